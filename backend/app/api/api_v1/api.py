@@ -1,8 +1,20 @@
-from fastapi import APIRouter
-from app.api.api_v1.endpoints import api_specs, test_cases, test_execution
+from fastapi import Depends, FastAPI
+from app.api.api_v1.endpoints import api_specs, test_cases, test_execution, mock_servers, profiling, generation_jobs, fixtures
+from app.core.security import require_admin
 
-api_router = APIRouter()
+API_V1_PREFIX = "/api/v1"
 
-api_router.include_router(api_specs.router, prefix="/api-specs", tags=["API Specifications"])
-api_router.include_router(test_cases.router, prefix="/test-cases", tags=["Test Cases"])
-api_router.include_router(test_execution.router, prefix="/test-execution", tags=["Test Execution"]) 
\ No newline at end of file
+def include_api_routers(app: FastAPI):
+    """Add the v1 endpoint routers to the app.
+
+    They are included directly rather than through an intermediate router:
+    every include_router rebuilds each route and its response models, which
+    dominates startup time.
+    """
+    app.include_router(api_specs.router, prefix=f"{API_V1_PREFIX}/api-specs", tags=["API Specifications"])
+    app.include_router(test_cases.router, prefix=f"{API_V1_PREFIX}/test-cases", tags=["Test Cases"])
+    app.include_router(generation_jobs.router, prefix=f"{API_V1_PREFIX}/generation-jobs", tags=["Test Cases"])
+    app.include_router(test_execution.router, prefix=f"{API_V1_PREFIX}/test-execution", tags=["Test Execution"])
+    app.include_router(mock_servers.router, prefix=f"{API_V1_PREFIX}/mock-servers", tags=["Mock Servers"])
+    app.include_router(fixtures.router, prefix=f"{API_V1_PREFIX}/fixtures", tags=["Fixtures"])
+    app.include_router(profiling.router, prefix=f"{API_V1_PREFIX}/admin/profiling", tags=["Admin"], dependencies=[Depends(require_admin)])
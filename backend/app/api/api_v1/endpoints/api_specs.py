@@ -9,10 +9,8 @@ import logging
 from app.core.database import get_db
 from app.schemas.api_spec import APISpec, APISpecCreate, APISpecUpdate, Endpoint
 from app.services.api_parser import APIParser
-from app.services.test_generator import TestGenerator
 from app.models.api_spec import APISpec as APISpecModel, Endpoint as EndpointModel
 from app.core.config import settings
-from app.models.test_case import TestCase as TestCaseModel
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -86,43 +84,6 @@ async def import_api_spec(
             endpoint_count += 1
             endpoint_ids.append(endpoint.id)
         db.commit()
-        db.refresh(db_api_spec)
-
-        # Auto-generate test cases for each endpoint if not already present
-        for endpoint_id in endpoint_ids:
-            endpoint = db.query(EndpointModel).filter(EndpointModel.id == endpoint_id).first()
-            # Check if test cases already exist
-            existing = db.query(TestCaseModel).filter(TestCaseModel.endpoint_id == endpoint_id).first()
-            if not existing:
-                endpoint_dict = {
-                    'method': endpoint.method,
-                    'path': endpoint.path,
-                    'summary': endpoint.summary,
-                    'description': endpoint.description,
-                    'parameters': endpoint.parameters,
-                    'request_body': endpoint.request_body,
-                    'responses': endpoint.responses,
-                    'tags': endpoint.tags
-                }
-                # Pass API spec content for RAG generation
-                api_spec_content = spec_info.get('content', {})
-                test_cases = TestGenerator.generate_test_cases(endpoint_dict, "", api_spec_content)
-                for test_case_data in test_cases:
-                    test_case = TestCaseModel(
-                        api_spec_id=db_api_spec.id,
-                        endpoint_id=endpoint.id,
-                        name=test_case_data['name'],
-                        description=test_case_data['description'],
-                        test_type=test_case_data['test_type'],
-                        priority=test_case_data['priority'],
-                        input_data=test_case_data['input_data'],
-                        expected_output=test_case_data.get('expected_output'),
-                        expected_status_code=test_case_data['expected_status_code'],
-                        curl_command=test_case_data['curl_command'],
-                        test_script=test_case_data.get('test_script')
-                    )
-                    db.add(test_case)
-        db.commit()
         
         # Update status based on endpoint creation
         if endpoint_count > 0:
@@ -131,6 +92,14 @@ async def import_api_spec(
             db_api_spec.status = 'failed'
         
         db.commit()
+        
+        # Test generation (and the retrieval index it uses) runs as a background job;
+        # its progress is reported through generation_status
+        if endpoint_count > 0:
+            from app.services.generation_jobs import GenerationJobRunner
+            job = GenerationJobRunner.create(db, db_api_spec.id, endpoint_ids=endpoint_ids)
+            GenerationJobRunner.submit(job.id)
+        
         db.refresh(db_api_spec)
         
         return db_api_spec
@@ -207,8 +176,13 @@ async def delete_api_spec(
     if not api_spec:
         raise HTTPException(status_code=404, detail="API specification not found")
     
-    # Delete associated file
+    # Delete associated file and its retrieval index
     if os.path.exists(api_spec.file_path):
+        try:
+            from app.services.spec_index import SpecIndex
+            SpecIndex.remove_for_spec(APIParser.validate_spec_file(api_spec.file_path)['content'])
+        except Exception as e:
+            logger.warning(f"Could not remove spec index for {api_spec.file_path}: {str(e)}")
         os.remove(api_spec.file_path)
     
     db.delete(api_spec)
@@ -0,0 +1,142 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Dict, List, Any, Optional
+import os
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.schemas.fixture_set import FixtureSet, FixtureSetCreate
+from app.services.api_parser import APIParser
+from app.services.fixtures import FixtureService, TEARDOWN_STATUSES
+from app.services.synthetic_data import DataContext
+from app.api.api_v1.endpoints.mock_servers import get_mock_server
+from app.models.api_spec import APISpec as APISpecModel, Endpoint as EndpointModel
+from app.models.fixture_set import FixtureSet as FixtureSetModel
+
+router = APIRouter()
+
+def load_spec(api_spec_id: int, db: Session):
+    """Spec content and endpoints of an API specification"""
+    api_spec = db.query(APISpecModel).filter(APISpecModel.id == api_spec_id).first()
+    if not api_spec:
+        raise HTTPException(status_code=404, detail="API specification not found")
+
+    api_spec_content = {}
+    if api_spec.file_path and os.path.exists(api_spec.file_path):
+        try:
+            spec_info = APIParser.validate_spec_file(api_spec.file_path)
+            api_spec_content = spec_info.get('content', {})
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Failed to load API spec content: {str(e)}")
+
+    endpoints = db.query(EndpointModel).filter(EndpointModel.api_spec_id == api_spec_id).all()
+    return api_spec_content, endpoints
+
+def plan_fixtures(request: FixtureSetCreate, api_spec_content: Dict[str, Any], endpoints: List[EndpointModel]) -> List[Dict[str, Any]]:
+    plan = FixtureService.plan(endpoints, api_spec_content, request.counts, request.default_count)
+    if not plan:
+        raise HTTPException(status_code=404, detail="No create operations to seed in this API specification")
+    total = sum(entry['count'] for entry in plan)
+    if total > settings.FIXTURE_MAX_ENTITIES:
+        raise HTTPException(status_code=400, detail=f"Plan creates {total} entities, more than FIXTURE_MAX_ENTITIES ({settings.FIXTURE_MAX_ENTITIES})")
+    return plan
+
+@router.post("/plan", response_model=List[Dict[str, Any]])
+async def plan_fixture_set(
+    request: FixtureSetCreate,
+    db: Session = Depends(get_db)
+):
+    """Preview the seed plan: create operations in dependency order with entity counts"""
+    api_spec_content, endpoints = load_spec(request.api_spec_id, db)
+    return plan_fixtures(request, api_spec_content, endpoints)
+
+@router.post("/", response_model=FixtureSet)
+async def create_fixture_set(
+    request: FixtureSetCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """Seed a target service with bulk data planned from the spec's create operations.
+
+    Returns the pending set at once and seeds in the background; poll
+    ``/fixtures/{id}`` until it is ``seeded`` or ``partial`` (created IDs
+    are checkpointed after every stage). Pass its ID to
+    ``/test-execution/run`` as ``fixture_set_id`` and tear it down with
+    ``/fixtures/{id}/teardown`` (or ``teardown_fixtures`` on the run).
+    """
+    api_spec_content, endpoints = load_spec(request.api_spec_id, db)
+    plan = plan_fixtures(request, api_spec_content, endpoints)
+    base_url = get_mock_server(request.api_spec_id, db).base_url if request.mock else request.base_url
+    if not base_url:
+        raise HTTPException(status_code=400, detail="base_url is required unless mock is set")
+
+    fixture_set = FixtureSetModel(
+        api_spec_id=request.api_spec_id,
+        status='pending',
+        base_url=base_url,
+        data_seed=request.data_seed if request.data_seed is not None else DataContext.new_seed(),
+        plan=plan,
+        resources={},
+        errors=[]
+    )
+    db.add(fixture_set)
+    db.commit()
+    db.refresh(fixture_set)
+
+    background_tasks.add_task(FixtureService.seed_in_background, fixture_set.id, api_spec_content, request.parallelism)
+    return fixture_set
+
+@router.get("/", response_model=List[FixtureSet])
+async def list_fixture_sets(
+    api_spec_id: Optional[int] = None,
+    status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """List fixture sets, newest first"""
+    query = db.query(FixtureSetModel)
+    if api_spec_id is not None:
+        query = query.filter(FixtureSetModel.api_spec_id == api_spec_id)
+    if status:
+        query = query.filter(FixtureSetModel.status == status)
+    return query.order_by(FixtureSetModel.id.desc()).offset(skip).limit(limit).all()
+
+@router.get("/{fixture_set_id}", response_model=FixtureSet)
+async def get_fixture_set(
+    fixture_set_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get a fixture set with its plan and per-collection resource counts"""
+    fixture_set = db.query(FixtureSetModel).filter(FixtureSetModel.id == fixture_set_id).first()
+    if not fixture_set:
+        raise HTTPException(status_code=404, detail="Fixture set not found")
+    return fixture_set
+
+@router.get("/{fixture_set_id}/resources", response_model=Dict[str, List[Dict[str, Any]]])
+async def get_fixture_set_resources(
+    fixture_set_id: int,
+    db: Session = Depends(get_db)
+):
+    """IDs (and parent path parameters) of the entities the set created and has not torn down"""
+    fixture_set = db.query(FixtureSetModel).filter(FixtureSetModel.id == fixture_set_id).first()
+    if not fixture_set:
+        raise HTTPException(status_code=404, detail="Fixture set not found")
+    return fixture_set.resources or {}
+
+@router.post("/{fixture_set_id}/teardown", response_model=FixtureSet)
+async def teardown_fixture_set(
+    fixture_set_id: int,
+    parallelism: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Delete the set's entities in reverse dependency order; failed deletes stay on the set for another try"""
+    fixture_set = db.query(FixtureSetModel).filter(FixtureSetModel.id == fixture_set_id).first()
+    if not fixture_set:
+        raise HTTPException(status_code=404, detail="Fixture set not found")
+    if fixture_set.status not in TEARDOWN_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Fixture set is {fixture_set.status}")
+
+    await FixtureService.teardown(db, fixture_set, parallelism)
+    db.refresh(fixture_set)
+    return fixture_set
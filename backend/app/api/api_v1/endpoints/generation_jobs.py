@@ -0,0 +1,132 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Dict, List, Any, Optional
+
+from app.core.database import get_db
+from app.schemas.generation_job import GenerationJob, GenerationJobCreate
+from app.models.api_spec import APISpec as APISpecModel
+from app.models.generation_job import GenerationJob as GenerationJobModel
+
+router = APIRouter()
+
+@router.post("/", response_model=GenerationJob, status_code=202)
+async def create_generation_job(
+    request: GenerationJobCreate,
+    db: Session = Depends(get_db)
+):
+    """Start automated + AI test case generation for a spec in the background.
+
+    Poll the returned job for progress; test cases are committed per
+    endpoint (per chunk with ``bulk``) as generation goes.
+    """
+    from app.services.generation_jobs import GenerationJobRunner
+    api_spec = db.query(APISpecModel).filter(APISpecModel.id == request.api_spec_id).first()
+    if not api_spec:
+        raise HTTPException(status_code=404, detail="API specification not found")
+    
+    job = GenerationJobRunner.create(db, request.api_spec_id, request.base_url, request.bulk, request.endpoint_ids, request.max_tokens, request.max_cost, request.data_seed)
+    if not job.endpoint_ids:
+        db.delete(job)
+        db.commit()
+        raise HTTPException(status_code=404, detail="No endpoints found for this API specification")
+    
+    GenerationJobRunner.submit(job.id)
+    return job
+
+@router.get("/", response_model=List[GenerationJob])
+async def list_generation_jobs(
+    api_spec_id: Optional[int] = None,
+    status: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """List generation jobs, newest first"""
+    query = db.query(GenerationJobModel)
+    if api_spec_id is not None:
+        query = query.filter(GenerationJobModel.api_spec_id == api_spec_id)
+    if status:
+        query = query.filter(GenerationJobModel.status == status)
+    return query.order_by(GenerationJobModel.id.desc()).offset(skip).limit(limit).all()
+
+@router.get("/usage")
+async def get_llm_usage(
+    api_spec_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """LLM calls, tokens, latency and cost of all generation jobs (or one spec's), per provider and model"""
+    from app.services.llm_accounting import LLMAccounting
+    return LLMAccounting.summary(db, api_spec_id=api_spec_id)
+
+@router.get("/{job_id}", response_model=GenerationJob)
+async def get_generation_job(
+    job_id: int,
+    db: Session = Depends(get_db)
+):
+    """Get a generation job and its progress"""
+    job = db.query(GenerationJobModel).filter(GenerationJobModel.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    return job
+
+@router.get("/{job_id}/usage")
+async def get_generation_job_usage(
+    job_id: int,
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """LLM usage of one job per provider/model and per endpoint, most expensive endpoints first"""
+    from app.services.llm_accounting import LLMAccounting
+    job = db.query(GenerationJobModel).filter(GenerationJobModel.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    usage = LLMAccounting.summary(db, job_id=job_id, by_endpoint=True)
+    usage.update({'max_tokens': job.max_tokens, 'max_cost': job.max_cost, 'status': job.status})
+    return usage
+
+@router.post("/{job_id}/cancel", response_model=GenerationJob)
+async def cancel_generation_job(
+    job_id: int,
+    db: Session = Depends(get_db)
+):
+    """Stop a job; test cases already committed are kept and the job can be resumed"""
+    from app.services.generation_jobs import GenerationJobRunner, FINISHED_STATUSES
+    job = db.query(GenerationJobModel).filter(GenerationJobModel.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    if job.status in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Generation job is already {job.status}")
+    
+    GenerationJobRunner.cancel(db, job)
+    db.refresh(job)
+    return job
+
+@router.post("/{job_id}/resume", response_model=GenerationJob)
+async def resume_generation_job(
+    job_id: int,
+    max_tokens: Optional[int] = None,
+    max_cost: Optional[float] = None,
+    db: Session = Depends(get_db)
+):
+    """Continue a cancelled, failed or budget-stopped job, or retry the failed endpoints of a completed one.
+
+    ``max_tokens``/``max_cost`` replace the job's budget (0 removes the limit).
+    """
+    from app.services.generation_jobs import GenerationJobRunner, FINISHED_STATUSES
+    from app.services.llm_accounting import LLMAccounting
+    job = db.query(GenerationJobModel).filter(GenerationJobModel.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    if job.status not in FINISHED_STATUSES or (job.status == 'completed' and not job.failed_endpoint_ids):
+        raise HTTPException(status_code=409, detail=f"Generation job is {job.status} and has nothing to resume")
+    
+    ledger = LLMAccounting.ledger_for(job)
+    if max_tokens is not None:
+        ledger.max_tokens = max_tokens or None
+    if max_cost is not None:
+        ledger.max_cost = max_cost or None
+    if ledger.exceeded:
+        raise HTTPException(status_code=409, detail=f"Generation job has no LLM budget left ({ledger.describe_limit()}); raise max_tokens or max_cost")
+    
+    GenerationJobRunner.resume(db, job, max_tokens, max_cost)
+    db.refresh(job)
+    return job
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from typing import List, Dict, Any
+
+from app.core.database import get_db
+from app.services.api_parser import APIParser
+from app.services.mock_server import SpecMockServer, MockServerRegistry
+from app.models.api_spec import APISpec as APISpecModel, Endpoint as EndpointModel
+
+router = APIRouter()
+
+def build_mock_server(api_spec_id: int, db: Session) -> SpecMockServer:
+    """Build (or rebuild) the mock server for a stored API spec"""
+    api_spec = db.query(APISpecModel).filter(APISpecModel.id == api_spec_id).first()
+    if not api_spec:
+        raise HTTPException(status_code=404, detail="API specification not found")
+
+    endpoints = db.query(EndpointModel).filter(EndpointModel.api_spec_id == api_spec_id).all()
+    if not endpoints:
+        raise HTTPException(status_code=400, detail="API specification has no endpoints to mock")
+
+    # The stored endpoints carry the operations; the spec file is only needed to resolve $refs
+    spec_content = {}
+    if api_spec.file_type == 'openapi' and api_spec.file_path:
+        try:
+            spec_content = APIParser.validate_spec_file(api_spec.file_path)['content']
+        except (FileNotFoundError, ValueError):
+            spec_content = {}
+
+    endpoint_dicts = [
+        {'method': endpoint.method, 'path': endpoint.path, 'responses': endpoint.responses}
+        for endpoint in endpoints
+    ]
+    return MockServerRegistry.register(SpecMockServer(api_spec_id, endpoint_dicts, spec_content))
+
+def get_mock_server(api_spec_id: int, db: Session) -> SpecMockServer:
+    """Mock server for an API spec, built on first use"""
+    return MockServerRegistry.get(api_spec_id) or build_mock_server(api_spec_id, db)
+
+def mock_server_info(server: SpecMockServer) -> Dict[str, Any]:
+    return {
+        'api_spec_id': server.api_spec_id,
+        'base_url': server.base_url,
+        'routes': server.route_count
+    }
+
+@router.get("/", response_model=List[Dict[str, Any]])
+async def list_mock_servers():
+    """List running mock servers"""
+    return [mock_server_info(server) for server in MockServerRegistry.servers.values()]
+
+@router.post("/{api_spec_id}", response_model=Dict[str, Any])
+async def start_mock_server(
+    api_spec_id: int,
+    db: Session = Depends(get_db)
+):
+    """Start a mock server for an API spec, rebuilding its response tables if already running"""
+    return mock_server_info(build_mock_server(api_spec_id, db))
+
+@router.delete("/{api_spec_id}")
+async def stop_mock_server(api_spec_id: int):
+    """Stop the mock server for an API spec"""
+    if not MockServerRegistry.remove(api_spec_id):
+        raise HTTPException(status_code=404, detail="Mock server not running")
+    return {"message": "Mock server stopped"}
+
+@router.api_route("/{api_spec_id}/serve/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"])
+async def serve_mock_request(
+    api_spec_id: int,
+    path: str,
+    request: Request
+):
+    """Serve a request from a running mock server over HTTP (for external clients)"""
+    server = MockServerRegistry.get(api_spec_id)
+    if server is None:
+        raise HTTPException(status_code=404, detail="Mock server not running")
+    status, headers, body = server.resolve(request.method, f"/{path}")
+    content_type = next((value.decode() for name, value in headers if name == b'content-type'), None)
+    return Response(content=body, status_code=status, media_type=content_type)
@@ -0,0 +1,78 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+from typing import List, Dict, Any, Optional
+from pydantic import BaseModel
+import os
+
+from app.services.profiler import ProfilingService
+
+router = APIRouter()
+
+class StartProfileRequest(BaseModel):
+    duration_seconds: float = 30  # capped by PROFILING_MAX_SECONDS
+    profiler: Optional[str] = None  # 'pyinstrument' (default when installed) or 'cprofile'
+    run_id: Optional[str] = None  # attach to an active run; the profile stops when the run ends
+
+class StartTracemallocRequest(BaseModel):
+    frames: Optional[int] = None  # traceback depth kept per allocation
+
+@router.get("/runs", response_model=List[Dict[str, Any]])
+async def list_active_runs():
+    """List runs a profiler can be attached to"""
+    return list(ProfilingService.active_runs.values())
+
+@router.get("/sessions", response_model=List[Dict[str, Any]])
+async def list_profiling_sessions():
+    """List CPU profiling sessions"""
+    return ProfilingService.list_sessions()
+
+@router.post("/sessions", response_model=Dict[str, Any])
+async def start_profiling_session(request: StartProfileRequest):
+    """Start a bounded CPU profile of the process or of an active run"""
+    try:
+        return ProfilingService.start_cpu_profile(request.duration_seconds, request.profiler, request.run_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/sessions/{session_id}/stop", response_model=Dict[str, Any])
+async def stop_profiling_session(session_id: str):
+    """Stop a CPU profile before its duration is up"""
+    try:
+        return ProfilingService.stop_cpu_profile(session_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/sessions/{session_id}/download")
+async def download_profile(session_id: str):
+    """Download a profile (speedscope JSON or pstats)"""
+    session = ProfilingService.sessions.get(session_id)
+    if session is None or session['status'] != 'completed' or not os.path.exists(session['file_path']):
+        raise HTTPException(status_code=404, detail="Profile not available")
+    return FileResponse(session['file_path'], filename=os.path.basename(session['file_path']))
+
+@router.get("/tracemalloc", response_model=Dict[str, Any])
+async def get_tracemalloc_status():
+    """Current traced memory"""
+    return ProfilingService.tracemalloc_status()
+
+@router.post("/tracemalloc/start", response_model=Dict[str, Any])
+async def start_tracemalloc(request: StartTracemallocRequest):
+    """Start tracing allocations"""
+    return ProfilingService.start_tracemalloc(request.frames)
+
+@router.post("/tracemalloc/snapshot", response_model=Dict[str, Any])
+async def take_tracemalloc_snapshot(top: int = 25):
+    """Save a snapshot with top allocations and growth since the previous snapshot"""
+    try:
+        return ProfilingService.take_snapshot(top)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/tracemalloc/stop", response_model=Dict[str, Any])
+async def stop_tracemalloc():
+    """Stop tracing allocations"""
+    return ProfilingService.stop_tracemalloc()
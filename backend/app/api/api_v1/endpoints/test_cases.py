@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from sqlalchemy import case
+import asyncio
 import json
 import os
+import threading
 
 from app.core.database import get_db
 from app.schemas.test_case import TestCase, TestCaseCreate, TestCaseUpdate, TestResult
 from app.services.test_generator import TestGenerator
 from app.services.api_parser import APIParser
+from app.services.synthetic_data import DataContext
 from app.models.test_case import TestCase as TestCaseModel, TestResult as TestResultModel
 from app.models.api_spec import APISpec as APISpecModel, Endpoint as EndpointModel
 from app.models.test_case import TestCaseType
@@ -21,13 +25,24 @@ class GenerateTestCasesRequest(BaseModel):
     endpoint_path: str = None
     method: str = None
     base_url: str = ""
+    bulk: bool = False
+    data_seed: Optional[int] = None  # seed for synthetic test data; random if omitted, echoed in X-Data-Seed
+
+class ValidateTestCasesRequest(BaseModel):
+    api_spec_id: int
+    dry_run: Optional[bool] = None  # route through the in-process mock; defaults to TEST_CASE_DRY_RUN
 
 @router.post("/generate", response_model=List[TestCase])
 async def generate_test_cases(
     request: GenerateTestCasesRequest,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """Generate test cases for an API specification"""
+    from app.services.test_case_dedup import TestCaseDeduplicator
+    from app.services.test_case_validation import TestCaseValidator, build_test_case_model
+    from app.services.llm_accounting import LLMAccounting
+    from app.core.llm_usage import use_ledger, usage_scope
     
     # Get API spec and endpoints
     api_spec = db.query(APISpecModel).filter(APISpecModel.id == request.api_spec_id).first()
@@ -38,7 +53,22 @@ async def generate_test_cases(
     if not endpoints:
         raise HTTPException(status_code=404, detail="No endpoints found for this API specification")
     
+    # Load API spec content for RAG generation
+    api_spec_content = {}
+    if api_spec.file_path and os.path.exists(api_spec.file_path):
+        try:
+            spec_info = APIParser.validate_spec_file(api_spec.file_path)
+            api_spec_content = spec_info.get('content', {})
+        except Exception as e:
+            print(f"Failed to load API spec content: {str(e)}")
+    
     generated_test_cases = []
+    dedup = TestCaseDeduplicator(db, request.api_spec_id)
+    validator = TestCaseValidator(db, request.api_spec_id, api_spec_content)
+    data_context = DataContext(request.data_seed)
+    response.headers['X-Data-Seed'] = str(data_context.seed)
+    # AI calls made for this request are recorded and held to the job budget
+    ledger = LLMAccounting.request_ledger()
     
     for endpoint in endpoints:
         # Convert endpoint model to dict
@@ -53,37 +83,23 @@ async def generate_test_cases(
             'tags': endpoint.tags
         }
         
-        # Load API spec content for RAG generation
-        api_spec_content = {}
-        if api_spec.file_path and os.path.exists(api_spec.file_path):
-            try:
-                spec_info = APIParser.validate_spec_file(api_spec.file_path)
-                api_spec_content = spec_info.get('content', {})
-            except Exception as e:
-                print(f"Failed to load API spec content: {str(e)}")
-        
         # Generate test cases for this endpoint with RAG support
-        test_cases = TestGenerator.generate_test_cases(endpoint_dict, request.base_url, api_spec_content)
+        with use_ledger(ledger), usage_scope(endpoint=f"{endpoint.method}_{endpoint.path}"):
+            test_cases = TestGenerator.generate_test_cases(endpoint_dict, request.base_url, api_spec_content, data_context)
         
         for test_case_data in test_cases:
+            # Skip test cases equivalent to one already stored for this spec
+            test_fingerprint = dedup.admit(endpoint, test_case_data)
+            if test_fingerprint is None:
+                continue
+            
             # Create test case record
-            test_case = TestCaseModel(
-                api_spec_id=request.api_spec_id,
-                endpoint_id=endpoint.id,
-                name=test_case_data['name'],
-                description=test_case_data['description'],
-                test_type=test_case_data['test_type'],
-                priority=test_case_data['priority'],
-                input_data=test_case_data['input_data'],
-                expected_output=test_case_data.get('expected_output'),
-                expected_status_code=test_case_data['expected_status_code'],
-                curl_command=test_case_data['curl_command'],
-                test_script=test_case_data.get('test_script')
-            )
+            test_case = build_test_case_model(request.api_spec_id, endpoint, test_case_data, validator, test_fingerprint)
             
             db.add(test_case)
             generated_test_cases.append(test_case)
     
+    LLMAccounting.persist_request(db, request.api_spec_id, ledger)
     db.commit()
     
     # Refresh all test cases to get IDs
@@ -95,9 +111,14 @@ async def generate_test_cases(
 @router.post("/generate-rag", response_model=List[TestCase])
 async def generate_rag_test_cases(
     request: GenerateTestCasesRequest,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """Generate automated test cases first, then optionally add AI-powered ones if available"""
+    from app.services.test_case_dedup import TestCaseDeduplicator
+    from app.services.test_case_validation import TestCaseValidator, build_test_case_model
+    from app.services.llm_accounting import LLMAccounting
+    from app.core.llm_usage import use_ledger, usage_scope
     
     # Get API spec
     api_spec = db.query(APISpecModel).filter(APISpecModel.id == request.api_spec_id).first()
@@ -132,6 +153,12 @@ async def generate_rag_test_cases(
             raise HTTPException(status_code=404, detail="No endpoints found for this API specification")
     
     generated_test_cases = []
+    dedup = TestCaseDeduplicator(db, request.api_spec_id)
+    validator = TestCaseValidator(db, request.api_spec_id, api_spec_content)
+    data_context = DataContext(request.data_seed)
+    response.headers['X-Data-Seed'] = str(data_context.seed)
+    # AI calls made for this request are recorded and held to the job budget
+    ledger = LLMAccounting.request_ledger()
     
     # ALWAYS generate automated test cases first (guaranteed to work)
     print("🔧 Generating automated test cases first...")
@@ -148,23 +175,14 @@ async def generate_rag_test_cases(
         }
         
         # Generate automated test cases (this always works)
-        automated_test_cases = TestGenerator._generate_rule_based_test_cases(endpoint_dict, request.base_url)
+        automated_test_cases = TestGenerator.generate_automated_test_cases(endpoint_dict, request.base_url, api_spec_content, data_context)
         
-        # Save automated test cases
+        # Save automated test cases not already stored for this spec
         for test_case_data in automated_test_cases:
-            test_case = TestCaseModel(
-                api_spec_id=request.api_spec_id,
-                endpoint_id=endpoint.id,
-                name=test_case_data['name'],
-                description=test_case_data['description'],
-                test_type=test_case_data['test_type'],
-                priority=test_case_data['priority'],
-                input_data=test_case_data['input_data'],
-                expected_output=test_case_data.get('expected_output'),
-                expected_status_code=test_case_data['expected_status_code'],
-                curl_command=test_case_data['curl_command'],
-                test_script=test_case_data.get('test_script')
-            )
+            test_fingerprint = dedup.admit(endpoint, test_case_data)
+            if test_fingerprint is None:
+                continue
+            test_case = build_test_case_model(request.api_spec_id, endpoint, test_case_data, validator, test_fingerprint)
             db.add(test_case)
             generated_test_cases.append(test_case)
     
@@ -177,6 +195,9 @@ async def generate_rag_test_cases(
         if rag_generator and rag_generator.is_available:
             # Try to generate AI test cases for each endpoint
             for endpoint in endpoints:
+                if ledger.exceeded:
+                    print(f"⚠️  AI generation stopped: {ledger.describe_limit()}")
+                    break
                 endpoint_dict = {
                     'method': endpoint.method,
                     'path': endpoint.path,
@@ -189,36 +210,21 @@ async def generate_rag_test_cases(
                 }
                 
                 # Try to generate AI test cases
-                ai_test_cases = rag_generator.generate_rag_test_cases(endpoint_dict, api_spec_content, request.base_url)
+                with use_ledger(ledger), usage_scope(endpoint=f"{endpoint.method}_{endpoint.path}"):
+                    ai_test_cases = rag_generator.generate_rag_test_cases(endpoint_dict, api_spec_content, request.base_url)
                 
                 if ai_test_cases:
-                    # Filter out duplicates by comparing with existing automated test cases
-                    existing_names = set()
-                    for existing_case in generated_test_cases:
-                        if existing_case.endpoint_id == endpoint.id:
-                            existing_names.add(existing_case.name)
-                    
-                    # Add unique AI test cases
+                    # Add AI test cases that are not equivalent to stored or just generated ones
+                    added_count = 0
                     for test_case_data in ai_test_cases:
-                        if test_case_data['name'] not in existing_names:
-                            test_case = TestCaseModel(
-                                api_spec_id=request.api_spec_id,
-                                endpoint_id=endpoint.id,
-                                name=test_case_data['name'],
-                                description=test_case_data['description'],
-                                test_type=test_case_data['test_type'],
-                                priority=test_case_data['priority'],
-                                input_data=test_case_data['input_data'],
-                                expected_output=test_case_data.get('expected_output'),
-                                expected_status_code=test_case_data['expected_status_code'],
-                                curl_command=test_case_data['curl_command'],
-                                test_script=test_case_data.get('test_script')
-                            )
+                        test_fingerprint = dedup.admit(endpoint, test_case_data)
+                        if test_fingerprint is not None:
+                            test_case = build_test_case_model(request.api_spec_id, endpoint, test_case_data, validator, test_fingerprint)
                             db.add(test_case)
                             generated_test_cases.append(test_case)
-                            existing_names.add(test_case_data['name'])
+                            added_count += 1
                     
-                    print(f"✅ Added {len([tc for tc in ai_test_cases if tc['name'] not in existing_names])} AI test cases for {endpoint.method} {endpoint.path}")
+                    print(f"✅ Added {added_count} AI test cases for {endpoint.method} {endpoint.path}")
                 else:
                     print(f"⚠️  No AI test cases generated for {endpoint.method} {endpoint.path} (quota/limit reached)")
         else:
@@ -227,6 +233,7 @@ async def generate_rag_test_cases(
     except Exception as e:
         print(f"⚠️  AI generation failed: {str(e)}, continuing with automated test cases only")
     
+    LLMAccounting.persist_request(db, request.api_spec_id, ledger)
     db.commit()
     
     # Refresh all test cases to get IDs
@@ -237,16 +244,21 @@ async def generate_rag_test_cases(
     automated_count = sum(1 for tc in generated_test_cases if tc.test_type == TestCaseType.AUTOMATED)
     ai_count = sum(1 for tc in generated_test_cases if tc.test_type == TestCaseType.AI_GENERATED)
     
-    print(f"🎉 Generation complete: {automated_count} automated + {ai_count} AI-generated = {len(generated_test_cases)} total test cases")
+    print(f"🎉 Generation complete: {automated_count} automated + {ai_count} AI-generated = {len(generated_test_cases)} total test cases ({dedup.skipped} duplicates skipped, {validator.invalid} AI test cases failed validation)")
     
     return generated_test_cases
 
 @router.post("/generate-rag-bulk", response_model=List[TestCase])
 async def generate_rag_test_cases_bulk(
     request: GenerateTestCasesRequest,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """Generate automated test cases first for ALL endpoints, then optionally add AI-powered ones if available"""
+    from app.services.test_case_dedup import TestCaseDeduplicator
+    from app.services.test_case_validation import TestCaseValidator, build_test_case_model
+    from app.services.llm_accounting import LLMAccounting
+    from app.core.llm_usage import use_ledger, usage_scope
     
     # Get API spec
     api_spec = db.query(APISpecModel).filter(APISpecModel.id == request.api_spec_id).first()
@@ -269,6 +281,12 @@ async def generate_rag_test_cases_bulk(
         raise HTTPException(status_code=404, detail="No endpoints found for this API specification")
     
     generated_test_cases = []
+    dedup = TestCaseDeduplicator(db, request.api_spec_id)
+    validator = TestCaseValidator(db, request.api_spec_id, api_spec_content)
+    data_context = DataContext(request.data_seed)
+    response.headers['X-Data-Seed'] = str(data_context.seed)
+    # AI calls made for this request are recorded and held to the job budget
+    ledger = LLMAccounting.request_ledger()
     
     # ALWAYS generate automated test cases first for all endpoints (guaranteed to work)
     print("🔧 Generating automated test cases for all endpoints first...")
@@ -285,23 +303,14 @@ async def generate_rag_test_cases_bulk(
         }
         
         # Generate automated test cases (this always works)
-        automated_test_cases = TestGenerator._generate_rule_based_test_cases(endpoint_dict, request.base_url)
+        automated_test_cases = TestGenerator.generate_automated_test_cases(endpoint_dict, request.base_url, api_spec_content, data_context)
         
-        # Save automated test cases
+        # Save automated test cases not already stored for this spec
         for test_case_data in automated_test_cases:
-            test_case = TestCaseModel(
-                api_spec_id=request.api_spec_id,
-                endpoint_id=endpoint.id,
-                name=test_case_data['name'],
-                description=test_case_data['description'],
-                test_type=test_case_data['test_type'],
-                priority=test_case_data['priority'],
-                input_data=test_case_data['input_data'],
-                expected_output=test_case_data.get('expected_output'),
-                expected_status_code=test_case_data['expected_status_code'],
-                curl_command=test_case_data['curl_command'],
-                test_script=test_case_data.get('test_script')
-            )
+            test_fingerprint = dedup.admit(endpoint, test_case_data)
+            if test_fingerprint is None:
+                continue
+            test_case = build_test_case_model(request.api_spec_id, endpoint, test_case_data, validator, test_fingerprint)
             db.add(test_case)
             generated_test_cases.append(test_case)
     
@@ -328,16 +337,21 @@ async def generate_rag_test_cases_bulk(
                 all_endpoints.append(endpoint_dict)
             
             # Try bulk AI generation
-            if hasattr(rag_generator, 'generate_rag_test_cases_for_all_endpoints'):
-                all_ai_test_cases = rag_generator.generate_rag_test_cases_for_all_endpoints(all_endpoints, api_spec_content, request.base_url)
-            else:
-                # Fallback to individual generation
-                all_ai_test_cases = {}
-                for endpoint_dict in all_endpoints:
-                    endpoint_key = f"{endpoint_dict['method']}_{endpoint_dict['path']}"
-                    ai_cases = rag_generator.generate_rag_test_cases(endpoint_dict, api_spec_content, request.base_url)
-                    if ai_cases:
-                        all_ai_test_cases[endpoint_key] = ai_cases
+            with use_ledger(ledger):
+                if hasattr(rag_generator, 'generate_rag_test_cases_for_all_endpoints'):
+                    all_ai_test_cases = rag_generator.generate_rag_test_cases_for_all_endpoints(all_endpoints, api_spec_content, request.base_url)
+                else:
+                    # Fallback to individual generation
+                    all_ai_test_cases = {}
+                    for endpoint_dict in all_endpoints:
+                        if ledger.exceeded:
+                            print(f"⚠️  AI generation stopped: {ledger.describe_limit()}")
+                            break
+                        endpoint_key = f"{endpoint_dict['method']}_{endpoint_dict['path']}"
+                        with usage_scope(endpoint=endpoint_key):
+                            ai_cases = rag_generator.generate_rag_test_cases(endpoint_dict, api_spec_content, request.base_url)
+                        if ai_cases:
+                            all_ai_test_cases[endpoint_key] = ai_cases
             
             # Map AI test cases back to endpoints and add unique ones
             endpoint_map = {f"{ep.method}_{ep.path}": ep for ep in endpoints}
@@ -346,32 +360,14 @@ async def generate_rag_test_cases_bulk(
                 if endpoint_key in endpoint_map:
                     endpoint = endpoint_map[endpoint_key]
                     
-                    # Filter out duplicates by comparing with existing automated test cases
-                    existing_names = set()
-                    for existing_case in generated_test_cases:
-                        if existing_case.endpoint_id == endpoint.id:
-                            existing_names.add(existing_case.name)
-                    
-                    # Add unique AI test cases
+                    # Add AI test cases that are not equivalent to stored or just generated ones
                     added_count = 0
                     for test_case_data in ai_test_cases:
-                        if test_case_data['name'] not in existing_names:
-                            test_case = TestCaseModel(
-                                api_spec_id=request.api_spec_id,
-                                endpoint_id=endpoint.id,
-                                name=test_case_data['name'],
-                                description=test_case_data['description'],
-                                test_type=test_case_data['test_type'],
-                                priority=test_case_data['priority'],
-                                input_data=test_case_data['input_data'],
-                                expected_output=test_case_data.get('expected_output'),
-                                expected_status_code=test_case_data['expected_status_code'],
-                                curl_command=test_case_data['curl_command'],
-                                test_script=test_case_data.get('test_script')
-                            )
+                        test_fingerprint = dedup.admit(endpoint, test_case_data)
+                        if test_fingerprint is not None:
+                            test_case = build_test_case_model(request.api_spec_id, endpoint, test_case_data, validator, test_fingerprint)
                             db.add(test_case)
                             generated_test_cases.append(test_case)
-                            existing_names.add(test_case_data['name'])
                             added_count += 1
                     
                     if added_count > 0:
@@ -384,6 +380,7 @@ async def generate_rag_test_cases_bulk(
     except Exception as e:
         print(f"⚠️  AI generation failed: {str(e)}, continuing with automated test cases only")
     
+    LLMAccounting.persist_request(db, request.api_spec_id, ledger)
     db.commit()
     
     # Refresh all test cases to get IDs
@@ -394,16 +391,238 @@ async def generate_rag_test_cases_bulk(
     automated_count = sum(1 for tc in generated_test_cases if tc.test_type == TestCaseType.AUTOMATED)
     ai_count = sum(1 for tc in generated_test_cases if tc.test_type == TestCaseType.AI_GENERATED)
     
-    print(f"🎉 Bulk generation complete: {automated_count} automated + {ai_count} AI-generated = {len(generated_test_cases)} total test cases")
+    print(f"🎉 Bulk generation complete: {automated_count} automated + {ai_count} AI-generated = {len(generated_test_cases)} total test cases ({dedup.skipped} duplicates skipped, {validator.invalid} AI test cases failed validation)")
     
     return generated_test_cases
 
+def _stream_event(event: str, **data) -> str:
+    """One NDJSON line of a streaming generation response"""
+    return json.dumps({'event': event, **data}, default=str) + "\n"
+
+@router.post("/generate-rag/stream")
+async def generate_rag_test_cases_stream(
+    request: GenerateTestCasesRequest,
+    db: Session = Depends(get_db)
+):
+    """Generate automated and AI test cases like /generate-rag, streaming progress as NDJSON.
+
+    Events, one JSON object per line:
+      - ``automated``: rule-based test cases saved (``count``)
+      - ``test_case``: an AI test case, sent as soon as it is validated and saved
+      - ``progress``: endpoints finished so far (``completed``/``total``)
+      - ``error``: AI generation failed or is unavailable; saved test cases are kept
+      - ``done``: final counts
+
+    With ``bulk`` the provider's bulk generation is used when it has one.
+    """
+    from app.services.test_case_dedup import TestCaseDeduplicator
+    from app.services.test_case_validation import TestCaseValidator, build_test_case_model
+    from app.services.llm_accounting import LLMAccounting
+    from app.core.llm_usage import use_ledger, usage_scope
+    from app.services.llm_streaming import GenerationCancelled
+    
+    # Get API spec
+    api_spec = db.query(APISpecModel).filter(APISpecModel.id == request.api_spec_id).first()
+    if not api_spec:
+        raise HTTPException(status_code=404, detail="API specification not found")
+    
+    # Load API spec content for RAG generation
+    api_spec_content = {}
+    if api_spec.file_path and os.path.exists(api_spec.file_path):
+        try:
+            spec_info = APIParser.validate_spec_file(api_spec.file_path)
+            api_spec_content = spec_info.get('content', {})
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Failed to load API spec content: {str(e)}")
+    
+    # Get endpoints - either specific endpoint or all endpoints
+    query = db.query(EndpointModel).filter(EndpointModel.api_spec_id == request.api_spec_id)
+    if request.endpoint_path and request.method:
+        query = query.filter(EndpointModel.path == request.endpoint_path, EndpointModel.method == request.method.upper())
+    endpoints = query.all()
+    if not endpoints:
+        raise HTTPException(status_code=404, detail="No endpoints found for this API specification")
+    
+    endpoint_map = {f"{endpoint.method}_{endpoint.path}": endpoint for endpoint in endpoints}
+    endpoint_dicts = [{
+        'method': endpoint.method,
+        'path': endpoint.path,
+        'summary': endpoint.summary,
+        'description': endpoint.description,
+        'parameters': endpoint.parameters,
+        'request_body': endpoint.request_body,
+        'responses': endpoint.responses,
+        'tags': endpoint.tags
+    } for endpoint in endpoints]
+    
+    dedup = TestCaseDeduplicator(db, request.api_spec_id)
+    validator = TestCaseValidator(db, request.api_spec_id, api_spec_content)
+    data_context = DataContext(request.data_seed)
+    # AI calls made for this request are recorded and held to the job budget
+    ledger = LLMAccounting.request_ledger()
+    
+    def save_test_case(endpoint: EndpointModel, test_case_data: dict) -> TestCaseModel:
+        """Add a test case unless an equivalent one is stored; returns None for duplicates"""
+        test_fingerprint = dedup.admit(endpoint, test_case_data)
+        if test_fingerprint is None:
+            return None
+        test_case = build_test_case_model(request.api_spec_id, endpoint, test_case_data, validator, test_fingerprint)
+        db.add(test_case)
+        return test_case
+    
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+    
+    def push(kind: str, endpoint_key: str = None, payload=None):
+        loop.call_soon_threadsafe(queue.put_nowait, (kind, endpoint_key, payload))
+    
+    def generate_ai_test_cases():
+        """Runs in a worker thread; every result goes through the queue"""
+        try:
+            with use_ledger(ledger):
+                from app.core.ai_config import get_rag_generator
+                rag_generator = get_rag_generator()
+                if not (rag_generator and rag_generator.is_available):
+                    push('error', payload="AI generator not available, keeping automated test cases only")
+                    return
+            
+                def on_test_case(endpoint_key: str, test_case_data: dict):
+                    # Client went away: stop the generator mid-response rather than pay for output nobody reads
+                    if cancelled.is_set():
+                        raise GenerationCancelled("Client disconnected from streaming generation")
+                    push('test_case', endpoint_key, test_case_data)
+            
+                if request.bulk and hasattr(rag_generator, 'generate_rag_test_cases_for_all_endpoints'):
+                    rag_generator.generate_rag_test_cases_for_all_endpoints(endpoint_dicts, api_spec_content, request.base_url, on_test_case=on_test_case)
+                    for endpoint_key in endpoint_map:
+                        push('endpoint_done', endpoint_key)
+                else:
+                    for endpoint_key, endpoint_dict in zip(endpoint_map, endpoint_dicts):
+                        if cancelled.is_set():
+                            break
+                        if ledger.exceeded:
+                            push('error', payload=f"AI generation stopped: {ledger.describe_limit()}")
+                            break
+                        with usage_scope(endpoint=endpoint_key):
+                            rag_generator.generate_rag_test_cases(endpoint_dict, api_spec_content, request.base_url, on_test_case=on_test_case)
+                        push('endpoint_done', endpoint_key)
+        except GenerationCancelled:
+            pass
+        except Exception as e:
+            push('error', payload=f"AI generation failed: {str(e)}, keeping the test cases saved so far")
+        finally:
+            push('finished')
+    
+    async def events():
+        # ALWAYS save automated test cases first (guaranteed to work)
+        automated_count = 0
+        for endpoint_key, endpoint_dict in zip(endpoint_map, endpoint_dicts):
+            for test_case_data in TestGenerator.generate_automated_test_cases(endpoint_dict, request.base_url, api_spec_content, data_context):
+                if save_test_case(endpoint_map[endpoint_key], test_case_data) is not None:
+                    automated_count += 1
+        db.commit()
+        yield _stream_event('automated', count=automated_count, endpoints=len(endpoints))
+        
+        worker = loop.run_in_executor(None, generate_ai_test_cases)
+        ai_count = 0
+        completed = set()
+        try:
+            while True:
+                kind, endpoint_key, payload = await queue.get()
+                if kind == 'finished':
+                    break
+                if kind == 'error':
+                    yield _stream_event('error', detail=payload)
+                elif kind == 'endpoint_done':
+                    if endpoint_key not in completed:
+                        completed.add(endpoint_key)
+                        yield _stream_event('progress', completed=len(completed), total=len(endpoints), endpoint=endpoint_key)
+                elif endpoint_key in endpoint_map:
+                    test_case = save_test_case(endpoint_map[endpoint_key], payload)
+                    if test_case is None:
+                        continue
+                    # Saved one by one so a dropped connection keeps everything sent so far
+                    db.commit()
+                    db.refresh(test_case)
+                    ai_count += 1
+                    yield _stream_event('test_case', endpoint=endpoint_key, test_case=TestCase.model_validate(test_case).model_dump(mode='json'))
+            await worker
+        finally:
+            # Client went away: stop the worker at its next test case or endpoint
+            cancelled.set()
+            # Calls made so far were paid for whether or not the client stayed
+            LLMAccounting.persist_request(db, request.api_spec_id, ledger)
+            db.commit()
+        
+        print(f"🎉 Streaming generation complete: {automated_count} automated + {ai_count} AI-generated test cases")
+        yield _stream_event('done', automated=automated_count, ai_generated=ai_count, total=automated_count + ai_count, duplicates_skipped=dedup.skipped, invalid=validator.invalid)
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson", headers={'X-Data-Seed': str(data_context.seed)})
+
+@router.post("/validate", response_model=Dict[str, Any])
+async def validate_test_cases(
+    request: ValidateTestCasesRequest,
+    db: Session = Depends(get_db)
+):
+    """Re-run pre-execution validation on a spec's stored AI-generated test cases.
+
+    Cases that now fail are deactivated; cases that pass again are
+    reactivated if validation was what deactivated them.
+    """
+    from app.services.test_case_validation import TestCaseValidator
+    api_spec = db.query(APISpecModel).filter(APISpecModel.id == request.api_spec_id).first()
+    if not api_spec:
+        raise HTTPException(status_code=404, detail="API specification not found")
+    
+    api_spec_content = {}
+    if api_spec.file_path and os.path.exists(api_spec.file_path):
+        try:
+            spec_info = APIParser.validate_spec_file(api_spec.file_path)
+            api_spec_content = spec_info.get('content', {})
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Failed to load API spec content: {str(e)}")
+    
+    validator = TestCaseValidator(db, request.api_spec_id, api_spec_content, dry_run=request.dry_run)
+    rows = db.query(TestCaseModel, EndpointModel).join(EndpointModel, TestCaseModel.endpoint_id == EndpointModel.id).filter(
+        TestCaseModel.api_spec_id == request.api_spec_id,
+        TestCaseModel.test_type == TestCaseType.AI_GENERATED
+    ).all()
+    
+    for test_case, endpoint in rows:
+        test_case_data = {
+            'name': test_case.name,
+            'test_type': test_case.test_type,
+            'input_data': test_case.input_data or {},
+            'curl_command': test_case.curl_command
+        }
+        if test_case.expected_status_code is not None:
+            test_case_data['expected_status_code'] = test_case.expected_status_code
+        tags = validator.check(endpoint, test_case_data)
+        if not tags:
+            continue
+        was_invalid = test_case.validation_status == 'invalid'
+        test_case.validation_status = tags['validation_status']
+        test_case.validation_errors = tags['validation_errors']
+        if not tags['is_active']:
+            test_case.is_active = False
+        elif was_invalid:
+            test_case.is_active = True
+    db.commit()
+    
+    return {
+        'api_spec_id': request.api_spec_id,
+        'checked': validator.valid + validator.invalid,
+        **validator.summary()
+    }
+
 @router.get("/", response_model=List[TestCase])
 async def list_test_cases(
     api_spec_id: int = None,
     endpoint_id: int = None,
     test_type: str = None,
     priority: str = None,
+    validation_status: str = None,
     sort: str = None,
     skip: int = 0,
     limit: int = 100,
@@ -426,6 +645,9 @@ async def list_test_cases(
     if priority:
         query = query.filter(TestCaseModel.priority == priority)
     
+    if validation_status:
+        query = query.filter(TestCaseModel.validation_status == validation_status)
+    
     # Add sorting by priority if requested
     if sort == "priority":
         priority_order = case(
@@ -458,6 +680,7 @@ async def update_test_case(
     db: Session = Depends(get_db)
 ):
     """Update test case"""
+    from app.services.test_case_dedup import fingerprint
     test_case = db.query(TestCaseModel).filter(TestCaseModel.id == test_case_id).first()
     if not test_case:
         raise HTTPException(status_code=404, detail="Test case not found")
@@ -466,6 +689,14 @@ async def update_test_case(
     for field, value in update_data.items():
         setattr(test_case, field, value)
     
+    # Keep the dedup fingerprint in step with what the test sends
+    if 'input_data' in update_data or 'expected_status_code' in update_data:
+        endpoint = test_case.endpoint
+        test_case.fingerprint = fingerprint(
+            endpoint.method if endpoint else None, endpoint.path if endpoint else None,
+            test_case.input_data, test_case.expected_status_code
+        )
+    
     db.commit()
     db.refresh(test_case)
     return test_case
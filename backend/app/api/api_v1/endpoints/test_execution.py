@@ -1,36 +1,143 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from sqlalchemy import or_
+from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 import os
+import zlib
 from datetime import datetime
 
 from app.core.database import get_db
 from app.schemas.test_case import TestCase, TestResult
 from app.services.test_executor import TestExecutor
+from app.services.concurrency_limiter import AdaptiveLimiterRegistry
+from app.services.run_scheduler import RunScheduler
+from app.services.retry_policy import RetryPolicy, RetryBudget
+from app.services.cassette_store import CassetteStore
+from app.services.resource_pool import ResourcePool
+from app.services.synthetic_data import DataContext
+from app.services.fixtures import FixtureService, TEARDOWN_STATUSES
 from app.services.report_generator import ReportGenerator
+from app.services.profiler import ProfilingService
+from app.api.api_v1.endpoints.mock_servers import get_mock_server
 from app.models.test_case import TestCase as TestCaseModel, TestResult as TestResultModel
 from app.models.api_spec import APISpec as APISpecModel, Endpoint as EndpointModel
+from app.models.fixture_set import FixtureSet as FixtureSetModel
 from app.core.config import settings
 
 router = APIRouter()
 
+class RunScheduleOptions(BaseModel):
+    priority_order: bool = False  # run CRITICAL > HIGH > MEDIUM > LOW
+    fail_fast_threshold: Optional[float] = None  # abort when failed+error ratio exceeds this (0-1)
+    fail_fast_min_results: int = 10  # results needed before fail-fast can trigger
+    time_budget_seconds: Optional[float] = None  # wall-clock budget; unstarted cases are skipped
+
+class RetryPolicyOptions(BaseModel):
+    max_attempts: Optional[int] = None  # total attempts including the first
+    base_delay: Optional[float] = None  # seconds, doubled per attempt
+    max_delay: Optional[float] = None
+    jitter: bool = True
+    retry_on_status: Optional[List[int]] = None  # default 429, 502, 503, 504
+    retry_on_errors: Optional[List[str]] = None  # 'timeout', 'connect', 'request'
+    respect_retry_after: bool = True
+
+class CassetteOptions(BaseModel):
+    name: str
+    mode: str = "replay"  # 'record' stores live responses, 'replay' serves them without network
+
 class ExecuteTestRequest(BaseModel):
     test_case_ids: List[int]
     base_url: str = ""
+    schedule: Optional[RunScheduleOptions] = None
+    retry_policy: Optional[RetryPolicyOptions] = None
+    cassette: Optional[CassetteOptions] = None
+    run_id: Optional[str] = None  # client-chosen ID so admins can attach a profiler; generated if omitted
+    mock_api_spec_id: Optional[int] = None  # run against the spec's in-process mock server instead of base_url
+    include_invalid: bool = False  # also run test cases that failed pre-execution validation
+    resource_ids: Optional[Dict[str, List[Any]]] = None  # IDs of existing resources by collection path, e.g. {"/products": [1, 2]}
+    data_seed: Optional[int] = None  # replay a run's synthetic data; random if omitted (derived from the cassette name with one)
+    data_shard: int = 0  # this worker's shard when several run the same seed in parallel
+    data_shards: int = 1
 
 class ExecuteCurlRequest(BaseModel):
     curl_command: str
 
+class ExecuteCurlBatchRequest(BaseModel):
+    curl_commands: List[str]
+    max_concurrency: Optional[int] = None
+
 class RunTestRequest(BaseModel):
     test_case_ids: List[int]
     base_url: str = ""
     service_name: str = ""
+    schedule: Optional[RunScheduleOptions] = None
+    retry_policy: Optional[RetryPolicyOptions] = None
+    cassette: Optional[CassetteOptions] = None
+    run_id: Optional[str] = None  # client-chosen ID so admins can attach a profiler; generated if omitted
+    mock_api_spec_id: Optional[int] = None  # run against the spec's in-process mock server instead of base_url
+    include_invalid: bool = False  # also run test cases that failed pre-execution validation
+    resource_ids: Optional[Dict[str, List[Any]]] = None  # IDs of existing resources by collection path, e.g. {"/products": [1, 2]}
+    data_seed: Optional[int] = None  # replay a run's synthetic data; random if omitted (derived from the cassette name with one)
+    data_shard: int = 0  # this worker's shard when several run the same seed in parallel
+    data_shards: int = 1
+    fixture_set_id: Optional[int] = None  # seeded data (see /fixtures) whose IDs fill path parameters
+    teardown_fixtures: bool = False  # delete the fixture set's entities once the run is done
 
 class MultiServiceTestRequest(BaseModel):
-    service_configs: Dict[str, Dict[str, Any]]  # { "service_name": { "base_url": "...", "api_spec_id": 1 } }
+    service_configs: Dict[str, Dict[str, Any]]  # { "service_name": { "base_url": "...", "api_spec_id": 1, "max_concurrency": 20, "mock": false, "resource_ids": {"/products": [1]} } }
     test_case_ids: List[int] = []
+    schedule: Optional[RunScheduleOptions] = None
+    retry_policy: Optional[RetryPolicyOptions] = None
+    cassette: Optional[CassetteOptions] = None
+    run_id: Optional[str] = None  # client-chosen ID so admins can attach a profiler; generated if omitted
+    include_invalid: bool = False  # also run test cases that failed pre-execution validation
+    data_seed: Optional[int] = None  # replay a run's synthetic data; random if omitted (derived from the cassette name with one)
+    data_shard: int = 0  # this worker's shard when several run the same seed in parallel
+    data_shards: int = 1
+
+def open_resource_pool(resource_ids: Optional[Dict[str, List[Any]]]) -> Optional[ResourcePool]:
+    """Pool of resource IDs for path parameters, unless disabled"""
+    if not settings.RESOURCE_POOL_ENABLED:
+        return None
+    return ResourcePool(resource_ids)
+
+def open_data_context(seed: Optional[int], shard: int, shards: int, cassette: Optional[CassetteOptions]) -> Optional[DataContext]:
+    """Synthetic data context for a run, unless disabled.
+
+    Without a seed a cassette's name fixes it, so recording and replaying
+    the cassette send the same request bodies.
+    """
+    if not settings.SYNTHETIC_DATA_PER_RUN:
+        return None
+    if seed is None and cassette is not None:
+        seed = zlib.crc32(cassette.name.encode()) & 0x7fffffff
+    try:
+        return DataContext(seed, shard, shards)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def runnable(query, include_invalid: bool = False):
+    """Leave out test cases that failed pre-execution validation, unless reactivated since"""
+    if include_invalid:
+        return query
+    return query.filter(or_(
+        TestCaseModel.validation_status.is_(None),
+        TestCaseModel.validation_status != 'invalid',
+        TestCaseModel.is_active.is_(True)
+    ))
+
+def open_cassette(options: Optional[CassetteOptions]) -> Optional[CassetteStore]:
+    """Open the cassette requested for a run, if any"""
+    if options is None:
+        return None
+    try:
+        return CassetteStore(options.name, options.mode)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/multi-service", response_model=Dict[str, Any])
 async def run_multi_service_tests(
@@ -41,21 +148,33 @@ async def run_multi_service_tests(
     
     # Get test cases if specific IDs provided, otherwise get all for the services
     if request.test_case_ids:
-        test_cases = db.query(TestCaseModel).filter(TestCaseModel.id.in_(request.test_case_ids)).all()
+        test_cases = runnable(db.query(TestCaseModel).filter(TestCaseModel.id.in_(request.test_case_ids)), request.include_invalid).all()
     else:
         # Get all test cases for the specified services
         api_spec_ids = [config.get('api_spec_id') for config in request.service_configs.values() if config.get('api_spec_id')]
-        test_cases = db.query(TestCaseModel).filter(TestCaseModel.api_spec_id.in_(api_spec_ids)).all()
+        test_cases = runnable(db.query(TestCaseModel).filter(TestCaseModel.api_spec_id.in_(api_spec_ids)), request.include_invalid).all()
     
     if not test_cases:
         raise HTTPException(status_code=404, detail="No test cases found for the specified services")
     
+    # Services flagged as mock are served by their spec's in-process mock server
+    for config in request.service_configs.values():
+        if config.get('mock') and config.get('api_spec_id') is not None:
+            config['base_url'] = get_mock_server(config['api_spec_id'], db).base_url
+    
+    # Precompute api_spec_id -> base URL once instead of scanning configs per test case
+    spec_base_urls = {}
+    for config in request.service_configs.values():
+        if config.get('api_spec_id') is not None:
+            spec_base_urls.setdefault(config['api_spec_id'], config.get('base_url', ''))
+    
     # Convert test cases to dict format for executor
     test_case_dicts = []
     for test_case in test_cases:
         endpoint = db.query(EndpointModel).filter(EndpointModel.id == test_case.endpoint_id).first()
         test_case_dict = {
             'id': test_case.id,
+            'api_spec_id': test_case.api_spec_id,
             'name': test_case.name,
             'method': endpoint.method if endpoint else 'GET',
             'path': endpoint.path if endpoint else '',
@@ -63,16 +182,23 @@ async def run_multi_service_tests(
             'input_data': test_case.input_data,
             'expected_status_code': test_case.expected_status_code,
             'curl_command': test_case.curl_command,
-            'base_url': next(
-                (config.get('base_url', '') for config in request.service_configs.values() 
-                 if config.get('api_spec_id') == test_case.api_spec_id), 
-                ''
-            )
+            'retry_policy': test_case.retry_policy,
+            'base_url': spec_base_urls.get(test_case.api_spec_id, '')
         }
         test_case_dicts.append(test_case_dict)
     
     # Execute multi-service tests
-    results = await TestExecutor.execute_multi_service_test(test_case_dicts, request.service_configs)
+    scheduler = RunScheduler.from_options(request.schedule.dict() if request.schedule else None)
+    retry_policy = RetryPolicy.from_options(request.retry_policy.dict() if request.retry_policy else None)
+    cassette = open_cassette(request.cassette)
+    data_context = open_data_context(request.data_seed, request.data_shard, request.data_shards, request.cassette)
+    run_id = ProfilingService.register_run(f"multi-service:{','.join(request.service_configs)}", request.run_id)
+    try:
+        results = await TestExecutor.execute_multi_service_test(test_case_dicts, request.service_configs, scheduler, retry_policy, cassette, data_context)
+    finally:
+        ProfilingService.finish_run(run_id)
+        if cassette is not None:
+            cassette.close()
     
     # Save results to database
     saved_results = []
@@ -84,7 +210,9 @@ async def run_multi_service_tests(
             response_body=result.get('response_body'),
             response_time=result.get('response_time', 0),
             error_message=result.get('error_message'),
-            execution_log=result.get('execution_log')
+            execution_log=result.get('execution_log'),
+            attempt_count=result.get('attempt_count', 1),
+            is_flaky=result.get('flaky', False)
         )
         db.add(test_result)
         saved_results.append(test_result)
@@ -96,6 +224,7 @@ async def run_multi_service_tests(
     
     return {
         "status": "completed",
+        "run_id": run_id,
         "report_filepath": report_filepath,
         "results": results,
         "results_count": len(saved_results)
@@ -109,10 +238,18 @@ async def run_tests_and_save_report(
     """Run test cases and save markdown report"""
     
     # Get test cases with endpoint and API spec info
-    test_cases = db.query(TestCaseModel).filter(TestCaseModel.id.in_(request.test_case_ids)).all()
+    test_cases = runnable(db.query(TestCaseModel).filter(TestCaseModel.id.in_(request.test_case_ids)), request.include_invalid).all()
     if not test_cases:
         raise HTTPException(status_code=404, detail="No test cases found")
     
+    fixture_set = None
+    if request.fixture_set_id is not None:
+        fixture_set = db.query(FixtureSetModel).filter(FixtureSetModel.id == request.fixture_set_id).first()
+        if not fixture_set:
+            raise HTTPException(status_code=404, detail="Fixture set not found")
+        if request.teardown_fixtures and fixture_set.status not in TEARDOWN_STATUSES:
+            raise HTTPException(status_code=409, detail=f"Fixture set is {fixture_set.status}")
+    
     # Get service name from first test case if not provided
     if not request.service_name:
         first_test_case = test_cases[0]
@@ -133,12 +270,41 @@ async def run_tests_and_save_report(
             'priority': test_case.priority.value if test_case.priority else 'medium',
             'input_data': test_case.input_data,
             'expected_status_code': test_case.expected_status_code,
-            'curl_command': test_case.curl_command
+            'curl_command': test_case.curl_command,
+            'retry_policy': test_case.retry_policy
         }
         test_case_dicts.append(test_case_dict)
     
+    base_url = get_mock_server(request.mock_api_spec_id, db).base_url if request.mock_api_spec_id is not None else request.base_url
+    
     # Execute tests
-    results = await TestExecutor.execute_test_suite(test_case_dicts, request.base_url)
+    limiters = AdaptiveLimiterRegistry()
+    scheduler = RunScheduler.from_options(request.schedule.dict() if request.schedule else None)
+    retry_policy = RetryPolicy.from_options(request.retry_policy.dict() if request.retry_policy else None)
+    retry_budget = RetryBudget()
+    cassette = open_cassette(request.cassette)
+    resource_ids = dict(request.resource_ids or {})
+    if fixture_set is not None:
+        for collection, ids in FixtureService.resource_ids(fixture_set).items():
+            resource_ids[collection] = list(resource_ids.get(collection, [])) + ids
+    resource_pool = open_resource_pool(resource_ids)
+    data_context = open_data_context(request.data_seed, request.data_shard, request.data_shards, request.cassette)
+    run_id = ProfilingService.register_run(f"run:{service_name}", request.run_id)
+    try:
+        results = await TestExecutor.execute_test_suite(
+            test_case_dicts, base_url, limiters=limiters, scheduler=scheduler,
+            retry_policy=retry_policy, retry_budget=retry_budget, cassette=cassette,
+            resource_pool=resource_pool, data_context=data_context
+        )
+    finally:
+        ProfilingService.finish_run(run_id)
+        if cassette is not None:
+            cassette.close()
+        if fixture_set is not None and request.teardown_fixtures:
+            # Another teardown may have started while the run was in flight; the summary shows its status
+            db.refresh(fixture_set)
+            if fixture_set.status in TEARDOWN_STATUSES:
+                await FixtureService.teardown(db, fixture_set)
     
     # Save results to database
     saved_results = []
@@ -150,7 +316,9 @@ async def run_tests_and_save_report(
             response_body=result.get('response_body'),
             response_time=result.get('response_time', 0),
             error_message=result.get('error_message'),
-            execution_log=result.get('execution_log')
+            execution_log=result.get('execution_log'),
+            attempt_count=result.get('attempt_count', 1),
+            is_flaky=result.get('flaky', False)
         )
         db.add(test_result)
         saved_results.append(test_result)
@@ -162,16 +330,34 @@ async def run_tests_and_save_report(
     passed = sum(1 for r in results if r['status'] == 'passed')
     failed = sum(1 for r in results if r['status'] == 'failed')
     errors = sum(1 for r in results if r['status'] == 'error')
-    success_rate = (passed / total_tests * 100) if total_tests > 0 else 0
-    avg_response_time = sum(r.get('response_time', 0) for r in results) / total_tests if total_tests > 0 else 0
+    skipped = sum(1 for r in results if r['status'] == 'skipped')
+    flaky = sum(1 for r in results if r.get('flaky'))
+    executed = total_tests - skipped
+    success_rate = (passed / executed * 100) if executed > 0 else 0
+    avg_response_time = sum(r.get('response_time', 0) for r in results if r['status'] != 'skipped') / executed if executed > 0 else 0
     
     execution_summary = {
         'total_tests': total_tests,
         'passed': passed,
         'failed': failed,
         'errors': errors,
+        'skipped': skipped,
+        'flaky': flaky,
         'success_rate': success_rate,
-        'average_response_time': avg_response_time
+        'average_response_time': avg_response_time,
+        'concurrency': limiters.snapshot(),
+        'schedule': scheduler.summary() if scheduler is not None else None,
+        'retries': retry_budget.summary(),
+        'cassette': cassette.summary() if cassette is not None else None,
+        'resources': resource_pool.summary() if resource_pool is not None else None,
+        'data': data_context.describe() if data_context is not None else None,
+        'fixtures': {
+            'fixture_set_id': fixture_set.id,
+            'status': fixture_set.status,
+            'created': fixture_set.created_count,
+            'deleted': fixture_set.deleted_count,
+            'remaining': fixture_set.resource_counts
+        } if fixture_set is not None else None
     }
     
     # Generate and save markdown report
@@ -179,6 +365,7 @@ async def run_tests_and_save_report(
     
     return {
         "status": "completed",
+        "run_id": run_id,
         "service_name": service_name,
         "report_filepath": report_filepath,
         "execution_summary": execution_summary,
@@ -195,7 +382,7 @@ async def execute_test_cases(
     """Execute test cases"""
     
     # Get test cases
-    test_cases = db.query(TestCaseModel).filter(TestCaseModel.id.in_(request.test_case_ids)).all()
+    test_cases = runnable(db.query(TestCaseModel).filter(TestCaseModel.id.in_(request.test_case_ids)), request.include_invalid).all()
     if not test_cases:
         raise HTTPException(status_code=404, detail="No test cases found")
     
@@ -204,15 +391,31 @@ async def execute_test_cases(
     for test_case in test_cases:
         test_case_dict = {
             'id': test_case.id,
+            'name': test_case.name,
             'method': test_case.endpoint.method,
             'path': test_case.endpoint.path,
+            'priority': test_case.priority.value if test_case.priority else 'medium',
             'input_data': test_case.input_data,
-            'expected_status_code': test_case.expected_status_code
+            'expected_status_code': test_case.expected_status_code,
+            'retry_policy': test_case.retry_policy
         }
         test_case_dicts.append(test_case_dict)
     
+    base_url = get_mock_server(request.mock_api_spec_id, db).base_url if request.mock_api_spec_id is not None else request.base_url
+    
     # Execute tests
-    results = await TestExecutor.execute_test_suite(test_case_dicts, request.base_url)
+    scheduler = RunScheduler.from_options(request.schedule.dict() if request.schedule else None)
+    retry_policy = RetryPolicy.from_options(request.retry_policy.dict() if request.retry_policy else None)
+    cassette = open_cassette(request.cassette)
+    resource_pool = open_resource_pool(request.resource_ids)
+    data_context = open_data_context(request.data_seed, request.data_shard, request.data_shards, request.cassette)
+    run_id = ProfilingService.register_run("execute", request.run_id)
+    try:
+        results = await TestExecutor.execute_test_suite(test_case_dicts, base_url, scheduler=scheduler, retry_policy=retry_policy, cassette=cassette, resource_pool=resource_pool, data_context=data_context)
+    finally:
+        ProfilingService.finish_run(run_id)
+        if cassette is not None:
+            cassette.close()
     
     # Save results to database
     saved_results = []
@@ -224,7 +427,9 @@ async def execute_test_cases(
             response_body=result.get('response_body'),
             response_time=result.get('response_time', 0),
             error_message=result.get('error_message'),
-            execution_log=result.get('execution_log')
+            execution_log=result.get('execution_log'),
+            attempt_count=result.get('attempt_count', 1),
+            is_flaky=result.get('flaky', False)
         )
         db.add(test_result)
         saved_results.append(test_result)
@@ -238,6 +443,7 @@ async def execute_test_cases(
     background_tasks.add_task(save_test_report, report, test_cases[0].api_spec.name if test_cases else "unknown")
     
     return {
+        "run_id": run_id,
         "report": report,
         "results_count": len(saved_results)
     }
@@ -257,6 +463,34 @@ async def execute_curl_command(
         "response_time": result.get('response_time', 0)
     }
 
+@router.post("/execute-curl-batch", response_model=Dict[str, Any])
+async def execute_curl_batch(
+    request: ExecuteCurlBatchRequest
+):
+    """Execute many CURL commands with bounded concurrency"""
+    
+    results = await TestExecutor.execute_curl_batch(request.curl_commands, request.max_concurrency)
+    
+    return {
+        "results": [
+            {
+                "curl_command": curl_command,
+                "status": result['status'],
+                "output": result.get('output'),
+                "error": result.get('error'),
+                "response_time": result.get('response_time', 0)
+            }
+            for curl_command, result in zip(request.curl_commands, results)
+        ],
+        "passed": sum(1 for result in results if result['status'] == 'passed'),
+        "total": len(results)
+    }
+
+@router.get("/cassettes")
+async def list_cassettes():
+    """List recorded cassettes available for replay"""
+    return {"cassettes": CassetteStore.list_cassettes()}
+
 @router.get("/results", response_model=List[TestResult])
 async def get_test_results(
     test_case_id: int = None,
@@ -1,5 +1,7 @@
-from typing import Optional
+from typing import Optional, Tuple
 from pydantic_settings import BaseSettings
+import importlib
+import json
 import os
 
 class AIConfig(BaseSettings):
@@ -38,15 +40,45 @@ class AIConfig(BaseSettings):
     GEMINI_TIMEOUT: int = int(os.environ.get("GEMINI_TIMEOUT", 30))
     GEMINI_BASE_URL: str = os.environ.get("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")
 
+    # Bulk generation packs endpoints into requests of at most this many prompt + expected output tokens
+    GEMINI_BATCH_TOKEN_BUDGET: int = int(os.environ.get("GEMINI_BATCH_TOKEN_BUDGET", 12000))
+    GEMINI_OUTPUT_TOKENS_PER_ENDPOINT: int = int(os.environ.get("GEMINI_OUTPUT_TOKENS_PER_ENDPOINT", 700))
+    GEMINI_MAX_OUTPUT_TOKENS: int = int(os.environ.get("GEMINI_MAX_OUTPUT_TOKENS", 8192))
+    GEMINI_BATCH_MAX_ENDPOINTS: int = int(os.environ.get("GEMINI_BATCH_MAX_ENDPOINTS", 10))
+    GEMINI_BATCH_CONCURRENCY: int = int(os.environ.get("GEMINI_BATCH_CONCURRENCY", 4))
+    GEMINI_REQUESTS_PER_MINUTE: float = float(os.environ.get("GEMINI_REQUESTS_PER_MINUTE", 15))
+    GEMINI_BATCH_MAX_RETRIES: int = int(os.environ.get("GEMINI_BATCH_MAX_RETRIES", 2))  # extra rounds for failed batches
+
+    # Hedged generation: comma-separated providers (e.g. "gemini,deepseek"); empty uses AI_PROVIDER alone
+    AI_HEDGE_PROVIDERS: str = os.environ.get("AI_HEDGE_PROVIDERS", "")
+    AI_HEDGE_DELAY: float = float(os.environ.get("AI_HEDGE_DELAY", 5.0))  # seconds before the next provider gets the same prompt
+    AI_HEDGE_MAX_RETRIES: int = int(os.environ.get("AI_HEDGE_MAX_RETRIES", 1))  # extra rounds when no provider succeeds
+    AI_HEDGE_RETRY_BASE_DELAY: float = float(os.environ.get("AI_HEDGE_RETRY_BASE_DELAY", 1.0))
+    AI_HEDGE_RETRY_MAX_DELAY: float = float(os.environ.get("AI_HEDGE_RETRY_MAX_DELAY", 10.0))
+    AI_HEDGE_FAILURE_LATENCY: float = float(os.environ.get("AI_HEDGE_FAILURE_LATENCY", 30.0))  # latency charged to a failed call
+    AI_HEDGE_MAX_WORKERS: int = int(os.environ.get("AI_HEDGE_MAX_WORKERS", 8))
+    AI_LATENCY_WINDOW: int = int(os.environ.get("AI_LATENCY_WINDOW", 50))  # recent calls per provider behind the p95 ranking
+
+    # Usage accounting and budget guard for generation jobs (0 = no limit)
+    AI_JOB_MAX_TOKENS: int = int(os.environ.get("AI_JOB_MAX_TOKENS", 0))  # prompt + completion tokens per job or generation request
+    AI_JOB_MAX_COST: float = float(os.environ.get("AI_JOB_MAX_COST", 0))  # USD per job or generation request
+    AI_MODEL_PRICES: str = os.environ.get("AI_MODEL_PRICES", "")  # JSON {"model": [input, output]} in USD per 1M tokens, overrides MODEL_PRICES
+
     # RAG Settings - Mock RAG DISABLED
     USE_MOCK_RAG: bool = bool(int(os.environ.get("USE_MOCK_RAG", "0")))
     RAG_FALLBACK_TO_MOCK: bool = bool(int(os.environ.get("RAG_FALLBACK_TO_MOCK", "0")))
     RAG_FALLBACK_TO_RULE_BASED: bool = bool(int(os.environ.get("RAG_FALLBACK_TO_RULE_BASED", "1")))
+    RAG_TOP_K: int = int(os.environ.get("RAG_TOP_K", 3))  # retrieved chunks beyond the endpoint's own references
+    RAG_CONTEXT_TOKEN_BUDGET: int = int(os.environ.get("RAG_CONTEXT_TOKEN_BUDGET", 800))  # cap on retrieved context per endpoint
 
     # Test Generation Settings
     MAX_TEST_CASES_PER_ENDPOINT: int = int(os.environ.get("MAX_TEST_CASES_PER_ENDPOINT", 4))
     ENABLE_SECURITY_TESTS: bool = bool(int(os.environ.get("ENABLE_SECURITY_TESTS", "1")))
     ENABLE_BUSINESS_LOGIC_TESTS: bool = bool(int(os.environ.get("ENABLE_BUSINESS_LOGIC_TESTS", "1")))
+    # Categories still requested from the LLM (normal, edge_case, security, business_logic, performance);
+    # validation and boundary cases come from TestGenerator's rule engine
+    AI_LLM_CATEGORIES: str = os.environ.get("AI_LLM_CATEGORIES", "business_logic")
+    RULE_CASES_PER_ENDPOINT: int = int(os.environ.get("RULE_CASES_PER_ENDPOINT", 40))  # cap on boundary/negative cases per endpoint
 
     class Config:
         env_file = ".env"
@@ -54,6 +86,63 @@ class AIConfig(BaseSettings):
 # Global AI config instance
 ai_config = AIConfig()
 
+# USD per 1M (prompt, completion) tokens; models are matched exactly, then by longest prefix
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "deepseek-chat": (0.27, 1.10),
+    "deepseek-reasoner": (0.55, 2.19),
+    "gemini-1.5-flash": (0.075, 0.30),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gemini-2.0-flash": (0.10, 0.40),
+}
+if ai_config.AI_MODEL_PRICES:
+    MODEL_PRICES.update({model: tuple(prices) for model, prices in json.loads(ai_config.AI_MODEL_PRICES).items()})
+
+def model_price(model: Optional[str]) -> Optional[Tuple[float, float]]:
+    """(prompt, completion) USD per 1M tokens for a model, or None if it has no known price"""
+    if not model:
+        return None
+    if model in MODEL_PRICES:
+        return MODEL_PRICES[model]
+    prefixes = [prefix for prefix in MODEL_PRICES if model.startswith(prefix)]
+    return MODEL_PRICES[max(prefixes, key=len)] if prefixes else None
+
+# Test case categories the providers know how to prompt for
+LLM_CATEGORIES = ("normal", "edge_case", "security", "business_logic", "performance")
+
+def llm_categories() -> list:
+    """Categories to ask the LLM for, in prompt order; ENABLE_SECURITY_TESTS/ENABLE_BUSINESS_LOGIC_TESTS still apply"""
+    requested = {category.strip() for category in ai_config.AI_LLM_CATEGORIES.split(",") if category.strip()}
+    if not ai_config.ENABLE_SECURITY_TESTS:
+        requested.discard("security")
+    if not ai_config.ENABLE_BUSINESS_LOGIC_TESTS:
+        requested.discard("business_logic")
+    return [category for category in LLM_CATEGORIES if category in requested]
+
+# Provider name -> (module, generator class, display name); imported only when used
+RAG_GENERATORS = {
+    "deepseek": ("app.services.deepseek_rag_generator", "DeepSeekRAGTestGenerator", "DeepSeek"),
+    "openai": ("app.services.rag_test_generator", "RAGTestGenerator", "OpenAI"),
+    "aimlapi": ("app.services.aimlapi_rag_generator", "AIMLAPIRAGTestGenerator", "AIMLAPI.com"),
+    "gemini": ("app.services.gemini_rag_generator", "GeminiRAGTestGenerator", "Gemini"),
+}
+
+def load_rag_generator(provider: str):
+    """Instantiate one provider's generator; None if it is unknown or not available"""
+    if provider not in RAG_GENERATORS:
+        return None
+    module_name, class_name, display_name = RAG_GENERATORS[provider]
+    try:
+        generator = getattr(importlib.import_module(module_name), class_name)()
+        if generator.is_available:
+            return generator
+    except Exception as e:
+        print(f"{display_name} RAG not available: {str(e)}")
+    return None
+
 def get_rag_generator():
     """Get the appropriate RAG generator based on configuration - Mock RAG disabled"""
     # Mock RAG is completely disabled
@@ -61,46 +150,24 @@ def get_rag_generator():
         print("Mock RAG is disabled in production")
         return None
     
-    # Try the configured AI provider first
-    if ai_config.AI_PROVIDER == "deepseek":
-        try:
-            from app.services.deepseek_rag_generator import DeepSeekRAGTestGenerator
-            deepseek_generator = DeepSeekRAGTestGenerator()
-            
-            if deepseek_generator.is_available:
-                return deepseek_generator
-        except Exception as e:
-            print(f"DeepSeek RAG not available: {str(e)}")
-    
-    elif ai_config.AI_PROVIDER == "openai":
-        try:
-            from app.services.rag_test_generator import RAGTestGenerator
-            openai_generator = RAGTestGenerator()
-            
-            if openai_generator.is_available:
-                return openai_generator
-        except Exception as e:
-            print(f"OpenAI RAG not available: {str(e)}")
-    
-    elif ai_config.AI_PROVIDER == "aimlapi":
-        try:
-            from app.services.aimlapi_rag_generator import AIMLAPIRAGTestGenerator
-            aimlapi_generator = AIMLAPIRAGTestGenerator()
-            
-            if aimlapi_generator.is_available:
-                return aimlapi_generator
-        except Exception as e:
-            print(f"AIMLAPI.com RAG not available: {str(e)}")
-    
-    elif ai_config.AI_PROVIDER == "gemini":
-        try:
-            from app.services.gemini_rag_generator import GeminiRAGTestGenerator
-            gemini_generator = GeminiRAGTestGenerator()
-            
-            if gemini_generator.is_available:
-                return gemini_generator
-        except Exception as e:
-            print(f"Gemini RAG not available: {str(e)}")
+    hedge_providers = [provider.strip() for provider in ai_config.AI_HEDGE_PROVIDERS.split(",") if provider.strip()]
+    if hedge_providers:
+        # Hedge across every configured provider that is available
+        generators = {}
+        for provider in hedge_providers:
+            generator = load_rag_generator(provider)
+            if generator:
+                generators[provider] = generator
+        if len(generators) > 1:
+            from app.services.llm_hedging import HedgedRAGGenerator
+            return HedgedRAGGenerator(generators)
+        if generators:
+            return next(iter(generators.values()))
+    else:
+        # Try the configured AI provider
+        generator = load_rag_generator(ai_config.AI_PROVIDER)
+        if generator:
+            return generator
     
     # No AI generator available - will use automated test cases only
     print("No real AI generator available, will use automated test cases only")
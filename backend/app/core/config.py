@@ -22,10 +22,77 @@ class Settings(BaseSettings):
     # File paths (non-sensitive, can have defaults)
     API_DOCS_DIR: str = os.environ.get("API_DOCS_DIR", "api-docs")
     LOGS_DIR: str = os.environ.get("LOGS_DIR", "logs")
+    CASSETTES_DIR: str = os.environ.get("CASSETTES_DIR", "logs/cassettes")  # recorded request/response pairs
+    SPEC_INDEX_DIR: str = os.environ.get("SPEC_INDEX_DIR", "logs/spec_indexes")  # retrieval indexes for RAG context
     
     # Test settings (non-sensitive, can have defaults)
     MAX_CONCURRENT_TESTS: int = 10
     TEST_TIMEOUT: int = 30  # seconds
+    MAX_CONCURRENT_TESTS_GLOBAL: int = int(os.environ.get("MAX_CONCURRENT_TESTS_GLOBAL", 50))  # cap across services in multi-service runs
+
+    # Shared HTTP connection pool for test traffic
+    HTTP_POOL_MAX_CONNECTIONS: int = int(os.environ.get("HTTP_POOL_MAX_CONNECTIONS", 200))
+    HTTP_POOL_MAX_KEEPALIVE: int = int(os.environ.get("HTTP_POOL_MAX_KEEPALIVE", 50))
+    CURL_SUBPROCESS_POOL_SIZE: int = int(os.environ.get("CURL_SUBPROCESS_POOL_SIZE", 4))  # fallback for unsupported curl flags
+
+    # Retry policy defaults (per run, overridable per test case); 1 attempt = no retries
+    RETRY_MAX_ATTEMPTS: int = int(os.environ.get("RETRY_MAX_ATTEMPTS", 1))
+    RETRY_BASE_DELAY: float = float(os.environ.get("RETRY_BASE_DELAY", 0.5))  # seconds, doubled per attempt
+    RETRY_MAX_DELAY: float = float(os.environ.get("RETRY_MAX_DELAY", 10.0))
+    RETRY_MAX_RETRY_AFTER: float = float(os.environ.get("RETRY_MAX_RETRY_AFTER", 30.0))  # longer Retry-After stops retrying
+    RETRY_BUDGET_RATIO: float = float(os.environ.get("RETRY_BUDGET_RATIO", 0.2))  # retries allowed per first attempt
+    RETRY_BUDGET_MIN_RETRIES: int = int(os.environ.get("RETRY_BUDGET_MIN_RETRIES", 10))
+
+    # Adaptive concurrency (AIMD per target host); MAX_CONCURRENT_TESTS is the starting limit
+    ADAPTIVE_CONCURRENCY_ENABLED: bool = bool(int(os.environ.get("ADAPTIVE_CONCURRENCY_ENABLED", "1")))
+    ADAPTIVE_CONCURRENCY_MIN_LIMIT: int = int(os.environ.get("ADAPTIVE_CONCURRENCY_MIN_LIMIT", 1))
+    ADAPTIVE_CONCURRENCY_MAX_LIMIT: int = int(os.environ.get("ADAPTIVE_CONCURRENCY_MAX_LIMIT", 200))
+    ADAPTIVE_CONCURRENCY_BACKOFF_RATIO: float = float(os.environ.get("ADAPTIVE_CONCURRENCY_BACKOFF_RATIO", 0.9))
+    ADAPTIVE_CONCURRENCY_LATENCY_TOLERANCE: float = float(os.environ.get("ADAPTIVE_CONCURRENCY_LATENCY_TOLERANCE", 2.0))
+    ADAPTIVE_CONCURRENCY_LATENCY_WINDOW: int = int(os.environ.get("ADAPTIVE_CONCURRENCY_LATENCY_WINDOW", 50))  # samples the latency baseline is taken over
+
+    # Per-run pool of IDs returned by create operations, used to fill path parameters like {product_id}
+    RESOURCE_POOL_ENABLED: bool = bool(int(os.environ.get("RESOURCE_POOL_ENABLED", "1")))
+    RESOURCE_POOL_WAIT_SECONDS: float = float(os.environ.get("RESOURCE_POOL_WAIT_SECONDS", 10))  # wait for a leased ID to come back
+
+    # Re-key generated emails, usernames and SKUs for every run (and shard) so repeated creates never collide
+    SYNTHETIC_DATA_PER_RUN: bool = bool(int(os.environ.get("SYNTHETIC_DATA_PER_RUN", "1")))
+
+    # Bulk fixture seeding and teardown through /fixtures
+    FIXTURE_DEFAULT_COUNT: int = int(os.environ.get("FIXTURE_DEFAULT_COUNT", 10))  # entities per create operation
+    FIXTURE_PARALLELISM: int = int(os.environ.get("FIXTURE_PARALLELISM", 20))  # create/delete requests in flight
+    FIXTURE_MAX_ENTITIES: int = int(os.environ.get("FIXTURE_MAX_ENTITIES", 100000))  # per fixture set
+
+    # OpenTelemetry tracing; exporter is 'otlp' (collector over HTTP), 'file' (JSON lines) or 'console'
+    OTEL_ENABLED: bool = bool(int(os.environ.get("OTEL_ENABLED", "0")))
+    OTEL_SERVICE_NAME: str = os.environ.get("OTEL_SERVICE_NAME", "apitestgen-backend")
+    OTEL_EXPORTER: str = os.environ.get("OTEL_EXPORTER", "otlp")
+    OTEL_EXPORTER_OTLP_ENDPOINT: str = os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    OTEL_TRACES_FILE: str = os.environ.get("OTEL_TRACES_FILE", "logs/traces.jsonl")
+    OTEL_SAMPLING_RATIO: float = float(os.environ.get("OTEL_SAMPLING_RATIO", 1.0))  # fraction of new traces kept
+
+    # Admin-only endpoints (profiling) require this token in X-Admin-Token; empty disables them
+    ADMIN_TOKEN: str = os.environ.get("ADMIN_TOKEN", "")
+    PROFILES_DIR: str = os.environ.get("PROFILES_DIR", "logs/profiles")  # next to logs/reports
+    PROFILING_MAX_SECONDS: float = float(os.environ.get("PROFILING_MAX_SECONDS", 300))
+    PROFILING_INTERVAL: float = float(os.environ.get("PROFILING_INTERVAL", 0.001))  # pyinstrument sampling interval
+    TRACEMALLOC_FRAMES: int = int(os.environ.get("TRACEMALLOC_FRAMES", 10))
+
+    # Schema creation: run `python -m migrations.init_db` before serving, or let startup do it in the background
+    DB_INIT_ON_STARTUP: bool = bool(int(os.environ.get("DB_INIT_ON_STARTUP", "1")))
+    DB_INIT_MAX_RETRIES: int = int(os.environ.get("DB_INIT_MAX_RETRIES", 30))
+    DB_INIT_RETRY_DELAY: float = float(os.environ.get("DB_INIT_RETRY_DELAY", 2))  # seconds
+    READINESS_TIMEOUT: float = float(os.environ.get("READINESS_TIMEOUT", 2))  # seconds for the database ping
+
+    # Background generation jobs
+    GENERATION_JOB_WORKERS: int = int(os.environ.get("GENERATION_JOB_WORKERS", 2))  # jobs running at once per process
+    GENERATION_JOB_CHUNK_SIZE: int = int(os.environ.get("GENERATION_JOB_CHUNK_SIZE", 40))  # endpoints per checkpoint in bulk mode
+    GENERATION_JOB_STALE_SECONDS: float = float(os.environ.get("GENERATION_JOB_STALE_SECONDS", 300))  # heartbeat age before another process takes over
+    GENERATION_JOBS_RESUME_ON_STARTUP: bool = bool(int(os.environ.get("GENERATION_JOBS_RESUME_ON_STARTUP", "1")))
+
+    # Pre-execution validation of AI-generated test cases
+    TEST_CASE_VALIDATION_ENABLED: bool = bool(int(os.environ.get("TEST_CASE_VALIDATION_ENABLED", "1")))  # invalid cases are stored inactive
+    TEST_CASE_DRY_RUN: bool = bool(int(os.environ.get("TEST_CASE_DRY_RUN", "1")))  # also route each case through an in-process mock
 
     class Config:
         env_file = ".env"
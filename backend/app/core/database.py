@@ -1,8 +1,10 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
 from app.core.config import settings
 from app.models.base import Base
+from app.core.metrics import instrument_engine
+from app.core.tracing import instrument_engine as trace_engine
 
 # Configure engine with connection pooling and retry logic
 engine = create_engine(
@@ -15,6 +17,10 @@ engine = create_engine(
     echo=False  # Set to True for SQL debugging
 )
 
+# Statement timings for /metrics and spans for tracing
+instrument_engine(engine)
+trace_engine(engine)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
@@ -22,4 +28,14 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+def create_tables():
+    """Create any missing tables for every registered model"""
+    import app.models  # registers all models on Base.metadata
+    Base.metadata.create_all(bind=engine)
+
+def ping_database():
+    """Round trip to the database; raises if it is unreachable"""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
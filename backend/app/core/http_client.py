@@ -0,0 +1,35 @@
+import asyncio
+import httpx
+from typing import Optional
+from app.core.config import settings
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared pooled async HTTP client for outgoing test traffic.
+
+    Connections are reused across test cases and runs. A new client is
+    created if the previous one was closed or belongs to another event loop
+    (e.g. scripts calling ``asyncio.run`` more than once).
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            timeout=settings.TEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE
+            )
+        )
+        _client_loop = loop
+    return _client
+
+async def close_http_client():
+    """Close the shared client on application shutdown"""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
@@ -0,0 +1,140 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Any, Optional, Tuple
+
+class LLMBudgetExceeded(Exception):
+    """Raised before an LLM call when the active ledger's token or cost ceiling is reached"""
+
+class LLMUsageLedger:
+    """Running token, latency and cost totals for one unit of generation work (a generation job).
+
+    Every provider call made while the ledger is active (see ``use_ledger``)
+    is appended to ``calls`` until drained for persistence. Totals start from
+    the given values so a resumed job keeps counting against the same budget.
+    Calls already in flight when the ceiling is reached still complete, so
+    the totals can end slightly above it.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, max_cost: Optional[float] = None,
+                 prompt_tokens: int = 0, completion_tokens: int = 0, cost: float = 0.0):
+        self.max_tokens = max_tokens or None
+        self.max_cost = max_cost or None
+        self.prompt_tokens = prompt_tokens or 0
+        self.completion_tokens = completion_tokens or 0
+        self.cost = cost or 0.0
+        self.calls: List[Dict[str, Any]] = []
+        self.refused = 0  # calls stopped by the budget guard
+        self.calls_avoided = 0  # per-category calls replaced by rule-generated test cases
+        self.lock = threading.Lock()
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def exceeded(self) -> bool:
+        return bool(
+            (self.max_tokens and self.total_tokens >= self.max_tokens)
+            or (self.max_cost and self.cost >= self.max_cost)
+        )
+
+    def describe_limit(self) -> str:
+        if self.max_tokens and self.total_tokens >= self.max_tokens:
+            return f"token budget reached ({self.total_tokens}/{self.max_tokens} tokens)"
+        return f"cost budget reached (${self.cost:.4f}/${self.max_cost:.4f})"
+
+    def check(self):
+        if self.exceeded:
+            with self.lock:
+                self.refused += 1
+            raise LLMBudgetExceeded(self.describe_limit())
+
+    def record(self, call: Dict[str, Any]):
+        with self.lock:
+            self.prompt_tokens += call.get('prompt_tokens') or 0
+            self.completion_tokens += call.get('completion_tokens') or 0
+            self.cost += call.get('cost') or 0.0
+            self.calls.append(call)
+
+    def avoid(self, count: int):
+        with self.lock:
+            self.calls_avoided += count
+
+    def drain(self) -> Tuple[List[Dict[str, Any]], int]:
+        """Calls recorded and calls avoided since the last drain"""
+        with self.lock:
+            calls, self.calls = self.calls, []
+            avoided, self.calls_avoided = self.calls_avoided, 0
+        return calls, avoided
+
+_ledger: ContextVar[Optional[LLMUsageLedger]] = ContextVar('llm_usage_ledger', default=None)
+_endpoint: ContextVar[Optional[str]] = ContextVar('llm_usage_endpoint', default=None)
+_retry: ContextVar[int] = ContextVar('llm_usage_retry', default=0)
+
+@contextmanager
+def use_ledger(ledger: LLMUsageLedger):
+    """Record LLM calls made in this context (and in threads started with a copy of it) to ``ledger``"""
+    token = _ledger.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _ledger.reset(token)
+
+@contextmanager
+def usage_scope(endpoint: Optional[str] = None, retry: Optional[int] = None):
+    """Label the calls made in this context with the endpoint they generate for and their retry round"""
+    tokens = []
+    if endpoint is not None:
+        tokens.append((_endpoint, _endpoint.set(endpoint)))
+    if retry is not None:
+        tokens.append((_retry, _retry.set(retry)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+def llm_budget_exhausted() -> bool:
+    ledger = _ledger.get()
+    return ledger is not None and ledger.exceeded
+
+def check_llm_budget():
+    """Raise LLMBudgetExceeded if the active ledger has no budget left"""
+    ledger = _ledger.get()
+    if ledger is not None:
+        ledger.check()
+
+def call_cost(model: Optional[str], prompt_tokens: Optional[int], completion_tokens: Optional[int]) -> Optional[float]:
+    """USD cost of one call, or None for models without a known price"""
+    from app.core.ai_config import model_price
+    price = model_price(model)
+    if price is None:
+        return None
+    return ((prompt_tokens or 0) * price[0] + (completion_tokens or 0) * price[1]) / 1_000_000
+
+def record_llm_usage(provider: str, model: Optional[str], duration: float, outcome: str, prompt_tokens: Optional[int] = None,
+                     completion_tokens: Optional[int] = None, cached_tokens: Optional[int] = None):
+    """Add one provider call to the active ledger, if any"""
+    ledger = _ledger.get()
+    if ledger is None:
+        return
+    ledger.record({
+        'provider': provider,
+        'model': model,
+        'endpoint': _endpoint.get(),
+        'prompt_tokens': prompt_tokens,
+        'completion_tokens': completion_tokens,
+        'cached_tokens': cached_tokens,
+        'cache_hit': bool(cached_tokens),
+        'latency': duration,
+        'outcome': outcome,
+        'retry': _retry.get(),
+        'cost': call_cost(model, prompt_tokens, completion_tokens)
+    })
+
+def record_llm_calls_avoided(count: int):
+    """Count calls the active ledger did not have to pay for"""
+    ledger = _ledger.get()
+    if ledger is not None and count:
+        ledger.avoid(count)
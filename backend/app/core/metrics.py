@@ -0,0 +1,236 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+    CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.tracing import start_span, set_span_attributes
+from app.core.llm_usage import check_llm_budget, record_llm_usage, record_llm_calls_avoided as record_ledger_calls_avoided
+
+# With several uvicorn workers each process writes its samples to
+# PROMETHEUS_MULTIPROC_DIR and /metrics aggregates them on read.
+MULTIPROCESS_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# Latency buckets in seconds, from in-process mock calls up to LLM timeouts
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+HTTP_REQUESTS = Counter(
+    "apitestgen_http_requests_total", "HTTP requests handled by the backend",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "apitestgen_http_request_duration_seconds", "Backend HTTP request latency",
+    ["method", "route"], buckets=REQUEST_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "apitestgen_http_requests_in_progress", "Backend HTTP requests being handled",
+    multiprocess_mode="livesum"
+)
+
+EXECUTOR_REQUESTS = Counter(
+    "apitestgen_executor_requests_total", "Test requests sent by the executor",
+    ["target", "outcome"]
+)
+EXECUTOR_REQUEST_DURATION = Histogram(
+    "apitestgen_executor_request_duration_seconds", "Latency of test requests per target",
+    ["target"], buckets=REQUEST_BUCKETS
+)
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "apitestgen_executor_queue_depth", "Test cases waiting for a concurrency slot",
+    multiprocess_mode="livesum"
+)
+EXECUTOR_IN_FLIGHT = Gauge(
+    "apitestgen_executor_in_flight", "Test cases currently executing",
+    multiprocess_mode="livesum"
+)
+
+LLM_REQUESTS = Counter(
+    "apitestgen_llm_requests_total", "Calls to LLM providers",
+    ["provider", "outcome"]
+)
+LLM_REQUEST_DURATION = Histogram(
+    "apitestgen_llm_request_duration_seconds", "LLM provider call latency",
+    ["provider"], buckets=LLM_BUCKETS
+)
+LLM_TOKENS = Counter(
+    "apitestgen_llm_tokens_total", "Tokens reported by LLM providers",
+    ["provider", "kind"]
+)
+LLM_HEDGED_REQUESTS = Counter(
+    "apitestgen_llm_hedged_requests_total", "Hedged generations by which attempt won",
+    ["winner"]
+)
+
+LLM_CALLS_AVOIDED = Counter(
+    "apitestgen_llm_calls_avoided_total", "Per-category LLM calls not made because the rule engine covers the category",
+    ["provider", "category"]
+)
+
+SPEC_PARSE_DURATION = Histogram(
+    "apitestgen_spec_parse_duration_seconds", "Time to load and parse a specification file",
+    ["file_type"], buckets=FAST_BUCKETS
+)
+
+DB_QUERY_DURATION = Histogram(
+    "apitestgen_db_query_duration_seconds", "Database statement execution time",
+    ["operation"], buckets=FAST_BUCKETS
+)
+
+def metrics_response() -> Tuple[bytes, str]:
+    """Exposition body and content type for /metrics"""
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+def mark_process_dead():
+    """Drop this worker's live gauges from the multiprocess directory"""
+    if MULTIPROCESS_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+def record_executor_request(target: str, duration: float, status_code: Optional[int] = None, error_type: Optional[str] = None):
+    """Record one request sent by TestExecutor"""
+    outcome = f"{status_code // 100}xx" if status_code is not None else (error_type or 'error')
+    EXECUTOR_REQUESTS.labels(target=target, outcome=outcome).inc()
+    EXECUTOR_REQUEST_DURATION.labels(target=target).observe(duration)
+
+def record_llm_call(provider: str, duration: float, outcome: str, prompt_tokens: Optional[int] = None, completion_tokens: Optional[int] = None):
+    """Record one LLM provider call ('success', 'error', 'timeout', 'rate_limited', ...)"""
+    LLM_REQUESTS.labels(provider=provider, outcome=outcome).inc()
+    LLM_REQUEST_DURATION.labels(provider=provider).observe(duration)
+    if prompt_tokens:
+        LLM_TOKENS.labels(provider=provider, kind='prompt').inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(provider=provider, kind='completion').inc(completion_tokens)
+
+def record_llm_hedge(winner: str):
+    """Record how a hedged generation ended ('primary', 'hedge' or 'none')"""
+    LLM_HEDGED_REQUESTS.labels(winner=winner).inc()
+
+def record_llm_calls_avoided(provider: str, categories: List[str]):
+    """Record per-category provider calls skipped in favour of rule-generated test cases"""
+    for category in categories:
+        LLM_CALLS_AVOIDED.labels(provider=provider, category=category).inc()
+    record_ledger_calls_avoided(len(categories))
+
+def llm_error_outcome(error: Exception) -> str:
+    """Outcome label for an exception raised by a provider client (openai or requests)"""
+    name = type(error).__name__
+    if 'Timeout' in name:
+        return 'timeout'
+    if 'RateLimit' in name:
+        return 'rate_limited'
+    return 'error'
+
+@contextmanager
+def track_llm_call(provider: str, model: Optional[str] = None):
+    """Time an LLM call (metrics, a client span and the active usage ledger); the caller may set 'outcome' and token counts on the yielded dict.
+
+    Raises LLMBudgetExceeded before the call if the active ledger's budget is spent.
+    """
+    check_llm_budget()
+    call = {'outcome': 'success', 'prompt_tokens': None, 'completion_tokens': None, 'cached_tokens': None}
+    with start_span(f"llm.{provider}", kind='client', **{'llm.provider': provider, 'llm.model': model}) as span:
+        start_time = time.perf_counter()
+        try:
+            yield call
+        except Exception as e:
+            call['outcome'] = llm_error_outcome(e)
+            raise
+        finally:
+            duration = time.perf_counter() - start_time
+            record_llm_call(provider, duration, call['outcome'], call['prompt_tokens'], call['completion_tokens'])
+            record_llm_usage(provider, model, duration, call['outcome'], call['prompt_tokens'], call['completion_tokens'], call['cached_tokens'])
+            set_span_attributes(span, **{
+                'llm.outcome': call['outcome'],
+                'llm.prompt_tokens': call['prompt_tokens'],
+                'llm.completion_tokens': call['completion_tokens']
+            })
+
+def openai_usage(response: Any) -> Dict[str, Optional[int]]:
+    """Token counts from an OpenAI-compatible chat completion"""
+    usage = getattr(response, 'usage', None)
+    return {
+        'prompt_tokens': getattr(usage, 'prompt_tokens', None),
+        'completion_tokens': getattr(usage, 'completion_tokens', None)
+    }
+
+def gemini_usage(response_data: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    """Token counts from a Gemini generateContent response"""
+    usage = response_data.get('usageMetadata') or {}
+    return {
+        'prompt_tokens': usage.get('promptTokenCount'),
+        'completion_tokens': usage.get('candidatesTokenCount'),
+        'cached_tokens': usage.get('cachedContentTokenCount')
+    }
+
+def instrument_engine(engine: Engine):
+    """Time every statement run on an engine, labelled by SQL verb"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start_times = conn.info.get('query_start_time')
+        if not start_times:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'UNKNOWN'
+        DB_QUERY_DURATION.labels(operation=operation).observe(time.perf_counter() - start_times.pop())
+
+class PrometheusMiddleware:
+    """ASGI middleware recording request count, latency and in-progress gauge.
+
+    Routes are labelled by their path template (``/api/v1/api-specs/{api_spec_id}``)
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.route_paths: Dict[Any, str] = {}
+
+    def _route_label(self, scope) -> str:
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return 'unmatched'
+        label = self.route_paths.get(endpoint)
+        if label is None:
+            app = scope.get('app')
+            label = next(
+                (route.path for route in getattr(app, 'routes', []) if getattr(route, 'endpoint', None) is endpoint),
+                'unmatched'
+            )
+            self.route_paths[endpoint] = label
+        return label
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] == '/metrics':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            HTTP_REQUESTS_IN_PROGRESS.dec()
+            route = self._route_label(scope)
+            HTTP_REQUESTS.labels(method=scope['method'], route=route, status=str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(method=scope['method'], route=route).observe(duration)
@@ -0,0 +1,17 @@
+import hmac
+from typing import Optional
+from fastapi import Header, HTTPException
+from app.core.config import settings
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Constant-time check of an admin token; always false when ADMIN_TOKEN is unset"""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Dependency guarding admin-only endpoints"""
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN not set)")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
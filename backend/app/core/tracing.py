@@ -0,0 +1,195 @@
+import functools
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Sequence
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Tracing is optional: without the OpenTelemetry packages every helper is a no-op.
+# The SDK is only imported by setup_tracing, keeping it off the startup path when disabled.
+OTEL_AVAILABLE = importlib.util.find_spec("opentelemetry.sdk") is not None
+
+_tracer = None
+trace = propagate = SpanKind = Status = StatusCode = None
+
+def _file_span_exporter(file_path: str):
+    """Exporter appending finished spans to a JSON-lines file"""
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class FileSpanExporter(SpanExporter):
+        def __init__(self):
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.lock = threading.Lock()
+
+        def export(self, spans: Sequence[Any]) -> SpanExportResult:
+            lines = [json.dumps(json.loads(span.to_json()), separators=(',', ':')) for span in spans]
+            with self.lock, open(file_path, 'a', encoding='utf-8') as file:
+                file.write('\n'.join(lines) + '\n')
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self):
+            pass
+
+    return FileSpanExporter()
+
+def setup_tracing():
+    """Install the tracer provider and exporter configured in settings"""
+    global _tracer, trace, propagate, SpanKind, Status, StatusCode
+    if not settings.OTEL_ENABLED or _tracer is not None:
+        return
+    if not OTEL_AVAILABLE:
+        logger.warning("OTEL_ENABLED is set but the opentelemetry packages are not installed; tracing disabled")
+        return
+
+    from opentelemetry import trace, propagate
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+    from opentelemetry.trace import SpanKind, Status, StatusCode
+
+    if settings.OTEL_EXPORTER == 'otlp':
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        exporter = OTLPSpanExporter(endpoint=settings.OTEL_EXPORTER_OTLP_ENDPOINT)
+    elif settings.OTEL_EXPORTER == 'file':
+        exporter = _file_span_exporter(settings.OTEL_TRACES_FILE)
+    elif settings.OTEL_EXPORTER == 'console':
+        exporter = ConsoleSpanExporter()
+    else:
+        logger.warning(f"Unknown OTEL_EXPORTER '{settings.OTEL_EXPORTER}'; tracing disabled")
+        return
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}),
+        # Follow the caller's sampling decision, otherwise sample a fraction of new traces
+        sampler=ParentBased(TraceIdRatioBased(settings.OTEL_SAMPLING_RATIO))
+    )
+    provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("apitestgen")
+    logger.info(f"Tracing enabled ({settings.OTEL_EXPORTER} exporter, sampling ratio {settings.OTEL_SAMPLING_RATIO})")
+
+def shutdown_tracing():
+    """Flush pending spans"""
+    if _tracer is not None:
+        trace.get_tracer_provider().shutdown()
+
+@contextmanager
+def start_span(name: str, kind: str = 'internal', **attributes):
+    """Context manager for a span ('internal', 'client' or 'server'); yields None when tracing is disabled"""
+    if _tracer is None:
+        yield None
+        return
+    span_kind = {'client': SpanKind.CLIENT, 'server': SpanKind.SERVER}.get(kind, SpanKind.INTERNAL)
+    with _tracer.start_as_current_span(name, kind=span_kind, attributes=_clean_attributes(attributes)) as span:
+        yield span
+
+def set_span_attributes(span: Any, **attributes):
+    """Set attributes on a span from start_span (ignores None spans and values)"""
+    if span is not None:
+        span.set_attributes(_clean_attributes(attributes))
+
+def traced(name: str):
+    """Decorator wrapping a sync or async function in a span"""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def inject_trace_headers(headers: Dict[str, str]) -> Dict[str, str]:
+    """Add W3C traceparent/tracestate for the current span to outgoing headers"""
+    if _tracer is not None:
+        propagate.inject(headers)
+    return headers
+
+def _clean_attributes(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in attributes.items() if value is not None}
+
+def instrument_engine(engine: Engine):
+    """Span per database statement, labelled by SQL verb"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _tracer is None:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'UNKNOWN'
+        span = _tracer.start_span(
+            f"db.{operation.lower()}",
+            kind=SpanKind.CLIENT,
+            attributes={'db.system': conn.engine.dialect.name, 'db.operation': operation, 'db.statement': statement[:1000]}
+        )
+        conn.info.setdefault('trace_spans', []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        spans = conn.info.get('trace_spans')
+        if spans:
+            spans.pop().end()
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        conn = exception_context.connection
+        spans = conn.info.get('trace_spans') if conn is not None else None
+        if spans:
+            span = spans.pop()
+            span.set_status(Status(StatusCode.ERROR, str(exception_context.original_exception)))
+            span.end()
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per request.
+
+    Incoming traceparent headers are honoured, so a run started from a
+    traced client continues the caller's trace.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if _tracer is None or scope['type'] != 'http' or scope['path'] == '/metrics':
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {key.decode('latin-1'): value.decode('latin-1') for key, value in scope.get('headers', [])}
+        context = propagate.extract(carrier)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        with _tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=context,
+            kind=SpanKind.SERVER,
+            attributes={'http.method': scope['method'], 'http.target': scope['path']}
+        ) as span:
+            await self.app(scope, receive, send_wrapper)
+            span.set_attribute('http.status_code', status_code)
+            if status_code >= 500:
+                span.set_status(Status(StatusCode.ERROR))
+            endpoint = scope.get('endpoint')
+            if endpoint is not None:
+                span.update_name(f"{scope['method']} {getattr(endpoint, '__name__', scope['path'])}")
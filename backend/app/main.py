@@ -1,13 +1,17 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
-import time
+import asyncio
 import logging
+import sys
 
 from app.core.config import settings
-from app.api.api_v1.api import api_router
-from app.core.database import engine
-from app.models.base import Base
+from app.api.api_v1.api import include_api_routers
+from app.core.database import create_tables, ping_database
+from app.core.http_client import close_http_client
+from app.core.metrics import PrometheusMiddleware, metrics_response, mark_process_dead
+from app.core.tracing import TracingMiddleware, setup_tracing, shutdown_tracing
+from app.services.profiler import RequestProfilingMiddleware
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,31 +33,77 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include API router
-app.include_router(api_router, prefix="/api/v1")
+# Request count and latency per route for /metrics
+app.add_middleware(PrometheusMiddleware)
+
+# Server span per request (no-op unless OTEL_ENABLED)
+setup_tracing()
+app.add_middleware(TracingMiddleware)
+
+# Admin-requested per-request profiles (X-Profile + X-Admin-Token)
+app.add_middleware(RequestProfilingMiddleware)
+
+# Include API routers
+include_api_routers(app)
+
+# Schema state reported by /health/ready: 'external' (created by migrations.init_db), 'pending', 'ready' or 'failed'
+app.state.schema_status = 'pending' if settings.DB_INIT_ON_STARTUP else 'external'
+
+async def initialize_database():
+    """Create tables in a worker thread, retrying without blocking the event loop"""
+    max_retries = settings.DB_INIT_MAX_RETRIES
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database tables on startup"""
-    max_retries = 30
-    retry_delay = 2
-    
     for attempt in range(max_retries):
         try:
             logger.info(f"Attempting to connect to database (attempt {attempt + 1}/{max_retries})")
-            # Import the entire models module to ensure all models are registered
-            import app.models
-            Base.metadata.create_all(bind=engine)
+            await asyncio.to_thread(create_tables)
+            app.state.schema_status = 'ready'
             logger.info("Database tables created successfully")
-            break
+            return
         except Exception as e:
             logger.warning(f"Database connection failed (attempt {attempt + 1}/{max_retries}): {e}")
             if attempt < max_retries - 1:
-                logger.info(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-            else:
-                logger.error("Failed to connect to database after all retries")
-                raise
+                logger.info(f"Retrying in {settings.DB_INIT_RETRY_DELAY} seconds...")
+                await asyncio.sleep(settings.DB_INIT_RETRY_DELAY)
+
+    app.state.schema_status = 'failed'
+    logger.error("Failed to connect to database after all retries")
+
+async def resume_generation_jobs():
+    """Queue generation jobs an earlier process left unfinished, once the schema is there"""
+    db_init_task = getattr(app.state, 'db_init_task', None)
+    if db_init_task is not None:
+        await db_init_task
+    if app.state.schema_status == 'failed':
+        return
+    # Imported here: the job runner pulls in generation, validation and indexing modules
+    from app.services.generation_jobs import GenerationJobRunner
+    try:
+        await asyncio.to_thread(GenerationJobRunner.resume_interrupted)
+    except Exception as e:
+        logger.warning(f"Could not resume generation jobs: {e}")
+
+@app.on_event("startup")
+async def startup_event():
+    """Start serving immediately; tables are created in the background unless done by migrations.init_db"""
+    if settings.DB_INIT_ON_STARTUP:
+        app.state.db_init_task = asyncio.create_task(initialize_database())
+    if settings.GENERATION_JOBS_RESUME_ON_STARTUP:
+        app.state.job_resume_task = asyncio.create_task(resume_generation_jobs())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Hand running generation jobs back, close the shared HTTP connection pool and flush telemetry"""
+    # Only a process that loaded the job runner can own jobs
+    job_runner = sys.modules.get('app.services.generation_jobs')
+    if job_runner is not None:
+        try:
+            await asyncio.to_thread(job_runner.GenerationJobRunner.release_owned)
+        except Exception as e:
+            logger.warning(f"Could not release generation jobs: {e}")
+    await close_http_client()
+    mark_process_dead()
+    shutdown_tracing()
 
 @app.get("/")
 async def root():
@@ -63,5 +113,36 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is serving; no dependencies are checked"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check(response: Response):
+    """Readiness probe: the database answers and the schema exists (503 otherwise)"""
+    checks = {}
+    try:
+        await asyncio.wait_for(asyncio.to_thread(ping_database), timeout=settings.READINESS_TIMEOUT)
+        checks["database"] = "ok"
+    except asyncio.TimeoutError:
+        checks["database"] = "timeout"
+    except Exception as e:
+        checks["database"] = f"error: {str(e).splitlines()[0]}"
+
+    schema_status = app.state.schema_status
+    checks["schema"] = "ok" if schema_status in ('ready', 'external') else schema_status
+
+    ready = all(value == "ok" for value in checks.values())
+    if not ready:
+        response.status_code = 503
+    return {"status": "ready" if ready else "not_ready", "checks": checks}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = metrics_response()
+    return Response(content=body, media_type=content_type)
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
@@ -5,6 +5,9 @@ from .base import Base, BaseModel
 # This ensures all models are available when relationships are created
 from .api_spec import APISpec, Endpoint
 from .test_case import TestCase, TestResult, TestCaseType, TestCasePriority
+from .generation_job import GenerationJob
+from .llm_call import LLMCall
+from .fixture_set import FixtureSet
 
 # Now that all models are imported, we can safely export them
 __all__ = [
@@ -15,5 +18,8 @@ __all__ = [
     "TestCase",
     "TestResult",
     "TestCaseType",
-    "TestCasePriority"
+    "TestCasePriority",
+    "GenerationJob",
+    "LLMCall",
+    "FixtureSet"
 ] 
\ No newline at end of file
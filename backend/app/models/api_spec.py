@@ -13,12 +13,22 @@ class APISpec(BaseModel):
     file_type = Column(String(50))  # 'openapi', 'postman'
     status = Column(String(50), default='active')  # 'active', 'inactive', 'error'
     
+    # Background test generation started by import: status of the latest generation job
+    generation_status = Column(String(50))  # pending, running, completed, failed, cancelled, budget_exceeded
+    generation_job_id = Column(Integer)
+    generation_error = Column(Text)
+    
+    # LLM calls replaced by the rule engine in generation requests made outside any job
+    llm_calls_avoided = Column(Integer, default=0)
+    
     # Service configuration for microservices
     service_config = Column(JSON, default={})  # { "base_url": "...", "dependencies": ["service1", "service2"] }
     
     # Relationships - using string references to avoid circular imports
     endpoints = relationship("Endpoint", back_populates="api_spec", cascade="all, delete-orphan")
     test_cases = relationship("TestCase", back_populates="api_spec", cascade="all, delete-orphan")
+    generation_jobs = relationship("GenerationJob", back_populates="api_spec", cascade="all, delete-orphan")
+    fixture_sets = relationship("FixtureSet", back_populates="api_spec", cascade="all, delete-orphan")
 
 class Endpoint(BaseModel):
     __tablename__ = "endpoints"
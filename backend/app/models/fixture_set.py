@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, JSON, ForeignKey, Integer, DateTime
+from sqlalchemy.orm import relationship
+from app.models.base import BaseModel
+
+class FixtureSet(BaseModel):
+    __tablename__ = "fixture_sets"
+    
+    api_spec_id = Column(Integer, ForeignKey("api_specs.id"), index=True)
+    status = Column(String(50), default='pending')  # pending, seeding, seeded, partial, failed, tearing_down, torn_down, teardown_incomplete
+    base_url = Column(String(500), default="")
+    data_seed = Column(Integer)  # synthetic data seed of the entity bodies
+    
+    # Create operations in dependency order with entity counts, and what they created
+    plan = Column(JSON)
+    resources = Column(JSON, default=dict)  # collection path -> [{"id": ..., "path_params": {...}}] not yet torn down
+    created_count = Column(Integer, default=0)
+    deleted_count = Column(Integer, default=0)
+    failed_count = Column(Integer, default=0)
+    errors = Column(JSON, default=list)  # first failure messages, capped
+    
+    seeded_at = Column(DateTime)
+    torn_down_at = Column(DateTime)
+    
+    # Relationships
+    api_spec = relationship("APISpec", back_populates="fixture_sets")
+    
+    @property
+    def resource_counts(self) -> dict:
+        return {collection: len(entries) for collection, entries in (self.resources or {}).items()}
@@ -0,0 +1,61 @@
+from sqlalchemy import Column, String, Text, JSON, Boolean, ForeignKey, Integer, Float, DateTime
+from sqlalchemy.orm import relationship
+from app.models.base import BaseModel
+
+class GenerationJob(BaseModel):
+    __tablename__ = "generation_jobs"
+    
+    api_spec_id = Column(Integer, ForeignKey("api_specs.id"), index=True)
+    status = Column(String(50), default='pending')  # pending, running, completed, failed, cancelled, budget_exceeded
+    base_url = Column(String(500), default="")
+    bulk = Column(Boolean, default=False)  # provider bulk generation, checkpointed per chunk of endpoints
+    data_seed = Column(Integer)  # synthetic test data seed, kept so a resumed job regenerates the same data
+    
+    # Checkpoint: endpoints whose test cases are committed are never sent to the LLM again
+    endpoint_ids = Column(JSON)
+    completed_endpoint_ids = Column(JSON, default=list)
+    failed_endpoint_ids = Column(JSON, default=list)
+    test_cases_created = Column(Integer, default=0)
+    
+    # LLM usage so far (per call in llm_calls) and the budget that stops the job; null budget = no limit
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    cost = Column(Float, default=0.0)
+    llm_call_count = Column(Integer, default=0)
+    llm_calls_avoided = Column(Integer, default=0)  # calls replaced by rule-generated test cases
+    max_tokens = Column(Integer)
+    max_cost = Column(Float)
+    
+    cancel_requested = Column(Boolean, default=False)
+    error = Column(Text)
+    owner = Column(String(255))  # host:pid of the process running the job
+    heartbeat_at = Column(DateTime)  # refreshed at every checkpoint; a stale one means the owner died
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    
+    # Relationships
+    api_spec = relationship("APISpec", back_populates="generation_jobs")
+    llm_calls = relationship("LLMCall", back_populates="generation_job", cascade="all, delete-orphan")
+    
+    @property
+    def total_endpoints(self) -> int:
+        return len(self.endpoint_ids or [])
+    
+    @property
+    def completed_endpoints(self) -> int:
+        return len(self.completed_endpoint_ids or [])
+    
+    @property
+    def failed_endpoints(self) -> int:
+        return len(self.failed_endpoint_ids or [])
+    
+    @property
+    def total_tokens(self) -> int:
+        return (self.prompt_tokens or 0) + (self.completion_tokens or 0)
+    
+    @property
+    def progress(self) -> float:
+        """Fraction of endpoints finished, successfully or not"""
+        if not self.total_endpoints:
+            return 1.0
+        return round((self.completed_endpoints + self.failed_endpoints) / self.total_endpoints, 4)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Integer, Float, Boolean, ForeignKey
+from sqlalchemy.orm import relationship
+from app.models.base import BaseModel
+
+class LLMCall(BaseModel):
+    __tablename__ = "llm_calls"
+    
+    generation_job_id = Column(Integer, ForeignKey("generation_jobs.id"), index=True)
+    api_spec_id = Column(Integer, index=True)
+    provider = Column(String(50))
+    model = Column(String(100))
+    endpoint = Column(String(600))  # "METHOD_/path" the call generated for; null for bulk batches
+    
+    prompt_tokens = Column(Integer)  # provider-reported, or a local estimate for streamed OpenAI-compatible calls
+    completion_tokens = Column(Integer)
+    cached_tokens = Column(Integer)  # prompt tokens served from the provider's prompt cache
+    cache_hit = Column(Boolean, default=False)
+    latency = Column(Float)  # seconds
+    outcome = Column(String(50))  # success, error, timeout, rate_limited
+    retry = Column(Integer, default=0)  # 0 for the first attempt, n for the n-th retry round
+    cost = Column(Float)  # USD; null when the model has no known price
+    
+    # Relationships
+    generation_job = relationship("GenerationJob", back_populates="llm_calls")
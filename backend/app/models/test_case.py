@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, JSON, Boolean, ForeignKey, Integer, Enum
+from sqlalchemy import Column, String, Text, JSON, Boolean, ForeignKey, Integer, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 from app.models.base import BaseModel
@@ -16,6 +16,9 @@ class TestCasePriority(enum.Enum):
 
 class TestCase(BaseModel):
     __tablename__ = "test_cases"
+    __table_args__ = (
+        Index("ix_test_cases_api_spec_fingerprint", "api_spec_id", "fingerprint"),
+    )
     
     api_spec_id = Column(Integer, ForeignKey("api_specs.id"))
     endpoint_id = Column(Integer, ForeignKey("endpoints.id"))
@@ -33,6 +36,10 @@ class TestCase(BaseModel):
     curl_command = Column(Text)
     test_script = Column(Text)
     is_active = Column(Boolean, default=True)
+    retry_policy = Column(JSON)  # overrides for the run's retry policy, e.g. {"max_attempts": 3}
+    fingerprint = Column(String(64))  # see app.services.test_case_dedup.fingerprint
+    validation_status = Column(String(20))  # valid, invalid; None if never validated (see app.services.test_case_validation)
+    validation_errors = Column(JSON)  # reasons an invalid case cannot run
     
     # Relationships
     api_spec = relationship("APISpec", back_populates="test_cases")
@@ -49,6 +56,8 @@ class TestResult(BaseModel):
     response_time = Column(Integer)  # milliseconds
     error_message = Column(Text)
     execution_log = Column(Text)
+    attempt_count = Column(Integer, default=1)
+    is_flaky = Column(Boolean, default=False)  # passed only after a retry
     
     # Relationships
     test_case = relationship("TestCase", back_populates="test_results") 
\ No newline at end of file
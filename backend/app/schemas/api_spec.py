@@ -21,6 +21,9 @@ class APISpec(APISpecBase):
     id: int
     file_path: str
     status: str
+    generation_status: Optional[str] = None
+    generation_job_id: Optional[int] = None
+    generation_error: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, List, Any
+from datetime import datetime
+
+class FixtureSetCreate(BaseModel):
+    api_spec_id: int
+    base_url: str = ""
+    mock: bool = False  # seed the spec's in-process mock server instead of base_url
+    counts: Optional[Dict[str, int]] = None  # entities per collection path, e.g. {"/products": 5000}; 0 skips one
+    default_count: Optional[int] = None  # for collections not in counts; defaults to FIXTURE_DEFAULT_COUNT
+    parallelism: Optional[int] = None  # requests in flight; defaults to FIXTURE_PARALLELISM
+    data_seed: Optional[int] = None  # seed for the entity bodies; random if omitted
+
+class FixtureSet(BaseModel):
+    id: int
+    api_spec_id: int
+    status: str
+    base_url: Optional[str] = None
+    data_seed: Optional[int] = None
+    plan: Optional[List[Dict[str, Any]]] = None
+    resource_counts: Dict[str, int] = {}
+    created_count: int = 0
+    deleted_count: int = 0
+    failed_count: int = 0
+    errors: Optional[List[str]] = None
+    seeded_at: Optional[datetime] = None
+    torn_down_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+class GenerationJobCreate(BaseModel):
+    api_spec_id: int
+    base_url: str = ""
+    bulk: bool = False
+    endpoint_ids: Optional[List[int]] = None  # default: every endpoint of the spec
+    max_tokens: Optional[int] = None  # LLM budget; defaults to AI_JOB_MAX_TOKENS / AI_JOB_MAX_COST, 0 = no limit
+    max_cost: Optional[float] = None
+    data_seed: Optional[int] = None  # seed for synthetic test data; random if omitted
+
+class GenerationJob(BaseModel):
+    id: int
+    api_spec_id: int
+    status: str
+    base_url: Optional[str] = None
+    bulk: bool
+    data_seed: Optional[int] = None
+    total_endpoints: int
+    completed_endpoints: int
+    failed_endpoints: int
+    progress: float
+    test_cases_created: int
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    cost: float = 0.0
+    llm_call_count: int = 0
+    llm_calls_avoided: int = 0
+    max_tokens: Optional[int] = None
+    max_cost: Optional[float] = None
+    cancel_requested: bool
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, List, Any
 from datetime import datetime
 from app.models.test_case import TestCaseType, TestCasePriority
 
@@ -11,6 +11,7 @@ class TestCaseBase(BaseModel):
     input_data: Optional[Dict[str, Any]] = None
     expected_output: Optional[Dict[str, Any]] = None
     expected_status_code: Optional[int] = None
+    retry_policy: Optional[Dict[str, Any]] = None
 
 class TestCaseCreate(TestCaseBase):
     api_spec_id: int
@@ -28,6 +29,7 @@ class TestCaseUpdate(BaseModel):
     curl_command: Optional[str] = None
     test_script: Optional[str] = None
     is_active: Optional[bool] = None
+    retry_policy: Optional[Dict[str, Any]] = None
 
 class TestCase(TestCaseBase):
     id: int
@@ -36,6 +38,8 @@ class TestCase(TestCaseBase):
     curl_command: Optional[str] = None
     test_script: Optional[str] = None
     is_active: bool
+    validation_status: Optional[str] = None
+    validation_errors: Optional[List[str]] = None
     created_at: datetime
     updated_at: datetime
 
@@ -49,6 +53,8 @@ class TestResultBase(BaseModel):
     response_time: Optional[int] = None
     error_message: Optional[str] = None
     execution_log: Optional[str] = None
+    attempt_count: Optional[int] = 1
+    is_flaky: Optional[bool] = False
 
 class TestResultCreate(TestResultBase):
     test_case_id: int
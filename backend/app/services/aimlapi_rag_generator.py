@@ -1,8 +1,10 @@
-import json
 from openai import OpenAI
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 from app.models.test_case import TestCaseType, TestCasePriority
-from app.core.ai_config import ai_config
+from app.core.ai_config import ai_config, llm_categories
+from app.core.metrics import track_llm_call, record_llm_calls_avoided
+from app.services.spec_index import SpecIndex, minify_json
+from app.services.llm_streaming import read_openai_json_object, validate_test_case_data, emit_test_case, emit_test_cases
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,6 +12,9 @@ logger = logging.getLogger(__name__)
 class AIMLAPIRAGTestGenerator:
     """RAG test generator using AIMLAPI.com API with OpenAI client"""
     
+    # Categories with a prompt, one call each
+    TEST_TYPES = ("normal", "edge_case", "security", "business_logic", "performance")
+    
     def __init__(self):
         self.aimlapi_client = None
         self.is_available = False
@@ -42,25 +47,29 @@ class AIMLAPIRAGTestGenerator:
         else:
             logger.warning("AIMLAPI.com API key not configured")
     
-    def generate_rag_test_cases(self, endpoint: Dict[str, Any], api_spec: Dict[str, Any], base_url: str = "") -> List[Dict[str, Any]]:
-        """Generate test cases using RAG approach with AIMLAPI.com (max 5 test cases)"""
+    def generate_rag_test_cases(self, endpoint: Dict[str, Any], api_spec: Dict[str, Any], base_url: str = "", on_test_case: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """Generate test cases using RAG approach with AIMLAPI.com (max 5 test cases)
+
+        ``on_test_case(endpoint_key, test_case)`` receives each test case as soon as it is ready.
+        """
         if not self.is_available:
             logger.warning("AIMLAPI.com API not available, falling back to rule-based generation")
-            return self._fallback_generation(endpoint, base_url)
+            return emit_test_cases(on_test_case, endpoint, self._fallback_generation(endpoint, base_url))
         
         # Create context from OpenAPI spec
         context = self._create_api_context(endpoint, api_spec)
         
-        # Generate test cases using AIMLAPI.com (limited to 5)
+        # Generate test cases using AIMLAPI.com (limited to 5), skipping categories the rule engine covers
         test_cases = []
+        categories = llm_categories()
+        record_llm_calls_avoided('aimlapi', [test_type for test_type in self.TEST_TYPES if test_type not in categories])
         
-        # Define test types to generate (max 5)
-        test_types = ["normal", "edge_case", "security", "business_logic", "performance"]
+        test_types = [test_type for test_type in self.TEST_TYPES if test_type in categories]
         
         for test_type in test_types[:5]:  # Ensure max 5 test cases
             test_case = self._generate_test_case(endpoint, context, test_type, base_url)
             if test_case:
-                test_cases.append(test_case)
+                test_cases.append(emit_test_case(on_test_case, endpoint, test_case))
             
             # Stop if we have 5 test cases
             if len(test_cases) >= 5:
@@ -99,7 +108,7 @@ class AIMLAPIRAGTestGenerator:
             context_parts.append("\nRequest Body Schema:")
             schema = self._extract_schema_from_request_body(endpoint['request_body'])
             if schema:
-                context_parts.append(json.dumps(schema, indent=2))
+                context_parts.append(minify_json(schema))
         
         # Response schemas
         if endpoint.get('responses'):
@@ -108,12 +117,18 @@ class AIMLAPIRAGTestGenerator:
                 context_parts.append(f"  {status_code}: {response.get('description', 'No description')}")
                 schema = self._extract_schema_from_response(response)
                 if schema:
-                    context_parts.append(f"    Schema: {json.dumps(schema, indent=4)}")
+                    context_parts.append(f"    Schema: {minify_json(schema)}")
         
         # Tags and categories
         if endpoint.get('tags'):
             context_parts.append(f"\nTags: {', '.join(endpoint['tags'])}")
         
+        # Referenced schemas, auth schemes and related operations retrieved from the spec index
+        related = SpecIndex.for_spec(api_spec).related_context(endpoint)
+        if related:
+            context_parts.append("\nRelated Components:")
+            context_parts.append(related)
+        
         return "\n".join(context_parts)
     
     def _extract_schema_from_request_body(self, request_body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -150,6 +165,7 @@ Return a JSON object with this structure:
     "description": "What this test validates",
     "priority": "medium",
     "input_data": {{
+        "path_params": {{}},
         "body": {{}},
         "query_params": {{}},
         "headers": {{}}
@@ -172,6 +188,7 @@ Return a JSON object with this structure:
     "description": "What edge case this test validates",
     "priority": "high",
     "input_data": {{
+        "path_params": {{}},
         "body": {{}},
         "query_params": {{}},
         "headers": {{}}
@@ -194,6 +211,7 @@ Return a JSON object with this structure:
     "description": "What security vulnerability this test validates",
     "priority": "critical",
     "input_data": {{
+        "path_params": {{}},
         "body": {{}},
         "query_params": {{}},
         "headers": {{}}
@@ -216,6 +234,7 @@ Return a JSON object with this structure:
     "description": "What business rule this test validates",
     "priority": "high",
     "input_data": {{
+        "path_params": {{}},
         "body": {{}},
         "query_params": {{}},
         "headers": {{}}
@@ -238,6 +257,7 @@ Return a JSON object with this structure:
     "description": "What performance aspect this test validates",
     "priority": "medium",
     "input_data": {{
+        "path_params": {{}},
         "body": {{}},
         "query_params": {{}},
         "headers": {{}}
@@ -250,30 +270,32 @@ Return a JSON object with this structure:
             return None
         
         try:
-            response = self.aimlapi_client.chat.completions.create(
-                model=ai_config.AIMLAPI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert API testing engineer. Generate realistic test cases based on the provided OpenAPI specification context. Return only valid JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=ai_config.AIMLAPI_TEMPERATURE,
-                max_tokens=ai_config.AIMLAPI_MAX_TOKENS
-            )
+            with track_llm_call('aimlapi', ai_config.AIMLAPI_MODEL) as call:
+                # Streamed, so the response is read only until the test case object is complete
+                stream = self.aimlapi_client.chat.completions.create(
+                    model=ai_config.AIMLAPI_MODEL,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are an expert API testing engineer. Generate realistic test cases based on the provided OpenAPI specification context. Return only valid JSON."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=ai_config.AIMLAPI_TEMPERATURE,
+                    max_tokens=ai_config.AIMLAPI_MAX_TOKENS,
+                    stream=True
+                )
+                test_data, usage = read_openai_json_object(stream, prompt)
+                call.update(usage)
             
-            if not response.choices:
-                logger.error("AIMLAPI.com API request failed: No response choices")
+            problem = "no complete JSON object in the response" if test_data is None else validate_test_case_data(test_data)
+            if problem:
+                logger.error(f"Invalid {test_type} test case from AIMLAPI.com: {problem}")
                 return None
             
-            # Parse the response
-            content = response.choices[0].message.content
-            test_data = json.loads(content)
-            
             # Generate CURL command
             curl_command = self._generate_curl_command(endpoint, base_url, test_data.get('input_data', {}))
             
@@ -294,33 +316,8 @@ Return a JSON object with this structure:
     
     def _generate_curl_command(self, endpoint: Dict[str, Any], base_url: str, test_data: Dict[str, Any]) -> str:
         """Generate CURL command for the test case"""
-        method = endpoint['method']
-        path = endpoint['path']
-        url = f"{base_url}{path}"
-        
-        curl_parts = [f"curl -X {method}"]
-        curl_parts.append('-H "Content-Type: application/json"')
-        
-        # Add headers
-        if test_data.get('headers'):
-            for key, value in test_data['headers'].items():
-                curl_parts.append(f'-H "{key}: {value}"')
-        
-        # Add request body
-        if method in ['POST', 'PUT', 'PATCH'] and test_data.get('body'):
-            body_json = json.dumps(test_data['body'])
-            curl_parts.append(f'-d \'{body_json}\'')
-        
-        # Add query parameters
-        if test_data.get('query_params'):
-            query_params = []
-            for key, value in test_data['query_params'].items():
-                query_params.append(f"{key}={value}")
-            if query_params:
-                url += "?" + "&".join(query_params)
-        
-        curl_parts.append(f'"{url}"')
-        return " ".join(curl_parts)
+        from app.services.test_generator import TestGenerator
+        return TestGenerator.generate_curl_command(endpoint, base_url, test_data)
     
     def _map_priority(self, priority_str: str) -> TestCasePriority:
         """Map string priority to enum"""
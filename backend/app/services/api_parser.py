@@ -1,9 +1,12 @@
 import yaml
 import json
 import os
+import time
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 from app.core.config import settings
+from app.core.metrics import SPEC_PARSE_DURATION
+from app.core.tracing import traced
 
 class APIParser:
     """Service to parse OpenAPI and Postman specifications"""
@@ -28,6 +31,7 @@ class APIParser:
         return content
     
     @staticmethod
+    @traced("api_parser.extract_endpoints_from_openapi")
     def extract_endpoints_from_openapi(spec_content: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract endpoints from OpenAPI specification"""
         endpoints = []
@@ -52,6 +56,7 @@ class APIParser:
         return endpoints
     
     @staticmethod
+    @traced("api_parser.extract_endpoints_from_postman")
     def extract_endpoints_from_postman(collection_content: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract endpoints from Postman collection"""
         endpoints = []
@@ -101,12 +106,14 @@ class APIParser:
         return servers[0].get('url', '') if servers else ''
     
     @staticmethod
+    @traced("api_parser.validate_spec_file")
     def validate_spec_file(file_path: str) -> Dict[str, Any]:
         """Validate and determine specification type"""
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
         
         file_extension = Path(file_path).suffix.lower()
+        start_time = time.perf_counter()
         
         try:
             if file_extension in ['.yaml', '.yml', '.json']:
@@ -132,4 +139,6 @@ class APIParser:
             raise ValueError(f"Unsupported file format: {file_extension}")
             
         except Exception as e:
-            raise ValueError(f"Error parsing file: {str(e)}") 
\ No newline at end of file
+            raise ValueError(f"Error parsing file: {str(e)}")
+        finally:
+            SPEC_PARSE_DURATION.labels(file_type=file_extension.lstrip('.') or 'unknown').observe(time.perf_counter() - start_time) 
\ No newline at end of file
@@ -0,0 +1,198 @@
+import difflib
+import hashlib
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from app.core.config import settings
+
+CASSETTE_MODES = ('record', 'replay')
+
+class CassetteStore:
+    """Indexed on-disk store of recorded request/response pairs.
+
+    Each cassette is a SQLite file under ``CASSETTES_DIR``. Interactions are
+    keyed by a hash of the normalized method, URL and body, with a secondary
+    index on (method, path) used to explain replay misses.
+    """
+
+    def __init__(self, name: str, mode: str = 'replay'):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unsupported cassette mode: {mode}. Allowed: {', '.join(CASSETTE_MODES)}")
+        if not re.fullmatch(r'[A-Za-z0-9_.-]+', name or ''):
+            raise ValueError("Cassette name may only contain letters, digits, '.', '_' and '-'")
+
+        self.name = name
+        self.mode = mode
+        self.path = os.path.join(settings.CASSETTES_DIR, f"{name}.sqlite")
+        if mode == 'replay' and not os.path.exists(self.path):
+            raise FileNotFoundError(f"Cassette not found: {name}")
+
+        os.makedirs(settings.CASSETTES_DIR, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS interactions (
+                key TEXT PRIMARY KEY,
+                method TEXT NOT NULL,
+                url TEXT NOT NULL,
+                path TEXT NOT NULL,
+                request_body TEXT,
+                status_code INTEGER,
+                response_headers TEXT,
+                response_body TEXT,
+                recorded_at TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_interactions_method_path ON interactions (method, path)")
+        self.conn.commit()
+
+        self.hits = 0
+        self.recorded = 0
+        self.mismatches: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        """Lowercase scheme and host, drop default ports and sort query params"""
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        netloc = parts.netloc.lower()
+        if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+            netloc = netloc.rsplit(':', 1)[0]
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+    @staticmethod
+    def normalize_body(body: Optional[str]) -> str:
+        """Canonical body text: JSON with sorted keys, otherwise the raw text"""
+        if not body:
+            return ''
+        try:
+            return json.dumps(json.loads(body), sort_keys=True, separators=(',', ':'))
+        except (TypeError, ValueError):
+            return body
+
+    @staticmethod
+    def interaction_key(method: str, url: str, body: Optional[str]) -> str:
+        """Lookup key for a request"""
+        body_hash = hashlib.sha256(CassetteStore.normalize_body(body).encode()).hexdigest()
+        raw = f"{method.upper()} {CassetteStore.normalize_url(url)} {body_hash}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def record(self, method: str, url: str, body: Optional[str], status_code: int, headers: Dict[str, str], response_body: str):
+        """Store (or overwrite) the response for a request"""
+        normalized_url = CassetteStore.normalize_url(url)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO interactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                CassetteStore.interaction_key(method, url, body),
+                method.upper(),
+                normalized_url,
+                urlsplit(normalized_url).path,
+                CassetteStore.normalize_body(body),
+                status_code,
+                json.dumps(headers),
+                response_body,
+                datetime.utcnow().isoformat()
+            )
+        )
+        self.conn.commit()
+        self.recorded += 1
+
+    def lookup(self, method: str, url: str, body: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Find the recorded response for a request, recording a diff on a miss"""
+        row = self.conn.execute(
+            "SELECT status_code, response_headers, response_body FROM interactions WHERE key = ?",
+            (CassetteStore.interaction_key(method, url, body),)
+        ).fetchone()
+
+        if row:
+            self.hits += 1
+            return {
+                'status_code': row[0],
+                'headers': json.loads(row[1] or '{}'),
+                'body': row[2]
+            }
+
+        self.mismatches.append({
+            'method': method.upper(),
+            'url': url,
+            'diff': self._mismatch_diff(method, url, body)
+        })
+        return None
+
+    def _mismatch_diff(self, method: str, url: str, body: Optional[str]) -> str:
+        """Unified diff between a request and the closest recorded one on the same route"""
+        normalized_url = CassetteStore.normalize_url(url)
+        actual = CassetteStore._request_lines(method.upper(), normalized_url, CassetteStore.normalize_body(body))
+
+        candidates = self.conn.execute(
+            "SELECT method, url, request_body FROM interactions WHERE method = ? AND path = ?",
+            (method.upper(), urlsplit(normalized_url).path)
+        ).fetchall()
+        if not candidates:
+            return f"No recorded interaction for {method.upper()} {urlsplit(normalized_url).path}"
+
+        def similarity(candidate):
+            return difflib.SequenceMatcher(None, '\n'.join(actual), '\n'.join(CassetteStore._request_lines(*candidate))).ratio()
+
+        closest = max(candidates, key=similarity)
+        return '\n'.join(difflib.unified_diff(
+            CassetteStore._request_lines(*closest),
+            actual,
+            fromfile='recorded',
+            tofile='actual',
+            lineterm=''
+        ))
+
+    @staticmethod
+    def _request_lines(method: str, url: str, body: Optional[str]) -> List[str]:
+        """Line-oriented request view used for diffs"""
+        lines = [f"{method} {url}"]
+        if body:
+            try:
+                lines.extend(json.dumps(json.loads(body), sort_keys=True, indent=2).splitlines())
+            except (TypeError, ValueError):
+                lines.append(body)
+        return lines
+
+    def summary(self) -> Dict[str, Any]:
+        """Cassette usage for run reports"""
+        return {
+            'name': self.name,
+            'mode': self.mode,
+            'hits': self.hits,
+            'recorded': self.recorded,
+            'misses': len(self.mismatches),
+            'mismatches': self.mismatches
+        }
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def list_cassettes() -> List[Dict[str, Any]]:
+        """Available cassettes with their interaction counts"""
+        if not os.path.exists(settings.CASSETTES_DIR):
+            return []
+
+        cassettes = []
+        for filename in sorted(os.listdir(settings.CASSETTES_DIR)):
+            if not filename.endswith('.sqlite'):
+                continue
+            filepath = os.path.join(settings.CASSETTES_DIR, filename)
+            conn = sqlite3.connect(filepath)
+            try:
+                count = conn.execute("SELECT COUNT(*) FROM interactions").fetchone()[0]
+            except sqlite3.Error:
+                count = 0
+            finally:
+                conn.close()
+            cassettes.append({
+                'name': filename[:-len('.sqlite')],
+                'interactions': count,
+                'updated_at': datetime.fromtimestamp(os.stat(filepath).st_mtime).isoformat()
+            })
+        return cassettes
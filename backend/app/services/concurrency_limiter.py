@@ -0,0 +1,138 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse
+from app.core.config import settings
+
+# Responses that signal the target is shedding load
+OVERLOAD_STATUS_CODES = {429, 503}
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limiter for a single target host.
+
+    The limit grows by one for every window of successful samples while the
+    observed latency stays close to the best latency of the recent samples,
+    and is cut multiplicatively on timeouts, 429/503 responses or a latency
+    spike. Samples without a latency (errors, replays, requests never sent)
+    only count when they signal overload.
+    """
+
+    def __init__(self, host: str, initial_limit: int = None, min_limit: int = None, max_limit: int = None):
+        self.host = host
+        self.min_limit = min_limit or settings.ADAPTIVE_CONCURRENCY_MIN_LIMIT
+        self.max_limit = max_limit or settings.ADAPTIVE_CONCURRENCY_MAX_LIMIT
+        initial = initial_limit or settings.MAX_CONCURRENT_TESTS
+        self.limit = float(max(self.min_limit, min(initial, self.max_limit)))
+        self.backoff_ratio = settings.ADAPTIVE_CONCURRENCY_BACKOFF_RATIO
+        self.latency_tolerance = settings.ADAPTIVE_CONCURRENCY_LATENCY_TOLERANCE
+        # Windowed so one fast endpoint or outlier cannot set the baseline for good
+        self._latencies = deque(maxlen=max(settings.ADAPTIVE_CONCURRENCY_LATENCY_WINDOW, 1))
+
+        self.in_flight = 0
+        self.min_latency: Optional[float] = None
+        self.samples = 0
+        self.drops = 0
+        self._condition = asyncio.Condition()
+        self._started_at = time.monotonic()
+        self.trajectory: List[Dict[str, Any]] = [
+            {'elapsed': 0.0, 'limit': int(self.limit), 'reason': 'initial'}
+        ]
+
+    async def acquire(self):
+        """Wait until a slot is free under the current limit"""
+        async with self._condition:
+            while self.in_flight >= int(self.limit):
+                await self._condition.wait()
+            self.in_flight += 1
+
+    async def release(self, latency_ms: Optional[float], status_code: Optional[int] = None, timed_out: bool = False):
+        """Release a slot and feed the sample back into the limit"""
+        async with self._condition:
+            in_flight = self.in_flight
+            self.in_flight -= 1
+            self._on_sample(latency_ms, status_code, timed_out, in_flight)
+            self._condition.notify_all()
+
+    def _on_sample(self, latency_ms: Optional[float], status_code: Optional[int], timed_out: bool, in_flight: int):
+        """Apply the AIMD rule to one completed request"""
+        self.samples += 1
+        previous = int(self.limit)
+
+        if timed_out or status_code in OVERLOAD_STATUS_CODES:
+            self.drops += 1
+            reason = 'timeout' if timed_out else f'status_{status_code}'
+            self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+        elif latency_ms is None:
+            # Errors, skips and replays say nothing about target latency
+            return
+        else:
+            self._latencies.append(latency_ms)
+            self.min_latency = min(self._latencies)
+
+            # Ignore sub-millisecond baselines so jitter is not read as queueing
+            baseline = max(self.min_latency, 1.0)
+            if latency_ms > baseline * self.latency_tolerance:
+                reason = 'latency'
+                self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+            elif in_flight * 2 >= int(self.limit):
+                # Only grow while the current limit is actually being used
+                reason = 'increase'
+                self.limit = min(self.max_limit, self.limit + 1.0 / max(int(self.limit), 1))
+            else:
+                return
+
+        if int(self.limit) != previous:
+            self.trajectory.append({
+                'elapsed': round(time.monotonic() - self._started_at, 3),
+                'limit': int(self.limit),
+                'reason': reason
+            })
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summary of the limiter for run reports"""
+        limits = [point['limit'] for point in self.trajectory]
+        return {
+            'host': self.host,
+            'final_limit': int(self.limit),
+            'min_limit_reached': min(limits),
+            'max_limit_reached': max(limits),
+            'samples': self.samples,
+            'drops': self.drops,
+            'min_latency_ms': self.min_latency,
+            'trajectory': self.trajectory
+        }
+
+class AdaptiveLimiterRegistry:
+    """Per-host limiters for one test run"""
+
+    def __init__(self, max_limits: Dict[str, int] = None):
+        self.limiters: Dict[str, AdaptiveConcurrencyLimiter] = {}
+        self.max_limits = max_limits or {}
+
+    @staticmethod
+    def host_key(base_url: str) -> str:
+        """Normalize a base URL to the host:port it targets"""
+        if base_url and not base_url.startswith(('http://', 'https://')):
+            base_url = f"http://{base_url}"
+        return urlparse(base_url).netloc or 'unknown'
+
+    def for_url(self, base_url: str) -> AdaptiveConcurrencyLimiter:
+        """Get or create the limiter for the host of a base URL"""
+        host = AdaptiveLimiterRegistry.host_key(base_url)
+        if host not in self.limiters:
+            max_limit = self.max_limits.get(host)
+            if settings.ADAPTIVE_CONCURRENCY_ENABLED:
+                self.limiters[host] = AdaptiveConcurrencyLimiter(host, max_limit=max_limit)
+            else:
+                # Fixed limit: pin min and max to the configured concurrency
+                fixed = max_limit or settings.MAX_CONCURRENT_TESTS
+                self.limiters[host] = AdaptiveConcurrencyLimiter(host, initial_limit=fixed, min_limit=fixed, max_limit=fixed)
+        return self.limiters[host]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Limit trajectories for every host touched in the run"""
+        return {
+            'adaptive': settings.ADAPTIVE_CONCURRENCY_ENABLED,
+            'hosts': [limiter.snapshot() for limiter in self.limiters.values()]
+        }
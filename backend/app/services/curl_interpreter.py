@@ -0,0 +1,443 @@
+import asyncio
+import base64
+import shlex
+import time
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlsplit, urlunsplit, quote_plus
+import httpx
+from app.core.config import settings
+from app.core.http_client import get_http_client
+from app.services.mock_server import MockServerRegistry
+from app.core.tracing import start_span, set_span_attributes, inject_trace_headers
+
+# Flags that take a value, mapped to the field they populate
+VALUE_FLAGS = {
+    '-X': 'method', '--request': 'method',
+    '-H': 'header', '--header': 'header',
+    '-d': 'data', '--data': 'data', '--data-raw': 'data_raw',
+    '--data-binary': 'data', '--data-ascii': 'data',
+    '--data-urlencode': 'data_urlencode',
+    '--json': 'json',
+    '-u': 'user', '--user': 'user',
+    '-A': 'user_agent', '--user-agent': 'user_agent',
+    '-e': 'referer', '--referer': 'referer',
+    '-b': 'cookie', '--cookie': 'cookie',
+    '-m': 'max_time', '--max-time': 'max_time',
+    '--connect-timeout': 'connect_timeout',
+    '--url': 'url',
+}
+
+# Flags without a value that the native interpreter understands
+BOOLEAN_FLAGS = {
+    '-G': 'get', '--get': 'get',
+    '-L': 'location', '--location': 'location',
+    '-k': 'insecure', '--insecure': 'insecure',
+    '-i': 'include', '--include': 'include',
+    '-I': 'head', '--head': 'head',
+    '-f': 'fail', '--fail': 'fail',
+    '-s': None, '--silent': None,
+    '-S': None, '--show-error': None,
+    '-v': None, '--verbose': None,
+    '--compressed': None,
+}
+
+# Network-only flags the subprocess fallback may pass to the real curl binary
+SUBPROCESS_VALUE_FLAGS = {
+    '-x', '--proxy', '--noproxy', '--proxy-user', '-U',
+    '--resolve', '--connect-to', '--max-redirs',
+    '--retry', '--retry-delay', '--retry-max-time',
+    '--limit-rate', '--oauth2-bearer', '--request-target',
+}
+SUBPROCESS_BOOLEAN_FLAGS = {
+    '-0', '--http1.0', '--http1.1', '--http2', '--http2-prior-knowledge',
+    '-4', '--ipv4', '-6', '--ipv6',
+    '--tlsv1.2', '--tlsv1.3', '--ssl-reqd',
+    '-g', '--globoff', '--path-as-is', '--no-keepalive', '--tcp-nodelay', '-N', '--no-buffer',
+    '--post301', '--post302', '--post303', '--basic', '--digest', '--fail-with-body',
+}
+
+# URL schemes either path will request
+URL_SCHEMES = ('http', 'https')
+
+SHELL_OPERATORS = {'|', '||', '&', '&&', ';', ';;', '>', '>>', '<', '<<', '(', ')'}
+
+class CurlInterpreter:
+    """Run cURL commands natively on the pooled async HTTP client.
+
+    Commands produced by ``TestGenerator.generate_curl_command`` and the
+    common curl flags above are translated into httpx requests. Commands
+    that also use one of the network-only ``SUBPROCESS_*_FLAGS`` fall back
+    to running the ``curl`` binary directly (never through a shell, without
+    ``.curlrc``) in a small bounded subprocess pool; anything that would make
+    curl read or write local files is rejected.
+    """
+
+    _subprocess_pool: Optional[asyncio.Semaphore] = None
+    _subprocess_pool_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def parse(curl_command: str) -> Dict[str, Any]:
+        """Parse a curl command line into a request description"""
+        parsed = {
+            'argv': [],
+            'method': None,
+            'url': None,
+            'headers': {},
+            'data': [],
+            'json': None,
+            'user': None,
+            'get': False,
+            'location': False,
+            'insecure': False,
+            'include': False,
+            'head': False,
+            'fail': False,
+            'timeout': None,
+            'unsupported': [],
+            'error': None
+        }
+
+        try:
+            argv = shlex.split(curl_command.replace('\\\n', ' '))
+        except ValueError as e:
+            parsed['error'] = f"Invalid curl command: {str(e)}"
+            return parsed
+
+        parsed['argv'] = argv
+        if not argv or argv[0] != 'curl':
+            parsed['error'] = "Only curl commands are supported"
+            return parsed
+
+        tokens = CurlInterpreter._expand_short_flags(argv[1:])
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+
+            if token in VALUE_FLAGS:
+                if i + 1 >= len(tokens):
+                    parsed['error'] = f"Option {token} requires a value"
+                    return parsed
+                CurlInterpreter._apply_value_flag(parsed, VALUE_FLAGS[token], token, tokens[i + 1])
+                i += 2
+                continue
+
+            if token in BOOLEAN_FLAGS:
+                field = BOOLEAN_FLAGS[token]
+                if field:
+                    parsed[field] = True
+                i += 1
+                continue
+
+            if token.startswith('-') and len(token) > 1:
+                parsed['unsupported'].append(token)
+                i += 1
+                continue
+
+            if parsed['url'] is None:
+                parsed['url'] = token
+            else:
+                parsed['unsupported'].append(token)
+            i += 1
+
+        if parsed['url'] is None and not parsed['error']:
+            parsed['error'] = "No URL found in curl command"
+        elif parsed['url'] is not None and CurlInterpreter._url_scheme(parsed['url']) not in URL_SCHEMES:
+            parsed['error'] = f"Only {' and '.join(URL_SCHEMES)} URLs are supported"
+
+        return parsed
+
+    @staticmethod
+    def check_subprocess_command(curl_command: str, argv: List[str]) -> Optional[str]:
+        """Why the command may not run on the real curl binary, or None when it may.
+
+        Only the flags the native interpreter handles and the network-only
+        ``SUBPROCESS_*_FLAGS`` are allowed, and none of their values may name
+        a local file (``-d @file``, ``-H @file``, a cookie jar, ...). Shell
+        operators are looked for in the quote-aware tokens, so a quoted body
+        containing ``;`` or ``$(id)`` is fine.
+        """
+        lexer = shlex.shlex(curl_command.replace('\\\n', ' '), posix=True, punctuation_chars=True)
+        lexer.whitespace_split = True
+        try:
+            operators = [token for token in lexer if token in SHELL_OPERATORS]
+        except ValueError as e:
+            return f"Invalid curl command: {str(e)}"
+        if operators:
+            return f"Shell syntax is not supported: {' '.join(operators)}"
+
+        tokens = CurlInterpreter._expand_short_flags(argv[1:])
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token in VALUE_FLAGS or token in SUBPROCESS_VALUE_FLAGS:
+                value = tokens[i + 1] if i + 1 < len(tokens) else ''
+                if CurlInterpreter._reads_file(VALUE_FLAGS.get(token), value):
+                    return f"Option {token} may not read local files"
+                if VALUE_FLAGS.get(token) == 'url' and CurlInterpreter._url_scheme(value) not in URL_SCHEMES:
+                    return f"Only {' and '.join(URL_SCHEMES)} URLs are supported"
+                i += 2
+                continue
+            if token.startswith('-') and len(token) > 1:
+                if token not in BOOLEAN_FLAGS and token not in SUBPROCESS_BOOLEAN_FLAGS:
+                    return f"Option {token} is not supported"
+            elif CurlInterpreter._url_scheme(token) not in URL_SCHEMES:
+                return f"Only {' and '.join(URL_SCHEMES)} URLs are supported"
+            i += 1
+        return None
+
+    @staticmethod
+    def _url_scheme(url: str) -> str:
+        """Scheme of a curl URL; like curl, one without ``://`` is plain http"""
+        return url.split('://', 1)[0].lower() if '://' in url else 'http'
+
+    @staticmethod
+    def _reads_file(field: Optional[str], value: str) -> bool:
+        """Whether curl would read a local file for this flag value"""
+        if field in ('data', 'json', 'header'):
+            return value.startswith('@')
+        if field == 'data_urlencode':
+            # name@file and @file read a file; name=content does not
+            name = value.split('=', 1)[0] if '=' in value else value
+            return '@' in name
+        if field == 'cookie':
+            # A cookie value without '=' is a cookie jar file name
+            return '=' not in value
+        return False
+
+    @staticmethod
+    def _expand_short_flags(tokens: List[str]) -> List[str]:
+        """Split bundled short flags (-sSL) and attached values (-XPOST)"""
+        expanded = []
+        for token in tokens:
+            if len(token) > 2 and token[0] == '-' and token[1] != '-':
+                flag = token[:2]
+                if flag in VALUE_FLAGS:
+                    expanded.extend([flag, token[2:]])
+                    continue
+                bundle = [f"-{char}" for char in token[1:]]
+                if all(item in BOOLEAN_FLAGS for item in bundle):
+                    expanded.extend(bundle)
+                    continue
+            expanded.append(token)
+        return expanded
+
+    @staticmethod
+    def _apply_value_flag(parsed: Dict[str, Any], field: str, flag: str, value: str):
+        """Store the value of a value-taking flag"""
+        if field == 'method':
+            parsed['method'] = value.upper()
+        elif field == 'header':
+            if ':' in value:
+                name, header_value = value.split(':', 1)
+                parsed['headers'][name.strip()] = header_value.strip()
+            else:
+                parsed['unsupported'].append(f"{flag} {value}")
+        elif field in ('data', 'data_raw'):
+            if field == 'data' and value.startswith('@'):
+                # Reading request bodies from files is left to the real curl
+                parsed['unsupported'].append(f"{flag} {value}")
+            else:
+                parsed['data'].append(value)
+        elif field == 'data_urlencode':
+            if '=' in value:
+                name, raw = value.split('=', 1)
+                parsed['data'].append(f"{name}={quote_plus(raw)}" if name else quote_plus(raw))
+            else:
+                parsed['data'].append(quote_plus(value))
+        elif field == 'json':
+            parsed['json'] = value
+        elif field == 'user':
+            parsed['user'] = value
+        elif field == 'user_agent':
+            parsed['headers']['User-Agent'] = value
+        elif field == 'referer':
+            parsed['headers']['Referer'] = value
+        elif field == 'cookie':
+            if '=' in value:
+                parsed['headers']['Cookie'] = value
+            else:
+                parsed['unsupported'].append(f"{flag} {value}")
+        elif field in ('max_time', 'connect_timeout'):
+            try:
+                parsed['timeout'] = float(value)
+            except ValueError:
+                parsed['unsupported'].append(f"{flag} {value}")
+        elif field == 'url':
+            parsed['url'] = value
+
+    @staticmethod
+    def build_request(parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """Translate a parsed command into httpx request arguments"""
+        headers = dict(parsed['headers'])
+        body = None
+
+        if parsed['json'] is not None:
+            body = parsed['json']
+            headers.setdefault('Content-Type', 'application/json')
+            headers.setdefault('Accept', 'application/json')
+        elif parsed['data']:
+            body = '&'.join(parsed['data'])
+            headers.setdefault('Content-Type', 'application/x-www-form-urlencoded')
+
+        url = parsed['url']
+        if '://' not in url:
+            url = f"http://{url}"
+
+        if parsed['get'] and body is not None:
+            # -G moves the data into the query string
+            parts = urlsplit(url)
+            query = f"{parts.query}&{body}" if parts.query else body
+            url = urlunsplit((parts.scheme, parts.netloc, parts.path, query, parts.fragment))
+            body = None
+
+        if parsed['method']:
+            method = parsed['method']
+        elif parsed['head']:
+            method = 'HEAD'
+        elif body is not None:
+            method = 'POST'
+        else:
+            method = 'GET'
+
+        if parsed['user']:
+            credentials = parsed['user'] if ':' in parsed['user'] else f"{parsed['user']}:"
+            headers['Authorization'] = "Basic " + base64.b64encode(credentials.encode()).decode()
+
+        return {
+            'method': method,
+            'url': url,
+            'headers': headers,
+            'content': body.encode() if body is not None else None,
+            'follow_redirects': parsed['location'],
+            'timeout': parsed['timeout'] or settings.TEST_TIMEOUT
+        }
+
+    @staticmethod
+    async def execute_command(curl_command: str) -> Dict[str, Any]:
+        """Execute a single curl command natively, or via the subprocess fallback"""
+        start_time = time.time()
+        parsed = CurlInterpreter.parse(curl_command)
+
+        if parsed['error']:
+            return {
+                'status': 'error',
+                'output': None,
+                'error': parsed['error'],
+                'response_time': int((time.time() - start_time) * 1000)
+            }
+
+        # -k needs a client without certificate checks, which the shared pool does not allow
+        if parsed['unsupported'] or parsed['insecure']:
+            error = CurlInterpreter.check_subprocess_command(curl_command, parsed['argv'])
+            if error:
+                return {
+                    'status': 'error',
+                    'output': None,
+                    'error': error,
+                    'response_time': int((time.time() - start_time) * 1000)
+                }
+            return await CurlInterpreter._execute_subprocess(parsed['argv'], parsed['timeout'] or settings.TEST_TIMEOUT, start_time)
+
+        request = CurlInterpreter.build_request(parsed)
+        client = MockServerRegistry.client_for(request['url']) or get_http_client()
+        try:
+            with start_span("curl.request", kind='client', **{'http.method': request['method'], 'http.url': request['url']}) as span:
+                response = await client.request(
+                    method=request['method'],
+                    url=request['url'],
+                    headers=inject_trace_headers(request['headers']),
+                    content=request['content'],
+                    follow_redirects=request['follow_redirects'],
+                    timeout=request['timeout']
+                )
+                set_span_attributes(span, **{'http.status_code': response.status_code})
+        except httpx.TimeoutException:
+            return {
+                'status': 'failed',
+                'output': '',
+                'error': f"Operation timed out after {request['timeout']} seconds",
+                'response_time': int((time.time() - start_time) * 1000)
+            }
+        except httpx.RequestError as e:
+            return {
+                'status': 'failed',
+                'output': '',
+                'error': f"Request error: {str(e)}",
+                'response_time': int((time.time() - start_time) * 1000)
+            }
+
+        output = '' if request['method'] == 'HEAD' and not parsed['include'] else response.text
+        if parsed['include'] or parsed['head']:
+            status_line = f"{response.http_version} {response.status_code} {response.reason_phrase}"
+            header_lines = "\r\n".join(f"{name}: {value}" for name, value in response.headers.items())
+            output = f"{status_line}\r\n{header_lines}\r\n\r\n{output}"
+
+        failed = parsed['fail'] and response.status_code >= 400
+        return {
+            'status': 'failed' if failed else 'passed',
+            'output': output,
+            'error': f"The requested URL returned error: {response.status_code}" if failed else None,
+            'response_status_code': response.status_code,
+            'response_time': int((time.time() - start_time) * 1000)
+        }
+
+    @staticmethod
+    async def _execute_subprocess(argv: List[str], timeout: float, start_time: float) -> Dict[str, Any]:
+        """Run the real curl binary for flags the interpreter does not handle; killed after ``timeout``"""
+        loop = asyncio.get_running_loop()
+        if CurlInterpreter._subprocess_pool is None or CurlInterpreter._subprocess_pool_loop is not loop:
+            CurlInterpreter._subprocess_pool = asyncio.Semaphore(settings.CURL_SUBPROCESS_POOL_SIZE)
+            CurlInterpreter._subprocess_pool_loop = loop
+
+        async with CurlInterpreter._subprocess_pool:
+            try:
+                # exec, not shell: argv comes from shlex and is never re-interpreted.
+                # -q (first) skips .curlrc; --proto keeps redirects off file:// and friends
+                process = await asyncio.create_subprocess_exec(
+                    argv[0], '-q', '--proto', '=http,https', '--proto-redir', '=http,https', *argv[1:],
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                return {
+                    'status': 'failed',
+                    'output': '',
+                    'error': f"Operation timed out after {timeout} seconds",
+                    'response_time': int((time.time() - start_time) * 1000)
+                }
+            except Exception as e:
+                return {
+                    'status': 'error',
+                    'output': None,
+                    'error': str(e),
+                    'response_time': int((time.time() - start_time) * 1000)
+                }
+
+        response_time = int((time.time() - start_time) * 1000)
+        if process.returncode == 0:
+            return {
+                'status': 'passed',
+                'output': stdout.decode(),
+                'error': stderr.decode() if stderr else None,
+                'response_time': response_time
+            }
+        return {
+            'status': 'failed',
+            'output': stdout.decode(),
+            'error': stderr.decode(),
+            'response_time': response_time
+        }
+
+    @staticmethod
+    async def execute_batch(curl_commands: List[str], max_concurrency: int = None) -> List[Dict[str, Any]]:
+        """Execute many curl commands with bounded concurrency, preserving order"""
+        semaphore = asyncio.Semaphore(max_concurrency or settings.MAX_CONCURRENT_TESTS)
+
+        async def execute_with_semaphore(curl_command):
+            async with semaphore:
+                return await CurlInterpreter.execute_command(curl_command)
+
+        return await asyncio.gather(*[execute_with_semaphore(command) for command in curl_commands])
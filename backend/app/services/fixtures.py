@@ -0,0 +1,364 @@
+import asyncio
+import copy
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.api_spec import Endpoint as EndpointModel
+from app.models.fixture_set import FixtureSet as FixtureSetModel
+from app.services.concurrency_limiter import AdaptiveLimiterRegistry
+from app.services.resource_pool import PATH_PARAMETER, ResourcePool, is_create_operation, singular_name, substitute_path_params
+from app.services.retry_policy import RetryPolicy, RetryBudget
+from app.services.synthetic_data import DataContext, identity_kind
+from app.services.test_executor import TestExecutor
+from app.services.test_generator import TestGenerator, BOUNDARY_MAX_DEPTH
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Failure messages kept on a fixture set; the rest are only counted
+FIXTURE_ERRORS_KEPT = 20
+
+# Teardown may run on sets in these states; anything else is mid-operation
+TEARDOWN_STATUSES = ('seeded', 'partial', 'failed', 'teardown_incomplete')
+
+class FixtureService:
+    """Bulk seed data for a target service, planned from its spec's create operations.
+
+    The plan orders collections by dependency: a collection depends on the
+    parents in its path (``/orders/{order_id}/items`` on ``/orders``) and on
+    collections its body references by ID field (``category_id`` on
+    ``/categories``). Seeding runs one dependency stage at a time, each
+    stage's creates concurrently through ``TestExecutor`` with bounded
+    parallelism; references and parent path parameters are filled
+    round-robin from the IDs the earlier stages created. Created IDs are
+    checkpointed on the fixture set after every stage and torn down in
+    reverse stage order.
+    """
+
+    @staticmethod
+    def plan(endpoints: List[EndpointModel], api_spec: Dict[str, Any], counts: Optional[Dict[str, int]] = None,
+             default_count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """One entry per create operation to seed, in dependency order"""
+        counts = counts or {}
+        default_count = settings.FIXTURE_DEFAULT_COUNT if default_count is None else default_count
+        # A POST without a body or a documented 201 is an action (POST /products/{id}/stock), not a create
+        creates = {
+            endpoint.path.rstrip('/'): endpoint
+            for endpoint in sorted(endpoints, key=lambda endpoint: endpoint.path)
+            if is_create_operation(endpoint.method, endpoint.path)
+            and (endpoint.request_body or '201' in (endpoint.responses or {}))
+        }
+        # DELETE /categories/{category_id} tears down what POST /categories created
+        deletes = {}
+        for endpoint in endpoints:
+            collection, _, last_segment = endpoint.path.rstrip('/').rpartition('/')
+            if endpoint.method.upper() == 'DELETE' and PATH_PARAMETER.fullmatch(last_segment):
+                deletes.setdefault(collection, endpoint.path)
+        # category_id / categoryId -> /categories
+        id_fields = {}
+        for collection in creates:
+            singular = singular_name(collection)
+            id_fields.setdefault(f"{singular}_id", collection)
+            id_fields.setdefault(f"{singular}Id", collection)
+
+        entries = {}
+        for collection, endpoint in creates.items():
+            count = counts.get(collection, default_count)
+            if count <= 0:
+                continue
+            endpoint_dict = FixtureService._endpoint_dict(endpoint)
+            body_schema = TestGenerator._body_schema(endpoint_dict, api_spec) or {}
+            references = {}
+            for field in FixtureService._property_names(body_schema, api_spec, 0):
+                if id_fields.get(field) not in (None, collection):
+                    references[field] = id_fields[field]
+            parents = {}
+            prefix = ''
+            for segment in [segment for segment in collection.split('/') if segment]:
+                match = PATH_PARAMETER.fullmatch(segment)
+                if match is not None:
+                    parents[match.group(1)] = prefix
+                prefix += '/' + segment
+            entries[collection] = {
+                'collection': collection,
+                'endpoint_id': endpoint.id,
+                'count': count,
+                'references': references,
+                'parents': parents,
+                'depends_on': sorted(set(references.values()) | set(parents.values())),
+                'delete_path': deletes.get(collection),
+                'success_status': TestGenerator._status_for(endpoint_dict, '2', 201)
+            }
+
+        # Stage = longest dependency chain; a dependency outside the plan (or in a cycle) is left unresolved
+        stages: Dict[str, int] = {}
+
+        def stage_of(collection: str, visiting: Tuple[str, ...] = ()) -> int:
+            if collection in stages:
+                return stages[collection]
+            entry = entries[collection]
+            stage = 0
+            for dependency in entry['depends_on']:
+                if dependency in entries and dependency not in visiting and dependency != collection:
+                    stage = max(stage, stage_of(dependency, visiting + (collection,)) + 1)
+                else:
+                    entry.setdefault('unresolved', []).append(dependency)
+            stages[collection] = stage
+            return stage
+
+        for collection in entries:
+            stage_of(collection)
+        for collection, entry in entries.items():
+            entry['stage'] = stages[collection]
+            if entry.get('unresolved'):
+                entry['unresolved'] = sorted(set(entry['unresolved']))
+        return sorted(entries.values(), key=lambda entry: (entry['stage'], entry['collection']))
+
+    @staticmethod
+    def _property_names(schema: Dict[str, Any], api_spec: Dict[str, Any], depth: int) -> List[str]:
+        """Every property name in a body schema, nested objects and array items included"""
+        schema = TestGenerator._resolve_schema(schema, api_spec)
+        if depth >= BOUNDARY_MAX_DEPTH:
+            return []
+        names = []
+        for name, prop_schema in (schema.get('properties') or {}).items():
+            names.append(name)
+            names.extend(FixtureService._property_names(prop_schema, api_spec, depth + 1))
+        if schema.get('items'):
+            names.extend(FixtureService._property_names(schema['items'], api_spec, depth + 1))
+        return names
+
+    @staticmethod
+    def _template(schema: Dict[str, Any], api_spec: Dict[str, Any], references: Dict[str, str], depth: int = 0,
+                  name: Optional[str] = None) -> Any:
+        """Body with the required fields, identity fields and references; identities are re-keyed per entity"""
+        schema = TestGenerator._resolve_schema(schema, api_spec)
+        schema_type = TestGenerator._schema_type(schema)
+        if schema_type == 'object' and depth < BOUNDARY_MAX_DEPTH:
+            required = set(schema.get('required') or [])
+            body = {}
+            for prop_name, prop_schema in (schema.get('properties') or {}).items():
+                prop_schema = TestGenerator._resolve_schema(prop_schema, api_spec)
+                if prop_schema.get('readOnly'):
+                    continue
+                if prop_name in required or prop_name in references or identity_kind(prop_name, prop_schema):
+                    body[prop_name] = FixtureService._template(prop_schema, api_spec, references, depth + 1, prop_name)
+            return body
+        if schema_type == 'array' and depth < BOUNDARY_MAX_DEPTH:
+            count = max(schema.get('minItems') or 1, 1)
+            return [FixtureService._template(schema.get('items') or {}, api_spec, references, depth + 1) for _ in range(count)]
+        return TestGenerator._baseline_value(schema, depth, name)
+
+    @staticmethod
+    def _fill_references(value: Any, references: Dict[str, str], pick) -> Any:
+        if isinstance(value, dict):
+            return {
+                key: pick(references[key]) if key in references else FixtureService._fill_references(item, references, pick)
+                for key, item in value.items()
+            }
+        if isinstance(value, list):
+            return [FixtureService._fill_references(item, references, pick) for item in value]
+        return value
+
+    @staticmethod
+    async def seed(db: Session, fixture_set: FixtureSetModel, endpoints: List[EndpointModel], api_spec: Dict[str, Any],
+                   parallelism: Optional[int] = None) -> FixtureSetModel:
+        """Create the planned entities stage by stage, checkpointing created IDs after each stage"""
+        parallelism = parallelism or settings.FIXTURE_PARALLELISM
+        endpoints_by_id = {endpoint.id: endpoint for endpoint in endpoints}
+        data_context = DataContext(fixture_set.data_seed)
+        resources: Dict[str, List[Dict[str, Any]]] = {}
+        errors: List[str] = []
+        failed = 0
+
+        fixture_set.status = 'seeding'
+        fixture_set.resources = {}
+        db.commit()
+
+        limiters, global_limit, retry_policy, retry_budget = FixtureService._execution_limits(fixture_set.base_url, parallelism)
+        for stage in sorted({entry['stage'] for entry in fixture_set.plan}):
+            cases = []
+            for entry in [entry for entry in fixture_set.plan if entry['stage'] == stage]:
+                endpoint = endpoints_by_id.get(entry['endpoint_id'])
+                if endpoint is None:
+                    errors.append(f"{entry['collection']}: create operation no longer in the spec")
+                    failed += entry['count']
+                    continue
+                body_schema = TestGenerator._body_schema(FixtureService._endpoint_dict(endpoint), api_spec)
+                template = FixtureService._template(body_schema, api_spec, entry['references']) if body_schema else None
+                # A reference outside the plan keeps its placeholder value; a parent has to exist
+                references = {field: target for field, target in entry['references'].items() if resources.get(target)}
+                unresolved = set(entry.get('unresolved') or []) - set(entry['parents'].values())
+                missing = [dependency for dependency in entry['depends_on'] if dependency not in unresolved and not resources.get(dependency)]
+                if missing:
+                    errors.append(f"{entry['collection']}: nothing created in {', '.join(missing)} to reference")
+                    failed += entry['count']
+                    continue
+
+                for index in range(entry['count']):
+                    pick = lambda collection, index=index: resources[collection][index % len(resources[collection])]['id']
+                    # The innermost parent carries the path parameters of its own parents
+                    path_params = {}
+                    for param, parent in entry['parents'].items():
+                        parent_entry = resources[parent][index % len(resources[parent])]
+                        path_params = {**parent_entry['path_params'], param: parent_entry['id']}
+                    input_data = {'path_params': path_params}
+                    if template is not None:
+                        body = data_context.render({'input_data': {'body': copy.deepcopy(template)}})['input_data']['body']
+                        input_data['body'] = FixtureService._fill_references(body, references, pick)
+                    cases.append({
+                        'name': f"Seed {entry['collection']} #{index + 1}",
+                        'method': 'POST',
+                        'path': entry['collection'],
+                        'priority': 'medium',
+                        'input_data': input_data,
+                        'expected_status_code': entry['success_status'],
+                        'fixture_collection': entry['collection']
+                    })
+
+            results = await TestExecutor.execute_test_suite(
+                cases, fixture_set.base_url, limiters=limiters, global_limit=global_limit,
+                retry_policy=retry_policy, retry_budget=retry_budget
+            )
+            for result in results:
+                test_case = result['test_case']
+                collection = test_case['fixture_collection']
+                path_params = test_case['input_data']['path_params']
+                status_code = result.get('response_status_code')
+                resource_id = None
+                if status_code is not None and 200 <= status_code < 300:
+                    resolved = substitute_path_params(collection, path_params)
+                    resource_id = ResourcePool.extract_id(resolved, result.get('response_body'), result.get('location'))
+                if resource_id is None:
+                    failed += 1
+                    reason = result.get('error_message') or f"HTTP {status_code}"
+                    if status_code is not None and 200 <= status_code < 300:
+                        reason += " without a resource ID in the response"
+                    errors.append(f"{test_case['name']}: {reason}")
+                    continue
+                resources.setdefault(collection, []).append({'id': resource_id, 'path_params': path_params})
+
+            fixture_set.resources = copy.deepcopy(resources)
+            fixture_set.created_count = sum(len(entries) for entries in resources.values())
+            fixture_set.failed_count = failed
+            fixture_set.errors = errors[:FIXTURE_ERRORS_KEPT]
+            db.commit()
+
+        fixture_set.status = 'partial' if failed else 'seeded'
+        fixture_set.seeded_at = datetime.utcnow()
+        db.commit()
+        logger.info(f"Fixture set {fixture_set.id}: {fixture_set.created_count} entities created, {failed} failed")
+        return fixture_set
+
+    @staticmethod
+    async def seed_in_background(fixture_set_id: int, api_spec: Dict[str, Any], parallelism: Optional[int] = None):
+        """Seed a pending set on its own session once the request that created it has returned"""
+        db = SessionLocal()
+        fixture_set = None
+        try:
+            fixture_set = db.query(FixtureSetModel).filter(FixtureSetModel.id == fixture_set_id).first()
+            if fixture_set is None or fixture_set.status != 'pending':
+                return
+            endpoints = db.query(EndpointModel).filter(EndpointModel.api_spec_id == fixture_set.api_spec_id).all()
+            await FixtureService.seed(db, fixture_set, endpoints, api_spec, parallelism)
+        except Exception as e:
+            logger.error(f"Fixture set {fixture_set_id} failed: {str(e)}")
+            db.rollback()
+            if fixture_set is not None:
+                # Stages checkpointed before the failure stay on the set for teardown
+                fixture_set.status = 'failed'
+                fixture_set.errors = (list(fixture_set.errors or []) + [f"Seeding failed: {str(e)}"])[-FIXTURE_ERRORS_KEPT:]
+                db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    async def teardown(db: Session, fixture_set: FixtureSetModel, parallelism: Optional[int] = None) -> FixtureSetModel:
+        """Delete what the set created, dependents before what they reference.
+
+        A 404 or 410 counts as already gone. Collections without a DELETE
+        operation, and entities whose delete failed, stay on the set.
+        """
+        parallelism = parallelism or settings.FIXTURE_PARALLELISM
+        resources = copy.deepcopy(fixture_set.resources or {})
+        errors = list(fixture_set.errors or [])
+
+        fixture_set.status = 'tearing_down'
+        db.commit()
+
+        limiters, global_limit, retry_policy, retry_budget = FixtureService._execution_limits(fixture_set.base_url, parallelism)
+        plan = fixture_set.plan or []
+        for stage in sorted({entry['stage'] for entry in plan}, reverse=True):
+            cases = []
+            for entry in [entry for entry in plan if entry['stage'] == stage and resources.get(entry['collection'])]:
+                if not entry.get('delete_path'):
+                    errors.append(f"{entry['collection']}: no DELETE operation, {len(resources[entry['collection']])} left in place")
+                    continue
+                param = PATH_PARAMETER.fullmatch(entry['delete_path'].rstrip('/').rsplit('/', 1)[-1]).group(1)
+                for position, resource in enumerate(resources[entry['collection']]):
+                    cases.append({
+                        'name': f"Tear down {entry['collection']} {resource['id']}",
+                        'method': 'DELETE',
+                        'path': entry['delete_path'],
+                        'priority': 'medium',
+                        'input_data': {'path_params': {**resource['path_params'], param: resource['id']}},
+                        'expected_status_code': 200,
+                        'fixture_collection': entry['collection'],
+                        'fixture_position': position
+                    })
+            if not cases:
+                continue
+
+            results = await TestExecutor.execute_test_suite(
+                cases, fixture_set.base_url, limiters=limiters, global_limit=global_limit,
+                retry_policy=retry_policy, retry_budget=retry_budget
+            )
+            gone: Dict[str, set] = {}
+            for result in results:
+                test_case = result['test_case']
+                status_code = result.get('response_status_code')
+                if status_code is not None and (200 <= status_code < 300 or status_code in (404, 410)):
+                    gone.setdefault(test_case['fixture_collection'], set()).add(test_case['fixture_position'])
+                else:
+                    errors.append(f"{test_case['name']}: {result.get('error_message') or f'HTTP {status_code}'}")
+            for collection, positions in gone.items():
+                resources[collection] = [resource for position, resource in enumerate(resources[collection]) if position not in positions]
+            resources = {collection: entries for collection, entries in resources.items() if entries}
+
+            fixture_set.resources = copy.deepcopy(resources)
+            fixture_set.deleted_count = (fixture_set.deleted_count or 0) + sum(len(positions) for positions in gone.values())
+            fixture_set.errors = errors[:FIXTURE_ERRORS_KEPT]
+            db.commit()
+
+        fixture_set.status = 'teardown_incomplete' if resources else 'torn_down'
+        fixture_set.torn_down_at = datetime.utcnow()
+        db.commit()
+        logger.info(f"Fixture set {fixture_set.id}: {fixture_set.deleted_count} entities torn down, {sum(len(entries) for entries in resources.values())} left")
+        return fixture_set
+
+    @staticmethod
+    def resource_ids(fixture_set: FixtureSetModel) -> Dict[str, List[Any]]:
+        """Created IDs by resolved collection path, the shape ResourcePool is seeded with"""
+        ids: Dict[str, List[Any]] = {}
+        for collection, entries in (fixture_set.resources or {}).items():
+            for entry in entries:
+                ids.setdefault(substitute_path_params(collection, entry['path_params']), []).append(entry['id'])
+        return ids
+
+    @staticmethod
+    def _execution_limits(base_url: str, parallelism: int) -> Tuple[AdaptiveLimiterRegistry, asyncio.Semaphore, RetryPolicy, RetryBudget]:
+        """Adaptive limiter capped at ``parallelism`` for the target, plus a hard in-flight cap"""
+        limiters = AdaptiveLimiterRegistry({AdaptiveLimiterRegistry.host_key(base_url): parallelism})
+        return limiters, asyncio.Semaphore(parallelism), RetryPolicy(), RetryBudget()
+
+    @staticmethod
+    def _endpoint_dict(endpoint: EndpointModel) -> Dict[str, Any]:
+        return {
+            'method': endpoint.method,
+            'path': endpoint.path,
+            'parameters': endpoint.parameters,
+            'request_body': endpoint.request_body,
+            'responses': endpoint.responses
+        }
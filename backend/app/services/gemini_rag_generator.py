@@ -1,8 +1,13 @@
 import json
+import threading
 import requests
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Callable, Optional
 from app.models.test_case import TestCaseType, TestCasePriority
-from app.core.ai_config import ai_config
+from app.core.ai_config import ai_config, llm_categories
+from app.core.metrics import track_llm_call, record_llm_calls_avoided
+from app.services.spec_index import SpecIndex, minify_json
+from app.services.prompt_batching import PromptBatcher, estimate_tokens
+from app.services.llm_streaming import IncrementalJSONParser, GenerationCancelled, iter_gemini_stream, validate_test_case_data, emit_test_case, emit_test_cases
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,6 +15,57 @@ logger = logging.getLogger(__name__)
 class GeminiRAGTestGenerator:
     """RAG test generator using Google Gemini 2.0 Flash API"""
     
+    # Category -> (prompt line, example object); prompts ask only for the categories in llm_categories()
+    CATEGORY_PROMPTS = {
+        "normal": ("Normal test case - realistic business scenarios with valid data", {
+            "name": "Normal test name",
+            "description": "What this normal test validates",
+            "priority": "medium",
+            "input_data": {"path_params": {}, "body": {}, "query_params": {}, "headers": {}},
+            "expected_status_code": 200,
+            "test_script": "Brief description of normal test logic"
+        }),
+        "edge_case": ("Edge case test - boundary conditions, invalid inputs, edge scenarios", {
+            "name": "Edge case test name",
+            "description": "What edge case this test validates",
+            "priority": "high",
+            "input_data": {"path_params": {}, "body": {}, "query_params": {}, "headers": {}},
+            "expected_status_code": 400,
+            "test_script": "Brief description of edge case test logic"
+        }),
+        "security": ("Security test - security vulnerabilities like SQL injection, XSS, authentication bypass", {
+            "name": "Security test name",
+            "description": "What security vulnerability this test validates",
+            "priority": "critical",
+            "input_data": {"path_params": {}, "body": {}, "query_params": {}, "headers": {}},
+            "expected_status_code": 400,
+            "test_script": "Brief description of security test logic"
+        }),
+        "business_logic": ("Business logic test - business rules, workflows and cross-field rules the schema cannot express", {
+            "name": "Business logic test name",
+            "description": "What business rule this test validates",
+            "priority": "high",
+            "input_data": {"path_params": {}, "body": {}, "query_params": {}, "headers": {}},
+            "expected_status_code": 200,
+            "test_script": "Brief description of business logic test"
+        }),
+        "performance": ("Performance test - load testing and performance scenarios", {
+            "name": "Performance test name",
+            "description": "What performance aspect this test validates",
+            "priority": "medium",
+            "input_data": {"path_params": {}, "body": {}, "query_params": {}, "headers": {}},
+            "expected_status_code": 200,
+            "test_script": "Brief description of performance test"
+        }),
+    }
+    
+    JSON_RULES = """- Use ONLY valid JSON values (strings, numbers, booleans, objects, arrays)
+- DO NOT use Python expressions like "A" * 8192 - use actual string values instead
+- DO NOT use any programming language syntax in JSON values
+- All string values must be properly quoted
+- Put values for path parameters such as {id} in input_data.path_params; leave them out to use resources created during the run
+- No additional text or explanations outside the JSON"""
+    
     def __init__(self):
         self.gemini_client = None
         self.is_available = False
@@ -47,33 +103,83 @@ class GeminiRAGTestGenerator:
         else:
             logger.warning("Gemini API key not configured")
     
-    def generate_rag_test_cases(self, endpoint: Dict[str, Any], api_spec: Dict[str, Any], base_url: str = "") -> List[Dict[str, Any]]:
-        """Generate test cases using RAG approach with Gemini 2.0 Flash (max 5 test cases)"""
+    def generate_rag_test_cases(self, endpoint: Dict[str, Any], api_spec: Dict[str, Any], base_url: str = "", on_test_case: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """Generate test cases using RAG approach with Gemini 2.0 Flash (max 5 test cases)
+
+        ``on_test_case(endpoint_key, test_case)`` receives each test case as soon as it is ready.
+        """
         if not self.is_available:
             logger.warning("Gemini API not available, falling back to rule-based generation")
-            return self._fallback_generation(endpoint, base_url)
+            return emit_test_cases(on_test_case, endpoint, self._fallback_generation(endpoint, base_url))
         
         # Create context from OpenAPI spec
         context = self._create_api_context(endpoint, api_spec)
         
         # Generate all test cases in a single request to avoid rate limiting
-        test_cases = self._generate_all_test_cases_single_request(endpoint, context, base_url)
-        
-        return test_cases[:5]  # Ensure max 5 test cases
+        return self._generate_all_test_cases_single_request(endpoint, context, base_url, on_test_case)
     
-    def generate_rag_test_cases_for_all_endpoints(self, endpoints: List[Dict[str, Any]], api_spec: Dict[str, Any], base_url: str = "") -> Dict[str, List[Dict[str, Any]]]:
-        """Generate test cases for all endpoints in a single Gemini request to avoid rate limiting"""
+    def generate_rag_test_cases_for_all_endpoints(self, endpoints: List[Dict[str, Any]], api_spec: Dict[str, Any], base_url: str = "", on_test_case: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Generate test cases for all endpoints, packed into token-budgeted Gemini requests.
+
+        Endpoints are grouped so each request's prompt plus expected output
+        stays within GEMINI_BATCH_TOKEN_BUDGET; batches run concurrently under
+        the provider rate limit and only failed batches are retried. Endpoints
+        that still fail fall back to rule-based generation.
+
+        ``on_test_case(endpoint_key, test_case)`` receives each test case as
+        soon as it has streamed in; calls are serialized across batches.
+        """
         if not self.is_available:
             logger.warning("Gemini API not available, falling back to rule-based generation")
-            return self._fallback_generation_for_all_endpoints(endpoints, base_url)
-        
-        # Create context from OpenAPI spec
-        context = self._create_api_context_for_all_endpoints(endpoints, api_spec)
-        
-        # Generate all test cases in a single request
-        all_test_cases = self._generate_all_endpoints_test_cases_single_request(endpoints, context, base_url)
-        
-        return all_test_cases
+            all_test_cases = self._fallback_generation_for_all_endpoints(endpoints, base_url)
+            for endpoint in endpoints:
+                emit_test_cases(on_test_case, endpoint, all_test_cases[self._endpoint_key(endpoint)])
+            return all_test_cases
+
+        if not llm_categories():
+            # Every category is covered by the rule engine
+            record_llm_calls_avoided('gemini', ['all'])
+            return {self._endpoint_key(endpoint): [] for endpoint in endpoints}
+
+        if on_test_case is not None:
+            callback, callback_lock = on_test_case, threading.Lock()
+
+            def on_test_case(endpoint_key: str, test_case: Dict[str, Any]):
+                with callback_lock:
+                    callback(endpoint_key, test_case)
+
+        prompt_overhead = estimate_tokens(self._bulk_prompt(self._create_api_context_for_all_endpoints([], api_spec)))
+        index = SpecIndex.for_spec(api_spec)
+        run = PromptBatcher.run(
+            endpoints,
+            key=self._endpoint_key,
+            # Retrieved components are counted per endpoint, an upper bound since batches share them
+            cost=lambda endpoint: (
+                estimate_tokens(self._endpoint_context(endpoint)) + estimate_tokens(index.related_context(endpoint))
+                + ai_config.GEMINI_OUTPUT_TOKENS_PER_ENDPOINT
+            ),
+            worker=lambda batch: self._generate_batch_test_cases(batch, self._create_api_context_for_all_endpoints(batch, api_spec), base_url, on_test_case),
+            token_budget=max(1, ai_config.GEMINI_BATCH_TOKEN_BUDGET - prompt_overhead),
+            max_items=ai_config.GEMINI_BATCH_MAX_ENDPOINTS,
+            concurrency=ai_config.GEMINI_BATCH_CONCURRENCY,
+            requests_per_minute=ai_config.GEMINI_REQUESTS_PER_MINUTE,
+            max_retries=ai_config.GEMINI_BATCH_MAX_RETRIES
+        )
+        logger.info(f"Gemini bulk generation: {len(endpoints)} endpoints in {run['batches']} requests over {run['rounds']} rounds")
+
+        all_test_cases = run['results']
+        if run['failed']:
+            logger.warning(f"Gemini failed for {len(run['failed'])} endpoints, using rule-based generation for them")
+            fallback = self._fallback_generation_for_all_endpoints(run['failed'], base_url)
+            for endpoint in run['failed']:
+                emit_test_cases(on_test_case, endpoint, fallback[self._endpoint_key(endpoint)])
+            all_test_cases.update(fallback)
+
+        return {self._endpoint_key(endpoint): all_test_cases.get(self._endpoint_key(endpoint), []) for endpoint in endpoints}
+
+    @staticmethod
+    def _endpoint_key(endpoint: Dict[str, Any]) -> str:
+        return f"{endpoint['method']}_{endpoint['path']}"
     
     def _create_api_context(self, endpoint: Dict[str, Any], api_spec: Dict[str, Any]) -> str:
         """Create context string from OpenAPI specification"""
@@ -106,7 +212,7 @@ class GeminiRAGTestGenerator:
             context_parts.append("\nRequest Body Schema:")
             schema = self._extract_schema_from_request_body(endpoint['request_body'])
             if schema:
-                context_parts.append(json.dumps(schema, indent=2))
+                context_parts.append(minify_json(schema))
         
         # Response schemas
         if endpoint.get('responses'):
@@ -115,12 +221,18 @@ class GeminiRAGTestGenerator:
                 context_parts.append(f"  {status_code}: {response.get('description', 'No description')}")
                 schema = self._extract_schema_from_response(response)
                 if schema:
-                    context_parts.append(f"    Schema: {json.dumps(schema, indent=4)}")
+                    context_parts.append(f"    Schema: {minify_json(schema)}")
         
         # Tags and categories
         if endpoint.get('tags'):
             context_parts.append(f"\nTags: {', '.join(endpoint['tags'])}")
         
+        # Referenced schemas, auth schemes and related operations retrieved from the spec index
+        related = SpecIndex.for_spec(api_spec).related_context(endpoint)
+        if related:
+            context_parts.append("\nRelated Components:")
+            context_parts.append(related)
+        
         return "\n".join(context_parts)
     
     def _create_api_context_for_all_endpoints(self, endpoints: List[Dict[str, Any]], api_spec: Dict[str, Any]) -> str:
@@ -136,35 +248,53 @@ class GeminiRAGTestGenerator:
         # All endpoints details
         context_parts.append(f"\nEndpoints to generate test cases for:")
         for i, endpoint in enumerate(endpoints, 1):
-            context_parts.append(f"\n{i}. {endpoint['method']} {endpoint['path']}")
-            context_parts.append(f"   Summary: {endpoint.get('summary', 'No summary')}")
-            context_parts.append(f"   Description: {endpoint.get('description', 'No description')}")
-            
-            # Parameters
-            if endpoint.get('parameters'):
-                context_parts.append("   Parameters:")
-                for param in endpoint['parameters']:
-                    param_info = f"     - {param.get('name')} ({param.get('in', 'unknown')}): {param.get('type', 'unknown')}"
-                    if param.get('required'):
-                        param_info += " [REQUIRED]"
-                    context_parts.append(param_info)
-            
-            # Request body schema
-            if endpoint.get('request_body'):
-                context_parts.append("   Request Body Schema:")
-                schema = self._extract_schema_from_request_body(endpoint['request_body'])
-                if schema:
-                    context_parts.append(f"     {json.dumps(schema, indent=6)}")
-            
-            # Response schemas
-            if endpoint.get('responses'):
-                context_parts.append("   Response Schemas:")
-                for status_code, response in endpoint['responses'].items():
-                    context_parts.append(f"     {status_code}: {response.get('description', 'No description')}")
-            
-            # Tags
-            if endpoint.get('tags'):
-                context_parts.append(f"   Tags: {', '.join(endpoint['tags'])}")
+            context_parts.append(f"\n{i}. {self._endpoint_context(endpoint)}")
+        
+        # Components the batch references or relates to, retrieved once for all its endpoints
+        index = SpecIndex.for_spec(api_spec)
+        related, seen = [], set()
+        for endpoint in endpoints:
+            for chunk in index.related_chunks(endpoint):
+                if chunk['id'] not in seen:
+                    seen.add(chunk['id'])
+                    related.append(f"[{chunk['kind']}] {chunk['title']}: {chunk['content']}")
+        if related:
+            context_parts.append("\nRelated Components:")
+            context_parts.extend(related)
+        
+        return "\n".join(context_parts)
+    
+    def _endpoint_context(self, endpoint: Dict[str, Any]) -> str:
+        """Context block for one endpoint in a bulk prompt"""
+        context_parts = [f"{endpoint['method']} {endpoint['path']}"]
+        context_parts.append(f"   Summary: {endpoint.get('summary', 'No summary')}")
+        context_parts.append(f"   Description: {endpoint.get('description', 'No description')}")
+        
+        # Parameters
+        if endpoint.get('parameters'):
+            context_parts.append("   Parameters:")
+            for param in endpoint['parameters']:
+                param_info = f"     - {param.get('name')} ({param.get('in', 'unknown')}): {param.get('type', 'unknown')}"
+                if param.get('required'):
+                    param_info += " [REQUIRED]"
+                context_parts.append(param_info)
+        
+        # Request body schema
+        if endpoint.get('request_body'):
+            context_parts.append("   Request Body Schema:")
+            schema = self._extract_schema_from_request_body(endpoint['request_body'])
+            if schema:
+                context_parts.append(f"     {minify_json(schema)}")
+        
+        # Response schemas
+        if endpoint.get('responses'):
+            context_parts.append("   Response Schemas:")
+            for status_code, response in endpoint['responses'].items():
+                context_parts.append(f"     {status_code}: {response.get('description', 'No description')}")
+        
+        # Tags
+        if endpoint.get('tags'):
+            context_parts.append(f"   Tags: {', '.join(endpoint['tags'])}")
         
         return "\n".join(context_parts)
     
@@ -184,94 +314,64 @@ class GeminiRAGTestGenerator:
                     return content_spec['schema']
         return None
     
-    def _generate_all_test_cases_single_request(self, endpoint: Dict[str, Any], context: str, base_url: str) -> List[Dict[str, Any]]:
-        """Generate all test cases in a single Gemini request to avoid rate limiting"""
-        
-        prompt = f"""Based on this API specification context:
-
-{context}
-
-Generate exactly 5 test cases for this endpoint in the following categories:
-1. Normal test case - realistic business scenarios with valid data
-2. Edge case test - boundary conditions, invalid inputs, edge scenarios  
-3. Security test - security vulnerabilities like SQL injection, XSS, authentication bypass
-4. Business logic test - business rules and validation scenarios
-5. Performance test - load testing and performance scenarios
+    def _generate_all_test_cases_single_request(self, endpoint: Dict[str, Any], context: str, base_url: str, on_test_case: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """Generate all test cases in a single Gemini request to avoid rate limiting.
 
-IMPORTANT RULES:
-- Return ONLY a valid JSON array with exactly 5 test case objects
-- Use ONLY valid JSON values (strings, numbers, booleans, objects, arrays)
-- DO NOT use Python expressions like "A" * 8192 - use actual string values instead
-- DO NOT use any programming language syntax in JSON values
-- All string values must be properly quoted
-- No additional text or explanations outside the JSON
-
-[
-    {{
-        "name": "Normal test name",
-        "description": "What this normal test validates",
-        "priority": "medium",
-        "input_data": {{
-            "body": {{}},
-            "query_params": {{}},
-            "headers": {{}}
-        }},
-        "expected_status_code": 200,
-        "test_script": "Brief description of normal test logic"
-    }},
-    {{
-        "name": "Edge case test name", 
-        "description": "What edge case this test validates",
-        "priority": "high",
-        "input_data": {{
-            "body": {{}},
-            "query_params": {{}},
-            "headers": {{}}
-        }},
-        "expected_status_code": 400,
-        "test_script": "Brief description of edge case test logic"
-    }},
-    {{
-        "name": "Security test name",
-        "description": "What security vulnerability this test validates", 
-        "priority": "critical",
-        "input_data": {{
-            "body": {{}},
-            "query_params": {{}},
-            "headers": {{}}
-        }},
-        "expected_status_code": 400,
-        "test_script": "Brief description of security test logic"
-    }},
-    {{
-        "name": "Business logic test name",
-        "description": "What business rule this test validates",
-        "priority": "high", 
-        "input_data": {{
-            "body": {{}},
-            "query_params": {{}},
-            "headers": {{}}
-        }},
-        "expected_status_code": 200,
-        "test_script": "Brief description of business logic test"
-    }},
-    {{
-        "name": "Performance test name",
-        "description": "What performance aspect this test validates",
-        "priority": "medium",
-        "input_data": {{
-            "body": {{}},
-            "query_params": {{}},
-            "headers": {{}}
-        }},
-        "expected_status_code": 200,
-        "test_script": "Brief description of performance test"
-    }}
-]"""
+        The response is streamed and each test case is used as soon as its
+        object is complete; rule-based generation is used only when no valid
+        test case arrived at all.
+        """
+        
+        categories = llm_categories()
+        if not categories:
+            record_llm_calls_avoided('gemini', ['all'])
+            return []
+        prompt = self._single_prompt(context, categories)
         
+        test_cases = []
+        
+        def on_item(endpoint_key: Optional[str], test_data: Dict[str, Any]):
+            if len(test_cases) < len(categories):  # One test case per requested category
+                test_cases.append(emit_test_case(on_test_case, endpoint, self._build_test_case(endpoint, base_url, test_data)))
+        
+        parser = IncrementalJSONParser('array')
         try:
+            self._stream_test_case_data(prompt, {
+                "temperature": ai_config.GEMINI_TEMPERATURE,
+                "maxOutputTokens": ai_config.GEMINI_MAX_TOKENS * 2,  # Increase tokens for multiple test cases
+                "topP": 0.95,
+                "topK": 64
+            }, parser, on_item)
+        except GenerationCancelled:
+            raise
+        except requests.exceptions.Timeout:
+            logger.error("Gemini API timeout for test case generation")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Gemini API request failed: {str(e)}")
+        except Exception as e:
+            logger.error(f"Failed to generate test cases with Gemini: {str(e)}")
+        
+        if not test_cases:
+            logger.error(f"No valid test cases in Gemini response ({parser.errors} malformed)")
+            return emit_test_cases(on_test_case, endpoint, self._fallback_generation(endpoint, base_url))
+        if parser.truncated or parser.errors:
+            logger.warning(f"Gemini response was incomplete ({parser.errors} malformed, truncated={parser.truncated}), keeping {len(test_cases)} test cases")
+        
+        logger.info(f"Successfully generated {len(test_cases)} test cases with Gemini 2.0 Flash")
+        return test_cases
+    
+    def _stream_test_case_data(self, prompt: str, generation_config: Dict[str, Any], parser: IncrementalJSONParser,
+                               on_item: Callable[[Optional[str], Dict[str, Any]], None]):
+        """Stream a Gemini completion through ``parser``, passing each valid test case object to ``on_item``.
+
+        Raises on request failures; items handed over before a failure stay delivered.
+        """
+        usage = {'prompt_tokens': None, 'completion_tokens': None, 'cached_tokens': None}
+        error = None
+        
+        with track_llm_call('gemini', ai_config.GEMINI_MODEL) as call:
             response = requests.post(
-                f"{ai_config.GEMINI_BASE_URL}/models/{ai_config.GEMINI_MODEL}:generateContent",
+                f"{ai_config.GEMINI_BASE_URL}/models/{ai_config.GEMINI_MODEL}:streamGenerateContent?alt=sse",
                 headers={
                     "x-goog-api-key": ai_config.GEMINI_API_KEY,
                     "Content-Type": "application/json"
@@ -280,260 +380,132 @@ IMPORTANT RULES:
                     "contents": [{
                         "parts": [{"text": prompt}]
                     }],
-                    "generationConfig": {
-                        "temperature": ai_config.GEMINI_TEMPERATURE,
-                        "maxOutputTokens": ai_config.GEMINI_MAX_TOKENS * 2,  # Increase tokens for multiple test cases
-                        "topP": 0.95,
-                        "topK": 64
-                    }
+                    "generationConfig": generation_config
                 },
-                timeout=ai_config.GEMINI_TIMEOUT
+                timeout=ai_config.GEMINI_TIMEOUT,
+                stream=True
             )
-            
-            if response.status_code != 200:
-                logger.error(f"Gemini API request failed: {response.status_code} - {response.text}")
-                return self._fallback_generation(endpoint, base_url)
-            
-            # Parse the response
-            response_data = response.json()
-            content = response_data['candidates'][0]['content']['parts'][0]['text']
-            
-            # Debug: Log the actual response content
-            logger.info(f"Gemini response content: {content}")
-            
-            # Try to extract JSON from the response using improved parsing
-            test_cases_data = self._parse_gemini_json_response(content)
-            if test_cases_data is None:
-                return self._fallback_generation(endpoint, base_url)
-            
-            # Convert to test case objects
-            test_cases = []
-            for test_data in test_cases_data:
-                if isinstance(test_data, dict):
-                    # Generate CURL command
-                    curl_command = self._generate_curl_command(endpoint, base_url, test_data.get('input_data', {}))
-                    
-                    test_case = {
-                        'name': test_data.get('name', f"AI Generated {endpoint['method']} {endpoint['path']}"),
-                        'description': test_data.get('description', f"Gemini 2.0 Flash AI-generated test for {endpoint['method']} {endpoint['path']}"),
-                        'test_type': TestCaseType.AI_GENERATED,
-                        'priority': self._map_priority(test_data.get('priority', 'medium')),
-                        'input_data': test_data.get('input_data', {}),
-                        'expected_status_code': test_data.get('expected_status_code', 200),
-                        'curl_command': curl_command,
-                        'test_script': test_data.get('test_script', '')
-                    }
-                    test_cases.append(test_case)
-            
-            logger.info(f"Successfully generated {len(test_cases)} test cases with Gemini 2.0 Flash")
-            return test_cases
-            
-        except requests.exceptions.Timeout:
-            logger.error("Gemini API timeout for test case generation")
-            return self._fallback_generation(endpoint, base_url)
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Gemini API request failed: {str(e)}")
-            return self._fallback_generation(endpoint, base_url)
-        except Exception as e:
-            logger.error(f"Failed to generate test cases with Gemini: {str(e)}")
-            return self._fallback_generation(endpoint, base_url)
+            try:
+                if response.status_code == 200:
+                    for text in iter_gemini_stream(response, usage):
+                        for endpoint_key, test_data in parser.feed(text):
+                            problem = validate_test_case_data(test_data)
+                            if problem:
+                                parser.errors += 1
+                                logger.warning(f"Skipping invalid Gemini test case: {problem}")
+                                continue
+                            on_item(endpoint_key, test_data)
+                else:
+                    call['outcome'] = 'rate_limited' if response.status_code == 429 else 'error'
+                    error = f"Gemini API request failed: {response.status_code} - {response.text[:500]}"
+            finally:
+                call.update(usage)
+                response.close()
+        
+        if error:
+            raise RuntimeError(error)
+    
+    def _build_test_case(self, endpoint: Dict[str, Any], base_url: str, test_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a Gemini test case object to a test case dict"""
+        # Generate CURL command
+        curl_command = self._generate_curl_command(endpoint, base_url, test_data.get('input_data', {}))
+        
+        return {
+            'name': test_data.get('name', f"AI Generated {endpoint['method']} {endpoint['path']}"),
+            'description': test_data.get('description', f"Gemini 2.0 Flash AI-generated test for {endpoint['method']} {endpoint['path']}"),
+            'test_type': TestCaseType.AI_GENERATED,
+            'priority': self._map_priority(test_data.get('priority', 'medium')),
+            'input_data': test_data.get('input_data', {}),
+            'expected_status_code': test_data.get('expected_status_code', 200),
+            'curl_command': curl_command,
+            'test_script': test_data.get('test_script', '')
+        }
     
-    def _generate_all_endpoints_test_cases_single_request(self, endpoints: List[Dict[str, Any]], context: str, base_url: str) -> Dict[str, List[Dict[str, Any]]]:
-        """Generate test cases for all endpoints in a single Gemini request"""
+    def _bulk_prompt(self, context: str) -> str:
+        """Prompt asking for test cases for every endpoint in the context"""
+        categories = llm_categories()
+        example = json.dumps({"GET_/": [self.CATEGORY_PROMPTS[category][1] for category in categories]}, indent=4)
         
-        prompt = f"""Based on this API specification context:
+        return f"""Based on this API specification context:
 
 {context}
 
-Generate exactly 3 test cases for each endpoint in the following categories:
-1. Normal test case - realistic business scenarios with valid data
-2. Edge case test - boundary conditions, invalid inputs, edge scenarios  
-3. Security test - security vulnerabilities like SQL injection, XSS, authentication bypass
+Generate exactly {len(categories)} test cases for each endpoint in the following categories:
+{self._categories_list(categories)}
 
 IMPORTANT RULES:
 - Return ONLY a valid JSON object with endpoint keys and test case arrays
-- Use ONLY valid JSON values (strings, numbers, booleans, objects, arrays)
-- DO NOT use Python expressions like "A" * 8192 - use actual string values instead
-- DO NOT use any programming language syntax in JSON values
-- All string values must be properly quoted
-- No additional text or explanations outside the JSON
+{self.JSON_RULES}
 
-{{
-    "GET_/": [
-        {{
-            "name": "Normal test name",
-            "description": "What this normal test validates",
-            "priority": "medium",
-            "input_data": {{
-                "body": {{}},
-                "query_params": {{}},
-                "headers": {{}}
-            }},
-            "expected_status_code": 200,
-            "test_script": "Brief description of normal test logic"
-        }},
-        {{
-            "name": "Edge case test name",
-            "description": "What edge case this test validates",
-            "priority": "high",
-            "input_data": {{
-                "body": {{}},
-                "query_params": {{}},
-                "headers": {{}}
-            }},
-            "expected_status_code": 400,
-            "test_script": "Brief description of edge case test logic"
-        }},
-        {{
-            "name": "Security test name",
-            "description": "What security vulnerability this test validates",
-            "priority": "critical",
-            "input_data": {{
-                "body": {{}},
-                "query_params": {{}},
-                "headers": {{}}
-            }},
-            "expected_status_code": 400,
-            "test_script": "Brief description of security test logic"
-        }}
-    ]
-}}"""
+{example}"""
+    
+    def _single_prompt(self, context: str, categories: List[str]) -> str:
+        """Prompt asking for one test case per category for a single endpoint"""
+        example = json.dumps([self.CATEGORY_PROMPTS[category][1] for category in categories], indent=4)
         
+        return f"""Based on this API specification context:
+
+{context}
+
+Generate exactly {len(categories)} test cases for this endpoint in the following categories:
+{self._categories_list(categories)}
+
+IMPORTANT RULES:
+- Return ONLY a valid JSON array with exactly {len(categories)} test case objects
+{self.JSON_RULES}
+
+{example}"""
+    
+    def _categories_list(self, categories: List[str]) -> str:
+        return "\n".join(f"{number}. {self.CATEGORY_PROMPTS[category][0]}" for number, category in enumerate(categories, 1))
+    
+    def _generate_batch_test_cases(self, endpoints: List[Dict[str, Any]], context: str, base_url: str,
+                                   on_test_case: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Generate test cases for one batch of endpoints in a single Gemini request.
+
+        Test cases are handed to ``on_test_case`` as they stream in. If the
+        stream fails or is cut off, the endpoints received so far are kept;
+        it raises only when nothing usable arrived so the batch can be
+        retried. Endpoints missing from the response are left out of the
+        result.
+        """
+        prompt = self._bulk_prompt(context)
+        endpoints_by_key = {self._endpoint_key(endpoint): endpoint for endpoint in endpoints}
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        
+        def on_item(endpoint_key: Optional[str], test_data: Dict[str, Any]):
+            endpoint = endpoints_by_key.get(endpoint_key)
+            if endpoint is not None:
+                result.setdefault(endpoint_key, []).append(emit_test_case(on_test_case, endpoint, self._build_test_case(endpoint, base_url, test_data)))
+        
+        parser = IncrementalJSONParser('keyed')
         try:
-            response = requests.post(
-                f"{ai_config.GEMINI_BASE_URL}/models/{ai_config.GEMINI_MODEL}:generateContent",
-                headers={
-                    "x-goog-api-key": ai_config.GEMINI_API_KEY,
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "contents": [{
-                        "parts": [{"text": prompt}]
-                    }],
-                    "generationConfig": {
-                        "temperature": ai_config.GEMINI_TEMPERATURE,
-                        "maxOutputTokens": ai_config.GEMINI_MAX_TOKENS * 3,  # Increase tokens for multiple endpoints
-                        "topP": 0.95,
-                        "topK": 64
-                    }
-                },
-                timeout=ai_config.GEMINI_TIMEOUT
-            )
-            
-            if response.status_code != 200:
-                logger.error(f"Gemini API request failed: {response.status_code} - {response.text}")
-                return self._fallback_generation_for_all_endpoints(endpoints, base_url)
-            
-            # Parse the response
-            response_data = response.json()
-            content = response_data['candidates'][0]['content']['parts'][0]['text']
-            
-            # Debug: Log the actual response content
-            logger.info(f"Gemini bulk response content: {content}")
-            
-            # Try to extract JSON from the response
-            try:
-                # First try direct JSON parsing
-                all_test_cases_data = json.loads(content)
-            except json.JSONDecodeError:
-                # If that fails, try to extract JSON from the text
-                import re
-                
-                # Remove markdown code blocks if present
-                content_clean = content.strip()
-                if content_clean.startswith('```json'):
-                    content_clean = content_clean[7:]  # Remove ```json
-                if content_clean.startswith('```'):
-                    content_clean = content_clean[3:]  # Remove ```
-                if content_clean.endswith('```'):
-                    content_clean = content_clean[:-3]  # Remove trailing ```
-                
-                content_clean = content_clean.strip()
-                
-                try:
-                    # Try parsing the cleaned content
-                    all_test_cases_data = json.loads(content_clean)
-                except json.JSONDecodeError:
-                    # If still fails, try to extract JSON object from the text
-                    json_match = re.search(r'\{.*\}', content_clean, re.DOTALL)
-                    if json_match:
-                        try:
-                            all_test_cases_data = json.loads(json_match.group())
-                        except json.JSONDecodeError:
-                            logger.error(f"Failed to parse JSON from cleaned Gemini bulk response: {content_clean}")
-                            return self._fallback_generation_for_all_endpoints(endpoints, base_url)
-                    else:
-                        logger.error(f"No JSON object found in cleaned Gemini bulk response: {content_clean}")
-                        return self._fallback_generation_for_all_endpoints(endpoints, base_url)
-            
-            # Convert to test case objects for each endpoint
-            result = {}
-            for endpoint in endpoints:
-                endpoint_key = f"{endpoint['method']}_{endpoint['path']}"
-                endpoint_test_cases = all_test_cases_data.get(endpoint_key, [])
-                
-                test_cases = []
-                for test_data in endpoint_test_cases:
-                    if isinstance(test_data, dict):
-                        # Generate CURL command
-                        curl_command = self._generate_curl_command(endpoint, base_url, test_data.get('input_data', {}))
-                        
-                        test_case = {
-                            'name': test_data.get('name', f"AI Generated {endpoint['method']} {endpoint['path']}"),
-                            'description': test_data.get('description', f"Gemini 2.0 Flash AI-generated test for {endpoint['method']} {endpoint['path']}"),
-                            'test_type': TestCaseType.AI_GENERATED,
-                            'priority': self._map_priority(test_data.get('priority', 'medium')),
-                            'input_data': test_data.get('input_data', {}),
-                            'expected_status_code': test_data.get('expected_status_code', 200),
-                            'curl_command': curl_command,
-                            'test_script': test_data.get('test_script', '')
-                        }
-                        test_cases.append(test_case)
-                
-                result[endpoint_key] = test_cases
-            
-            logger.info(f"Successfully generated test cases for {len(result)} endpoints with Gemini 2.0 Flash")
-            return result
-            
-        except requests.exceptions.Timeout:
-            logger.error("Gemini API timeout for bulk test case generation")
-            return self._fallback_generation_for_all_endpoints(endpoints, base_url)
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Gemini API request failed: {str(e)}")
-            return self._fallback_generation_for_all_endpoints(endpoints, base_url)
+            self._stream_test_case_data(prompt, {
+                "temperature": ai_config.GEMINI_TEMPERATURE,
+                # Output grows with the number of endpoints in the batch
+                "maxOutputTokens": min(ai_config.GEMINI_MAX_OUTPUT_TOKENS, ai_config.GEMINI_OUTPUT_TOKENS_PER_ENDPOINT * len(endpoints)),
+                "topP": 0.95,
+                "topK": 64
+            }, parser, on_item)
+        except GenerationCancelled:
+            raise
         except Exception as e:
-            logger.error(f"Failed to generate bulk test cases with Gemini: {str(e)}")
-            return self._fallback_generation_for_all_endpoints(endpoints, base_url)
+            if not result:
+                raise
+            logger.warning(f"Gemini bulk stream failed after {len(result)} endpoints: {str(e)}")
+        
+        if not result:
+            raise ValueError(f"No valid test cases in Gemini bulk response for {len(endpoints)} endpoints")
+        if parser.truncated:
+            logger.warning(f"Gemini bulk response was cut off after {len(result)}/{len(endpoints)} endpoints")
+        
+        logger.info(f"Successfully generated test cases for {len(result)}/{len(endpoints)} endpoints with Gemini 2.0 Flash")
+        return result
     
     def _generate_curl_command(self, endpoint: Dict[str, Any], base_url: str, test_data: Dict[str, Any]) -> str:
         """Generate CURL command for the test case"""
-        method = endpoint['method']
-        path = endpoint['path']
-        url = f"{base_url}{path}"
-        
-        curl_parts = [f"curl -X {method}"]
-        curl_parts.append('-H "Content-Type: application/json"')
-        
-        # Add headers
-        if test_data.get('headers'):
-            for key, value in test_data['headers'].items():
-                curl_parts.append(f'-H "{key}: {value}"')
-        
-        # Add request body
-        if method in ['POST', 'PUT', 'PATCH'] and test_data.get('body'):
-            body_json = json.dumps(test_data['body'])
-            curl_parts.append(f'-d \'{body_json}\'')
-        
-        # Add query parameters
-        if test_data.get('query_params'):
-            query_params = []
-            for key, value in test_data['query_params'].items():
-                query_params.append(f"{key}={value}")
-            if query_params:
-                url += "?" + "&".join(query_params)
-        
-        curl_parts.append(f'"{url}"')
-        return " ".join(curl_parts)
+        from app.services.test_generator import TestGenerator
+        return TestGenerator.generate_curl_command(endpoint, base_url, test_data)
     
     def _map_priority(self, priority_str: str) -> TestCasePriority:
         """Map string priority to enum"""
@@ -557,92 +529,4 @@ IMPORTANT RULES:
         for endpoint in endpoints:
             endpoint_key = f"{endpoint['method']}_{endpoint['path']}"
             result[endpoint_key] = TestGenerator._generate_rule_based_test_cases(endpoint, base_url)
-        return result 
-
-    def _fix_json_content(self, json_content: str) -> str:
-        """Fix common JSON parsing issues in Gemini responses"""
-        import re
-        
-        # Remove any trailing commas before closing brackets/braces
-        json_content = re.sub(r',(\s*[}\]])', r'\1', json_content)
-        
-        # Fix Python expressions like "A" * 8192
-        json_content = re.sub(r'"([^"]*)"\s*\*\s*(\d+)', r'"\1"', json_content)
-        
-        # Fix Python expressions like "A" * 8192 in different formats
-        json_content = re.sub(r'"([^"]*)"\s*\*\s*(\d+)', lambda m: f'"{m.group(1) * int(m.group(2))}"', json_content)
-        
-        # Fix any remaining unescaped quotes at the end of strings
-        json_content = re.sub(r'(?<!\\)"(?=\s*[,}\]])', r'\\"', json_content)
-        
-        # Fix any remaining unescaped quotes in the middle of strings
-        json_content = re.sub(r'(?<!\\)"(?=.*")', r'\\"', json_content)
-        
-        # Fix any remaining unescaped quotes before colons
-        json_content = re.sub(r'(?<!\\)"(?=.*":)', r'\\"', json_content)
-        
-        # Remove any null bytes or invalid characters
-        json_content = json_content.replace('\x00', '')
-        
-        # Fix any remaining Python expressions
-        json_content = re.sub(r'(\w+)\s*\*\s*(\d+)', lambda m: f'"{m.group(1) * int(m.group(2))}"', json_content)
-        
-        return json_content 
-
-    def _parse_gemini_json_response(self, content: str) -> Optional[List[Dict[str, Any]]]:
-        """Parse Gemini JSON response with improved error handling"""
-        import re
-        
-        try:
-            # First try direct JSON parsing
-            test_cases_data = json.loads(content)
-            logger.info("Successfully parsed JSON directly")
-            return test_cases_data
-        except json.JSONDecodeError as e:
-            logger.warning(f"Direct JSON parsing failed: {str(e)}")
-        
-        # If that fails, try to extract JSON from the text
-        # Remove markdown code blocks if present
-        content_clean = content.strip()
-        if content_clean.startswith('```json'):
-            content_clean = content_clean[7:]  # Remove ```json
-        if content_clean.startswith('```'):
-            content_clean = content_clean[3:]  # Remove ```
-        if content_clean.endswith('```'):
-            content_clean = content_clean[:-3]  # Remove trailing ```
-        
-        content_clean = content_clean.strip()
-        logger.info(f"Cleaned content: {content_clean[:200]}...")
-        
-        try:
-            # Try parsing the cleaned content
-            test_cases_data = json.loads(content_clean)
-            logger.info("Successfully parsed cleaned JSON")
-            return test_cases_data
-        except json.JSONDecodeError as e:
-            logger.warning(f"Cleaned JSON parsing failed: {str(e)}")
-        
-        # If still fails, try to extract JSON array from the text
-        json_match = re.search(r'\[.*\]', content_clean, re.DOTALL)
-        if json_match:
-            try:
-                test_cases_data = json.loads(json_match.group())
-                logger.info("Successfully parsed extracted JSON array")
-                return test_cases_data
-            except json.JSONDecodeError as e:
-                logger.warning(f"Extracted JSON parsing failed: {str(e)}")
-                # Try to fix common JSON issues
-                fixed_content = self._fix_json_content(json_match.group())
-                try:
-                    test_cases_data = json.loads(fixed_content)
-                    logger.info("Successfully parsed fixed JSON")
-                    return test_cases_data
-                except json.JSONDecodeError as e:
-                    logger.error(f"Failed to parse JSON after fixing: {str(e)}")
-                    logger.error(f"Original content: {content}")
-                    logger.error(f"Cleaned content: {content_clean}")
-                    logger.error(f"Fixed content: {fixed_content}")
-                    return None
-        else:
-            logger.error(f"No JSON array found in cleaned Gemini response: {content_clean}")
-            return None 
\ No newline at end of file
+        return result
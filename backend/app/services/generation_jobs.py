@@ -0,0 +1,398 @@
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.ai_config import ai_config
+from app.core.llm_usage import LLMBudgetExceeded, LLMUsageLedger, use_ledger, usage_scope
+from app.core.database import SessionLocal
+from app.models.api_spec import APISpec as APISpecModel, Endpoint as EndpointModel
+from app.models.generation_job import GenerationJob as GenerationJobModel
+from app.services.api_parser import APIParser
+from app.services.llm_accounting import LLMAccounting
+from app.services.llm_streaming import GenerationCancelled
+from app.services.profiler import ProfilingService
+from app.services.spec_index import SpecIndex
+from app.services.test_case_dedup import TestCaseDeduplicator
+from app.services.test_case_validation import TestCaseValidator, build_test_case_model
+from app.services.synthetic_data import DataContext
+from app.services.test_generator import TestGenerator
+import logging
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled', 'budget_exceeded')
+
+class GenerationJobRunner:
+    """Runs test case generation for a spec in the background, checkpointed in the database.
+
+    Each endpoint's rule-based and AI test cases are committed together
+    with the endpoint's ID in ``completed_endpoint_ids`` (in bulk mode, a
+    chunk of endpoints at a time), so a resumed job only generates for the
+    endpoints that are not checkpointed yet. A job is claimed by setting
+    ``owner`` and ``heartbeat_at``; a job whose heartbeat is older than
+    GENERATION_JOB_STALE_SECONDS is taken over by the next process that
+    resumes jobs.
+
+    The spec's ``generation_status`` and ``generation_error`` mirror its
+    latest job, so clients can poll the spec after an import.
+
+    Every LLM call a job makes is recorded in ``llm_calls`` with the
+    checkpoints. When the job's ``max_tokens`` or ``max_cost`` is reached,
+    further calls are refused and the job stops as ``budget_exceeded``;
+    raising the budget and resuming continues it.
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _lock = threading.Lock()
+    _cancel_events: Dict[int, threading.Event] = {}
+    _active: set = set()  # jobs queued or running in this process
+    _stopping = threading.Event()
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def create(db: Session, api_spec_id: int, base_url: str = "", bulk: bool = False, endpoint_ids: Optional[List[int]] = None,
+               max_tokens: Optional[int] = None, max_cost: Optional[float] = None, data_seed: Optional[int] = None) -> GenerationJobModel:
+        """Store a pending job for the spec's endpoints (or the given subset); the budget defaults to AI_JOB_MAX_TOKENS/AI_JOB_MAX_COST"""
+        query = db.query(EndpointModel.id).filter(EndpointModel.api_spec_id == api_spec_id)
+        if endpoint_ids:
+            query = query.filter(EndpointModel.id.in_(endpoint_ids))
+        job = GenerationJobModel(
+            api_spec_id=api_spec_id,
+            status='pending',
+            base_url=base_url,
+            bulk=bulk,
+            data_seed=data_seed if data_seed is not None else DataContext.new_seed(),
+            endpoint_ids=[row[0] for row in query.order_by(EndpointModel.id)],
+            completed_endpoint_ids=[],
+            failed_endpoint_ids=[],
+            test_cases_created=0,
+            max_tokens=max_tokens if max_tokens is not None else (ai_config.AI_JOB_MAX_TOKENS or None),
+            max_cost=max_cost if max_cost is not None else (ai_config.AI_JOB_MAX_COST or None)
+        )
+        db.add(job)
+        db.flush()
+        db.query(APISpecModel).filter(APISpecModel.id == api_spec_id).update({
+            APISpecModel.generation_job_id: job.id,
+            APISpecModel.generation_status: job.status,
+            APISpecModel.generation_error: None
+        }, synchronize_session=False)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    @staticmethod
+    def submit(job_id: int):
+        """Run a job on the background pool"""
+        with GenerationJobRunner._lock:
+            if GenerationJobRunner._executor is None:
+                GenerationJobRunner._executor = ThreadPoolExecutor(max_workers=settings.GENERATION_JOB_WORKERS, thread_name_prefix="generation-job")
+            if job_id in GenerationJobRunner._active:
+                return
+            GenerationJobRunner._active.add(job_id)
+            GenerationJobRunner._cancel_events.setdefault(job_id, threading.Event())
+            GenerationJobRunner._executor.submit(GenerationJobRunner.run, job_id)
+
+    @staticmethod
+    def cancel(db: Session, job: GenerationJobModel):
+        """Ask a job to stop; it stops at its next test case or checkpoint, keeping committed work"""
+        job.cancel_requested = True
+        if job.status == 'pending':
+            job.status = 'cancelled'
+            job.finished_at = datetime.utcnow()
+        GenerationJobRunner._sync_spec(db, job)
+        db.commit()
+        event = GenerationJobRunner._cancel_events.get(job.id)
+        if event is not None:
+            event.set()
+
+    @staticmethod
+    def resume(db: Session, job: GenerationJobModel, max_tokens: Optional[int] = None, max_cost: Optional[float] = None):
+        """Queue a failed, cancelled, budget-stopped or partially failed job again; checkpointed endpoints are skipped"""
+        if max_tokens is not None:
+            job.max_tokens = max_tokens or None
+        if max_cost is not None:
+            job.max_cost = max_cost or None
+        job.status = 'pending'
+        job.cancel_requested = False
+        job.failed_endpoint_ids = []
+        job.error = None
+        job.finished_at = None
+        job.owner = None
+        job.heartbeat_at = None
+        GenerationJobRunner._sync_spec(db, job)
+        db.commit()
+        GenerationJobRunner._cancel_events.pop(job.id, None)
+        GenerationJobRunner.submit(job.id)
+
+    @staticmethod
+    def resume_interrupted() -> List[int]:
+        """Queue jobs a previous process left pending or running; returns their IDs"""
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.GENERATION_JOB_STALE_SECONDS)
+        db = SessionLocal()
+        try:
+            job_ids = [row[0] for row in db.query(GenerationJobModel.id).filter(
+                GenerationJobModel.status.in_(('pending', 'running')),
+                GenerationJobModel.cancel_requested.is_(False),
+                or_(GenerationJobModel.heartbeat_at.is_(None), GenerationJobModel.heartbeat_at < stale_before)
+            ).order_by(GenerationJobModel.id)]
+        finally:
+            db.close()
+        for job_id in job_ids:
+            GenerationJobRunner.submit(job_id)
+        if job_ids:
+            logger.info(f"Resuming generation jobs {job_ids}")
+        return job_ids
+
+    @staticmethod
+    def release_owned():
+        """On shutdown: stop this process's jobs at their next test case so another start can resume them"""
+        GenerationJobRunner._stopping.set()
+        for event in list(GenerationJobRunner._cancel_events.values()):
+            event.set()
+        db = SessionLocal()
+        try:
+            db.query(GenerationJobModel).filter(
+                GenerationJobModel.owner == GenerationJobRunner.owner,
+                GenerationJobModel.status == 'running'
+            ).update({GenerationJobModel.heartbeat_at: None}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _claim(db: Session, job_id: int) -> bool:
+        """Take ownership unless another live process is running the job"""
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=settings.GENERATION_JOB_STALE_SECONDS)
+        claimed = db.query(GenerationJobModel).filter(
+            GenerationJobModel.id == job_id,
+            GenerationJobModel.status.in_(('pending', 'running')),
+            GenerationJobModel.cancel_requested.is_(False),
+            or_(
+                GenerationJobModel.owner.is_(None),
+                GenerationJobModel.owner == GenerationJobRunner.owner,
+                GenerationJobModel.heartbeat_at.is_(None),
+                GenerationJobModel.heartbeat_at < stale_before
+            )
+        ).update({
+            GenerationJobModel.status: 'running',
+            GenerationJobModel.owner: GenerationJobRunner.owner,
+            GenerationJobModel.heartbeat_at: now
+        }, synchronize_session=False)
+        db.commit()
+        return claimed == 1
+
+    @staticmethod
+    def _sync_spec(db: Session, job: GenerationJobModel):
+        """Copy the job's status to its spec, unless a newer job has replaced it there"""
+        db.query(APISpecModel).filter(
+            APISpecModel.id == job.api_spec_id,
+            APISpecModel.generation_job_id == job.id
+        ).update({
+            APISpecModel.generation_status: job.status,
+            APISpecModel.generation_error: job.error
+        }, synchronize_session=False)
+
+    @staticmethod
+    def _should_stop(db: Session, job: GenerationJobModel, event: threading.Event) -> bool:
+        if event.is_set() or GenerationJobRunner._stopping.is_set():
+            return True
+        # Cancellation may have been requested through another process
+        return bool(db.query(GenerationJobModel.cancel_requested).filter(GenerationJobModel.id == job.id).scalar())
+
+    @staticmethod
+    def _checkpoint(db: Session, job: GenerationJobModel, ledger: LLMUsageLedger, completed: List[int] = (), failed: List[int] = (), created: int = 0):
+        """Commit the pending test cases together with the endpoints they complete and the LLM calls made so far"""
+        LLMAccounting.persist(db, job, ledger)
+        if completed:
+            job.completed_endpoint_ids = list(job.completed_endpoint_ids or []) + list(completed)
+        if failed:
+            job.failed_endpoint_ids = list(job.failed_endpoint_ids or []) + list(failed)
+        job.test_cases_created = (job.test_cases_created or 0) + created
+        job.heartbeat_at = datetime.utcnow()
+        db.commit()
+
+    @staticmethod
+    def run(job_id: int):
+        """Generate for every endpoint of the job that is not checkpointed yet"""
+        db = SessionLocal()
+        event = GenerationJobRunner._cancel_events.setdefault(job_id, threading.Event())
+        job = None
+        ledger = None
+        # Admins attach profilers to the job by this ID; they run on this pool thread
+        run_id = ProfilingService.register_run(f"generation-job:{job_id}", GenerationJobRunner.profiling_run_id(job_id), worker_thread=True)
+        try:
+            if not GenerationJobRunner._claim(db, job_id):
+                logger.info(f"Generation job {job_id} is finished or owned by another process")
+                return
+            job = db.query(GenerationJobModel).filter(GenerationJobModel.id == job_id).first()
+            if job.started_at is None:
+                job.started_at = datetime.utcnow()
+            GenerationJobRunner._sync_spec(db, job)
+            db.commit()
+
+            ledger = LLMAccounting.ledger_for(job)
+            with use_ledger(ledger):
+                budget_stopped = GenerationJobRunner._run_job(db, job, event, ledger)
+            LLMAccounting.persist(db, job, ledger)
+
+            if budget_stopped:
+                job.status = 'budget_exceeded'
+                job.error = f"Stopped: {ledger.describe_limit()}; raise max_tokens or max_cost and resume the job to continue"
+                job.finished_at = datetime.utcnow()
+            elif GenerationJobRunner._should_stop(db, job, event):
+                db.refresh(job)
+                if job.cancel_requested:
+                    job.status = 'cancelled'
+                    job.finished_at = datetime.utcnow()
+                else:
+                    # Shutting down: leave the job for the next process to resume
+                    job.status = 'pending'
+                    job.owner = None
+                    job.heartbeat_at = None
+            else:
+                job.status = 'completed'
+                job.finished_at = datetime.utcnow()
+                if job.failed_endpoint_ids:
+                    job.error = f"Generation failed for {len(job.failed_endpoint_ids)} endpoints; resume the job to retry them"
+            GenerationJobRunner._sync_spec(db, job)
+            db.commit()
+            logger.info(f"Generation job {job_id} {job.status}: {job.test_cases_created} test cases for {job.completed_endpoints}/{job.total_endpoints} endpoints")
+
+        except Exception as e:
+            logger.error(f"Generation job {job_id} failed: {str(e)}")
+            db.rollback()
+            if job is not None:
+                if ledger is not None:
+                    # Calls since the last checkpoint were paid for even though their test cases are lost
+                    LLMAccounting.persist(db, job, ledger)
+                job.status = 'failed'
+                job.error = str(e)
+                job.finished_at = datetime.utcnow()
+                GenerationJobRunner._sync_spec(db, job)
+                db.commit()
+        finally:
+            ProfilingService.finish_run(run_id)
+            with GenerationJobRunner._lock:
+                GenerationJobRunner._active.discard(job_id)
+                GenerationJobRunner._cancel_events.pop(job_id, None)
+            db.close()
+
+    @staticmethod
+    def profiling_run_id(job_id: int) -> str:
+        return f"generation-job-{job_id}"
+
+    @staticmethod
+    def _run_job(db: Session, job: GenerationJobModel, event: threading.Event, ledger: LLMUsageLedger) -> bool:
+        """Generate and checkpoint chunk by chunk; returns True if the LLM budget stopped the job"""
+        done = set(job.completed_endpoint_ids or [])
+        remaining = [endpoint_id for endpoint_id in job.endpoint_ids or [] if endpoint_id not in done]
+        if not remaining:
+            return False
+        if done:
+            logger.info(f"Resuming generation job {job.id}: {len(done)} endpoints already checkpointed, {len(remaining)} left")
+
+        api_spec = db.query(APISpecModel).filter(APISpecModel.id == job.api_spec_id).first()
+        api_spec_content = {}
+        if api_spec and api_spec.file_path and os.path.exists(api_spec.file_path):
+            spec_info = APIParser.validate_spec_file(api_spec.file_path)
+            api_spec_content = spec_info.get('content', {})
+        # A fresh job (the one an import queues) builds and persists the retrieval index up front
+        if api_spec_content and not done:
+            try:
+                SpecIndex.build_for_spec(api_spec_content)
+            except Exception as e:
+                logger.warning(f"Generation job {job.id}: could not index spec {job.api_spec_id}: {str(e)}")
+
+        endpoints = {endpoint.id: endpoint for endpoint in db.query(EndpointModel).filter(EndpointModel.id.in_(remaining))}
+        dedup = TestCaseDeduplicator(db, job.api_spec_id)
+        validator = TestCaseValidator(db, job.api_spec_id, api_spec_content)
+        # Per-endpoint streams of the job's seed: resuming regenerates exactly what a straight run would
+        data_context = DataContext(job.data_seed)
+
+        from app.core.ai_config import get_rag_generator
+        rag_generator = get_rag_generator()
+        if rag_generator is None:
+            logger.warning(f"Generation job {job.id}: AI generator not available, generating automated test cases only")
+
+        run_id = GenerationJobRunner.profiling_run_id(job.id)
+
+        def on_test_case(endpoint_key: str, test_case_data: Dict[str, Any]):
+            ProfilingService.poll_run(run_id)
+            # Stops an in-flight generation; its endpoint stays unchecked and is redone on resume
+            if event.is_set() or GenerationJobRunner._stopping.is_set():
+                raise GenerationCancelled(f"Generation job {job.id} stopped")
+
+        bulk = job.bulk and hasattr(rag_generator, 'generate_rag_test_cases_for_all_endpoints')
+        chunk_size = max(1, settings.GENERATION_JOB_CHUNK_SIZE) if bulk else 1
+        for start in range(0, len(remaining), chunk_size):
+            ProfilingService.poll_run(run_id)
+            if GenerationJobRunner._should_stop(db, job, event):
+                return False
+            if ledger.exceeded:
+                return True
+            chunk = [endpoints[endpoint_id] for endpoint_id in remaining[start:start + chunk_size] if endpoint_id in endpoints]
+            # Endpoints deleted since the job was created count as done
+            missing = [endpoint_id for endpoint_id in remaining[start:start + chunk_size] if endpoint_id not in endpoints]
+            endpoint_dicts = [GenerationJobRunner._endpoint_dict(endpoint) for endpoint in chunk]
+
+            refused = ledger.refused
+            try:
+                ai_test_cases = {}
+                if rag_generator is not None and bulk:
+                    # Bulk requests cannot be interrupted per test case; cancellation applies between chunks
+                    ai_test_cases = rag_generator.generate_rag_test_cases_for_all_endpoints(endpoint_dicts, api_spec_content, job.base_url)
+                elif rag_generator is not None:
+                    for endpoint_dict in endpoint_dicts:
+                        endpoint_key = f"{endpoint_dict['method']}_{endpoint_dict['path']}"
+                        with usage_scope(endpoint=endpoint_key):
+                            ai_test_cases[endpoint_key] = rag_generator.generate_rag_test_cases(
+                                endpoint_dict, api_spec_content, job.base_url, on_test_case=on_test_case
+                            )
+            except GenerationCancelled:
+                return False
+            except LLMBudgetExceeded:
+                return True
+            except Exception as e:
+                logger.warning(f"Generation job {job.id}: AI generation failed for {len(chunk)} endpoints: {str(e)}")
+                db.rollback()
+                GenerationJobRunner._checkpoint(db, job, ledger, completed=missing, failed=[endpoint.id for endpoint in chunk])
+                continue
+
+            if ledger.refused > refused:
+                # Providers fall back quietly when a call is refused, so this chunk's AI test cases
+                # are incomplete; leave it unchecked for a resume with more budget
+                logger.info(f"Generation job {job.id}: {ledger.describe_limit()}")
+                return True
+
+            created = 0
+            for endpoint, endpoint_dict in zip(chunk, endpoint_dicts):
+                endpoint_key = f"{endpoint.method}_{endpoint.path}"
+                # Automated test cases first, as in /generate-rag-bulk
+                test_cases = TestGenerator.generate_automated_test_cases(endpoint_dict, job.base_url, api_spec_content, data_context) + list(ai_test_cases.get(endpoint_key) or [])
+                for test_case_data in test_cases:
+                    test_fingerprint = dedup.admit(endpoint, test_case_data)
+                    if test_fingerprint is None:
+                        continue
+                    db.add(build_test_case_model(job.api_spec_id, endpoint, test_case_data, validator, test_fingerprint))
+                    created += 1
+            GenerationJobRunner._checkpoint(db, job, ledger, completed=[endpoint.id for endpoint in chunk] + missing, created=created)
+        return False
+
+    @staticmethod
+    def _endpoint_dict(endpoint: EndpointModel) -> Dict[str, Any]:
+        return {
+            'method': endpoint.method,
+            'path': endpoint.path,
+            'summary': endpoint.summary,
+            'description': endpoint.description,
+            'parameters': endpoint.parameters,
+            'request_body': endpoint.request_body,
+            'responses': endpoint.responses,
+            'tags': endpoint.tags
+        }
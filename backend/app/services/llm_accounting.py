@@ -0,0 +1,124 @@
+from typing import Dict, List, Any, Optional
+from sqlalchemy import func, case
+from sqlalchemy.orm import Session
+from app.core.ai_config import ai_config
+from app.core.llm_usage import LLMUsageLedger
+from app.models.api_spec import APISpec as APISpecModel
+from app.models.generation_job import GenerationJob as GenerationJobModel
+from app.models.llm_call import LLMCall as LLMCallModel
+
+class LLMAccounting:
+    """Per-call LLM usage of generation jobs and generation requests: persistence and aggregates"""
+
+    @staticmethod
+    def ledger_for(job: GenerationJobModel) -> LLMUsageLedger:
+        """Ledger with the job's budget, continuing from the usage it has already recorded"""
+        return LLMUsageLedger(
+            max_tokens=job.max_tokens,
+            max_cost=job.max_cost,
+            prompt_tokens=job.prompt_tokens or 0,
+            completion_tokens=job.completion_tokens or 0,
+            cost=job.cost or 0.0
+        )
+
+    @staticmethod
+    def persist(db: Session, job: GenerationJobModel, ledger: LLMUsageLedger) -> int:
+        """Add the ledger's new calls to the session and the job's totals; the caller commits"""
+        calls, avoided = ledger.drain()
+        job.llm_calls_avoided = (job.llm_calls_avoided or 0) + avoided
+        for call in calls:
+            db.add(LLMCallModel(generation_job_id=job.id, api_spec_id=job.api_spec_id, **call))
+        if calls:
+            job.prompt_tokens = (job.prompt_tokens or 0) + sum(call['prompt_tokens'] or 0 for call in calls)
+            job.completion_tokens = (job.completion_tokens or 0) + sum(call['completion_tokens'] or 0 for call in calls)
+            job.cost = (job.cost or 0.0) + sum(call['cost'] or 0.0 for call in calls)
+            job.llm_call_count = (job.llm_call_count or 0) + len(calls)
+        return len(calls)
+
+    @staticmethod
+    def request_ledger() -> LLMUsageLedger:
+        """Ledger for AI generation inside a request, with the default job budget"""
+        return LLMUsageLedger(max_tokens=ai_config.AI_JOB_MAX_TOKENS or None, max_cost=ai_config.AI_JOB_MAX_COST or None)
+
+    @staticmethod
+    def persist_request(db: Session, api_spec_id: int, ledger: LLMUsageLedger) -> int:
+        """Add a request's new calls to the session and its avoided calls to the spec's count, outside any job; the caller commits"""
+        calls, avoided = ledger.drain()
+        if avoided:
+            db.query(APISpecModel).filter(APISpecModel.id == api_spec_id).update(
+                {APISpecModel.llm_calls_avoided: func.coalesce(APISpecModel.llm_calls_avoided, 0) + avoided},
+                synchronize_session=False
+            )
+        for call in calls:
+            db.add(LLMCallModel(generation_job_id=None, api_spec_id=api_spec_id, **call))
+        return len(calls)
+
+    @staticmethod
+    def _aggregate(query) -> List[Dict[str, Any]]:
+        rows = []
+        for row in query:
+            values = row._asdict()
+            calls = values['calls'] or 0
+            values['total_tokens'] = (values['prompt_tokens'] or 0) + (values['completion_tokens'] or 0)
+            values['avg_latency'] = round(values['total_latency'] / calls, 3) if calls and values['total_latency'] is not None else None
+            values['total_latency'] = round(values['total_latency'] or 0.0, 3)
+            values['cost'] = round(values['cost'], 6) if values['cost'] is not None else None
+            rows.append(values)
+        return rows
+
+    @staticmethod
+    def summary(db: Session, job_id: Optional[int] = None, api_spec_id: Optional[int] = None, by_endpoint: bool = False) -> Dict[str, Any]:
+        """Calls, failures, retries, cache hits, tokens, latency, cost and calls avoided; in total, per provider/model and optionally per endpoint"""
+        measures = [
+            func.count(LLMCallModel.id).label('calls'),
+            func.sum(case((LLMCallModel.outcome != 'success', 1), else_=0)).label('failures'),
+            func.sum(case((LLMCallModel.retry > 0, 1), else_=0)).label('retries'),
+            func.sum(case((LLMCallModel.cache_hit.is_(True), 1), else_=0)).label('cache_hits'),
+            func.sum(LLMCallModel.prompt_tokens).label('prompt_tokens'),
+            func.sum(LLMCallModel.completion_tokens).label('completion_tokens'),
+            func.sum(LLMCallModel.cached_tokens).label('cached_tokens'),
+            func.sum(LLMCallModel.latency).label('total_latency'),
+            func.max(LLMCallModel.latency).label('max_latency'),
+            func.sum(LLMCallModel.cost).label('cost')
+        ]
+
+        def scoped(*columns):
+            query = db.query(*columns)
+            if job_id is not None:
+                query = query.filter(LLMCallModel.generation_job_id == job_id)
+            if api_spec_id is not None:
+                query = query.filter(LLMCallModel.api_spec_id == api_spec_id)
+            return query
+
+        totals = LLMAccounting._aggregate(scoped(*measures))[0]
+        avoided = db.query(func.sum(GenerationJobModel.llm_calls_avoided))
+        if job_id is not None:
+            avoided = avoided.filter(GenerationJobModel.id == job_id)
+        if api_spec_id is not None:
+            avoided = avoided.filter(GenerationJobModel.api_spec_id == api_spec_id)
+        llm_calls_avoided = avoided.scalar() or 0
+        if job_id is None:
+            # Generation requests outside any job count theirs on the spec
+            request_avoided = db.query(func.sum(APISpecModel.llm_calls_avoided))
+            if api_spec_id is not None:
+                request_avoided = request_avoided.filter(APISpecModel.id == api_spec_id)
+            llm_calls_avoided += request_avoided.scalar() or 0
+        report = {
+            'generation_job_id': job_id,
+            'api_spec_id': api_spec_id,
+            **totals,
+            # Per-category calls replaced by the rule engine's boundary and negative cases
+            'llm_calls_avoided': llm_calls_avoided,
+            'by_model': LLMAccounting._aggregate(
+                scoped(LLMCallModel.provider, LLMCallModel.model, *measures)
+                .group_by(LLMCallModel.provider, LLMCallModel.model)
+                .order_by(LLMCallModel.provider, LLMCallModel.model)
+            )
+        }
+        if by_endpoint:
+            # Most expensive endpoints first
+            report['by_endpoint'] = sorted(
+                LLMAccounting._aggregate(scoped(LLMCallModel.endpoint, *measures).group_by(LLMCallModel.endpoint)),
+                key=lambda row: row['total_tokens'], reverse=True
+            )
+        return report
@@ -0,0 +1,243 @@
+import contextvars
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Dict, List, Any, Callable, Optional
+from app.core.ai_config import ai_config
+from app.core.llm_usage import check_llm_budget, llm_budget_exhausted, usage_scope
+from app.core.metrics import record_llm_hedge
+from app.models.test_case import TestCaseType
+from app.services.llm_streaming import GenerationCancelled, emit_test_cases
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ProviderLatencyTracker:
+    """Rolling window of generation latencies per provider, ranked by p95"""
+
+    def __init__(self, window: int = None):
+        self.window = window or ai_config.AI_LATENCY_WINDOW
+        self.samples: Dict[str, deque] = {}
+        self.lock = threading.Lock()
+
+    def record(self, provider: str, seconds: float):
+        with self.lock:
+            self.samples.setdefault(provider, deque(maxlen=self.window)).append(seconds)
+
+    def p95(self, provider: str) -> Optional[float]:
+        with self.lock:
+            samples = sorted(self.samples.get(provider, ()))
+        if not samples:
+            return None
+        return samples[max(0, math.ceil(0.95 * len(samples)) - 1)]
+
+    def rank(self, providers: List[str]) -> List[str]:
+        """Fastest recent p95 first; providers without samples go first so they get measured"""
+        order = {provider: index for index, provider in enumerate(providers)}
+        return sorted(providers, key=lambda provider: (self.p95(provider) or 0.0, order[provider]))
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self.lock:
+            counts = {provider: len(samples) for provider, samples in self.samples.items()}
+        return {provider: {'samples': count, 'p95': self.p95(provider)} for provider, count in counts.items()}
+
+# Shared by every hedged generator in the process so rankings survive requests
+latency_tracker = ProviderLatencyTracker()
+
+class _Attempt:
+    """One provider working on one endpoint within a hedged request"""
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.started = time.perf_counter()
+        self.cancelled = threading.Event()
+        self.buffered: List[tuple] = []
+        self.delivered: List[Dict[str, Any]] = []
+        self.future: Optional[Future] = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+class HedgedRAGGenerator:
+    """Sends generation to the provider with the best recent p95 and hedges slow calls.
+
+    If the primary has not produced an AI test case after AI_HEDGE_DELAY
+    seconds, or fails first, the same endpoint goes to the next provider.
+    The first provider to produce a valid AI test case wins: its cases are
+    passed on, and the others are cancelled at their next test case.
+    Results that are only the provider's rule-based fallback do not count
+    as valid. If no provider succeeds, the round is retried with
+    exponential backoff and full jitter.
+
+    Takes any generator objects with ``is_available`` and
+    ``generate_rag_test_cases(endpoint, api_spec, base_url, on_test_case)``.
+    """
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, generators: Dict[str, Any], hedge_delay: float = None, max_retries: int = None,
+                 retry_base_delay: float = None, retry_max_delay: float = None, tracker: ProviderLatencyTracker = None):
+        self.generators = {name: generator for name, generator in generators.items() if generator and generator.is_available}
+        self.is_available = bool(self.generators)
+        self.hedge_delay = hedge_delay if hedge_delay is not None else ai_config.AI_HEDGE_DELAY
+        self.max_retries = max_retries if max_retries is not None else ai_config.AI_HEDGE_MAX_RETRIES
+        self.retry_base_delay = retry_base_delay if retry_base_delay is not None else ai_config.AI_HEDGE_RETRY_BASE_DELAY
+        self.retry_max_delay = retry_max_delay if retry_max_delay is not None else ai_config.AI_HEDGE_RETRY_MAX_DELAY
+        self.tracker = tracker or latency_tracker
+
+    @classmethod
+    def _pool(cls) -> ThreadPoolExecutor:
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=ai_config.AI_HEDGE_MAX_WORKERS, thread_name_prefix="llm-hedge")
+            return cls._executor
+
+    @staticmethod
+    def _is_valid(test_cases: Optional[List[Dict[str, Any]]]) -> bool:
+        return bool(test_cases) and any(test_case.get('test_type') == TestCaseType.AI_GENERATED for test_case in test_cases)
+
+    def generate_rag_test_cases(self, endpoint: Dict[str, Any], api_spec: Dict[str, Any], base_url: str = "",
+                                on_test_case: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """Hedged generation for one endpoint; same contract as the provider generators"""
+        fallback: List[Dict[str, Any]] = []
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                # Providers report a spent budget as an ordinary failure; don't retry into it
+                check_llm_budget()
+                delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * (2 ** (attempt - 1))))
+                logger.info(f"Retrying hedged generation for {endpoint['method']} {endpoint['path']} in {delay:.1f}s")
+                time.sleep(delay)
+            with usage_scope(retry=attempt):
+                test_cases, fallback = self._hedged_round(endpoint, api_spec, base_url, on_test_case)
+            if test_cases is not None:
+                return test_cases
+
+        record_llm_hedge('none')
+        logger.warning(f"No provider produced AI test cases for {endpoint['method']} {endpoint['path']}")
+        return emit_test_cases(on_test_case, endpoint, fallback)
+
+    def _hedged_round(self, endpoint: Dict[str, Any], api_spec: Dict[str, Any], base_url: str,
+                      on_test_case: Optional[Callable[[str, Dict[str, Any]], None]]) -> tuple:
+        """(winner's test cases or None, first fallback result) for one round over the providers"""
+        providers = self.tracker.rank(list(self.generators))
+        lock = threading.Lock()
+        state = {'winner': None}
+        attempts: List[_Attempt] = []
+
+        def claim(current: _Attempt):
+            # Called with the lock held
+            state['winner'] = current
+            for other in attempts:
+                if other is not current:
+                    other.cancelled.set()
+            for endpoint_key, test_case in current.buffered:
+                deliver(current, endpoint_key, test_case)
+            current.buffered = []
+
+        def deliver(current: _Attempt, endpoint_key: str, test_case: Dict[str, Any]):
+            current.delivered.append(test_case)
+            if on_test_case is not None:
+                on_test_case(endpoint_key, test_case)
+
+        def run(current: _Attempt) -> List[Dict[str, Any]]:
+            def forward(endpoint_key: str, test_case: Dict[str, Any]):
+                with lock:
+                    if current.cancelled.is_set():
+                        raise GenerationCancelled(f"{current.provider} lost the hedge")
+                    if state['winner'] is current:
+                        deliver(current, endpoint_key, test_case)
+                        return
+                    current.buffered.append((endpoint_key, test_case))
+                    if state['winner'] is None and test_case.get('test_type') == TestCaseType.AI_GENERATED:
+                        claim(current)
+
+            generator = self.generators[current.provider]
+            return generator.generate_rag_test_cases(endpoint, api_spec, base_url, on_test_case=forward)
+
+        def launch() -> _Attempt:
+            current = _Attempt(providers[len(attempts)])
+            attempts.append(current)
+            # Pool threads see the caller's usage ledger through a copy of its context
+            current.future = self._pool().submit(contextvars.copy_context().run, run, current)
+            if len(attempts) > 1:
+                logger.info(f"Hedging {endpoint['method']} {endpoint['path']} to {current.provider} after {attempts[0].elapsed:.1f}s")
+            return current
+
+        launch()
+        next_hedge = time.monotonic() + self.hedge_delay
+        fallback: Optional[List[Dict[str, Any]]] = None
+        finished = set()
+
+        while True:
+            winner = state['winner']
+            if winner is not None and winner.future.done():
+                break
+            running = [current.future for current in attempts if not current.future.done()]
+            if not running and len(attempts) == len(providers):
+                break
+            can_hedge = winner is None and len(attempts) < len(providers)
+            timeout = max(0.0, next_hedge - time.monotonic()) if can_hedge else None
+            if running:
+                wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            failed_now = False
+            for current in attempts:
+                if current.future.done() and current not in finished:
+                    finished.add(current)
+                    failed, fallback_cases = self._record(current)
+                    failed_now = failed_now or failed
+                    if fallback is None and fallback_cases:
+                        fallback = fallback_cases
+            # A failed attempt hands over at once; a slow one after the hedge delay
+            if state['winner'] is None and len(attempts) < len(providers) and (failed_now or time.monotonic() >= next_hedge or not running):
+                launch()
+                next_hedge = time.monotonic() + self.hedge_delay
+
+        winner = state['winner']
+        for current in attempts:
+            if current is not winner and current not in finished:
+                current.cancelled.set()
+                # Lower bound on its latency, so a provider that keeps losing drifts down the ranking
+                self.tracker.record(current.provider, current.elapsed)
+        if winner is None:
+            return None, fallback or []
+
+        record_llm_hedge('primary' if winner is attempts[0] else 'hedge')
+        # Whatever the winner returns, the client has already seen exactly the delivered cases
+        return winner.delivered, fallback or []
+
+    def _record(self, current: _Attempt) -> tuple:
+        """Record a finished attempt's latency; returns (failed, its rule-based fallback cases)"""
+        try:
+            test_cases = current.future.result()
+        except GenerationCancelled:
+            return False, None
+        except Exception as e:
+            logger.warning(f"{current.provider} generation failed: {str(e)}")
+            test_cases = None
+        if self._is_valid(test_cases):
+            self.tracker.record(current.provider, current.elapsed)
+            return False, None
+        if llm_budget_exhausted():
+            # Refused by the budget guard, not by the provider: leave the ranking alone
+            return True, test_cases
+        # Failures count as slow so the ranking moves away from a failing provider
+        self.tracker.record(current.provider, max(current.elapsed, ai_config.AI_HEDGE_FAILURE_LATENCY))
+        return True, test_cases
+
+    def generate_rag_test_cases_for_all_endpoints(self, endpoints: List[Dict[str, Any]], api_spec: Dict[str, Any], base_url: str = "",
+                                                  on_test_case: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Bulk generation on the best-ranked provider that supports it, else hedged endpoint by endpoint"""
+        for provider in self.tracker.rank(list(self.generators)):
+            generator = self.generators[provider]
+            if hasattr(generator, 'generate_rag_test_cases_for_all_endpoints'):
+                return generator.generate_rag_test_cases_for_all_endpoints(endpoints, api_spec, base_url, on_test_case=on_test_case)
+        return {
+            f"{endpoint['method']}_{endpoint['path']}": self.generate_rag_test_cases(endpoint, api_spec, base_url, on_test_case)
+            for endpoint in endpoints
+        }
@@ -0,0 +1,207 @@
+import json
+from typing import Dict, List, Any, Callable, Iterator, Optional, Tuple
+from app.services.prompt_batching import estimate_tokens
+import logging
+
+logger = logging.getLogger(__name__)
+
+PARSER_MODES = ('array', 'keyed', 'object')
+
+class GenerationCancelled(Exception):
+    """Raised from an on_test_case callback to stop a generator that is no longer wanted"""
+
+class IncrementalJSONParser:
+    """Pulls complete test-case objects out of a JSON document as it streams in.
+
+    Modes:
+      - ``array``: ``[{...}, {...}]``, each element is an item
+      - ``keyed``: ``{"GET_/x": [{...}], ...}``, each element of each array is
+        an item tagged with its key
+      - ``object``: ``{...}``, the top-level object is the single item
+
+    Text before the document (prose, markdown fences) is skipped. A
+    malformed item is counted in ``errors`` and skipped without losing the
+    items around it, and a truncated tail only loses the unfinished item.
+    """
+
+    def __init__(self, mode: str = 'array'):
+        if mode not in PARSER_MODES:
+            raise ValueError(f"Unsupported parser mode: {mode}")
+        self.mode = mode
+        self.item_depth = {'array': 1, 'keyed': 2, 'object': 0}[mode]
+        self.buffer = ''
+        self.pos = 0
+        self.stack: List[str] = []
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.done = False
+        self.item_start: Optional[int] = None
+        self.key_start: Optional[int] = None
+        self.current_key: Optional[str] = None
+        self.errors = 0
+
+    def feed(self, text: str) -> List[Tuple[Optional[str], Any]]:
+        """Consume more text; returns the items completed by it as (key, value)"""
+        items = []
+        if self.done:
+            return items
+        self.buffer += text
+        buffer = self.buffer
+        length = len(buffer)
+        pos = self.pos
+
+        while pos < length:
+            char = buffer[pos]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == '\\':
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.key_start is not None:
+                        self._read_key(buffer[self.key_start:pos + 1])
+                        self.key_start = None
+                pos += 1
+                continue
+
+            if not self.started:
+                opener = '[' if self.mode == 'array' else '{'
+                if char == opener:
+                    self.started = True
+                    self.stack.append(char)
+                    if self.mode == 'object':
+                        self.item_start = pos
+                pos += 1
+                continue
+
+            depth = len(self.stack)
+            if char == '"':
+                self.in_string = True
+                # Keys of the top-level object name the endpoint in keyed mode
+                if self.mode == 'keyed' and depth == 1:
+                    self.key_start = pos
+            elif char in '[{':
+                if depth == self.item_depth and char == '{' and self.item_start is None:
+                    self.item_start = pos
+                self.stack.append(char)
+            elif char in ']}':
+                if self.stack:
+                    self.stack.pop()
+                if len(self.stack) == self.item_depth and char == '}' and self.item_start is not None:
+                    items.extend(self._emit(buffer[self.item_start:pos + 1]))
+                    self.item_start = None
+                if not self.stack:
+                    self.done = True
+                    pos += 1
+                    break
+            pos += 1
+
+        # Drop consumed text that no open item or key still points into
+        if self.item_start is None and self.key_start is None:
+            self.buffer = buffer[pos:]
+            self.pos = 0
+        else:
+            keep_from = min(index for index in (self.item_start, self.key_start) if index is not None)
+            self.buffer = buffer[keep_from:]
+            self.pos = pos - keep_from
+            if self.item_start is not None:
+                self.item_start -= keep_from
+            if self.key_start is not None:
+                self.key_start -= keep_from
+        return items
+
+    def _read_key(self, raw: str):
+        try:
+            self.current_key = json.loads(raw)
+        except json.JSONDecodeError:
+            self.current_key = raw.strip('"')
+
+    def _emit(self, raw: str) -> List[Tuple[Optional[str], Any]]:
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self.errors += 1
+            logger.warning(f"Skipping malformed streamed item: {str(e)}")
+            return []
+        return [(self.current_key if self.mode == 'keyed' else None, value)]
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the stream ended inside the document"""
+        return self.started and not self.done
+
+def validate_test_case_data(test_data: Any) -> Optional[str]:
+    """Problem with an LLM test case object, or None if it can be stored"""
+    if not isinstance(test_data, dict):
+        return "test case is not an object"
+    if not isinstance(test_data.get('name', ''), str):
+        return "name is not a string"
+    if 'input_data' in test_data and not isinstance(test_data['input_data'], dict):
+        return "input_data is not an object"
+    status_code = test_data.get('expected_status_code', 200)
+    if isinstance(status_code, bool) or not isinstance(status_code, int) or not 100 <= status_code <= 599:
+        return f"expected_status_code {status_code!r} is not an HTTP status"
+    return None
+
+def iter_gemini_stream(response: Any, usage: Dict[str, Optional[int]]) -> Iterator[str]:
+    """Text deltas from a Gemini ``streamGenerateContent?alt=sse`` response.
+
+    Token counts (including cached prompt tokens) from the last event's usage
+    metadata are written to ``usage``.
+    """
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith('data:'):
+            continue
+        try:
+            event = json.loads(line[5:].strip())
+        except json.JSONDecodeError:
+            continue
+        metadata = event.get('usageMetadata')
+        if metadata:
+            usage['prompt_tokens'] = metadata.get('promptTokenCount')
+            usage['completion_tokens'] = metadata.get('candidatesTokenCount')
+            usage['cached_tokens'] = metadata.get('cachedContentTokenCount')
+        for candidate in event.get('candidates', [])[:1]:
+            for part in candidate.get('content', {}).get('parts', []):
+                if part.get('text'):
+                    yield part['text']
+
+def read_openai_json_object(stream: Any, prompt: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, Optional[int]]]:
+    """First complete JSON object from a streamed OpenAI-compatible chat completion.
+
+    The stream is closed as soon as the object is complete, so trailing
+    prose is never generated. Streamed chunks carry no usage, so token
+    counts are local estimates.
+    """
+    parser = IncrementalJSONParser('object')
+    completion = []
+    result = None
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ''
+            completion.append(delta)
+            items = parser.feed(delta)
+            if items:
+                result = items[0][1]
+                break
+    finally:
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            close()
+    usage = {'prompt_tokens': estimate_tokens(prompt), 'completion_tokens': estimate_tokens(''.join(completion))}
+    return result, usage
+
+def emit_test_case(on_test_case: Optional[Callable[[str, Dict[str, Any]], None]], endpoint: Dict[str, Any], test_case: Dict[str, Any]) -> Dict[str, Any]:
+    """Hand a finished test case to a streaming consumer (if any); returns it unchanged"""
+    if on_test_case is not None:
+        on_test_case(f"{endpoint['method']}_{endpoint['path']}", test_case)
+    return test_case
+
+def emit_test_cases(on_test_case: Optional[Callable[[str, Dict[str, Any]], None]], endpoint: Dict[str, Any], test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    for test_case in test_cases:
+        emit_test_case(on_test_case, endpoint, test_case)
+    return test_cases
@@ -298,33 +298,8 @@ class MockRAGTestGenerator:
     
     def _generate_curl_command(self, endpoint: Dict[str, Any], base_url: str, test_data: Dict[str, Any]) -> str:
         """Generate CURL command for the test case"""
-        method = endpoint['method']
-        path = endpoint['path']
-        url = f"{base_url}{path}"
-        
-        curl_parts = [f"curl -X {method}"]
-        curl_parts.append('-H "Content-Type: application/json"')
-        
-        # Add headers
-        if test_data.get('headers'):
-            for key, value in test_data['headers'].items():
-                curl_parts.append(f'-H "{key}: {value}"')
-        
-        # Add request body
-        if method in ['POST', 'PUT', 'PATCH'] and test_data.get('body'):
-            body_json = json.dumps(test_data['body'])
-            curl_parts.append(f'-d \'{body_json}\'')
-        
-        # Add query parameters
-        if test_data.get('query_params'):
-            query_params = []
-            for key, value in test_data['query_params'].items():
-                query_params.append(f"{key}={value}")
-            if query_params:
-                url += "?" + "&".join(query_params)
-        
-        curl_parts.append(f'"{url}"')
-        return " ".join(curl_parts)
+        from app.services.test_generator import TestGenerator
+        return TestGenerator.generate_curl_command(endpoint, base_url, test_data)
     
     def _map_priority(self, priority_str: str) -> TestCasePriority:
         """Map string priority to enum"""
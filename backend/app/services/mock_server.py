@@ -0,0 +1,205 @@
+import asyncio
+import json
+import re
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlsplit
+import httpx
+from app.services.test_generator import TestGenerator
+from app.services.synthetic_data import DataContext, use_data_context
+
+# Base URLs of in-process mock servers look like http://mock-<api_spec_id>.apitestgen.local
+MOCK_HOST_TEMPLATE = "mock-{api_spec_id}.apitestgen.local"
+MOCK_HOST_PATTERN = re.compile(r'^mock-(\d+)\.apitestgen\.local$')
+
+NOT_FOUND_BODY = b'{"detail":"No mock route for this request"}'
+
+class SpecMockServer:
+    """In-process ASGI mock of an API, built from a stored specification.
+
+    Every operation's response (status, headers and serialized body) is
+    computed once when the server is built, from the spec's examples or
+    from ``TestGenerator`` synthetic data, so serving a request is a dict
+    lookup or a short regex scan plus a single send.
+    """
+
+    def __init__(self, api_spec_id: int, endpoints: List[Dict[str, Any]], spec_content: Optional[Dict[str, Any]] = None):
+        self.api_spec_id = api_spec_id
+        self.base_url = f"http://{MOCK_HOST_TEMPLATE.format(api_spec_id=api_spec_id)}"
+        self.spec_content = spec_content or {}
+        self.base_path = SpecMockServer._server_base_path(self.spec_content)
+
+        # (method, path) -> response for paths without parameters
+        self.static_routes: Dict[Tuple[str, str], Tuple[int, List[Tuple[bytes, bytes]], bytes]] = {}
+        # method -> [(regex, response)] for templated paths, most specific first
+        self.templated_routes: Dict[str, List[Tuple[re.Pattern, Tuple[int, List[Tuple[bytes, bytes]], bytes]]]] = {}
+
+        # Seeded so the same spec always yields the same mock data
+        with use_data_context(DataContext(api_spec_id)):
+            for endpoint in endpoints:
+                self._add_route(endpoint)
+
+        for routes in self.templated_routes.values():
+            routes.sort(key=lambda route: route[0].pattern.count('[^/]+'))
+
+    @property
+    def route_count(self) -> int:
+        return len(self.static_routes) + sum(len(routes) for routes in self.templated_routes.values())
+
+    @staticmethod
+    def _server_base_path(spec_content: Dict[str, Any]) -> str:
+        """Path prefix from the first OpenAPI server URL (e.g. /api/v1)"""
+        servers = spec_content.get('servers') or []
+        if not servers:
+            return ''
+        return urlsplit(servers[0].get('url', '')).path.rstrip('/')
+
+    def _add_route(self, endpoint: Dict[str, Any]):
+        """Precompute the response for one operation"""
+        method = endpoint['method'].upper()
+        path = endpoint['path']
+        response = self._build_response(endpoint.get('responses') or {})
+
+        if '{' not in path:
+            self.static_routes[(method, path)] = response
+            if self.base_path:
+                self.static_routes[(method, self.base_path + path)] = response
+            return
+
+        pattern = re.sub(r'\\\{[^/]+?\\\}', '[^/]+', re.escape(path))
+        prefix = f"(?:{re.escape(self.base_path)})?" if self.base_path else ''
+        self.templated_routes.setdefault(method, []).append((re.compile(f"^{prefix}{pattern}/?$"), response))
+
+    def _build_response(self, responses: Dict[str, Any]) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+        """Pick the success response and serialize its body once"""
+        codes = sorted(code for code in responses if str(code).startswith('2'))
+        code = codes[0] if codes else ('default' if 'default' in responses else None)
+        status = int(code) if code and code != 'default' else 200
+        response_spec = self._resolve(responses.get(code, {})) if code else {}
+
+        if status == 204:
+            return status, [(b'content-length', b'0')], b''
+
+        body = self._response_body(response_spec)
+        body_bytes = json.dumps(body, separators=(',', ':'), default=str).encode()
+        headers = [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body_bytes)).encode())
+        ]
+        return status, headers, body_bytes
+
+    def _response_body(self, response_spec: Dict[str, Any]) -> Any:
+        """Example from the spec if present, otherwise schema-driven synthetic data"""
+        media = (response_spec.get('content') or {}).get('application/json') or {}
+        if 'example' in media:
+            return media['example']
+        if media.get('examples'):
+            first = next(iter(media['examples'].values()))
+            return self._resolve(first).get('value', first)
+
+        schema = self._resolve(media.get('schema') or response_spec.get('schema') or {})
+        if 'example' in schema:
+            return schema['example']
+        if not schema:
+            return {}
+        return self._synthesize(schema)
+
+    def _synthesize(self, schema: Dict[str, Any]) -> Any:
+        """Generate a value for a schema, using spec examples where given"""
+        if 'example' in schema:
+            return schema['example']
+        if schema.get('type') == 'object' or 'properties' in schema:
+            return {
+                name: self._synthesize(self._resolve(prop_schema))
+                for name, prop_schema in (schema.get('properties') or {}).items()
+            }
+        if schema.get('type') == 'array':
+            item_schema = self._resolve(schema.get('items') or {})
+            return [self._synthesize(item_schema)]
+        return TestGenerator._generate_value_from_schema(schema, "normal")
+
+    def _resolve(self, node: Any, depth: int = 0) -> Any:
+        """Resolve local $refs (#/components/...) against the spec content"""
+        if not isinstance(node, dict):
+            return node
+        if '$ref' in node and depth < 20:
+            target = self.spec_content
+            for part in node['$ref'].lstrip('#/').split('/'):
+                target = target.get(part, {}) if isinstance(target, dict) else {}
+            return self._resolve(target, depth + 1)
+        if depth >= 20:
+            return {}
+        resolved = {}
+        for key, value in node.items():
+            if key in ('properties',) and isinstance(value, dict):
+                resolved[key] = {name: self._resolve(prop, depth + 1) for name, prop in value.items()}
+            elif key in ('items', 'schema') and isinstance(value, dict):
+                resolved[key] = self._resolve(value, depth + 1)
+            else:
+                resolved[key] = value
+        return resolved
+
+    def resolve(self, method: str, path: str) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+        """Find the precomputed response for a request"""
+        response = self.static_routes.get((method, path))
+        if response is not None:
+            return response
+        if len(path) > 1 and path.endswith('/'):
+            response = self.static_routes.get((method, path.rstrip('/')))
+            if response is not None:
+                return response
+        for pattern, templated_response in self.templated_routes.get(method, ()):
+            if pattern.match(path):
+                return templated_response
+        return 404, [(b'content-type', b'application/json'), (b'content-length', str(len(NOT_FOUND_BODY)).encode())], NOT_FOUND_BODY
+
+    async def __call__(self, scope, receive, send):
+        """ASGI entrypoint"""
+        if scope['type'] != 'http':
+            return
+        status, headers, body = self.resolve(scope['method'], scope['path'])
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+class MockServerRegistry:
+    """Mock servers built from API specs, addressable by API spec ID"""
+
+    servers: Dict[int, SpecMockServer] = {}
+    _clients: Dict[int, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+
+    @staticmethod
+    def register(server: SpecMockServer) -> SpecMockServer:
+        MockServerRegistry.servers[server.api_spec_id] = server
+        MockServerRegistry._clients.pop(server.api_spec_id, None)
+        return server
+
+    @staticmethod
+    def get(api_spec_id: int) -> Optional[SpecMockServer]:
+        return MockServerRegistry.servers.get(api_spec_id)
+
+    @staticmethod
+    def remove(api_spec_id: int) -> bool:
+        MockServerRegistry._clients.pop(api_spec_id, None)
+        return MockServerRegistry.servers.pop(api_spec_id, None) is not None
+
+    @staticmethod
+    def spec_id_for_url(url: str) -> Optional[int]:
+        """API spec ID if the URL targets a mock host"""
+        if '://' not in url:
+            url = f"http://{url}"
+        match = MOCK_HOST_PATTERN.match(urlsplit(url).hostname or '')
+        return int(match.group(1)) if match else None
+
+    @staticmethod
+    def client_for(url: str) -> Optional[httpx.AsyncClient]:
+        """In-process client for a mock URL, or None for real targets"""
+        api_spec_id = MockServerRegistry.spec_id_for_url(url)
+        if api_spec_id is None or api_spec_id not in MockServerRegistry.servers:
+            return None
+
+        loop = asyncio.get_running_loop()
+        cached = MockServerRegistry._clients.get(api_spec_id)
+        if cached is None or cached[1] is not loop or cached[0].is_closed:
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=MockServerRegistry.servers[api_spec_id]))
+            MockServerRegistry._clients[api_spec_id] = (client, loop)
+            return client
+        return cached[0]
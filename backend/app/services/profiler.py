@@ -0,0 +1,330 @@
+import asyncio
+import cProfile
+import importlib.util
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+from app.core.config import settings
+from app.core.security import is_admin_token
+
+# pyinstrument is optional (cProfile is the fallback) and only imported when a session starts
+PYINSTRUMENT_AVAILABLE = importlib.util.find_spec("pyinstrument") is not None
+
+PROFILERS = ('pyinstrument', 'cprofile')
+
+class ProfilingService:
+    """On-demand CPU profiles and tracemalloc snapshots of the live process.
+
+    CPU sessions profile the event loop thread for a bounded time, either
+    free-standing or attached to an active run (stopping early when the run
+    ends), or a single request. Runs on worker threads, such as generation
+    jobs, are profiled on their own thread: the profiler is started and
+    stopped there by ``poll_run`` at the run's next test case or checkpoint.
+    Output is written to ``PROFILES_DIR``: speedscope JSON for pyinstrument,
+    pstats ``.prof`` for cProfile.
+    """
+
+    sessions: Dict[str, Dict[str, Any]] = {}
+    active_runs: Dict[str, Dict[str, Any]] = {}
+    _active_cpu_session: Optional[str] = None
+    _profilers: Dict[str, Any] = {}
+    _timers: Dict[str, asyncio.TimerHandle] = {}
+    _last_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    @staticmethod
+    def default_profiler() -> str:
+        return 'pyinstrument' if PYINSTRUMENT_AVAILABLE else 'cprofile'
+
+    @staticmethod
+    def register_run(label: str, run_id: Optional[str] = None, worker_thread: bool = False) -> str:
+        """Mark a run as active so a profiler can be attached to it.
+
+        A ``worker_thread`` run executes off the event loop, on the calling
+        thread, and must call ``poll_run`` regularly for profiles to start.
+        """
+        run_id = run_id or uuid.uuid4().hex[:12]
+        ProfilingService.active_runs[run_id] = {
+            'run_id': run_id,
+            'label': label,
+            'thread': threading.current_thread().name if worker_thread else None,
+            'started_at': datetime.now().isoformat()
+        }
+        return run_id
+
+    @staticmethod
+    def finish_run(run_id: str):
+        """Forget a finished run and stop any profile attached to it"""
+        run = ProfilingService.active_runs.pop(run_id, None)
+        for session in list(ProfilingService.sessions.values()):
+            if session['run_id'] == run_id and session['status'] == 'running':
+                if run is not None and run['thread']:
+                    # Called on the run's own thread, where its profiler is hooked
+                    ProfilingService._finish_worker_session(session)
+                else:
+                    ProfilingService.stop_cpu_profile(session['id'])
+
+    @staticmethod
+    def poll_run(run_id: str):
+        """On a worker-thread run's thread: start a requested profile, or stop one that is due"""
+        for session in list(ProfilingService.sessions.values()):
+            if session['run_id'] != run_id or session['status'] != 'running' or not session['_worker']:
+                continue
+            if session['_stop'] or time.monotonic() >= session['_deadline']:
+                ProfilingService._finish_worker_session(session)
+            elif session['id'] not in ProfilingService._profilers:
+                session['_start'] = time.monotonic()
+                ProfilingService._start_profiler(session)
+
+    @staticmethod
+    def _finish_worker_session(session: Dict[str, Any]):
+        if session['id'] in ProfilingService._profilers:
+            ProfilingService._finish_session(session)
+        else:
+            # Stopped before the run reached a checkpoint: nothing was recorded
+            session['status'] = 'failed'
+            session['duration_seconds'] = 0.0
+            session['error'] = "The run did not reach a checkpoint while the profile was requested"
+        if ProfilingService._active_cpu_session == session['id']:
+            ProfilingService._active_cpu_session = None
+
+    @staticmethod
+    def _new_session(target: str, profiler: Optional[str], run_id: Optional[str] = None, label: str = '') -> Dict[str, Any]:
+        profiler = profiler or ProfilingService.default_profiler()
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unsupported profiler: {profiler}. Allowed: {', '.join(PROFILERS)}")
+        if profiler == 'pyinstrument' and not PYINSTRUMENT_AVAILABLE:
+            raise ValueError("pyinstrument is not installed; use the cprofile profiler")
+
+        session_id = uuid.uuid4().hex[:12]
+        extension = 'speedscope.json' if profiler == 'pyinstrument' else 'prof'
+        filename = f"profile_{target}_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{session_id}.{extension}"
+        session = {
+            'id': session_id,
+            'target': target,
+            'run_id': run_id,
+            'label': label,
+            'profiler': profiler,
+            'status': 'running',
+            'started_at': datetime.now().isoformat(),
+            'duration_seconds': None,
+            'file_path': os.path.join(settings.PROFILES_DIR, filename),
+            'error': None,
+            '_start': time.monotonic(),
+            '_worker': False,
+            '_stop': False,
+            '_deadline': None
+        }
+        ProfilingService.sessions[session_id] = session
+        return session
+
+    @staticmethod
+    def _start_profiler(session: Dict[str, Any], async_mode: str = 'disabled'):
+        if session['profiler'] == 'pyinstrument':
+            from pyinstrument import Profiler as PyinstrumentProfiler
+            profiler = PyinstrumentProfiler(interval=settings.PROFILING_INTERVAL, async_mode=async_mode)
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        ProfilingService._profilers[session['id']] = profiler
+
+    @staticmethod
+    def _finish_session(session: Dict[str, Any]):
+        """Stop the profiler and write its output next to the reports"""
+        profiler = ProfilingService._profilers.pop(session['id'], None)
+        session['duration_seconds'] = round(time.monotonic() - session['_start'], 3)
+        if profiler is None:
+            return
+
+        os.makedirs(settings.PROFILES_DIR, exist_ok=True)
+        try:
+            if session['profiler'] == 'pyinstrument':
+                from pyinstrument.renderers import SpeedscopeRenderer
+                profiler.stop()
+                with open(session['file_path'], 'w', encoding='utf-8') as f:
+                    f.write(profiler.output(SpeedscopeRenderer()))
+            else:
+                profiler.disable()
+                profiler.dump_stats(session['file_path'])
+            session['status'] = 'completed'
+        except Exception as e:
+            session['status'] = 'failed'
+            session['error'] = str(e)
+
+    @staticmethod
+    def start_cpu_profile(duration_seconds: float, profiler: Optional[str] = None, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """Profile the event loop thread (or a worker-thread run's thread) for a bounded time, optionally tied to a run"""
+        if ProfilingService._active_cpu_session is not None:
+            raise RuntimeError(f"A CPU profile is already running: {ProfilingService._active_cpu_session}")
+        if run_id is not None and run_id not in ProfilingService.active_runs:
+            raise LookupError(f"Run not active: {run_id}")
+
+        duration_seconds = max(0.1, min(duration_seconds, settings.PROFILING_MAX_SECONDS))
+        target = 'run' if run_id else 'process'
+        label = ProfilingService.active_runs[run_id]['label'] if run_id else ''
+        session = ProfilingService._new_session(target, profiler, run_id, label)
+        ProfilingService._active_cpu_session = session['id']
+        if run_id and ProfilingService.active_runs[run_id]['thread']:
+            # Started and stopped on the run's thread by poll_run
+            session['_worker'] = True
+            session['_deadline'] = time.monotonic() + duration_seconds
+            return ProfilingService.session_info(session)
+
+        ProfilingService._start_profiler(session)
+        loop = asyncio.get_running_loop()
+        ProfilingService._timers[session['id']] = loop.call_later(
+            duration_seconds, ProfilingService.stop_cpu_profile, session['id']
+        )
+        return ProfilingService.session_info(session)
+
+    @staticmethod
+    def stop_cpu_profile(session_id: str) -> Dict[str, Any]:
+        """Stop a running CPU profile early (or when its time is up)"""
+        session = ProfilingService.sessions.get(session_id)
+        if session is None:
+            raise LookupError(f"Profiling session not found: {session_id}")
+        if session['_worker']:
+            # Only the run's thread can unhook its profiler; it does so at its next poll_run
+            session['_stop'] = True
+            return ProfilingService.session_info(session)
+
+        timer = ProfilingService._timers.pop(session_id, None)
+        if timer is not None:
+            timer.cancel()
+        if session['status'] == 'running':
+            ProfilingService._finish_session(session)
+        if ProfilingService._active_cpu_session == session_id:
+            ProfilingService._active_cpu_session = None
+        return ProfilingService.session_info(session)
+
+    @staticmethod
+    def begin_request_profile(method: str, path: str, profiler: Optional[str] = None) -> Dict[str, Any]:
+        """Start profiling a single request (pyinstrument follows only its own async context)"""
+        if ProfilingService._active_cpu_session is not None:
+            raise RuntimeError(f"A CPU profile is already running: {ProfilingService._active_cpu_session}")
+        session = ProfilingService._new_session('request', profiler, label=f"{method} {path}")
+        ProfilingService._start_profiler(session, async_mode='enabled')
+        # Both profilers hook the thread's profile function, so sessions never overlap
+        ProfilingService._active_cpu_session = session['id']
+        return session
+
+    @staticmethod
+    def end_request_profile(session: Dict[str, Any]) -> Dict[str, Any]:
+        ProfilingService._finish_session(session)
+        if ProfilingService._active_cpu_session == session['id']:
+            ProfilingService._active_cpu_session = None
+        return ProfilingService.session_info(session)
+
+    @staticmethod
+    def session_info(session: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in session.items() if not key.startswith('_')}
+
+    @staticmethod
+    def list_sessions() -> List[Dict[str, Any]]:
+        return [ProfilingService.session_info(session) for session in ProfilingService.sessions.values()]
+
+    @staticmethod
+    def start_tracemalloc(frames: int = None) -> Dict[str, Any]:
+        """Start tracing allocations (adds memory and CPU overhead until stopped)"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or settings.TRACEMALLOC_FRAMES)
+            ProfilingService._last_snapshot = None
+        return ProfilingService.tracemalloc_status()
+
+    @staticmethod
+    def stop_tracemalloc() -> Dict[str, Any]:
+        status = ProfilingService.tracemalloc_status()
+        tracemalloc.stop()
+        ProfilingService._last_snapshot = None
+        return status
+
+    @staticmethod
+    def tracemalloc_status() -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            'tracing': tracemalloc.is_tracing(),
+            'traced_memory_bytes': current,
+            'peak_memory_bytes': peak
+        }
+
+    @staticmethod
+    def take_snapshot(top: int = 25) -> Dict[str, Any]:
+        """Save a tracemalloc snapshot and report top allocations and growth since the last one"""
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not running")
+
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        os.makedirs(settings.PROFILES_DIR, exist_ok=True)
+        file_path = os.path.join(
+            settings.PROFILES_DIR,
+            f"tracemalloc_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}_{uuid.uuid4().hex[:6]}.snapshot"
+        )
+        snapshot.dump(file_path)
+
+        top_allocations = [
+            {'location': str(stat.traceback), 'size_bytes': stat.size, 'count': stat.count}
+            for stat in snapshot.statistics('lineno')[:top]
+        ]
+        growth = None
+        if ProfilingService._last_snapshot is not None:
+            growth = [
+                {'location': str(stat.traceback), 'size_diff_bytes': stat.size_diff, 'count_diff': stat.count_diff}
+                for stat in snapshot.compare_to(ProfilingService._last_snapshot, 'lineno')[:top]
+            ]
+        ProfilingService._last_snapshot = snapshot
+
+        return {
+            **ProfilingService.tracemalloc_status(),
+            'file_path': file_path,
+            'top_allocations': top_allocations,
+            'growth_since_last_snapshot': growth
+        }
+
+class RequestProfilingMiddleware:
+    """ASGI middleware profiling requests sent with ``X-Profile`` and a valid ``X-Admin-Token``.
+
+    ``X-Profile`` is ``1`` or a profiler name. The session id is returned in
+    the ``X-Profile-Id`` response header; the output file is listed by the
+    admin profiling endpoints.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get('headers', []))
+        requested = headers.get(b'x-profile')
+        if requested is None:
+            await self.app(scope, receive, send)
+            return
+        if not is_admin_token((headers.get(b'x-admin-token') or b'').decode('latin-1')):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = requested.decode('latin-1').lower()
+        try:
+            session = ProfilingService.begin_request_profile(scope['method'], scope['path'], None if profiler in ('1', 'true') else profiler)
+        except (RuntimeError, ValueError):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                message = {**message, 'headers': list(message.get('headers', [])) + [(b'x-profile-id', session['id'].encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            ProfilingService.end_request_profile(session)
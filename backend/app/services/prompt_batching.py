@@ -0,0 +1,132 @@
+import contextvars
+import math
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Callable, Optional
+from app.core.llm_usage import check_llm_budget, usage_scope
+import logging
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]+")
+
+def estimate_tokens(text: str) -> int:
+    """Local token estimate for prompt sizing (no tokenizer download or API call).
+
+    Words cost one token per ~4 letters, numbers one per ~3 digits and
+    punctuation runs one per ~2 characters, which tracks BPE tokenizers
+    closely enough on JSON-heavy prompts to stay on the safe side of a budget.
+    """
+    tokens = 0
+    for piece in _TOKEN_PATTERN.findall(text):
+        if piece[0].isalpha():
+            tokens += math.ceil(len(piece) / 4)
+        elif piece[0].isdigit():
+            tokens += math.ceil(len(piece) / 3)
+        else:
+            tokens += math.ceil(len(piece) / 2)
+    return tokens
+
+class RequestPacer:
+    """Thread-safe minimum spacing between request starts (requests per minute limit)"""
+
+    def __init__(self, requests_per_minute: Optional[float]):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self.lock = threading.Lock()
+        self.next_start = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_start)
+            self.next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+class PromptBatcher:
+    """Packs items into prompts under a token budget and runs the batches concurrently.
+
+    Each item has a key (e.g. ``"GET_/users"``) and a token cost. The worker
+    receives a batch and returns results keyed by item key; items of batches
+    that raised, or whose keys are missing from the worker's result, are
+    re-packed into batches half the previous size and retried. Items still
+    missing after the last round are reported back to the caller, which
+    decides how to fill them in.
+    """
+
+    @staticmethod
+    def plan_batches(items: List[Any], costs: List[int], token_budget: int, max_items: Optional[int] = None) -> List[List[Any]]:
+        """Greedy in-order packing; an item over budget on its own gets a batch to itself"""
+        batches: List[List[Any]] = []
+        current: List[Any] = []
+        current_tokens = 0
+        for item, cost in zip(items, costs):
+            full = max_items is not None and len(current) >= max_items
+            if current and (current_tokens + cost > token_budget or full):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(item)
+            current_tokens += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def run(items: List[Any], key: Callable[[Any], str], cost: Callable[[Any], int], worker: Callable[[List[Any]], Dict[str, Any]],
+            token_budget: int, max_items: Optional[int] = None, concurrency: int = 1, requests_per_minute: Optional[float] = None,
+            max_retries: int = 1, retry_delay: float = 1.0) -> Dict[str, Any]:
+        """Run every batch through ``worker`` and merge the results by item key.
+
+        Returns ``{'results': {key: value}, 'failed': [items], 'batches': n, 'rounds': n}``.
+        """
+        costs = {key(item): cost(item) for item in items}
+        pacer = RequestPacer(requests_per_minute)
+        results: Dict[str, Any] = {}
+        pending = list(items)
+        batch_count = 0
+        rounds = 0
+
+        def run_batch(batch: List[Any], round_index: int) -> Dict[str, Any]:
+            pacer.wait()
+            with usage_scope(retry=round_index):
+                return worker(batch)
+
+        while pending and rounds <= max_retries:
+            if rounds:
+                # Workers report a spent budget as an ordinary failure; don't retry into it
+                check_llm_budget()
+                logger.info(f"Retrying {len(pending)} items after failed batches (round {rounds + 1})")
+                time.sleep(retry_delay * (2 ** (rounds - 1)))
+            # Retry rounds pack into smaller batches so truncated outputs get more room
+            shrink = 2 ** rounds
+            batches = PromptBatcher.plan_batches(
+                pending, [costs[key(item)] for item in pending],
+                max(1, token_budget // shrink), max(1, max_items // shrink) if max_items else None
+            )
+            batch_count += len(batches)
+            rounds += 1
+
+            with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(batches)))) as pool:
+                # Each worker gets a copy of the caller's context, so its LLM calls reach the caller's usage ledger
+                futures = [(batch, pool.submit(contextvars.copy_context().run, run_batch, batch, rounds - 1)) for batch in batches]
+                failed = []
+                for batch, future in futures:
+                    try:
+                        batch_results = future.result() or {}
+                    except Exception as e:
+                        logger.warning(f"Batch of {len(batch)} items failed: {str(e)}")
+                        failed.extend(batch)
+                        continue
+                    for item in batch:
+                        item_key = key(item)
+                        if item_key in batch_results:
+                            results[item_key] = batch_results[item_key]
+                        else:
+                            failed.append(item)
+            pending = failed
+
+        return {'results': results, 'failed': pending, 'batches': batch_count, 'rounds': rounds}
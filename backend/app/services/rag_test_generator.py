@@ -1,12 +1,14 @@
-import json
 import random
 import string
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable
 from datetime import datetime, timedelta
 import openai
 from app.models.test_case import TestCaseType, TestCasePriority
 from app.core.config import settings
-from app.core.ai_config import ai_config
+from app.core.ai_config import ai_config, llm_categories
+from app.core.metrics import track_llm_call, record_llm_calls_avoided
+from app.services.spec_index import SpecIndex, minify_json
+from app.services.llm_streaming import read_openai_json_object, validate_test_case_data, emit_test_case, emit_test_cases
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,6 +16,9 @@ logger = logging.getLogger(__name__)
 class RAGTestGenerator:
     """RAG-based test generator using OpenAI and OpenAPI context"""
     
+    # Categories with a prompt, one call each
+    TEST_TYPES = ("normal", "edge_case", "security", "business_logic")
+    
     def __init__(self):
         self.openai_client = None
         self.is_available = False
@@ -32,44 +37,36 @@ class RAGTestGenerator:
                 logger.warning(f"OpenAI API not available: {str(e)}")
                 self.is_available = False
     
-    def generate_rag_test_cases(self, endpoint: Dict[str, Any], api_spec: Dict[str, Any], base_url: str = "") -> List[Dict[str, Any]]:
-        """Generate test cases using RAG approach with OpenAPI context"""
+    def generate_rag_test_cases(self, endpoint: Dict[str, Any], api_spec: Dict[str, Any], base_url: str = "", on_test_case: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """Generate test cases using RAG approach with OpenAPI context
+
+        ``on_test_case(endpoint_key, test_case)`` receives each test case as soon as it is ready.
+        """
         if not self.is_available:
             logger.warning("OpenAI API not available, falling back to rule-based generation")
-            return self._fallback_generation(endpoint, base_url)
+            return emit_test_cases(on_test_case, endpoint, self._fallback_generation(endpoint, base_url))
         
         try:
             # Create context from OpenAPI spec
             context = self._create_api_context(endpoint, api_spec)
             
-            # Generate test cases using RAG
+            # Generate test cases using RAG, one call per category the rule engine does not cover
             test_cases = []
+            categories = llm_categories()
+            record_llm_calls_avoided('openai', [test_type for test_type in self.TEST_TYPES if test_type not in categories])
             
-            # Normal test case with RAG
-            normal_case = self._generate_rag_test_case(endpoint, context, "normal", base_url)
-            if normal_case:
-                test_cases.append(normal_case)
-            
-            # Edge case with RAG
-            edge_case = self._generate_rag_test_case(endpoint, context, "edge_case", base_url)
-            if edge_case:
-                test_cases.append(edge_case)
-            
-            # Security test case with RAG
-            security_case = self._generate_rag_test_case(endpoint, context, "security", base_url)
-            if security_case:
-                test_cases.append(security_case)
-            
-            # Business logic test case with RAG
-            business_case = self._generate_rag_test_case(endpoint, context, "business_logic", base_url)
-            if business_case:
-                test_cases.append(business_case)
+            for test_type in self.TEST_TYPES:
+                if test_type not in categories:
+                    continue
+                test_case = self._generate_rag_test_case(endpoint, context, test_type, base_url)
+                if test_case:
+                    test_cases.append(emit_test_case(on_test_case, endpoint, test_case))
             
             return test_cases
             
         except Exception as e:
             logger.error(f"RAG generation failed: {str(e)}, falling back to rule-based")
-            return self._fallback_generation(endpoint, base_url)
+            return emit_test_cases(on_test_case, endpoint, self._fallback_generation(endpoint, base_url))
     
     def _create_api_context(self, endpoint: Dict[str, Any], api_spec: Dict[str, Any]) -> str:
         """Create context string from OpenAPI specification"""
@@ -102,7 +99,7 @@ class RAGTestGenerator:
             context_parts.append("\nRequest Body Schema:")
             schema = self._extract_schema_from_request_body(endpoint['request_body'])
             if schema:
-                context_parts.append(json.dumps(schema, indent=2))
+                context_parts.append(minify_json(schema))
         
         # Response schemas
         if endpoint.get('responses'):
@@ -111,12 +108,18 @@ class RAGTestGenerator:
                 context_parts.append(f"  {status_code}: {response.get('description', 'No description')}")
                 schema = self._extract_schema_from_response(response)
                 if schema:
-                    context_parts.append(f"    Schema: {json.dumps(schema, indent=4)}")
+                    context_parts.append(f"    Schema: {minify_json(schema)}")
         
         # Tags and categories
         if endpoint.get('tags'):
             context_parts.append(f"\nTags: {', '.join(endpoint['tags'])}")
         
+        # Referenced schemas, auth schemes and related operations retrieved from the spec index
+        related = SpecIndex.for_spec(api_spec).related_context(endpoint)
+        if related:
+            context_parts.append("\nRelated Components:")
+            context_parts.append(related)
+        
         return "\n".join(context_parts)
     
     def _extract_schema_from_request_body(self, request_body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -151,26 +154,32 @@ class RAGTestGenerator:
             return None
         
         try:
-            response = self.openai_client.chat.completions.create(
-                model=ai_config.OPENAI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert API testing engineer. Generate realistic test cases based on the provided OpenAPI specification context. Return only valid JSON."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=ai_config.OPENAI_TEMPERATURE,
-                max_tokens=ai_config.OPENAI_MAX_TOKENS,
-                timeout=ai_config.OPENAI_TIMEOUT
-            )
+            with track_llm_call('openai', ai_config.OPENAI_MODEL) as call:
+                # Streamed, so the response is read only until the test case object is complete
+                stream = self.openai_client.chat.completions.create(
+                    model=ai_config.OPENAI_MODEL,
+                    messages=[
+                        {
+                            "role": "system",
+                            "content": "You are an expert API testing engineer. Generate realistic test cases based on the provided OpenAPI specification context. Return only valid JSON."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=ai_config.OPENAI_TEMPERATURE,
+                    max_tokens=ai_config.OPENAI_MAX_TOKENS,
+                    timeout=ai_config.OPENAI_TIMEOUT,
+                    stream=True
+                )
+                test_data, usage = read_openai_json_object(stream, prompt)
+                call.update(usage)
             
-            # Parse the response
-            content = response.choices[0].message.content
-            test_data = json.loads(content)
+            problem = "no complete JSON object in the response" if test_data is None else validate_test_case_data(test_data)
+            if problem:
+                logger.error(f"Invalid {test_type} test case from OpenAI: {problem}")
+                return None
             
             # Generate CURL command
             curl_command = self._generate_curl_command(endpoint, base_url, test_data.get('input_data', {}))
@@ -213,6 +222,7 @@ Generate a JSON response with the following structure:
     "description": "What this test validates",
     "priority": "low|medium|high|critical",
     "input_data": {{
+        "path_params": {{ /* values for path parameters, if any */ }},
         "body": {{ /* realistic request body data */ }},
         "query_params": {{ /* realistic query parameters */ }},
         "headers": {{ /* realistic headers */ }}
@@ -324,33 +334,8 @@ Focus on:
     
     def _generate_curl_command(self, endpoint: Dict[str, Any], base_url: str, test_data: Dict[str, Any]) -> str:
         """Generate CURL command for the test case"""
-        method = endpoint['method']
-        path = endpoint['path']
-        url = f"{base_url}{path}"
-        
-        curl_parts = [f"curl -X {method}"]
-        curl_parts.append('-H "Content-Type: application/json"')
-        
-        # Add headers
-        if test_data.get('headers'):
-            for key, value in test_data['headers'].items():
-                curl_parts.append(f'-H "{key}: {value}"')
-        
-        # Add request body
-        if method in ['POST', 'PUT', 'PATCH'] and test_data.get('body'):
-            body_json = json.dumps(test_data['body'])
-            curl_parts.append(f'-d \'{body_json}\'')
-        
-        # Add query parameters
-        if test_data.get('query_params'):
-            query_params = []
-            for key, value in test_data['query_params'].items():
-                query_params.append(f"{key}={value}")
-            if query_params:
-                url += "?" + "&".join(query_params)
-        
-        curl_parts.append(f'"{url}"')
-        return " ".join(curl_parts)
+        from app.services.test_generator import TestGenerator
+        return TestGenerator.generate_curl_command(endpoint, base_url, test_data)
     
     def _map_priority(self, priority_str: str) -> TestCasePriority:
         """Map string priority to enum"""
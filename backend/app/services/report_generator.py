@@ -3,11 +3,13 @@ import json
 from datetime import datetime
 from typing import List, Dict, Any
 from pathlib import Path
+from app.core.tracing import traced
 
 class ReportGenerator:
     """Service to generate test reports with inter-service analysis"""
     
     @staticmethod
+    @traced("report_generator.generate_test_report")
     def generate_test_report(service_name: str, results: List[Dict[str, Any]], execution_summary: Dict[str, Any]) -> str:
         """Generate a comprehensive test report with inter-service analysis"""
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -29,6 +31,7 @@ class ReportGenerator:
         return filepath
     
     @staticmethod
+    @traced("report_generator.generate_multi_service_report")
     def generate_multi_service_report(service_configs: Dict[str, Any], results: Dict[str, Any]) -> str:
         """Generate a comprehensive multi-service test report"""
         timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
@@ -69,6 +72,10 @@ class ReportGenerator:
 | ✅ Passed | {execution_summary.get('passed', 0)} | {(execution_summary.get('passed', 0) / execution_summary.get('total_tests', 1) * 100):.1f}% |
 | ❌ Failed | {execution_summary.get('failed', 0)} | {(execution_summary.get('failed', 0) / execution_summary.get('total_tests', 1) * 100):.1f}% |
 | ⚠️ Error | {execution_summary.get('errors', 0)} | {(execution_summary.get('errors', 0) / execution_summary.get('total_tests', 1) * 100):.1f}% |
+| ⏭️ Skipped | {execution_summary.get('skipped', 0)} | {(execution_summary.get('skipped', 0) / execution_summary.get('total_tests', 1) * 100):.1f}% |
+
+**Flaky Tests (passed on retry):** {execution_summary.get('flaky', 0)}  
+**Retries:** {execution_summary.get('retries', {}).get('retries', 0)} (denied by retry budget: {execution_summary.get('retries', {}).get('retries_denied', 0)})
 
 ## 🔍 Inter-Service Communication Analysis
 
@@ -114,7 +121,7 @@ class ReportGenerator:
         # Add detailed results
         for i, result in enumerate(results, 1):
             test_case = result.get('test_case', {})
-            status_emoji = "✅" if result.get('status') == 'passed' else "❌" if result.get('status') == 'failed' else "⚠️"
+            status_emoji = "✅" if result.get('status') == 'passed' else "❌" if result.get('status') == 'failed' else "⏭️" if result.get('status') == 'skipped' else "⚠️"
             
             content += f"""
 ### {status_emoji} Test {i}: {test_case.get('name', 'Unknown Test')}
@@ -122,7 +129,8 @@ class ReportGenerator:
 **Status:** {result.get('status', 'unknown').upper()}  
 **Response Code:** {result.get('response_status_code', 'N/A')}  
 **Response Time:** {result.get('response_time', 0)}ms  
-**Priority:** {test_case.get('priority', 'medium')}
+**Priority:** {test_case.get('priority', 'medium')}  
+**Attempts:** {result.get('attempt_count', 1)}{' (flaky: passed on retry)' if result.get('flaky') else ''}
 
 **Endpoint:** {test_case.get('method', 'GET')} {test_case.get('path', '')}
 
@@ -137,6 +145,10 @@ class ReportGenerator:
             if result.get('execution_log'):
                 content += f"**Execution Log:**\n```\n{result.get('execution_log', '')}\n```\n\n"
         
+        content += ReportGenerator._generate_schedule_section(execution_summary.get('schedule'))
+        content += ReportGenerator._generate_cassette_section(execution_summary.get('cassette'))
+        content += ReportGenerator._generate_concurrency_section(execution_summary.get('concurrency'))
+        
         content += f"""
 ## 🎯 Recommendations
 
@@ -205,13 +217,15 @@ class ReportGenerator:
             passed = len([r for r in service_results if r.get('status') == 'passed'])
             failed = len([r for r in service_results if r.get('status') == 'failed'])
             errors = len([r for r in service_results if r.get('status') == 'error'])
+            skipped = len([r for r in service_results if r.get('status') == 'skipped'])
             total = len(service_results)
-            success_rate = (passed / total * 100) if total > 0 else 0
+            executed = total - skipped
+            success_rate = (passed / executed * 100) if executed > 0 else 0
             
             content += f"""
 #### {service_name}
 - **Base URL:** {config.get('base_url', 'N/A')}
-- **Tests:** {total} (✅ {passed} | ❌ {failed} | ⚠️ {errors})
+- **Tests:** {total} (✅ {passed} | ❌ {failed} | ⚠️ {errors} | ⏭️ {skipped})
 - **Success Rate:** {success_rate:.1f}%
 """
         
@@ -283,7 +297,7 @@ class ReportGenerator:
             
             for i, result in enumerate(service_results, 1):
                 test_case = result.get('test_case', {})
-                status_emoji = "✅" if result.get('status') == 'passed' else "❌" if result.get('status') == 'failed' else "⚠️"
+                status_emoji = "✅" if result.get('status') == 'passed' else "❌" if result.get('status') == 'failed' else "⏭️" if result.get('status') == 'skipped' else "⚠️"
                 
                 content += f"""
 #### {status_emoji} Test {i}: {test_case.get('name', 'Unknown Test')}
@@ -299,6 +313,10 @@ class ReportGenerator:
                 if result.get('error_message'):
                     content += f"**Error:** {result.get('error_message')}\n\n"
         
+        content += ReportGenerator._generate_schedule_section(results.get('schedule'))
+        content += ReportGenerator._generate_cassette_section(results.get('cassette'))
+        content += ReportGenerator._generate_concurrency_section(results.get('concurrency'))
+        
         content += f"""
 
 ## 🎯 Multi-Service Recommendations
@@ -338,4 +356,76 @@ class ReportGenerator:
 *Report generated by APITestGen - Multi-Service Test Generation Tool*
 """
         
-        return content 
\ No newline at end of file
+        return content
+    
+    @staticmethod
+    def _generate_schedule_section(schedule: Dict[str, Any]) -> str:
+        """Generate markdown for run scheduling options and outcome"""
+        if not schedule:
+            return ""
+        
+        budget = schedule.get('time_budget_seconds')
+        threshold = schedule.get('fail_fast_threshold')
+        content = f"""
+## ⏱️ Run Scheduling
+
+- **Priority-first Ordering:** {'Yes' if schedule.get('priority_order') else 'No'}
+- **Fail-fast Threshold:** {f"{threshold:.0%}" if threshold is not None else 'Disabled'}
+- **Time Budget:** {f"{budget}s" if budget is not None else 'Unlimited'}
+- **Elapsed:** {schedule.get('elapsed_seconds', 0)}s
+- **Completed / Skipped:** {schedule.get('completed', 0)} / {schedule.get('skipped', 0)}
+"""
+        if schedule.get('aborted'):
+            content += f"- **Aborted:** {schedule.get('abort_reason')}\n"
+        
+        return content + "\n"
+    
+    @staticmethod
+    def _generate_cassette_section(cassette: Dict[str, Any]) -> str:
+        """Generate markdown for cassette record/replay usage and mismatch diffs"""
+        if not cassette:
+            return ""
+        
+        content = f"""
+## 📼 Cassette
+
+- **Cassette:** {cassette.get('name')}
+- **Mode:** {cassette.get('mode')}
+- **Replayed:** {cassette.get('hits', 0)}
+- **Recorded:** {cassette.get('recorded', 0)}
+- **Mismatches:** {cassette.get('misses', 0)}
+"""
+        for mismatch in cassette.get('mismatches', []):
+            content += f"\n**{mismatch.get('method')} {mismatch.get('url')}**\n```diff\n{mismatch.get('diff')}\n```\n"
+        
+        return content + "\n"
+    
+    @staticmethod
+    def _generate_concurrency_section(concurrency: Dict[str, Any]) -> str:
+        """Generate markdown for the per-host concurrency limit trajectory"""
+        if not concurrency or not concurrency.get('hosts'):
+            return ""
+        
+        mode = "Adaptive (AIMD)" if concurrency.get('adaptive') else "Fixed"
+        content = f"""
+## 🚦 Concurrency Control
+
+**Mode:** {mode}
+
+| Host | Final Limit | Min | Max | Samples | Backoffs | Min Latency |
+|------|-------------|-----|-----|---------|----------|-------------|
+"""
+        for host in concurrency['hosts']:
+            min_latency = host.get('min_latency_ms')
+            min_latency_text = f"{min_latency:.0f}ms" if min_latency is not None else "N/A"
+            content += f"| {host.get('host')} | {host.get('final_limit')} | {host.get('min_limit_reached')} | {host.get('max_limit_reached')} | {host.get('samples')} | {host.get('drops')} | {min_latency_text} |\n"
+        
+        for host in concurrency['hosts']:
+            trajectory = host.get('trajectory', [])
+            if len(trajectory) <= 1:
+                continue
+            content += f"\n**Limit trajectory for {host.get('host')}:** "
+            content += " → ".join(f"{point['limit']} ({point['reason']} @ {point['elapsed']}s)" for point in trajectory)
+            content += "\n"
+        
+        return content + "\n"
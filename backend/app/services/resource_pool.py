@@ -0,0 +1,225 @@
+import asyncio
+import json
+import re
+from collections import defaultdict, deque
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import quote, urlsplit
+from app.core.config import settings
+
+PATH_PARAMETER = re.compile(r'\{([^/{}]+)\}')
+
+# Response fields that carry the new resource's ID, checked in order
+ID_FIELDS = ('id', '_id', 'uuid')
+
+# Envelopes some APIs wrap the created resource in
+ID_ENVELOPES = ('data', 'result', 'item')
+
+# Cases expecting these are about resources that do not exist, so they never get a pooled ID
+NOT_FOUND_STATUS_CODES = (404, 410)
+
+# Execution stages after the creates: reads and updates, then deletes
+READ_STAGE = 1_000
+DELETE_STAGE = 2_000
+
+def substitute_path_params(path: str, path_params: Optional[Dict[str, Any]]) -> str:
+    """Fill ``{name}`` segments from ``path_params``; unknown names are left as they are"""
+    if not path_params or '{' not in path:
+        return path
+
+    def value_for(match: re.Match) -> str:
+        name = match.group(1)
+        if name not in path_params or path_params[name] is None:
+            return match.group(0)
+        return quote(str(path_params[name]), safe='')
+
+    return PATH_PARAMETER.sub(value_for, path)
+
+def singular_name(collection: str) -> str:
+    """categories -> category, /orders/17/items -> item"""
+    resource = collection.rstrip('/').rsplit('/', 1)[-1]
+    if resource.endswith('ies'):
+        return resource[:-3] + 'y'
+    return resource[:-1] if resource.endswith('s') else resource
+
+def is_create_operation(method: str, path: str) -> bool:
+    """POST to a collection: /products or /orders/{order_id}/items"""
+    segments = [segment for segment in path.rstrip('/').split('/') if segment]
+    return method.upper() == 'POST' and bool(segments) and not PATH_PARAMETER.fullmatch(segments[-1])
+
+def creation_stage(test_case: Dict[str, Any]) -> int:
+    """Creates run first, shallowest collections before nested ones; then reads and updates; deletes last"""
+    path = test_case.get('path') or ''
+    method = test_case.get('method', 'GET')
+    if is_create_operation(method, path):
+        return len(PATH_PARAMETER.findall(path))
+    if method.upper() == 'DELETE':
+        return DELETE_STAGE
+    return READ_STAGE
+
+class PathLease:
+    """Path parameter values one test case drew from the pool, held until it finishes"""
+
+    def __init__(self, values: Dict[str, Any], leased: List[Tuple[str, str, Any]], missing: List[str]):
+        self.values = values  # parameter name -> value, explicit ones included
+        self.leased = leased  # (parameter name, collection, id) taken from the pool
+        self.missing = missing  # parameters no ID was available for
+
+class ResourcePool:
+    """IDs of resources created during a run, leased to test cases whose paths need them.
+
+    Create operations (``POST /products``) add the ID from their response
+    under the resolved collection path (``/products``, ``/orders/17/items``).
+    A test case for ``/products/{product_id}`` leases one of them for the
+    duration of its attempts, so concurrent cases never act on the same
+    resource at the same time; a successful DELETE retires its ID instead of
+    returning it. Values in the case's own ``input_data.path_params`` always
+    win over the pool, and cases expecting 404/410 are left as they are.
+    """
+
+    def __init__(self, seed: Optional[Dict[str, List[Any]]] = None, wait_seconds: Optional[float] = None):
+        self.wait_seconds = settings.RESOURCE_POOL_WAIT_SECONDS if wait_seconds is None else wait_seconds
+        self.available: Dict[str, deque] = defaultdict(deque)
+        self.in_use: Dict[str, int] = defaultdict(int)
+        self.known: Dict[str, set] = defaultdict(set)  # every ID ever pooled, so one is never handed out twice
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {
+            'seeded': 0, 'created': 0, 'leases': 0, 'waits': 0, 'misses': 0, 'retired': 0
+        })
+        self.condition = asyncio.Condition()
+        for collection, ids in (seed or {}).items():
+            collection = ResourcePool._collection_key(collection)
+            for resource_id in ids:
+                if resource_id in self.known[collection]:
+                    continue
+                self.known[collection].add(resource_id)
+                self.available[collection].append(resource_id)
+                self.stats[collection]['seeded'] += 1
+
+    @staticmethod
+    def _collection_key(path: str) -> str:
+        return '/' + path.strip('/')
+
+    async def lease(self, test_case: Dict[str, Any]) -> Optional[PathLease]:
+        """Values for every path parameter of the case, drawing missing ones from the pool"""
+        path = test_case.get('path') or ''
+        if '{' not in path or test_case.get('expected_status_code') in NOT_FOUND_STATUS_CODES:
+            return None
+        explicit = (test_case.get('input_data') or {}).get('path_params') or {}
+        values: Dict[str, Any] = {}
+        leased: List[Tuple[str, str, Any]] = []
+        missing: List[str] = []
+
+        # Outer parameters first: the collection of /orders/{order_id}/items/{item_id}'s
+        # item_id is /orders/<the leased order_id>/items. Taking them in path order
+        # also keeps two cases from each waiting for an ID the other holds.
+        prefix = ''
+        for segment in [segment for segment in path.split('/') if segment]:
+            match = PATH_PARAMETER.fullmatch(segment)
+            if match is None:
+                prefix += '/' + substitute_path_params(segment, explicit)
+                continue
+            name = match.group(1)
+            if explicit.get(name) is not None:
+                values[name] = explicit[name]
+            elif not missing:
+                collection = ResourcePool._collection_key(prefix)
+                resource_id = await self._take(collection)
+                if resource_id is None:
+                    missing.append(name)
+                else:
+                    values[name] = resource_id
+                    leased.append((name, collection, resource_id))
+            else:
+                missing.append(name)
+            prefix += '/' + (quote(str(values[name]), safe='') if name in values else segment)
+        return PathLease(values, leased, missing)
+
+    async def _take(self, collection: str) -> Optional[Any]:
+        async with self.condition:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.wait_seconds
+            while not self.available[collection]:
+                remaining = deadline - loop.time()
+                # Nothing leased can come back, or waited long enough
+                if not self.in_use[collection] or remaining <= 0:
+                    self.stats[collection]['misses'] += 1
+                    return None
+                self.stats[collection]['waits'] += 1
+                try:
+                    await asyncio.wait_for(self.condition.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+            self.in_use[collection] += 1
+            self.stats[collection]['leases'] += 1
+            return self.available[collection].popleft()
+
+    async def release(self, lease: Optional[PathLease], test_case: Dict[str, Any], result: Optional[Dict[str, Any]]):
+        """Return leased IDs; the target of a successful DELETE is retired"""
+        if lease is None or not lease.leased:
+            return
+        status_code = (result or {}).get('response_status_code')
+        deleted = None
+        if test_case.get('method', 'GET').upper() == 'DELETE' and status_code is not None and 200 <= status_code < 300:
+            # DELETE /orders/{order_id}/items/{item_id} removes the item, not the order
+            last_segment = PATH_PARAMETER.fullmatch((test_case.get('path') or '').rstrip('/').rsplit('/', 1)[-1])
+            deleted = last_segment.group(1) if last_segment else None
+        async with self.condition:
+            for name, collection, resource_id in lease.leased:
+                self.in_use[collection] -= 1
+                if name == deleted:
+                    self.stats[collection]['retired'] += 1
+                else:
+                    self.available[collection].append(resource_id)
+            self.condition.notify_all()
+
+    async def record(self, test_case: Dict[str, Any], lease: Optional[PathLease], result: Dict[str, Any]):
+        """Add the ID a successful create operation returned"""
+        path = test_case.get('path') or ''
+        status_code = result.get('response_status_code')
+        if not is_create_operation(test_case.get('method', 'GET'), path) or status_code is None or not 200 <= status_code < 300:
+            return
+        values = lease.values if lease is not None else (test_case.get('input_data') or {}).get('path_params')
+        collection = ResourcePool._collection_key(substitute_path_params(path, values))
+        if '{' in collection:
+            return
+        resource_id = ResourcePool.extract_id(collection, result.get('response_body'), result.get('location'))
+        if resource_id is None:
+            return
+        async with self.condition:
+            if resource_id in self.known[collection]:
+                return
+            self.known[collection].add(resource_id)
+            self.available[collection].append(resource_id)
+            self.stats[collection]['created'] += 1
+            self.condition.notify_all()
+
+    @staticmethod
+    def extract_id(collection: str, body: Optional[str], location: Optional[str] = None) -> Optional[Any]:
+        """ID of a created resource from its JSON body, else from the Location header"""
+        singular = singular_name(collection)
+        fields = ID_FIELDS + (f"{singular}_id", f"{singular}Id")
+
+        try:
+            data = json.loads(body) if body else None
+        except (TypeError, ValueError):
+            data = None
+        candidates = [data]
+        if isinstance(data, dict):
+            candidates += [data.get(key) for key in ID_ENVELOPES + (singular,)]
+        for candidate in candidates:
+            if not isinstance(candidate, dict):
+                continue
+            for field in fields:
+                value = candidate.get(field)
+                if isinstance(value, (str, int)) and not isinstance(value, bool) and value != '':
+                    return value
+
+        if location:
+            last_segment = urlsplit(location).path.rstrip('/').rsplit('/', 1)[-1]
+            return last_segment or None
+        return None
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        return {
+            collection: {**stats, 'available': len(self.available[collection])}
+            for collection, stats in sorted(self.stats.items())
+        }
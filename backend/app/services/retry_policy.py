@@ -0,0 +1,134 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Any, Optional
+from app.core.config import settings
+
+# Error classes reported by TestExecutor._execute_http_request
+RETRYABLE_ERROR_TYPES = {'timeout', 'connect', 'request'}
+
+class RetryPolicy:
+    """When and how long to wait before re-running a test case attempt"""
+
+    def __init__(self, max_attempts: int = None, base_delay: float = None, max_delay: float = None, jitter: bool = True, retry_on_status: List[int] = None, retry_on_errors: List[str] = None, respect_retry_after: bool = True):
+        self.max_attempts = max(1, max_attempts if max_attempts is not None else settings.RETRY_MAX_ATTEMPTS)
+        self.base_delay = base_delay if base_delay is not None else settings.RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else settings.RETRY_MAX_DELAY
+        self.jitter = jitter
+        self.retry_on_status = set(retry_on_status if retry_on_status is not None else [429, 502, 503, 504])
+        self.retry_on_errors = set(retry_on_errors if retry_on_errors is not None else ['timeout', 'connect']) & RETRYABLE_ERROR_TYPES
+        self.respect_retry_after = respect_retry_after
+
+    @staticmethod
+    def from_options(options: Optional[Dict[str, Any]]) -> 'RetryPolicy':
+        """Build a policy from request or test case options (unset keys use defaults)"""
+        options = options or {}
+        return RetryPolicy(
+            max_attempts=options.get('max_attempts'),
+            base_delay=options.get('base_delay'),
+            max_delay=options.get('max_delay'),
+            jitter=options.get('jitter', True),
+            retry_on_status=options.get('retry_on_status'),
+            retry_on_errors=options.get('retry_on_errors'),
+            respect_retry_after=options.get('respect_retry_after', True)
+        )
+
+    def with_overrides(self, overrides: Optional[Dict[str, Any]]) -> 'RetryPolicy':
+        """Policy for one test case: the run policy with the case's own settings on top"""
+        if not overrides:
+            return self
+        merged = {
+            'max_attempts': self.max_attempts,
+            'base_delay': self.base_delay,
+            'max_delay': self.max_delay,
+            'jitter': self.jitter,
+            'retry_on_status': sorted(self.retry_on_status),
+            'retry_on_errors': sorted(self.retry_on_errors),
+            'respect_retry_after': self.respect_retry_after
+        }
+        merged.update({k: v for k, v in overrides.items() if k in merged and v is not None})
+        return RetryPolicy.from_options(merged)
+
+    def is_retryable(self, result: Dict[str, Any], test_case: Dict[str, Any]) -> bool:
+        """Whether an attempt's outcome is worth retrying"""
+        if result.get('status') == 'passed':
+            return False
+
+        status_code = result.get('response_status_code')
+        if status_code is not None:
+            # A case that expects e.g. 429 has simply passed or failed on its own terms
+            if status_code == test_case.get('expected_status_code'):
+                return False
+            return status_code in self.retry_on_status
+
+        return result.get('error_type') in self.retry_on_errors
+
+    def retry_delay(self, attempt: int, result: Dict[str, Any], test_case: Dict[str, Any]) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to stop retrying"""
+        if attempt >= self.max_attempts or not self.is_retryable(result, test_case):
+            return None
+
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        if self.jitter:
+            # Full jitter spreads retries from concurrent cases apart
+            delay = random.uniform(0, delay)
+
+        if self.respect_retry_after:
+            retry_after = RetryPolicy.parse_retry_after(result.get('retry_after'))
+            if retry_after is not None:
+                if retry_after > settings.RETRY_MAX_RETRY_AFTER:
+                    # The server asked for a longer pause than a test run should wait
+                    return None
+                delay = max(delay, retry_after)
+
+        return delay
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date"""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class RetryBudget:
+    """Caps retries in a run to a fraction of first attempts.
+
+    Keeps retries from multiplying load on a target that is already
+    rate limiting or failing.
+    """
+
+    def __init__(self, ratio: float = None, min_retries: int = None):
+        self.ratio = ratio if ratio is not None else settings.RETRY_BUDGET_RATIO
+        self.min_retries = min_retries if min_retries is not None else settings.RETRY_BUDGET_MIN_RETRIES
+        self.requests = 0
+        self.retries = 0
+        self.denied = 0
+
+    def record_request(self):
+        """Count a first attempt"""
+        self.requests += 1
+
+    def try_acquire(self) -> bool:
+        """Take one retry from the budget if any is left"""
+        if self.retries < self.min_retries + self.ratio * self.requests:
+            self.retries += 1
+            return True
+        self.denied += 1
+        return False
+
+    def summary(self) -> Dict[str, Any]:
+        """Retry budget usage for run reports"""
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'retries_denied': self.denied
+        }
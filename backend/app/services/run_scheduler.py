@@ -0,0 +1,121 @@
+import time
+from typing import Dict, List, Any, Optional
+
+# Lower rank runs first
+PRIORITY_RANK = {
+    'critical': 0,
+    'high': 1,
+    'medium': 2,
+    'low': 3
+}
+
+class RunScheduler:
+    """Decides run order and whether queued test cases may still start.
+
+    Supports priority-first ordering, fail-fast abort once the failure rate
+    passes a threshold, and a wall-clock budget. Cases that never start are
+    reported as skipped instead of being silently dropped.
+    """
+
+    def __init__(self, priority_order: bool = False, fail_fast_threshold: Optional[float] = None, fail_fast_min_results: int = 10, time_budget_seconds: Optional[float] = None):
+        self.priority_order = priority_order
+        self.fail_fast_threshold = fail_fast_threshold
+        self.fail_fast_min_results = max(1, fail_fast_min_results)
+        self.time_budget_seconds = time_budget_seconds
+
+        self.started_at = time.monotonic()
+        self.completed = 0
+        self.unsuccessful = 0
+        self.skipped = 0
+        self.abort_reason: Optional[str] = None
+        # Exponentially weighted average duration of a test case, in seconds
+        self.estimated_duration: Optional[float] = None
+
+    @staticmethod
+    def from_options(options: Optional[Dict[str, Any]]) -> Optional['RunScheduler']:
+        """Build a scheduler from request options, or None when nothing is set"""
+        if not options:
+            return None
+        return RunScheduler(
+            priority_order=options.get('priority_order', False),
+            fail_fast_threshold=options.get('fail_fast_threshold'),
+            fail_fast_min_results=options.get('fail_fast_min_results', 10),
+            time_budget_seconds=options.get('time_budget_seconds')
+        )
+
+    def order(self, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Return test cases in execution order (stable within a priority)"""
+        if not self.priority_order:
+            return list(test_cases)
+        return sorted(test_cases, key=lambda tc: PRIORITY_RANK.get(str(tc.get('priority') or 'medium').lower(), len(PRIORITY_RANK)))
+
+    def remaining_budget(self) -> Optional[float]:
+        """Seconds left in the wall-clock budget, if one is set"""
+        if self.time_budget_seconds is None:
+            return None
+        return self.time_budget_seconds - (time.monotonic() - self.started_at)
+
+    def skip_reason(self) -> Optional[str]:
+        """Reason the next test case must not start, or None if it may run"""
+        if self.abort_reason:
+            return self.abort_reason
+
+        remaining = self.remaining_budget()
+        if remaining is not None:
+            if remaining <= 0:
+                return f"Time budget of {self.time_budget_seconds}s exhausted"
+            if self.estimated_duration is not None and self.estimated_duration > remaining:
+                return f"Not enough time budget left ({remaining:.1f}s) for an estimated {self.estimated_duration:.1f}s test"
+
+        return None
+
+    def record(self, result: Dict[str, Any]):
+        """Feed a finished test case back into the fail-fast and budget state"""
+        if result.get('status') == 'skipped':
+            self.skipped += 1
+            return
+
+        self.completed += 1
+        if result.get('status') in ('failed', 'error'):
+            self.unsuccessful += 1
+
+        duration = (result.get('response_time') or 0) / 1000
+        if self.estimated_duration is None:
+            self.estimated_duration = duration
+        else:
+            self.estimated_duration = 0.8 * self.estimated_duration + 0.2 * duration
+
+        if (self.fail_fast_threshold is not None and self.abort_reason is None
+                and self.completed >= self.fail_fast_min_results):
+            failure_rate = self.unsuccessful / self.completed
+            if failure_rate > self.fail_fast_threshold:
+                self.abort_reason = (
+                    f"Fail-fast: failure rate {failure_rate:.0%} exceeded "
+                    f"{self.fail_fast_threshold:.0%} after {self.completed} tests"
+                )
+
+    @staticmethod
+    def skipped_result(reason: str) -> Dict[str, Any]:
+        """Result entry for a test case that was never started"""
+        return {
+            'status': 'skipped',
+            'response_status_code': None,
+            'response_body': None,
+            'response_time': 0,
+            'error_message': reason,
+            'execution_log': f"Skipped: {reason}",
+            'service_calls': []
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Scheduling outcome for run reports"""
+        return {
+            'priority_order': self.priority_order,
+            'fail_fast_threshold': self.fail_fast_threshold,
+            'time_budget_seconds': self.time_budget_seconds,
+            'elapsed_seconds': round(time.monotonic() - self.started_at, 3),
+            'completed': self.completed,
+            'skipped': self.skipped,
+            'aborted': self.abort_reason is not None,
+            'abort_reason': self.abort_reason
+        }
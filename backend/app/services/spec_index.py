@@ -0,0 +1,330 @@
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Any, Optional, Set
+from app.core.config import settings
+from app.core.ai_config import ai_config
+from app.services.prompt_batching import estimate_tokens
+import logging
+
+logger = logging.getLogger(__name__)
+
+HTTP_METHODS = ('get', 'post', 'put', 'delete', 'patch')
+COMPONENT_KINDS = {
+    'schemas': 'schema',
+    'parameters': 'parameter',
+    'requestBodies': 'request_body',
+    'responses': 'response',
+    'securitySchemes': 'security'
+}
+INDEX_VERSION = 1
+
+_WORD_PATTERN = re.compile(r"[A-Za-z][a-z]*|[A-Z]+(?![a-z])|\d+")
+_STOPWORDS = {'a', 'an', 'and', 'the', 'of', 'to', 'in', 'for', 'is', 'on', 'by', 'with', 'or', 'be', 'this', 'that', 'as', 'at', 'it', 'from'}
+
+def minify_json(value: Any) -> str:
+    """Compact JSON for prompts (no indentation whitespace)"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=str)
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case terms, splitting camelCase, snake_case and path segments"""
+    return [word.lower() for word in _WORD_PATTERN.findall(text) if word.lower() not in _STOPWORDS]
+
+def compact_schema(value: Any) -> Any:
+    """Schema without display-only ``title`` strings (generated for every field by FastAPI)"""
+    if isinstance(value, dict):
+        return {key: compact_schema(item) for key, item in value.items() if not (key == 'title' and isinstance(item, str))}
+    if isinstance(value, list):
+        return [compact_schema(item) for item in value]
+    return value
+
+def spec_hash(spec_content: Dict[str, Any]) -> str:
+    return hashlib.sha256(minify_json(spec_content).encode('utf-8')).hexdigest()[:32]
+
+def _collect_refs(value: Any, refs: Set[str]):
+    if isinstance(value, dict):
+        ref = value.get('$ref')
+        if isinstance(ref, str) and ref.startswith('#/'):
+            refs.add(ref)
+        for item in value.values():
+            _collect_refs(item, refs)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_refs(item, refs)
+
+class SpecIndex:
+    """BM25 retrieval index over the operations and components of one API spec.
+
+    Chunks are operations, shared components (schemas, parameters, request
+    bodies, responses, security schemes) and the API description. Generators
+    ask for the context of an endpoint: components it references (followed
+    transitively), the security schemes it uses, then the best BM25 matches
+    for its path, summary and tags, all minified and capped at a token budget.
+
+    Indexes are keyed by a hash of the spec content, built at import and
+    persisted as JSON under ``SPEC_INDEX_DIR``.
+    """
+
+    K1 = 1.5
+    B = 0.75
+
+    _cache: 'OrderedDict[str, SpecIndex]' = OrderedDict()
+    _cache_size = 32
+    _lock = threading.Lock()
+    _last_spec: Optional[Dict[str, Any]] = None
+    _last_index: Optional['SpecIndex'] = None
+
+    def __init__(self, spec_hash: str, chunks: List[Dict[str, Any]], default_security: Optional[List[Dict[str, Any]]] = None):
+        self.spec_hash = spec_hash
+        self.chunks = chunks
+        self.default_security = default_security
+        self.by_id = {chunk['id']: chunk for chunk in chunks}
+        doc_lengths = [len(chunk['terms']) for chunk in chunks]
+        avg_length = (sum(doc_lengths) / len(chunks)) if chunks else 0.0
+        # Inverted index: term -> [(chunk position, term frequency, length norm)]
+        self.postings: Dict[str, List[tuple]] = {}
+        for position, chunk in enumerate(chunks):
+            norm = self.K1 * (1 - self.B + self.B * doc_lengths[position] / (avg_length or 1))
+            for term, freq in Counter(chunk['terms']).items():
+                self.postings.setdefault(term, []).append((position, freq, norm))
+        total = len(chunks)
+        self.idf = {term: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5)) for term, postings in self.postings.items()}
+
+    @staticmethod
+    def build(spec_content: Dict[str, Any]) -> 'SpecIndex':
+        """Chunk a parsed OpenAPI spec (or Postman collection) and index it"""
+        chunks = []
+
+        info = spec_content.get('info', {})
+        if info.get('description'):
+            chunks.append(SpecIndex._chunk('info', 'info', info.get('title', 'API'), info.get('description', ''), {}))
+
+        for path, methods in (spec_content.get('paths') or {}).items():
+            if not isinstance(methods, dict):
+                continue
+            for method, operation in methods.items():
+                if method.lower() not in HTTP_METHODS or not isinstance(operation, dict):
+                    continue
+                title = f"{method.upper()} {path}"
+                text = ' '.join([
+                    title, operation.get('operationId', ''), operation.get('summary', ''),
+                    operation.get('description', ''), ' '.join(operation.get('tags', []))
+                ])
+                chunks.append(SpecIndex._chunk(
+                    f"operation:{method.upper()} {path}", 'operation', title, text, operation,
+                    summary=SpecIndex._operation_summary(operation)
+                ))
+
+        for section, kind in COMPONENT_KINDS.items():
+            for name, component in ((spec_content.get('components') or {}).get(section) or {}).items():
+                text = f"{name} {component.get('description', '') if isinstance(component, dict) else ''}"
+                chunks.append(SpecIndex._chunk(f"#/components/{section}/{name}", kind, name, text, component))
+
+        # Postman collections: one chunk per request
+        if 'item' in spec_content and not chunks:
+            SpecIndex._postman_chunks(spec_content.get('item', []), chunks)
+
+        return SpecIndex(spec_hash(spec_content), chunks, spec_content.get('security'))
+
+    @staticmethod
+    def _operation_summary(operation: Dict[str, Any]) -> str:
+        """One-line description of a linked operation (its full JSON is rarely worth the tokens)"""
+        parts = [operation.get('summary') or operation.get('operationId') or '']
+        params = [f"{p.get('name')}({p.get('in')})" for p in operation.get('parameters', []) if isinstance(p, dict) and p.get('name')]
+        if params:
+            parts.append(f"params: {', '.join(params)}")
+        body_refs: Set[str] = set()
+        _collect_refs(operation.get('requestBody'), body_refs)
+        if body_refs:
+            parts.append(f"body: {', '.join(ref.rsplit('/', 1)[-1] for ref in sorted(body_refs))}")
+        success = [code for code in operation.get('responses', {}) if str(code).startswith('2')]
+        if success:
+            parts.append(f"returns: {', '.join(str(code) for code in success)}")
+        return '; '.join(part for part in parts if part)
+
+    @staticmethod
+    def _chunk(chunk_id: str, kind: str, title: str, text: str, content: Any, summary: Optional[str] = None) -> Dict[str, Any]:
+        full_body = minify_json(compact_schema(content)) if content else ''
+        body = summary if summary is not None else full_body
+        refs: Set[str] = set()
+        if kind == 'operation' and isinstance(content, dict):
+            # Follow what the operation sends and gets back on success, not shared error bodies
+            _collect_refs([content.get('parameters'), content.get('requestBody')], refs)
+            _collect_refs([response for code, response in content.get('responses', {}).items() if str(code).startswith('2')], refs)
+        else:
+            _collect_refs(content, refs)
+        # Schema property names and enum values are good retrieval terms
+        terms = tokenize(f"{title} {text} {title}") + tokenize(' '.join(re.findall(r'"([A-Za-z_][\w-]*)"', full_body)))
+        return {
+            'id': chunk_id,
+            'kind': kind,
+            'title': title,
+            'content': body,
+            'refs': sorted(refs),
+            'security': content.get('security') if kind == 'operation' and isinstance(content, dict) else None,
+            'terms': terms,
+            'tokens': estimate_tokens(body) + estimate_tokens(title)
+        }
+
+    @staticmethod
+    def _postman_chunks(items: List[Dict[str, Any]], chunks: List[Dict[str, Any]]):
+        for item in items:
+            if 'item' in item:
+                SpecIndex._postman_chunks(item['item'], chunks)
+            elif 'request' in item and isinstance(item['request'], dict):
+                request = item['request']
+                url = request.get('url', '')
+                raw = url.get('raw', '') if isinstance(url, dict) else str(url)
+                title = f"{request.get('method', 'GET').upper()} {raw}"
+                chunks.append(SpecIndex._chunk(f"operation:{title}", 'operation', title, f"{item.get('name', '')} {request.get('description', '')}", request))
+
+    def search(self, query: str, top_k: int = 5, exclude: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
+        """Best BM25 matches for a free-text query"""
+        exclude = exclude or set()
+        terms = {term for term in tokenize(query) if term in self.idf}
+        # Terms in most chunks ('id', 'string', ...) barely move the ranking but dominate the cost
+        selective = {term for term in terms if len(self.postings[term]) * 2 <= len(self.chunks)}
+        scores: Dict[int, float] = {}
+        for term in selective or terms:
+            idf = self.idf[term]
+            for position, freq, norm in self.postings[term]:
+                scores[position] = scores.get(position, 0.0) + idf * freq * (self.K1 + 1) / (freq + norm)
+        ranked = heapq.nsmallest(
+            top_k + len(exclude), ((-score, position) for position, score in scores.items())
+        )
+        return [self.chunks[position] for _, position in ranked if self.chunks[position]['id'] not in exclude][:top_k]
+
+    def related_chunks(self, endpoint: Dict[str, Any], top_k: int = None, token_budget: int = None) -> List[Dict[str, Any]]:
+        """Chunks worth sending with an endpoint: its references, its auth, then BM25 matches"""
+        top_k = top_k if top_k is not None else ai_config.RAG_TOP_K
+        token_budget = token_budget if token_budget is not None else ai_config.RAG_CONTEXT_TOKEN_BUDGET
+        operation_id = f"operation:{endpoint.get('method', '').upper()} {endpoint.get('path', '')}"
+        operation = self.by_id.get(operation_id)
+
+        # Components the endpoint sends or gets back on success, followed transitively
+        refs: Set[str] = set()
+        _collect_refs([endpoint.get('parameters'), endpoint.get('request_body')], refs)
+        _collect_refs([response for code, response in (endpoint.get('responses') or {}).items() if str(code).startswith('2')], refs)
+        if operation:
+            refs.update(operation['refs'])
+        ordered: List[str] = []
+        queue = sorted(refs)
+        while queue:
+            ref = queue.pop(0)
+            if ref in ordered or ref not in self.by_id:
+                continue
+            ordered.append(ref)
+            queue.extend(self.by_id[ref]['refs'])
+
+        # Security schemes that apply to the operation (its own or the spec-wide default)
+        security = operation['security'] if operation and operation['security'] is not None else self.default_security
+        names = {name for requirement in security or [] for name in requirement}
+        ordered.extend(
+            chunk['id'] for chunk in self.chunks
+            if chunk['kind'] == 'security' and chunk['title'] in names and chunk['id'] not in ordered
+        )
+
+        # Linked operations and components that mention the same resources
+        query = ' '.join([
+            endpoint.get('path', ''), endpoint.get('summary') or '', endpoint.get('description') or '',
+            ' '.join(endpoint.get('tags') or [])
+        ])
+        for chunk in self.search(query, top_k=top_k, exclude=set(ordered) | {operation_id}):
+            ordered.append(chunk['id'])
+
+        # Referenced components come first; whatever does not fit the budget is dropped
+        selected, used = [], 0
+        for chunk_id in ordered:
+            chunk = self.by_id[chunk_id]
+            if used + chunk['tokens'] > token_budget:
+                continue
+            selected.append(chunk)
+            used += chunk['tokens']
+        return selected
+
+    def related_context(self, endpoint: Dict[str, Any], top_k: int = None, token_budget: int = None) -> str:
+        """Minified context lines for the chunks related to an endpoint"""
+        return "\n".join(
+            f"[{chunk['kind']}] {chunk['title']}: {chunk['content']}"
+            for chunk in self.related_chunks(endpoint, top_k, token_budget)
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'version': INDEX_VERSION, 'spec_hash': self.spec_hash, 'default_security': self.default_security, 'chunks': self.chunks}
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> 'SpecIndex':
+        return SpecIndex(data['spec_hash'], data['chunks'], data.get('default_security'))
+
+    @staticmethod
+    def _index_path(digest: str) -> str:
+        return os.path.join(settings.SPEC_INDEX_DIR, f"{digest}.json")
+
+    def save(self):
+        os.makedirs(settings.SPEC_INDEX_DIR, exist_ok=True)
+        tmp_path = self._index_path(self.spec_hash) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, separators=(',', ':'))
+        os.replace(tmp_path, self._index_path(self.spec_hash))
+
+    @staticmethod
+    def _remember(index: 'SpecIndex'):
+        SpecIndex._cache[index.spec_hash] = index
+        SpecIndex._cache.move_to_end(index.spec_hash)
+        while len(SpecIndex._cache) > SpecIndex._cache_size:
+            SpecIndex._cache.popitem(last=False)
+
+    @staticmethod
+    def build_for_spec(spec_content: Dict[str, Any]) -> 'SpecIndex':
+        """Build and persist the index for a newly imported spec"""
+        index = SpecIndex.build(spec_content)
+        index.save()
+        with SpecIndex._lock:
+            SpecIndex._remember(index)
+            SpecIndex._last_spec, SpecIndex._last_index = spec_content, index
+        logger.info(f"Indexed spec {index.spec_hash}: {len(index.chunks)} chunks")
+        return index
+
+    @staticmethod
+    def for_spec(spec_content: Dict[str, Any]) -> 'SpecIndex':
+        """Index for a spec: memory, then disk, else built and persisted"""
+        with SpecIndex._lock:
+            # Generators pass the same spec dict for every endpoint of a run
+            if SpecIndex._last_spec is spec_content and SpecIndex._last_index is not None:
+                return SpecIndex._last_index
+
+            digest = spec_hash(spec_content)
+            index = SpecIndex._cache.get(digest)
+            if index is None and os.path.exists(SpecIndex._index_path(digest)):
+                try:
+                    with open(SpecIndex._index_path(digest), encoding='utf-8') as f:
+                        data = json.load(f)
+                    if data.get('version') == INDEX_VERSION:
+                        index = SpecIndex.from_dict(data)
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Ignoring unreadable spec index {digest}: {str(e)}")
+            if index is None:
+                index = SpecIndex.build(spec_content)
+                try:
+                    index.save()
+                except OSError as e:
+                    logger.warning(f"Could not persist spec index {digest}: {str(e)}")
+            SpecIndex._remember(index)
+            SpecIndex._last_spec, SpecIndex._last_index = spec_content, index
+            return index
+
+    @staticmethod
+    def remove_for_spec(spec_content: Dict[str, Any]):
+        """Drop the persisted index of a deleted spec"""
+        digest = spec_hash(spec_content)
+        with SpecIndex._lock:
+            SpecIndex._cache.pop(digest, None)
+            if SpecIndex._last_index is not None and SpecIndex._last_index.spec_hash == digest:
+                SpecIndex._last_spec = SpecIndex._last_index = None
+        if os.path.exists(SpecIndex._index_path(digest)):
+            os.remove(SpecIndex._index_path(digest))
@@ -0,0 +1,171 @@
+import hashlib
+import random
+import re
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Union
+
+# Identity-like kinds: (prefix, separator, suffix) of the values generated for them
+IDENTITY_KINDS = {
+    'email': ('user', '.', '@example.com'),
+    'username': ('user', '_', ''),
+    'sku': ('SKU', '-', ''),
+    'slug': ('item', '-', ''),
+}
+
+# Field names (lowercased, separators removed) that hold identity-like values
+IDENTITY_FIELDS = {
+    'email': 'email', 'emailaddress': 'email', 'mail': 'email',
+    'username': 'username', 'login': 'username', 'handle': 'username', 'nickname': 'username',
+    'sku': 'sku', 'productcode': 'sku',
+    'slug': 'slug', 'name': 'slug', 'title': 'slug',
+}
+
+# A value produced by DataContext.unique: prefix, run tag, sequence number, suffix
+SYNTHETIC_VALUE = re.compile(r'^(user|SKU|item)([._-])([0-9a-f]{8})\2([0-9a-z]+)(@example\.com)?$')
+
+# Generated dates and times fall in the year after this instant, never on the wall clock
+SYNTHETIC_EPOCH = datetime(2024, 1, 1)
+SYNTHETIC_SPAN_SECONDS = 366 * 24 * 3600
+
+# Tag of the placeholder identity values in stored test cases that were not drawn from a run
+PLACEHOLDER_TAG = '0' * 8
+
+def identity_kind(field: Optional[str], schema: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Which identity kind a field holds, from its format or its name"""
+    schema = schema or {}
+    if schema.get('enum') or schema.get('pattern'):
+        return None
+    if schema.get('format') == 'email':
+        return 'email'
+    if not field:
+        return None
+    return IDENTITY_FIELDS.get(re.sub(r'[^a-z0-9]', '', field.lower()))
+
+def synthetic_value(kind: str, tag: str, sequence: int, max_length: Optional[int] = None, min_length: Optional[int] = None) -> Optional[str]:
+    """``user.<tag>.<seq>@example.com`` and friends; None when it would not fit the length limits"""
+    prefix, separator, suffix = IDENTITY_KINDS[kind]
+    value = f"{prefix}{separator}{tag}{separator}{_base36(sequence)}{suffix}"
+    if isinstance(max_length, int) and len(value) > max_length:
+        return None
+    if isinstance(min_length, int) and len(value) < min_length:
+        return None
+    return value
+
+def _base36(number: int) -> str:
+    digits = '0123456789abcdefghijklmnopqrstuvwxyz'
+    encoded = ''
+    while True:
+        number, remainder = divmod(number, 36)
+        encoded = digits[remainder] + encoded
+        if not number:
+            return encoded
+
+class DataContext:
+    """Seeded source of synthetic test data for one generation or execution run.
+
+    All random draws go through ``random``, so a run replays exactly from its
+    seed. Identity-like values (emails, usernames, SKUs, slugs) come from
+    per-kind sequences tagged with a hash of the seed: different seeds never
+    produce the same value, and shard ``i`` of ``n`` only takes sequence
+    numbers ``i, i + n, i + 2n, ...`` so workers sharing a seed never collide.
+    """
+
+    def __init__(self, seed: Optional[Union[int, str]] = None, shard: int = 0, shards: int = 1):
+        if shards < 1 or not 0 <= shard < shards:
+            raise ValueError(f"Shard must be between 0 and {shards - 1}, got {shard} of {shards}")
+        self.seed = DataContext.new_seed() if seed is None else seed
+        self.shard = shard
+        self.shards = shards
+        self.tag = hashlib.sha256(str(self.seed).encode()).hexdigest()[:8]
+        self.random = random.Random(f"{self.seed}/{shard}")
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.rendered = 0  # identity values re-keyed by render()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def new_seed() -> int:
+        return random.SystemRandom().randrange(2 ** 31)
+
+    def stream(self, key: str) -> 'DataContext':
+        """Independent context for one part of the run (an endpoint), stable whatever order parts run in"""
+        return DataContext(f"{self.seed}:{key}", self.shard, self.shards)
+
+    def split(self, count: int) -> List['DataContext']:
+        """``count`` contexts sharing this seed whose sequences never overlap each other's or this shard's siblings'"""
+        return [DataContext(self.seed, self.shard + index * self.shards, self.shards * count) for index in range(count)]
+
+    def next_sequence(self, kind: str) -> int:
+        with self.lock:
+            position = self.counters[kind]
+            self.counters[kind] += 1
+        return position * self.shards + self.shard
+
+    def unique(self, kind: str, max_length: Optional[int] = None, min_length: Optional[int] = None) -> Optional[str]:
+        """Next value of the kind that no other run or shard produces; None when it cannot fit"""
+        return synthetic_value(kind, self.tag, self.next_sequence(kind), max_length, min_length)
+
+    def timestamp(self) -> datetime:
+        """A seeded point in time, so dates replay with the run"""
+        return SYNTHETIC_EPOCH + timedelta(seconds=self.random.randrange(SYNTHETIC_SPAN_SECONDS))
+
+    def render(self, test_case: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of the test case with every generated identity value re-keyed to this run.
+
+        The same value used twice within the case (say in the body and a
+        header) gets the same replacement. Values not produced by a
+        DataContext, such as boundary strings, are left alone.
+        """
+        input_data = test_case.get('input_data')
+        if not isinstance(input_data, dict):
+            return test_case
+        replacements: Dict[str, str] = {}
+
+        def rekey(value: Any) -> Any:
+            if isinstance(value, dict):
+                return {key: rekey(item) for key, item in value.items()}
+            if isinstance(value, list):
+                return [rekey(item) for item in value]
+            if not isinstance(value, str):
+                return value
+            match = SYNTHETIC_VALUE.match(value)
+            if match is None:
+                return value
+            if value not in replacements:
+                kind = next((
+                    kind for kind, shape in IDENTITY_KINDS.items()
+                    if shape == (match.group(1), match.group(2), match.group(5) or '')
+                ), None)
+                if kind is None:
+                    return value
+                replacements[value] = synthetic_value(kind, self.tag, self.next_sequence(kind))
+            return replacements[value]
+
+        rendered = rekey(input_data)
+        if not replacements:
+            return test_case
+        with self.lock:
+            self.rendered += len(replacements)
+        return {**test_case, 'input_data': rendered}
+
+    def describe(self) -> Dict[str, Any]:
+        return {'seed': self.seed, 'shard': self.shard, 'shards': self.shards, 'rendered_values': self.rendered}
+
+_data_context: ContextVar[Optional[DataContext]] = ContextVar('synthetic_data_context', default=None)
+_fallback = DataContext()
+
+@contextmanager
+def use_data_context(context: DataContext):
+    """Draw generated test data from ``context`` in this context"""
+    token = _data_context.set(context)
+    try:
+        yield context
+    finally:
+        _data_context.reset(token)
+
+def current_data_context() -> DataContext:
+    """The active context, or a process-wide unseeded one outside any run"""
+    return _data_context.get() or _fallback
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import re
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Set
+from sqlalchemy.orm import Session
+from app.models.test_case import TestCase as TestCaseModel, TestResult as TestResultModel
+from app.models.api_spec import Endpoint as EndpointModel
+import logging
+
+logger = logging.getLogger(__name__)
+
+_UUID_PATTERN = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
+_DATETIME_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:?\d{2})?")
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+_DIGITS_PATTERN = re.compile(r"\d+")
+
+# Headers whose values differ on every run without changing what the request tests
+VOLATILE_HEADERS = {
+    'authorization', 'cookie', 'date', 'idempotency-key', 'x-api-key',
+    'x-correlation-id', 'x-request-id', 'x-trace-id', 'traceparent'
+}
+
+def _mask_string(value: str) -> str:
+    value = _UUID_PATTERN.sub('<uuid>', value)
+    value = _DATETIME_PATTERN.sub('<datetime>', value)
+    value = _DATE_PATTERN.sub('<date>', value)
+    # Random suffixes ("test_string_4821", "test3187@example.com")
+    return _DIGITS_PATTERN.sub('#', value)
+
+def _mask_number(value: float) -> str:
+    if value == 0:
+        return '<zero>'
+    sign = '-' if value < 0 else '+'
+    size = 'large' if abs(value) >= 1e6 else 'small'
+    kind = 'int' if isinstance(value, int) else 'float'
+    return f"<{sign}{size}-{kind}>"
+
+def mask_volatile(value: Any) -> Any:
+    """Replace values that change between generations (random numbers, ids, dates) with placeholders.
+
+    Arrays become their sorted distinct masked elements, so randomly sized
+    lists of generated values compare equal.
+    """
+    if isinstance(value, dict):
+        return {key: mask_volatile(item) for key, item in value.items()}
+    if isinstance(value, list):
+        masked = {json.dumps(mask_volatile(item), sort_keys=True, default=str) for item in value}
+        return [json.loads(item) for item in sorted(masked)]
+    if isinstance(value, bool):
+        return '<bool>'
+    if isinstance(value, (int, float)):
+        return _mask_number(value)
+    if isinstance(value, str):
+        return _mask_string(value)
+    return value
+
+def normalize_input_data(input_data: Optional[Dict[str, Any]], mask: bool = True) -> Dict[str, Any]:
+    """Canonical form of a test case's input_data for fingerprinting; ``mask=False`` keeps exact values"""
+    normalized = {}
+    for section, value in (input_data or {}).items():
+        # {"body": {}, "headers": {}} and {} send the same request
+        if value in (None, '', {}, []):
+            continue
+        if section == 'headers' and isinstance(value, dict):
+            value = {
+                name.lower(): '<masked>' if name.lower() in VOLATILE_HEADERS else header_value
+                for name, header_value in value.items()
+            }
+        normalized[section] = mask_volatile(value) if mask else value
+    return normalized
+
+def fingerprint(method: Optional[str], path: Optional[str], input_data: Optional[Dict[str, Any]], expected_status_code: Optional[int],
+                exact: bool = False) -> str:
+    """SHA-256 over (method, path, normalized input_data, expected status).
+
+    ``exact`` skips masking, for deterministic rule-generated cases whose
+    exact values are the point (a boundary and the value just past it).
+    """
+    canonical = json.dumps(
+        [(method or '').upper(), path or '', normalize_input_data(input_data, mask=not exact), expected_status_code, 'exact' if exact else 'masked'],
+        sort_keys=True, separators=(',', ':'), default=str
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class TestCaseDeduplicator:
+    """Fingerprint index over one API spec's stored test cases.
+
+    The spec's fingerprints are read once through the
+    (api_spec_id, fingerprint) index, after which every duplicate check is
+    a set lookup. Fingerprints accepted during the request are added, so
+    duplicates within one generation are caught too.
+    """
+
+    def __init__(self, db: Session, api_spec_id: int):
+        self.api_spec_id = api_spec_id
+        self.fingerprints: Set[str] = {
+            row[0] for row in db.query(TestCaseModel.fingerprint).filter(
+                TestCaseModel.api_spec_id == api_spec_id,
+                TestCaseModel.fingerprint.isnot(None)
+            )
+        }
+        self.skipped = 0
+
+    def admit(self, endpoint: Any, test_case_data: Dict[str, Any]) -> Optional[str]:
+        """Fingerprint for a new test case, or None if an equivalent one is already stored"""
+        test_fingerprint = fingerprint(
+            endpoint.method, endpoint.path, test_case_data.get('input_data'), test_case_data.get('expected_status_code'),
+            exact=bool(test_case_data.get('deterministic'))
+        )
+        if test_fingerprint in self.fingerprints:
+            self.skipped += 1
+            return None
+        self.fingerprints.add(test_fingerprint)
+        return test_fingerprint
+
+    @staticmethod
+    def backfill(db: Session, api_spec_id: Optional[int] = None) -> int:
+        """Fingerprint stored test cases that have none yet; returns how many were updated"""
+        query = db.query(TestCaseModel, EndpointModel.method, EndpointModel.path).outerjoin(
+            EndpointModel, TestCaseModel.endpoint_id == EndpointModel.id
+        ).filter(TestCaseModel.fingerprint.is_(None))
+        if api_spec_id is not None:
+            query = query.filter(TestCaseModel.api_spec_id == api_spec_id)
+
+        updated = 0
+        for test_case, method, path in query.all():
+            test_case.fingerprint = fingerprint(method, path, test_case.input_data, test_case.expected_status_code)
+            updated += 1
+        db.commit()
+        return updated
+
+    @staticmethod
+    def compact(db: Session, api_spec_id: Optional[int] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """Collapse stored test cases that share a fingerprint within a spec.
+
+        The oldest active case of each group is kept; the others are deleted
+        and their results are moved to it, so run history is preserved.
+        The report counts the requests every future run no longer sends and
+        the duplicate executions already recorded, also expressed in runs of
+        the compacted suite ("runs' worth").
+        """
+        if not dry_run:
+            backfilled = TestCaseDeduplicator.backfill(db, api_spec_id)
+        else:
+            backfilled = 0
+
+        query = db.query(TestCaseModel, EndpointModel.method, EndpointModel.path).outerjoin(
+            EndpointModel, TestCaseModel.endpoint_id == EndpointModel.id
+        )
+        if api_spec_id is not None:
+            query = query.filter(TestCaseModel.api_spec_id == api_spec_id)
+
+        groups: Dict[Any, List[TestCaseModel]] = defaultdict(list)
+        scanned = 0
+        for test_case, method, path in query.order_by(TestCaseModel.id).all():
+            scanned += 1
+            test_fingerprint = test_case.fingerprint or fingerprint(method, path, test_case.input_data, test_case.expected_status_code)
+            groups[(test_case.api_spec_id, test_fingerprint)].append(test_case)
+
+        specs: Dict[int, Dict[str, int]] = defaultdict(lambda: {
+            'duplicates_removed': 0, 'requests_saved_per_run': 0, 'duplicate_executions': 0, 'active_test_cases': 0
+        })
+        duplicate_groups = 0
+        for (spec_id, _), test_cases in groups.items():
+            keeper = next((test_case for test_case in test_cases if test_case.is_active), test_cases[0])
+            spec = specs[spec_id]
+            spec['active_test_cases'] += 1 if any(test_case.is_active for test_case in test_cases) else 0
+            duplicates = [test_case for test_case in test_cases if test_case is not keeper]
+            if not duplicates:
+                continue
+            duplicate_groups += 1
+
+            duplicate_ids = [test_case.id for test_case in duplicates]
+            results = db.query(TestResultModel).filter(TestResultModel.test_case_id.in_(duplicate_ids))
+            spec['duplicates_removed'] += len(duplicates)
+            spec['requests_saved_per_run'] += sum(1 for test_case in duplicates if test_case.is_active)
+            spec['duplicate_executions'] += results.count()
+            if not dry_run:
+                results.update({TestResultModel.test_case_id: keeper.id}, synchronize_session=False)
+                for test_case in duplicates:
+                    db.delete(test_case)
+
+        if not dry_run:
+            db.commit()
+
+        for spec in specs.values():
+            spec['runs_worth_saved'] = round(spec['duplicate_executions'] / spec['active_test_cases'], 2) if spec['active_test_cases'] else 0.0
+
+        totals = {
+            key: sum(spec[key] for spec in specs.values())
+            for key in ('duplicates_removed', 'requests_saved_per_run', 'duplicate_executions', 'active_test_cases')
+        }
+        report = {
+            'dry_run': dry_run,
+            'test_cases_scanned': scanned,
+            'fingerprints_backfilled': backfilled,
+            'duplicate_groups': duplicate_groups,
+            **totals,
+            'runs_worth_saved': round(totals['duplicate_executions'] / totals['active_test_cases'], 2) if totals['active_test_cases'] else 0.0,
+            'api_specs': {spec_id: spec for spec_id, spec in sorted(specs.items()) if spec['duplicates_removed']}
+        }
+        logger.info(f"Test case compaction: removed {report['duplicates_removed']} duplicates, {report['requests_saved_per_run']} fewer requests per run")
+        return report
@@ -0,0 +1,307 @@
+import json
+import logging
+import re
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlsplit, unquote
+import httpx
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.api_spec import Endpoint as EndpointModel
+from app.models.test_case import TestCase as TestCaseModel, TestCaseType
+from app.services.curl_interpreter import CurlInterpreter
+from app.services.llm_streaming import validate_test_case_data
+from app.services.mock_server import SpecMockServer, NOT_FOUND_BODY
+from app.services.resource_pool import PATH_PARAMETER, substitute_path_params
+from app.services.test_generator import TestGenerator
+
+logger = logging.getLogger(__name__)
+
+# Template leftovers an LLM writes instead of a value: {id}, {{token}}, <user_id>, :id
+PLACEHOLDER_VALUE = re.compile(r'^\s*(\{\{?\s*[\w.\-]+\s*\}?\}|<[\w .\-]+>|:[A-Za-z_]\w*)\s*$')
+
+JSON_TYPES = {
+    'string': str,
+    'integer': int,
+    'number': (int, float),
+    'boolean': bool,
+    'array': list,
+    'object': dict,
+}
+
+MAX_VALIDATION_ERRORS = 10
+
+class TestCaseValidator:
+    """Checks AI-generated test cases before they are stored.
+
+    Static checks run against the resolved spec: path parameters that
+    cannot be filled, template placeholders, a curl_command aimed at another
+    path or method, success statuses the endpoint does not document, and
+    request bodies or parameters the schema rejects where the case expects
+    success. Cases that pass are then dry-run against an in-process
+    ``SpecMockServer``: the request is built the way the executor builds it
+    and routed by the mock. Invalid cases are stored inactive with their
+    reasons, and runs leave them out.
+    """
+
+    def __init__(self, db: Session, api_spec_id: int, api_spec_content: Optional[Dict[str, Any]] = None, dry_run: Optional[bool] = None):
+        self.api_spec_id = api_spec_id
+        self.api_spec = api_spec_content or {}
+        self.enabled = settings.TEST_CASE_VALIDATION_ENABLED
+        self.endpoints: Dict[int, Dict[str, Any]] = {}
+        if self.enabled:
+            for endpoint in db.query(EndpointModel).filter(EndpointModel.api_spec_id == api_spec_id):
+                self.endpoints[endpoint.id] = TestCaseValidator._endpoint_dict(endpoint)
+
+        # Built once per validator: routes for every endpoint of the spec
+        dry_run = settings.TEST_CASE_DRY_RUN if dry_run is None else dry_run
+        self.mock = SpecMockServer(api_spec_id, list(self.endpoints.values()), self.api_spec) if self.enabled and dry_run and self.endpoints else None
+        self.valid = 0
+        self.invalid = 0
+
+    @staticmethod
+    def _endpoint_dict(endpoint: EndpointModel) -> Dict[str, Any]:
+        return {
+            'method': endpoint.method,
+            'path': endpoint.path,
+            'parameters': endpoint.parameters,
+            'request_body': endpoint.request_body,
+            'responses': endpoint.responses
+        }
+
+    def check(self, endpoint: EndpointModel, test_case_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Validation columns for a new test case; empty for cases that are not validated"""
+        if not self.enabled or test_case_data.get('test_type') != TestCaseType.AI_GENERATED:
+            return {}
+        endpoint_dict = self.endpoints.get(endpoint.id) or TestCaseValidator._endpoint_dict(endpoint)
+        errors = self.validate(endpoint_dict, test_case_data)
+        if not errors and self.mock is not None:
+            errors = self.dry_run(endpoint_dict, test_case_data)
+
+        if errors:
+            self.invalid += 1
+            logger.info(f"Invalid test case '{test_case_data.get('name')}' for {endpoint.method} {endpoint.path}: {'; '.join(errors)}")
+        else:
+            self.valid += 1
+        return {
+            'validation_status': 'invalid' if errors else 'valid',
+            'validation_errors': errors or None,
+            'is_active': not errors
+        }
+
+    def validate(self, endpoint: Dict[str, Any], test_case_data: Dict[str, Any]) -> List[str]:
+        """Reasons the test case cannot run as written, from the spec alone"""
+        problem = validate_test_case_data(test_case_data)
+        if problem:
+            return [problem]
+
+        input_data = test_case_data.get('input_data') or {}
+        expected_status = test_case_data.get('expected_status_code', 200)
+        errors = []
+
+        # Path parameters without a value are filled from the run's resource pool, if enabled
+        path_params = input_data.get('path_params')
+        if path_params is not None and not isinstance(path_params, dict):
+            errors.append("input_data.path_params is not an object")
+            path_params = {}
+        for location in ('query_params', 'headers'):
+            if input_data.get(location) is not None and not isinstance(input_data[location], dict):
+                errors.append(f"input_data.{location} is not an object")
+        for name in PATH_PARAMETER.findall(endpoint['path']):
+            value = (path_params or {}).get(name)
+            if value is None and not settings.RESOURCE_POOL_ENABLED:
+                errors.append(f"path parameter '{name}' has no value; the request would be sent to {endpoint['path']} literally")
+            elif isinstance(value, (dict, list, bool)):
+                errors.append(f"path parameter '{name}' should be a string or number, got {type(value).__name__}")
+
+        for location in ('path_params', 'query_params', 'headers', 'body'):
+            errors.extend(TestCaseValidator._placeholders(input_data.get(location), location))
+
+        errors.extend(TestCaseValidator._check_curl(endpoint, test_case_data.get('curl_command')))
+
+        # Negative cases are expected to break the schema; only success expectations must satisfy it
+        if 200 <= expected_status < 300:
+            documented = sorted(str(code) for code in (endpoint.get('responses') or {}) if str(code).startswith('2'))
+            if documented and str(expected_status) not in documented:
+                errors.append(f"expects {expected_status}, but {endpoint['method']} {endpoint['path']} documents {', '.join(documented)} on success")
+            errors.extend(self._check_parameters(endpoint, input_data))
+            errors.extend(self._check_body(endpoint, input_data))
+
+        return errors[:MAX_VALIDATION_ERRORS]
+
+    def dry_run(self, endpoint: Dict[str, Any], test_case_data: Dict[str, Any]) -> List[str]:
+        """Build the request as the executor does and route it through the mock server"""
+        input_data = test_case_data.get('input_data') or {}
+        method = endpoint['method']
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json'
+        }
+        try:
+            if input_data.get('auth_token'):
+                headers['Authorization'] = f"Bearer {input_data['auth_token']}"
+            if input_data.get('headers'):
+                headers.update(input_data['headers'])
+            content = None
+            if method in ['POST', 'PUT', 'PATCH'] and input_data.get('body'):
+                content = json.dumps(input_data['body'])
+            path = substitute_path_params(endpoint['path'], input_data.get('path_params'))
+            request = httpx.Request(
+                method, f"{self.mock.base_url}{path}",
+                headers=headers, params=input_data.get('query_params') or {}, content=content
+            )
+        except Exception as e:
+            # httpx rejects non-string header values, unencodable params and the like
+            return [f"request cannot be built: {type(e).__name__}: {str(e)}"]
+
+        status, _, body = self.mock.resolve(request.method, request.url.path)
+        if status == 404 and body == NOT_FOUND_BODY:
+            return [f"the spec has no route for {request.method} {request.url.path}"]
+        return []
+
+    @staticmethod
+    def _placeholders(value: Any, location: str) -> List[str]:
+        """Values that are template placeholders rather than data"""
+        if isinstance(value, str):
+            return [f"{location} is an unfilled placeholder {value!r}"] if PLACEHOLDER_VALUE.match(value) else []
+        errors = []
+        if isinstance(value, dict):
+            for key, item in value.items():
+                errors.extend(TestCaseValidator._placeholders(item, f"{location}.{key}"))
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                errors.extend(TestCaseValidator._placeholders(item, f"{location}[{index}]"))
+        return errors
+
+    @staticmethod
+    def _check_curl(endpoint: Dict[str, Any], curl_command: Optional[str]) -> List[str]:
+        """The curl_command must target the endpoint's method and path.
+
+        The executor sends ``input_data``, not the curl_command, so a command
+        that does not parse is left alone rather than failing the case.
+        """
+        if not curl_command:
+            return []
+        parsed = CurlInterpreter.parse(curl_command)
+        if parsed['error']:
+            logger.debug(f"Not checking unparseable curl_command: {parsed['error']}")
+            return []
+        request = CurlInterpreter.build_request(parsed)
+
+        errors = []
+        if request['method'].upper() != endpoint['method']:
+            errors.append(f"curl_command uses {request['method'].upper()}, the endpoint is {endpoint['method']}")
+        # The base URL may carry a prefix such as /api/v1
+        template = re.sub(r'\\\{[^/]+?\\\}', '[^/]+', re.escape(endpoint['path']))
+        curl_path = unquote(urlsplit(request['url']).path)
+        if not re.search(f"{template}/?$", curl_path):
+            errors.append(f"curl_command targets {curl_path}, not {endpoint['path']}")
+        return errors
+
+    def _check_parameters(self, endpoint: Dict[str, Any], input_data: Dict[str, Any]) -> List[str]:
+        """Required query and header parameters are present and enum values allowed"""
+        errors = []
+        for param in endpoint.get('parameters') or []:
+            if not isinstance(param, dict) or param.get('in') not in ('query', 'header') or not param.get('name'):
+                continue
+            location = 'query_params' if param['in'] == 'query' else 'headers'
+            values = input_data.get(location) or {}
+            if not isinstance(values, dict):
+                # Reported once by validate()
+                continue
+            if param['in'] == 'header':
+                values = {key.lower(): value for key, value in values.items()}
+            name = param['name'].lower() if param['in'] == 'header' else param['name']
+            if name not in values:
+                if param.get('required'):
+                    errors.append(f"required {param['in']} parameter '{param['name']}' is missing")
+                continue
+            schema = TestGenerator._resolve_schema(param.get('schema') or param, self.api_spec)
+            # Query and header values reach the server as strings
+            if schema.get('enum') and str(values[name]) not in [str(option) for option in schema['enum']]:
+                errors.append(f"{location}.{param['name']} {values[name]!r} is not one of {schema['enum']}")
+        return errors
+
+    def _check_body(self, endpoint: Dict[str, Any], input_data: Dict[str, Any]) -> List[str]:
+        body_schema = TestGenerator._body_schema(endpoint, self.api_spec)
+        if body_schema is None:
+            return []
+        body = input_data.get('body')
+        if body in (None, {}, []):
+            required = (endpoint.get('request_body') or {}).get('required') or body_schema.get('required')
+            return ["request body is required but empty"] if required else []
+        return self._schema_errors(body, body_schema, 'body', 0)
+
+    def _schema_errors(self, value: Any, schema: Dict[str, Any], location: str, depth: int) -> List[str]:
+        """Where ``value`` breaks ``schema``: type, required, enum, numeric limits, lengths and item counts"""
+        schema = TestGenerator._resolve_schema(schema, self.api_spec)
+        if not schema or depth > 10:
+            return []
+        if value is None:
+            nullable = schema.get('nullable') or (isinstance(schema.get('type'), list) and 'null' in schema['type'])
+            return [] if nullable else [f"{location} is null"]
+
+        schema_type = TestGenerator._schema_type(schema)
+        expected = JSON_TYPES.get(schema_type)
+        if expected is not None:
+            wrong_type = not isinstance(value, expected) or (isinstance(value, bool) and schema_type != 'boolean')
+            if schema_type == 'integer' and isinstance(value, float) and value.is_integer():
+                wrong_type = False
+            if wrong_type:
+                return [f"{location} should be {schema_type}, got {type(value).__name__}"]
+
+        errors = []
+        if schema.get('enum') and value not in schema['enum']:
+            errors.append(f"{location} {value!r} is not one of {schema['enum']}")
+
+        if schema_type in ('integer', 'number'):
+            lower, lower_exclusive = TestGenerator._bound(schema, 'minimum', 'exclusiveMinimum')
+            upper, upper_exclusive = TestGenerator._bound(schema, 'maximum', 'exclusiveMaximum')
+            if lower is not None and (value < lower or (lower_exclusive and value == lower)):
+                errors.append(f"{location} {value} is below the minimum {lower}")
+            if upper is not None and (value > upper or (upper_exclusive and value == upper)):
+                errors.append(f"{location} {value} is above the maximum {upper}")
+        elif schema_type == 'string':
+            if isinstance(schema.get('minLength'), int) and len(value) < schema['minLength']:
+                errors.append(f"{location} is shorter than minLength {schema['minLength']}")
+            if isinstance(schema.get('maxLength'), int) and len(value) > schema['maxLength']:
+                errors.append(f"{location} is longer than maxLength {schema['maxLength']}")
+        elif schema_type == 'array':
+            if isinstance(schema.get('minItems'), int) and len(value) < schema['minItems']:
+                errors.append(f"{location} has fewer than minItems {schema['minItems']}")
+            if isinstance(schema.get('maxItems'), int) and len(value) > schema['maxItems']:
+                errors.append(f"{location} has more than maxItems {schema['maxItems']}")
+            for index, item in enumerate(value):
+                errors.extend(self._schema_errors(item, schema.get('items') or {}, f"{location}[{index}]", depth + 1))
+        elif schema_type == 'object':
+            properties = schema.get('properties') or {}
+            for name in schema.get('required') or []:
+                if name not in value and not TestGenerator._resolve_schema(properties.get(name, {}), self.api_spec).get('readOnly'):
+                    errors.append(f"{location}.{name} is required")
+            for name, item in value.items():
+                if name in properties:
+                    errors.extend(self._schema_errors(item, properties[name], f"{location}.{name}", depth + 1))
+                elif schema.get('additionalProperties') is False:
+                    errors.append(f"{location}.{name} is not an allowed property")
+        return errors
+
+    def summary(self) -> Dict[str, int]:
+        return {'valid': self.valid, 'invalid': self.invalid}
+
+def build_test_case_model(api_spec_id: int, endpoint: EndpointModel, test_case_data: Dict[str, Any], validator: TestCaseValidator,
+                          test_fingerprint: Optional[str] = None) -> TestCaseModel:
+    """Test case record for generated test case data, with its dedup fingerprint and validation columns"""
+    return TestCaseModel(
+        api_spec_id=api_spec_id,
+        endpoint_id=endpoint.id,
+        name=test_case_data['name'],
+        description=test_case_data['description'],
+        test_type=test_case_data['test_type'],
+        priority=test_case_data['priority'],
+        input_data=test_case_data['input_data'],
+        expected_output=test_case_data.get('expected_output'),
+        expected_status_code=test_case_data['expected_status_code'],
+        curl_command=test_case_data['curl_command'],
+        test_script=test_case_data.get('test_script'),
+        fingerprint=test_fingerprint,
+        **validator.check(endpoint, test_case_data)
+    )
@@ -2,24 +2,34 @@ import asyncio
 import httpx
 import json
 import time
-import subprocess
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 from app.models.test_case import TestResult
 from app.core.config import settings
+from app.core.http_client import get_http_client
+from app.services.mock_server import MockServerRegistry
+from app.services.concurrency_limiter import AdaptiveLimiterRegistry
+from app.services.curl_interpreter import CurlInterpreter
+from app.services.run_scheduler import RunScheduler
+from app.services.retry_policy import RetryPolicy, RetryBudget
+from app.services.cassette_store import CassetteStore
+from app.services.resource_pool import ResourcePool, substitute_path_params, creation_stage
+from app.services.synthetic_data import DataContext
+from app.core.metrics import record_executor_request, EXECUTOR_QUEUE_DEPTH, EXECUTOR_IN_FLIGHT
+from app.core.tracing import traced, start_span, set_span_attributes, inject_trace_headers
 
 class TestExecutor:
     """Service to execute test cases with multi-service support"""
     
     @staticmethod
-    async def execute_test_case(test_case: Dict[str, Any], base_url: str = "", service_configs: Dict[str, str] = None) -> Dict[str, Any]:
+    async def execute_test_case(test_case: Dict[str, Any], base_url: str = "", service_configs: Dict[str, str] = None, cassette: Optional[CassetteStore] = None) -> Dict[str, Any]:
         """Execute a single test case with multi-service support"""
         start_time = time.time()
         
         try:
             # Execute the test with service context
-            result = await TestExecutor._execute_http_request(test_case, base_url, service_configs)
+            result = await TestExecutor._execute_http_request(test_case, base_url, service_configs, cassette)
             
             # Calculate response time
             response_time = int((time.time() - start_time) * 1000)  # milliseconds
@@ -34,7 +44,12 @@ class TestExecutor:
                 'response_time': response_time,
                 'error_message': result.get('error'),
                 'execution_log': result.get('log'),
-                'service_calls': result.get('service_calls', [])
+                'service_calls': result.get('service_calls', []),
+                'timed_out': result.get('timed_out', False),
+                'error_type': result.get('error_type'),
+                'replayed': result.get('replayed', False),
+                'retry_after': result.get('headers', {}).get('retry-after'),
+                'location': result.get('headers', {}).get('location')  # where a create put its resource
             }
             
         except Exception as e:
@@ -61,11 +76,15 @@ class TestExecutor:
         return base_url
     
     @staticmethod
-    async def _execute_http_request(test_case: Dict[str, Any], base_url: str, service_configs: Dict[str, str] = None) -> Dict[str, Any]:
-        """Execute HTTP request for test case with multi-service support"""
-        input_data = test_case.get('input_data', {})
+    async def _execute_http_request(test_case: Dict[str, Any], base_url: str, service_configs: Dict[str, str] = None, cassette: Optional[CassetteStore] = None) -> Dict[str, Any]:
+        """Execute HTTP request for test case with multi-service support.
+
+        With a cassette in replay mode the response is served from the
+        cassette; in record mode live responses are stored in it.
+        """
+        input_data = test_case.get('input_data') or {}
         method = test_case.get('method', 'GET')
-        path = test_case.get('path', '')
+        path = substitute_path_params(test_case.get('path', ''), input_data.get('path_params'))
         service_calls = []
         
         # Validate base URL
@@ -117,24 +136,62 @@ class TestExecutor:
         if method in ['POST', 'PUT', 'PATCH'] and input_data.get('body'):
             data = json.dumps(input_data['body'])
         
-        # Execute request
-        async with httpx.AsyncClient(timeout=settings.TEST_TIMEOUT) as client:
+        # Serve from the cassette instead of the network when replaying
+        if cassette is not None and cassette.mode == 'replay':
+            full_url = str(httpx.URL(url, params=params))
+            recorded = cassette.lookup(method, full_url, data)
+            if recorded is None:
+                return {
+                    'status_code': None,
+                    'body': None,
+                    'error': f"Cassette mismatch: no recorded response for {method} {full_url}",
+                    'log': f"Request: {method} {full_url}\nCassette diff:\n{cassette.mismatches[-1]['diff']}",
+                    'service_calls': service_calls,
+                    'error_type': 'cassette_mismatch'
+                }
+            if 'x-service-calls' in recorded['headers']:
+                try:
+                    service_calls = json.loads(recorded['headers']['x-service-calls'])
+                except:
+                    service_calls = []
+            return {
+                'status_code': recorded['status_code'],
+                'body': recorded['body'],
+                'headers': recorded['headers'],
+                'log': f"Request: {method} {url}\nResponse: {recorded['status_code']} (replayed from cassette '{cassette.name}')",
+                'service_calls': service_calls,
+                'replayed': True
+            }
+        
+        # Execute request on the shared connection pool (or in-process for mock servers)
+        target = AdaptiveLimiterRegistry.host_key(url)
+        with start_span("executor.request", kind='client', **{'http.method': method, 'http.url': url, 'net.peer.name': target}) as span:
+            # Propagate the trace to the service under test
+            inject_trace_headers(headers)
+            client = MockServerRegistry.client_for(url) or get_http_client()
+            request_start = time.perf_counter()
             try:
                 response = await client.request(
                     method=method,
                     url=url,
                     headers=headers,
                     params=params,
-                    data=data
+                    content=data,
+                    timeout=settings.TEST_TIMEOUT
                 )
-                
+                record_executor_request(target, time.perf_counter() - request_start, status_code=response.status_code)
+                set_span_attributes(span, **{'http.status_code': response.status_code})
+            
+                if cassette is not None and cassette.mode == 'record':
+                    cassette.record(method, str(response.request.url), data, response.status_code, dict(response.headers), response.text)
+            
                 # Track service calls if response indicates inter-service communication
                 if 'X-Service-Calls' in response.headers:
                     try:
                         service_calls = json.loads(response.headers['X-Service-Calls'])
                     except:
                         service_calls = []
-                
+            
                 return {
                     'status_code': response.status_code,
                     'body': response.text,
@@ -142,30 +199,37 @@ class TestExecutor:
                     'log': f"Request: {method} {url}\nResponse: {response.status_code}",
                     'service_calls': service_calls
                 }
-                
+            
             except httpx.TimeoutException:
+                record_executor_request(target, time.perf_counter() - request_start, error_type='timeout')
                 return {
                     'status_code': None,
                     'body': None,
                     'error': f'Request timeout after {settings.TEST_TIMEOUT} seconds. The API server may be slow or unresponsive.',
                     'log': f"Request: {method} {url}\nError: Timeout after {settings.TEST_TIMEOUT}s",
-                    'service_calls': service_calls
+                    'service_calls': service_calls,
+                    'timed_out': True,
+                    'error_type': 'timeout'
                 }
             except httpx.ConnectError:
+                record_executor_request(target, time.perf_counter() - request_start, error_type='connect')
                 return {
                     'status_code': None,
                     'body': None,
                     'error': f'Connection failed. Please check if the API server is running at {base_url}',
                     'log': f"Request: {method} {url}\nError: Connection failed - server may not be running",
-                    'service_calls': service_calls
+                    'service_calls': service_calls,
+                    'error_type': 'connect'
                 }
             except httpx.RequestError as e:
+                record_executor_request(target, time.perf_counter() - request_start, error_type='request')
                 return {
                     'status_code': None,
                     'body': None,
                     'error': f'Request error: {str(e)}. Please verify the API endpoint and network connectivity.',
                     'log': f"Request: {method} {url}\nError: {str(e)}",
-                    'service_calls': service_calls
+                    'service_calls': service_calls,
+                    'error_type': 'request'
                 }
     
     @staticmethod
@@ -215,56 +279,177 @@ class TestExecutor:
     @staticmethod
     async def execute_curl_command(curl_command: str) -> Dict[str, Any]:
         """Execute a CURL command and return results"""
-        start_time = time.time()
-        
-        try:
-            # Execute CURL command
-            process = await asyncio.create_subprocess_shell(
-                curl_command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            response_time = int((time.time() - start_time) * 1000)
-            
-            if process.returncode == 0:
-                return {
-                    'status': 'passed',
-                    'output': stdout.decode(),
-                    'error': stderr.decode() if stderr else None,
-                    'response_time': response_time
-                }
-            else:
-                return {
-                    'status': 'failed',
-                    'output': stdout.decode(),
-                    'error': stderr.decode(),
-                    'response_time': response_time
-                }
-                
-        except Exception as e:
-            return {
-                'status': 'error',
-                'output': None,
-                'error': str(e),
-                'response_time': int((time.time() - start_time) * 1000)
-            }
+        return await CurlInterpreter.execute_command(curl_command)
+    
+    @staticmethod
+    async def execute_curl_batch(curl_commands: List[str], max_concurrency: int = None) -> List[Dict[str, Any]]:
+        """Execute many CURL commands with bounded concurrency"""
+        return await CurlInterpreter.execute_batch(curl_commands, max_concurrency)
     
     @staticmethod
-    async def execute_test_suite(test_cases: List[Dict[str, Any]], base_url: str = "", service_configs: Dict[str, str] = None) -> List[Dict[str, Any]]:
-        """Execute multiple test cases concurrently with multi-service support"""
-        # Limit concurrent executions
-        semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_TESTS)
+    @traced("test_executor.execute_test_suite")
+    async def execute_test_suite(test_cases: List[Dict[str, Any]], base_url: str = "", service_configs: Dict[str, str] = None, limiters: Optional[AdaptiveLimiterRegistry] = None, global_limit: Optional[asyncio.Semaphore] = None, scheduler: Optional[RunScheduler] = None, retry_policy: Optional[RetryPolicy] = None, retry_budget: Optional[RetryBudget] = None, cassette: Optional[CassetteStore] = None, resource_pool: Optional[ResourcePool] = None, data_context: Optional[DataContext] = None) -> List[Dict[str, Any]]:
+        """Execute multiple test cases concurrently with multi-service support.
+
+        Concurrency is governed per target host by an adaptive limiter; pass a
+        shared ``limiters`` registry to read the limit trajectory afterwards.
+        ``global_limit`` caps in-flight requests across suites running in parallel.
+        An optional ``scheduler`` orders cases by priority and skips the ones
+        that should not start (fail-fast abort or exhausted time budget).
+        Failed attempts are retried per ``retry_policy`` (overridable per test
+        case) while the run's ``retry_budget`` allows it. A ``cassette``
+        records responses or replays them without touching the network.
+        With a ``resource_pool`` create operations run first, in stages from
+        the shallowest collection down, and deletes run last; path parameters
+        a case leaves unset are filled with IDs the creates returned, or sent
+        unresolved when there are none. A ``data_context`` re-keys
+        generated identity values (emails, usernames, SKUs) to the run, in
+        input order so the same seed and shard replay the same requests.
+        """
+        if data_context is not None:
+            test_cases = [data_context.render(test_case) for test_case in test_cases]
+        if limiters is None:
+            limiters = AdaptiveLimiterRegistry()
+        if scheduler is not None:
+            test_cases = scheduler.order(test_cases)
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        if retry_budget is None:
+            retry_budget = RetryBudget()
+        
+        async def run_test_case(test_case):
+            if global_limit is not None:
+                async with global_limit:
+                    return await TestExecutor.execute_test_case(test_case, base_url, service_configs, cassette)
+            return await TestExecutor.execute_test_case(test_case, base_url, service_configs, cassette)
+        
+        async def execute_attempt(test_case, first_attempt):
+            limiter = limiters.for_url(base_url)
+            EXECUTOR_QUEUE_DEPTH.inc()
+            try:
+                await limiter.acquire()
+            finally:
+                EXECUTOR_QUEUE_DEPTH.dec()
+            EXECUTOR_IN_FLIGHT.inc()
+            result = None
+            try:
+                # Checked once a slot is free so queued cases see the latest run state
+                skip_reason = scheduler.skip_reason() if scheduler is not None and first_attempt else None
+                if skip_reason:
+                    return RunScheduler.skipped_result(skip_reason)
+                
+                remaining = scheduler.remaining_budget() if scheduler is not None else None
+                if remaining is None:
+                    result = await run_test_case(test_case)
+                    return result
+                try:
+                    result = await asyncio.wait_for(run_test_case(test_case), timeout=max(remaining, 0))
+                    return result
+                except asyncio.TimeoutError:
+                    return {
+                        'status': 'error',
+                        'response_status_code': None,
+                        'response_body': None,
+                        'response_time': int(max(remaining, 0) * 1000),
+                        'error_message': f"Cancelled: time budget of {scheduler.time_budget_seconds}s exhausted",
+                        'execution_log': "Request cancelled when the run time budget ran out",
+                        'service_calls': [],
+                        'error_type': 'cancelled'
+                    }
+            finally:
+                EXECUTOR_IN_FLIGHT.dec()
+                # Every attempt, retries included, is a sample for the limiter; only a
+                # response the target actually sent carries a latency
+                if result is None:
+                    await limiter.release(None)
+                else:
+                    responded = result.get('response_status_code') is not None and not result.get('replayed')
+                    await limiter.release(
+                        result.get('response_time') if responded else None,
+                        result.get('response_status_code'),
+                        result.get('timed_out', False)
+                    )
+        
+        async def execute_with_retries(test_case):
+            policy = retry_policy.with_overrides(test_case.get('retry_policy'))
+            attempts = []
+            attempt = 0
+            while True:
+                attempt += 1
+                result = await execute_attempt(test_case, attempt == 1)
+                if result.get('status') == 'skipped':
+                    scheduler.record(result)
+                    return result
+                if attempt == 1:
+                    retry_budget.record_request()
+                delay = policy.retry_delay(attempt, result, test_case)
+                if delay is not None and scheduler is not None:
+                    remaining = scheduler.remaining_budget()
+                    if scheduler.abort_reason or (remaining is not None and remaining <= delay):
+                        delay = None
+                if delay is not None and not retry_budget.try_acquire():
+                    delay = None
+                attempts.append({
+                    'attempt': attempt,
+                    'status': result.get('status'),
+                    'response_status_code': result.get('response_status_code'),
+                    'response_time': result.get('response_time'),
+                    'error_message': result.get('error_message'),
+                    'retry_delay': round(delay, 3) if delay is not None else None
+                })
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+            
+            result['attempts'] = attempts
+            result['attempt_count'] = attempt
+            # Passing only after a retry means the outcome depends on timing
+            result['flaky'] = attempt > 1 and result.get('status') == 'passed'
+            if attempt > 1:
+                history = ", ".join(
+                    f"#{a['attempt']}: {a['response_status_code'] or a['error_message']}" for a in attempts
+                )
+                result['execution_log'] = f"{result.get('execution_log') or ''}\nAttempts: {history}".strip()
+            if scheduler is not None:
+                scheduler.record(result)
+            return result
         
-        async def execute_with_semaphore(test_case):
-            async with semaphore:
-                return await TestExecutor.execute_test_case(test_case, base_url, service_configs)
+        async def execute_with_resources(test_case):
+            lease = await resource_pool.lease(test_case)
+            if lease is None:
+                result = await execute_with_retries(test_case)
+                await resource_pool.record(test_case, None, result)
+                return result
+            # Attempts see the leased IDs as if the case had set them; parameters
+            # the pool has no ID for are sent as they are, as without a pool
+            resolved = {**test_case, 'input_data': {**(test_case.get('input_data') or {}), 'path_params': lease.values}}
+            result = None
+            try:
+                result = await execute_with_retries(resolved)
+                if lease.leased:
+                    drawn = ", ".join(f"{name}={resource_id} ({collection})" for name, collection, resource_id in lease.leased)
+                    result['execution_log'] = f"{result.get('execution_log') or ''}\nResource IDs from the run's pool: {drawn}".strip()
+                if lease.missing:
+                    result['execution_log'] = f"{result.get('execution_log') or ''}\nNo resource ID in the run's pool for {', '.join(lease.missing)}; sent unresolved".strip()
+                await resource_pool.record(test_case, lease, result)
+                return result
+            finally:
+                await resource_pool.release(lease, test_case, result)
         
         # Execute all test cases
-        tasks = [execute_with_semaphore(test_case) for test_case in test_cases]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if resource_pool is None:
+            results = await asyncio.gather(*[execute_with_retries(test_case) for test_case in test_cases], return_exceptions=True)
+        else:
+            # Stage by stage so parameterized cases find the IDs creates return
+            stages: Dict[int, List[int]] = {}
+            for index, test_case in enumerate(test_cases):
+                stages.setdefault(creation_stage(test_case), []).append(index)
+            results = [None] * len(test_cases)
+            for stage in sorted(stages):
+                indexes = stages[stage]
+                stage_results = await asyncio.gather(*[execute_with_resources(test_cases[index]) for index in indexes], return_exceptions=True)
+                for index, result in zip(indexes, stage_results):
+                    results[index] = result
         
         # Process results
         processed_results = []
@@ -286,26 +471,68 @@ class TestExecutor:
         return processed_results
     
     @staticmethod
-    async def execute_multi_service_test(test_cases: List[Dict[str, Any]], service_configs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
-        """Execute tests across multiple services"""
+    @traced("test_executor.execute_multi_service_test")
+    async def execute_multi_service_test(test_cases: List[Dict[str, Any]], service_configs: Dict[str, Dict[str, Any]], scheduler: Optional[RunScheduler] = None, retry_policy: Optional[RetryPolicy] = None, cassette: Optional[CassetteStore] = None, data_context: Optional[DataContext] = None) -> Dict[str, Any]:
+        """Execute tests across multiple services concurrently.
+
+        Each service gets its own adaptive limiter, optionally capped by a
+        ``max_concurrency`` entry in its config, and all services share a
+        global in-flight cap of ``MAX_CONCURRENT_TESTS_GLOBAL``. A shared
+        ``scheduler`` applies fail-fast and time budget across all services.
+        Each service also gets its own resource pool, seeded from a
+        ``resource_ids`` entry in its config, and its own shard of
+        ``data_context`` so services running in parallel never collide.
+        Cases that match no service are reported as skipped.
+        """
+        service_test_cases, unrouted = TestExecutor._route_test_cases_to_services(test_cases, service_configs)
+        
+        max_limits = {
+            AdaptiveLimiterRegistry.host_key(config.get('base_url', '')): config['max_concurrency']
+            for config in service_configs.values()
+            if config.get('max_concurrency')
+        }
+        limiters = AdaptiveLimiterRegistry(max_limits)
+        global_limit = asyncio.Semaphore(settings.MAX_CONCURRENT_TESTS_GLOBAL)
+        retry_budget = RetryBudget()
+        
+        service_names = [name for name in service_configs if service_test_cases.get(name)]
+        resource_pools = {
+            service_name: ResourcePool(service_configs[service_name].get('resource_ids'))
+            for service_name in service_names
+        } if settings.RESOURCE_POOL_ENABLED else {}
+        data_contexts = dict(zip(service_names, data_context.split(len(service_names)))) if data_context is not None else {}
+        suites = [
+            TestExecutor.execute_test_suite(
+                service_test_cases[service_name],
+                service_configs[service_name].get('base_url', ''),
+                service_configs,
+                limiters,
+                global_limit,
+                scheduler,
+                retry_policy,
+                retry_budget,
+                cassette,
+                resource_pools.get(service_name),
+                data_contexts.get(service_name)
+            )
+            for service_name in service_names
+        ]
+        suite_results = await asyncio.gather(*suites)
+        
         all_results = []
         service_results = {}
+        for service_name, results in zip(service_names, suite_results):
+            service_results[service_name] = results
+            all_results.extend(results)
         
-        for service_name, service_config in service_configs.items():
-            # Filter test cases for this service
-            service_test_cases = [
-                tc for tc in test_cases 
-                if TestExecutor._extract_service_name_from_url(service_config.get('base_url', '')) == service_name
-            ]
-            
-            if service_test_cases:
-                results = await TestExecutor.execute_test_suite(
-                    service_test_cases, 
-                    service_config.get('base_url', ''),
-                    service_configs
-                )
-                service_results[service_name] = results
-                all_results.extend(results)
+        # Never sent, but reported so the run accounts for every test case
+        for test_case in unrouted:
+            result = RunScheduler.skipped_result(
+                f"No service configured for api_spec_id {test_case.get('api_spec_id')} or base_url '{test_case.get('base_url', '')}'"
+            )
+            if scheduler is not None:
+                scheduler.record(result)
+            all_results.append({'test_case': test_case, **result})
         
         # Generate inter-service communication report
         inter_service_report = TestExecutor._generate_inter_service_report(all_results, service_configs)
@@ -313,9 +540,44 @@ class TestExecutor:
         return {
             'results': all_results,
             'service_results': service_results,
-            'inter_service_report': inter_service_report
+            'inter_service_report': inter_service_report,
+            'concurrency': limiters.snapshot(),
+            'schedule': scheduler.summary() if scheduler is not None else None,
+            'retries': retry_budget.summary(),
+            'cassette': cassette.summary() if cassette is not None else None,
+            'resources': {service_name: pool.summary() for service_name, pool in resource_pools.items()} or None,
+            'data': {**data_context.describe(), 'rendered_values': sum(context.rendered for context in data_contexts.values())} if data_context is not None else None
         }
     
+    @staticmethod
+    def _route_test_cases_to_services(test_cases: List[Dict[str, Any]], service_configs: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, List[Dict[str, Any]]], List[Dict[str, Any]]]:
+        """Assign each test case to exactly one service in a single pass.
+
+        Routing uses a precomputed ``api_spec_id`` -> service map, falling back
+        to the test case's ``base_url`` for cases without a known spec.
+        Returns the cases per service and the cases no service matched.
+        """
+        spec_to_service = {}
+        base_url_to_service = {}
+        for service_name, config in service_configs.items():
+            if config.get('api_spec_id') is not None:
+                spec_to_service.setdefault(config['api_spec_id'], service_name)
+            if config.get('base_url'):
+                base_url_to_service.setdefault(config['base_url'], service_name)
+        
+        routed = {service_name: [] for service_name in service_configs}
+        unrouted = []
+        for test_case in test_cases:
+            service_name = spec_to_service.get(test_case.get('api_spec_id'))
+            if service_name is None:
+                service_name = base_url_to_service.get(test_case.get('base_url', ''))
+            if service_name is not None:
+                routed[service_name].append({**test_case, 'service_name': service_name})
+            else:
+                unrouted.append(test_case)
+        
+        return routed, unrouted
+    
     @staticmethod
     def _generate_inter_service_report(results: List[Dict[str, Any]], service_configs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         """Generate report for inter-service communication"""
@@ -328,7 +590,7 @@ class TestExecutor:
             
             # Track dependencies
             test_case = result.get('test_case', {})
-            service_name = TestExecutor._extract_service_name_from_url(test_case.get('base_url', ''))
+            service_name = test_case.get('service_name') or TestExecutor._extract_service_name_from_url(test_case.get('base_url', ''))
             if service_name not in service_dependencies:
                 service_dependencies[service_name] = set()
             
@@ -1,18 +1,59 @@
+import copy
 import json
-import random
+import shlex
 import string
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import urlencode
 from app.models.test_case import TestCaseType, TestCasePriority
+from app.core.tracing import traced
+from app.services.resource_pool import substitute_path_params
+from app.services.synthetic_data import DataContext, PLACEHOLDER_TAG, current_data_context, identity_kind, synthetic_value, use_data_context
+
+# Placeholder values for the boundary engine's valid baseline, by string format
+BASELINE_FORMATS = {
+    'email': "user@example.com",
+    'date': "2024-01-15",
+    'date-time': "2024-01-15T10:30:00Z",
+    'datetime': "2024-01-15T10:30:00Z",
+    'uuid': "123e4567-e89b-12d3-a456-426614174000",
+    'uri': "https://example.com/resource",
+    'url': "https://example.com/resource",
+    'ipv4': "192.168.1.10",
+}
+
+# Values that violate a string format
+INVALID_FORMATS = {
+    'email': "not-an-email",
+    'date': "2024-13-45",
+    'date-time': "not-a-datetime",
+    'datetime': "not-a-datetime",
+    'uuid': "not-a-uuid",
+    'uri': "not a uri",
+    'url': "not a url",
+    'ipv4': "999.999.999.999",
+}
+
+# A value of the wrong JSON type for each schema type
+WRONG_TYPE_VALUES = {
+    'string': 12345,
+    'integer': "not_an_integer",
+    'number': "not_a_number",
+    'boolean': "not_a_boolean",
+    'array': "not_an_array",
+    'object': "not_an_object",
+}
+
+BOUNDARY_MAX_DEPTH = 3
 
 class TestGenerator:
     """Service to generate test cases from API specifications"""
     
     @staticmethod
     def generate_curl_command(endpoint: Dict[str, Any], base_url: str = "", test_data: Dict[str, Any] = None) -> str:
-        """Generate CURL command for an endpoint"""
+        """Generate CURL command for an endpoint; every argument is shell-quoted"""
+        test_data = test_data or {}
         method = endpoint['method']
-        path = endpoint['path']
+        path = substitute_path_params(endpoint['path'], test_data.get('path_params'))
         url = f"{base_url}{path}"
         
         # Build CURL command
@@ -22,23 +63,24 @@ class TestGenerator:
         curl_parts.append('-H "Content-Type: application/json"')
         
         # Add authentication header if needed
-        if test_data and test_data.get('auth_token'):
-            curl_parts.append(f'-H "Authorization: Bearer {test_data["auth_token"]}"')
+        if test_data.get('auth_token'):
+            curl_parts.append(f"-H {shlex.quote('Authorization: Bearer ' + str(test_data['auth_token']))}")
+        
+        # LLM output may carry headers or query params that are not objects; those are left out
+        if isinstance(test_data.get('headers'), dict):
+            for key, value in test_data['headers'].items():
+                curl_parts.append(f"-H {shlex.quote(f'{key}: {value}')}")
         
         # Add request body for POST/PUT/PATCH
-        if method in ['POST', 'PUT', 'PATCH'] and test_data and test_data.get('body'):
+        if method in ['POST', 'PUT', 'PATCH'] and test_data.get('body'):
             body_json = json.dumps(test_data['body'])
-            curl_parts.append(f'-d \'{body_json}\'')
+            curl_parts.append(f'-d {shlex.quote(body_json)}')
         
         # Add query parameters
-        if test_data and test_data.get('query_params'):
-            query_params = []
-            for key, value in test_data['query_params'].items():
-                query_params.append(f"{key}={value}")
-            if query_params:
-                url += "?" + "&".join(query_params)
+        if isinstance(test_data.get('query_params'), dict) and test_data['query_params']:
+            url += "?" + urlencode({key: '' if value is None else value for key, value in test_data['query_params'].items()}, doseq=True)
         
-        curl_parts.append(f'"{url}"')
+        curl_parts.append(shlex.quote(url))
         
         return " ".join(curl_parts)
     
@@ -83,13 +125,14 @@ class TestGenerator:
             if param.get('in') == 'query':
                 param_name = param['name']
                 param_schema = param.get('schema', {})
-                query_params[param_name] = TestGenerator._generate_value_from_schema(param_schema, test_type)
+                query_params[param_name] = TestGenerator._generate_value_from_schema(param_schema, test_type, param_name)
         
         return query_params
     
     @staticmethod
     def _generate_from_schema(schema: Dict[str, Any], test_type: str) -> Dict[str, Any]:
         """Generate data from JSON schema"""
+        data = current_data_context()
         if schema.get('type') == 'object':
             result = {}
             properties = schema.get('properties', {})
@@ -98,59 +141,68 @@ class TestGenerator:
             for prop_name, prop_schema in properties.items():
                 if test_type == "edge_case" and prop_name in required:
                     # For edge cases, sometimes omit required fields
-                    if random.random() < 0.3:
+                    if data.random.random() < 0.3:
                         continue
                 
-                result[prop_name] = TestGenerator._generate_value_from_schema(prop_schema, test_type)
+                result[prop_name] = TestGenerator._generate_value_from_schema(prop_schema, test_type, prop_name)
             
             return result
         else:
             return TestGenerator._generate_value_from_schema(schema, test_type)
     
     @staticmethod
-    def _generate_value_from_schema(schema: Dict[str, Any], test_type: str) -> Any:
+    def _generate_value_from_schema(schema: Dict[str, Any], test_type: str, field: Optional[str] = None) -> Any:
         """Generate a single value from schema"""
         schema_type = schema.get('type', 'string')
         
         if test_type == "edge_case":
             return TestGenerator._generate_edge_case_value(schema_type, schema)
         else:
-            return TestGenerator._generate_normal_value(schema_type, schema)
+            return TestGenerator._generate_normal_value(schema_type, schema, field)
     
     @staticmethod
-    def _generate_normal_value(schema_type: str, schema: Dict[str, Any]) -> Any:
-        """Generate normal test value"""
+    def _generate_normal_value(schema_type: str, schema: Dict[str, Any], field: Optional[str] = None) -> Any:
+        """Generate normal test value from the active data context.
+
+        Identity-like fields (emails, usernames, SKUs) get values unique to
+        the run and shard, so thousands of creates never collide.
+        """
+        data = current_data_context()
         if schema_type == 'string':
+            kind = identity_kind(field, schema)
+            unique = data.unique(kind, schema.get('maxLength'), schema.get('minLength')) if kind else None
+            if unique is not None:
+                return unique
             if 'enum' in schema:
-                return random.choice(schema['enum'])
+                return data.random.choice(schema['enum'])
             elif 'format' in schema:
                 if schema['format'] == 'email':
-                    return f"test{random.randint(1000, 9999)}@example.com"
+                    return f"test{data.random.randint(1000, 9999)}@example.com"
                 elif schema['format'] == 'date':
-                    return datetime.now().strftime('%Y-%m-%d')
-                elif schema['format'] == 'datetime':
-                    return datetime.now().isoformat()
+                    return data.timestamp().strftime('%Y-%m-%d')
+                elif schema['format'] in ('datetime', 'date-time'):
+                    return data.timestamp().isoformat() + 'Z'
             else:
-                return f"test_string_{random.randint(1000, 9999)}"
+                return f"test_string_{data.random.randint(1000, 9999)}"
         
         elif schema_type == 'integer':
             minimum = schema.get('minimum', 1)
             maximum = schema.get('maximum', 100)
-            return random.randint(minimum, maximum)
+            return data.random.randint(minimum, maximum)
         
         elif schema_type == 'number':
             minimum = schema.get('minimum', 1.0)
             maximum = schema.get('maximum', 100.0)
-            return round(random.uniform(minimum, maximum), 2)
+            return round(data.random.uniform(minimum, maximum), 2)
         
         elif schema_type == 'boolean':
-            return random.choice([True, False])
+            return data.random.choice([True, False])
         
         elif schema_type == 'array':
             items_schema = schema.get('items', {})
             min_items = schema.get('minItems', 1)
             max_items = schema.get('maxItems', 3)
-            count = random.randint(min_items, max_items)
+            count = data.random.randint(min_items, max_items)
             
             return [TestGenerator._generate_value_from_schema(items_schema, "normal") for _ in range(count)]
         
@@ -159,6 +211,7 @@ class TestGenerator:
     @staticmethod
     def _generate_edge_case_value(schema_type: str, schema: Dict[str, Any]) -> Any:
         """Generate edge case test value"""
+        data = current_data_context()
         if schema_type == 'string':
             if 'enum' in schema:
                 # Return invalid enum value
@@ -172,21 +225,21 @@ class TestGenerator:
                     return "invalid-datetime"
             else:
                 # Generate very long string or special characters
-                if random.random() < 0.5:
+                if data.random.random() < 0.5:
                     return "x" * 10000  # Very long string
                 else:
                     return "!@#$%^&*()_+-=[]{}|;':\",./<>?"  # Special characters
         
         elif schema_type == 'integer':
             # Return negative value or very large number
-            if random.random() < 0.5:
+            if data.random.random() < 0.5:
                 return -999999
             else:
                 return 999999999
         
         elif schema_type == 'number':
             # Return very large or very small numbers instead of infinity/NaN
-            if random.random() < 0.5:
+            if data.random.random() < 0.5:
                 return 1e308  # Very large number
             else:
                 return -1e308  # Very small number
@@ -196,7 +249,7 @@ class TestGenerator:
         
         elif schema_type == 'array':
             # Return empty array or very large array
-            if random.random() < 0.5:
+            if data.random.random() < 0.5:
                 return []
             else:
                 return [None] * 1000
@@ -204,7 +257,9 @@ class TestGenerator:
         return None
     
     @staticmethod
-    def generate_test_cases(endpoint: Dict[str, Any], base_url: str = "", api_spec: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    @traced("test_generator.generate_test_cases")
+    def generate_test_cases(endpoint: Dict[str, Any], base_url: str = "", api_spec: Optional[Dict[str, Any]] = None,
+                            data_context: Optional[DataContext] = None) -> List[Dict[str, Any]]:
         """Generate multiple test cases for an endpoint with RAG support"""
         
         # Try RAG generation first if API spec is provided
@@ -218,16 +273,16 @@ class TestGenerator:
                 if rag_generator:
                     rag_test_cases = rag_generator.generate_rag_test_cases(endpoint, api_spec, base_url)
                     
-                    # If RAG generation succeeded and returned test cases, use them
+                    # If RAG generation succeeded and returned test cases, use them with the rule engine's boundary cases
                     if rag_test_cases and len(rag_test_cases) > 0:
-                        return rag_test_cases
+                        return rag_test_cases + TestGenerator.generate_boundary_test_cases(endpoint, base_url, api_spec)
                     
             except Exception as e:
                 # If RAG fails, fall back to rule-based generation
                 print(f"RAG generation failed, falling back to rule-based: {str(e)}")
         
         # Fallback to original rule-based generation
-        return TestGenerator._generate_rule_based_test_cases(endpoint, base_url)
+        return TestGenerator.generate_automated_test_cases(endpoint, base_url, api_spec, data_context)
     
     @staticmethod
     def _generate_rule_based_test_cases(endpoint: Dict[str, Any], base_url: str = "") -> List[Dict[str, Any]]:
@@ -309,6 +364,7 @@ class TestGenerator:
         return test_cases[:5] 
 
     @staticmethod
+    @traced("test_generator.generate_test_cases_for_all_endpoints")
     def generate_test_cases_for_all_endpoints(endpoints: List[Dict[str, Any]], base_url: str = "", api_spec: Optional[Dict[str, Any]] = None) -> Dict[str, List[Dict[str, Any]]]:
         """Generate test cases for all endpoints in a single RAG request to avoid rate limiting"""
         from app.core.ai_config import get_rag_generator
@@ -325,4 +381,343 @@ class TestGenerator:
             for endpoint in endpoints:
                 endpoint_key = f"{endpoint['method']}_{endpoint['path']}"
                 result[endpoint_key] = TestGenerator._generate_rule_based_test_cases(endpoint, base_url)
-            return result 
\ No newline at end of file
+            return result
+
+    @staticmethod
+    def generate_automated_test_cases(endpoint: Dict[str, Any], base_url: str = "", api_spec: Optional[Dict[str, Any]] = None,
+                                      data_context: Optional[DataContext] = None) -> List[Dict[str, Any]]:
+        """Every locally generated test case: the rule-based set plus the boundary and negative cases.
+
+        With a ``data_context`` the endpoint draws from its own stream of it,
+        so the same seed regenerates the same data whatever order endpoints
+        are processed in.
+        """
+        if data_context is not None:
+            with use_data_context(data_context.stream(f"{endpoint['method']} {endpoint['path']}")):
+                return TestGenerator.generate_automated_test_cases(endpoint, base_url, api_spec)
+        return (
+            TestGenerator._generate_rule_based_test_cases(endpoint, base_url)
+            + TestGenerator.generate_boundary_test_cases(endpoint, base_url, api_spec)
+        )
+
+    @staticmethod
+    @traced("test_generator.generate_boundary_test_cases")
+    def generate_boundary_test_cases(endpoint: Dict[str, Any], base_url: str = "", api_spec: Optional[Dict[str, Any]] = None,
+                                     max_cases: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Schema-driven boundary and negative test cases, generated without an LLM.
+
+        Starts from a valid baseline request and changes one field per case:
+        missing required fields, values at and just past minimum/maximum,
+        minLength/maxLength and minItems/maxItems, wrong types, enum and
+        format violations. Output is deterministic, so regenerating an
+        endpoint yields the same cases. Local ``$ref``s are resolved against
+        ``api_spec``. Capped at RULE_CASES_PER_ENDPOINT, most important first.
+        """
+        from app.core.ai_config import ai_config
+        limit = max_cases if max_cases is not None else ai_config.RULE_CASES_PER_ENDPOINT
+        if limit <= 0:
+            return []
+
+        fields = TestGenerator._boundary_fields(endpoint, api_spec or {})
+        if not fields:
+            return []
+
+        baseline = {'body': {}, 'query_params': {}, 'headers': {}}
+        for location, path, schema, required in fields:
+            if location != 'body':
+                TestGenerator._set_path(baseline, location, path, TestGenerator._baseline_value(schema, name=path[-1]))
+        body_schema = TestGenerator._body_schema(endpoint, api_spec or {})
+        if body_schema is not None:
+            baseline['body'] = TestGenerator._baseline_value(body_schema)
+
+        success_status = TestGenerator._status_for(endpoint, '2', 200)
+        invalid_status = 400 if '400' in (endpoint.get('responses') or {}) or '422' not in (endpoint.get('responses') or {}) else 422
+
+        # (priority rank, case) so the cap keeps the most useful cases
+        candidates: List[Tuple[int, Dict[str, Any]]] = [(0, {
+            'name': "Valid baseline",
+            'description': "Request satisfying every schema constraint; the reference for the boundary cases below",
+            'priority': TestCasePriority.MEDIUM,
+            'input_data': baseline,
+            'expected_status_code': success_status,
+            'rule': 'baseline'
+        })]
+
+        def mutate(location: str, path: Tuple[str, ...], value: Any = None, remove: bool = False) -> Dict[str, Any]:
+            input_data = copy.deepcopy(baseline)
+            if remove:
+                TestGenerator._remove_path(input_data, location, path)
+            else:
+                TestGenerator._set_path(input_data, location, path, value)
+            return input_data
+
+        def add(rank: int, rule: str, field: str, description: str, input_data: Dict[str, Any], valid: bool):
+            if valid and input_data == baseline:
+                return  # the baseline already sits on this boundary
+            candidates.append((rank, {
+                'name': f"{'Boundary' if valid else 'Invalid'}: {field} {description}",
+                'description': f"{field}: {description} (expects {'success' if valid else 'a validation error'})",
+                'priority': TestCasePriority.MEDIUM if valid else TestCasePriority.HIGH,
+                'input_data': input_data,
+                'expected_status_code': success_status if valid else invalid_status,
+                'rule': rule
+            }))
+
+        for location, path, schema, required in fields:
+            field = '.'.join(path) if location == 'body' else f"{location.rstrip('s').replace('_param', '')} {path[-1]}"
+            schema_type = TestGenerator._schema_type(schema)
+            wire_string = location != 'body'  # query and header values reach the server as strings
+
+            if required:
+                add(1, 'missing_required', field, "missing (required)", mutate(location, path, remove=True), False)
+
+            if 'enum' in schema and schema['enum']:
+                add(2, 'enum', field, "not one of the allowed values", mutate(location, path, TestGenerator._enum_violation(schema['enum'])), False)
+
+            if schema_type in ('integer', 'number'):
+                step = 1 if schema_type == 'integer' else 0.01
+                lower, lower_exclusive = TestGenerator._bound(schema, 'minimum', 'exclusiveMinimum')
+                upper, upper_exclusive = TestGenerator._bound(schema, 'maximum', 'exclusiveMaximum')
+                if lower is not None:
+                    lowest = lower + step if lower_exclusive else lower
+                    add(3, 'minimum', field, f"at minimum ({TestGenerator._round(lowest)})", mutate(location, path, TestGenerator._round(lowest)), True)
+                    add(2, 'minimum', field, f"below minimum ({TestGenerator._round(lowest - step)})", mutate(location, path, TestGenerator._round(lowest - step)), False)
+                if upper is not None:
+                    highest = upper - step if upper_exclusive else upper
+                    add(3, 'maximum', field, f"at maximum ({TestGenerator._round(highest)})", mutate(location, path, TestGenerator._round(highest)), True)
+                    add(2, 'maximum', field, f"above maximum ({TestGenerator._round(highest + step)})", mutate(location, path, TestGenerator._round(highest + step)), False)
+
+            elif schema_type == 'string' and 'enum' not in schema:
+                min_length, max_length = schema.get('minLength'), schema.get('maxLength')
+                # Filler strings rarely match a pattern, so only the too-short/too-long cases are safe there
+                exact_lengths = 'pattern' not in schema and 'format' not in schema
+                if isinstance(min_length, int) and min_length > 0:
+                    if exact_lengths:
+                        add(3, 'minLength', field, f"at minLength ({min_length})", mutate(location, path, TestGenerator._string_of_length(min_length)), True)
+                    add(2, 'minLength', field, f"shorter than minLength ({min_length - 1})", mutate(location, path, TestGenerator._string_of_length(min_length - 1)), False)
+                if isinstance(max_length, int):
+                    if exact_lengths:
+                        add(3, 'maxLength', field, f"at maxLength ({max_length})", mutate(location, path, TestGenerator._string_of_length(max_length)), True)
+                    add(2, 'maxLength', field, f"longer than maxLength ({max_length + 1})", mutate(location, path, TestGenerator._string_of_length(max_length + 1)), False)
+                if schema.get('format') in INVALID_FORMATS:
+                    add(2, 'format', field, f"invalid {schema['format']}", mutate(location, path, INVALID_FORMATS[schema['format']]), False)
+
+            elif schema_type == 'array':
+                item = TestGenerator._baseline_value(schema.get('items') or {})
+                min_items, max_items = schema.get('minItems'), schema.get('maxItems')
+                if isinstance(min_items, int) and min_items > 0:
+                    add(2, 'minItems', field, f"fewer than minItems ({min_items - 1} items)", mutate(location, path, [item] * (min_items - 1)), False)
+                if isinstance(max_items, int):
+                    add(3, 'maxItems', field, f"at maxItems ({max_items} items)", mutate(location, path, [item] * max_items), True)
+                    add(2, 'maxItems', field, f"more than maxItems ({max_items + 1} items)", mutate(location, path, [item] * (max_items + 1)), False)
+
+            if schema_type in WRONG_TYPE_VALUES and not (wire_string and schema_type == 'string'):
+                add(4, 'type', field, f"wrong type (not {schema_type})", mutate(location, path, WRONG_TYPE_VALUES[schema_type]), False)
+
+        candidates.sort(key=lambda candidate: candidate[0])  # stable: spec order within a rank
+        test_cases = []
+        for _, case in candidates[:limit]:
+            test_cases.append({
+                'name': f"{case['name']} {endpoint['method']} {endpoint['path']}",
+                'description': case['description'],
+                'test_type': TestCaseType.AUTOMATED,
+                'priority': case['priority'],
+                'input_data': case['input_data'],
+                'expected_status_code': case['expected_status_code'],
+                'curl_command': TestGenerator.generate_curl_command(endpoint, base_url, case['input_data']),
+                'test_script': f"rule: {case['rule']}",
+                # Exact values matter here (minimum vs minimum - 1), so dedup must not mask them
+                'deterministic': True
+            })
+        return test_cases
+
+    @staticmethod
+    def _resolve_schema(schema: Any, api_spec: Dict[str, Any], depth: int = 0) -> Dict[str, Any]:
+        """Follow local $refs (#/components/schemas/..., #/definitions/...) and merge allOf"""
+        if not isinstance(schema, dict) or depth > 20:
+            return {}
+        if '$ref' in schema:
+            target: Any = api_spec
+            for part in schema['$ref'].lstrip('#/').split('/'):
+                target = target.get(part, {}) if isinstance(target, dict) else {}
+            return TestGenerator._resolve_schema(target, api_spec, depth + 1)
+        if 'allOf' in schema:
+            merged: Dict[str, Any] = {key: value for key, value in schema.items() if key != 'allOf'}
+            for part in schema['allOf']:
+                resolved = TestGenerator._resolve_schema(part, api_spec, depth + 1)
+                merged.setdefault('properties', {}).update(resolved.get('properties', {}))
+                merged['required'] = list(merged.get('required', [])) + list(resolved.get('required', []))
+                for key, value in resolved.items():
+                    if key not in ('properties', 'required'):
+                        merged.setdefault(key, value)
+            return merged
+        return schema
+
+    @staticmethod
+    def _body_schema(endpoint: Dict[str, Any], api_spec: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        request_body = endpoint.get('request_body') or {}
+        if endpoint['method'] not in ('POST', 'PUT', 'PATCH'):
+            return None
+        for content_type, content_spec in (request_body.get('content') or {}).items():
+            if 'json' in content_type and isinstance(content_spec, dict) and 'schema' in content_spec:
+                return TestGenerator._resolve_schema(content_spec['schema'], api_spec)
+        # Swagger 2.0 body parameter
+        for param in endpoint.get('parameters') or []:
+            if isinstance(param, dict) and param.get('in') == 'body' and 'schema' in param:
+                return TestGenerator._resolve_schema(param['schema'], api_spec)
+        return None
+
+    @staticmethod
+    def _boundary_fields(endpoint: Dict[str, Any], api_spec: Dict[str, Any]) -> List[Tuple[str, Tuple[str, ...], Dict[str, Any], bool]]:
+        """(location, path, schema, required) for every constrained input of the endpoint"""
+        fields = []
+        for param in endpoint.get('parameters') or []:
+            if not isinstance(param, dict) or param.get('in') not in ('query', 'header') or not param.get('name'):
+                continue
+            # OpenAPI 3 nests the schema; Swagger 2.0 puts type and limits on the parameter
+            schema = TestGenerator._resolve_schema(param.get('schema') or param, api_spec)
+            location = 'query_params' if param['in'] == 'query' else 'headers'
+            fields.append((location, (param['name'],), schema, bool(param.get('required'))))
+
+        body_schema = TestGenerator._body_schema(endpoint, api_spec)
+        if body_schema is not None:
+            TestGenerator._collect_body_fields(body_schema, (), api_spec, fields, 0)
+        return fields
+
+    @staticmethod
+    def _collect_body_fields(schema: Dict[str, Any], path: Tuple[str, ...], api_spec: Dict[str, Any], fields: List, depth: int):
+        if depth >= BOUNDARY_MAX_DEPTH:
+            return
+        required = set(schema.get('required') or [])
+        for name, prop_schema in (schema.get('properties') or {}).items():
+            prop_schema = TestGenerator._resolve_schema(prop_schema, api_spec)
+            if prop_schema.get('readOnly'):
+                continue
+            fields.append(('body', path + (name,), prop_schema, name in required))
+            if TestGenerator._schema_type(prop_schema) == 'object':
+                TestGenerator._collect_body_fields(prop_schema, path + (name,), api_spec, fields, depth + 1)
+
+    @staticmethod
+    def _schema_type(schema: Dict[str, Any]) -> Optional[str]:
+        schema_type = schema.get('type')
+        if isinstance(schema_type, list):
+            # OpenAPI 3.1: ["string", "null"]
+            schema_type = next((item for item in schema_type if item != 'null'), None)
+        if schema_type:
+            return schema_type
+        if 'properties' in schema:
+            return 'object'
+        if 'items' in schema:
+            return 'array'
+        return None
+
+    @staticmethod
+    def _baseline_value(schema: Dict[str, Any], depth: int = 0, name: Optional[str] = None) -> Any:
+        """A deterministic value satisfying the schema's type, enum, format and limits.
+
+        Identity-like fields get a placeholder the executor re-keys on every
+        run, so replaying the baseline does not hit unique constraints.
+        """
+        for key in ('example', 'default'):
+            if key in schema and schema[key] is not None:
+                return copy.deepcopy(schema[key])
+        if schema.get('enum'):
+            return schema['enum'][0]
+
+        schema_type = TestGenerator._schema_type(schema)
+        if schema_type == 'object':
+            if depth >= BOUNDARY_MAX_DEPTH:
+                return {}
+            return {
+                prop_name: TestGenerator._baseline_value(prop_schema, depth + 1, prop_name)
+                for prop_name, prop_schema in (schema.get('properties') or {}).items()
+                if not prop_schema.get('readOnly')
+            }
+        if schema_type == 'array':
+            count = max(schema.get('minItems') or 1, 1)
+            if isinstance(schema.get('maxItems'), int):
+                count = min(count, schema['maxItems'])
+            return [TestGenerator._baseline_value(schema.get('items') or {}, depth + 1) for _ in range(count)]
+        if schema_type in ('integer', 'number'):
+            step = 1 if schema_type == 'integer' else 0.01
+            lower, lower_exclusive = TestGenerator._bound(schema, 'minimum', 'exclusiveMinimum')
+            upper, upper_exclusive = TestGenerator._bound(schema, 'maximum', 'exclusiveMaximum')
+            if lower is not None:
+                value = lower + step if lower_exclusive else lower
+            elif upper is not None:
+                value = min(upper - step if upper_exclusive else upper, 1)
+            else:
+                value = 1
+            return int(value) if schema_type == 'integer' else TestGenerator._round(float(value))
+        if schema_type == 'boolean':
+            return True
+        kind = identity_kind(name, schema)
+        placeholder = synthetic_value(kind, PLACEHOLDER_TAG, 0, schema.get('maxLength'), schema.get('minLength')) if kind else None
+        if placeholder is not None:
+            return placeholder
+        if schema.get('format') in BASELINE_FORMATS:
+            return BASELINE_FORMATS[schema['format']]
+        length = 6
+        if isinstance(schema.get('minLength'), int):
+            length = max(length, schema['minLength'])
+        if isinstance(schema.get('maxLength'), int):
+            length = min(length, schema['maxLength'])
+        return TestGenerator._string_of_length(length)
+
+    @staticmethod
+    def _bound(schema: Dict[str, Any], key: str, exclusive_key: str) -> Tuple[Optional[float], bool]:
+        """(limit, exclusive) from OpenAPI 3.0 boolean or 3.1 numeric exclusive bounds"""
+        exclusive = schema.get(exclusive_key)
+        if isinstance(exclusive, (int, float)) and not isinstance(exclusive, bool):
+            return exclusive, True
+        limit = schema.get(key)
+        if isinstance(limit, (int, float)) and not isinstance(limit, bool):
+            return limit, exclusive is True
+        return None, False
+
+    @staticmethod
+    def _round(value: float) -> Any:
+        return round(value, 6) if isinstance(value, float) else value
+
+    @staticmethod
+    def _string_of_length(length: int) -> str:
+        return ("sample" * (length // 6 + 1))[:max(length, 0)]
+
+    @staticmethod
+    def _enum_violation(enum: List[Any]) -> Any:
+        if all(isinstance(value, str) for value in enum):
+            candidate = "invalid_enum_value"
+            while candidate in enum:
+                candidate += "_x"
+            return candidate
+        numbers = [value for value in enum if isinstance(value, (int, float)) and not isinstance(value, bool)]
+        if numbers:
+            return max(numbers) + 1
+        return "invalid_enum_value"
+
+    @staticmethod
+    def _status_for(endpoint: Dict[str, Any], prefix: str, default: int) -> int:
+        """First documented status code starting with ``prefix``, else ``default``"""
+        for code in sorted(str(code) for code in (endpoint.get('responses') or {})):
+            if code.startswith(prefix) and code.isdigit():
+                return int(code)
+        return default
+
+    @staticmethod
+    def _set_path(input_data: Dict[str, Any], location: str, path: Tuple[str, ...], value: Any):
+        target = input_data.setdefault(location, {})
+        for part in path[:-1]:
+            if not isinstance(target.get(part), dict):
+                target[part] = {}
+            target = target[part]
+        target[path[-1]] = str(value) if location == 'headers' and not isinstance(value, str) else value
+
+    @staticmethod
+    def _remove_path(input_data: Dict[str, Any], location: str, path: Tuple[str, ...]):
+        target = input_data.get(location)
+        for part in path[:-1]:
+            if not isinstance(target, dict):
+                return
+            target = target.get(part)
+        if isinstance(target, dict):
+            target.pop(path[-1], None)
@@ -0,0 +1,94 @@
+"""
+Adaptive concurrency limiter checked against a scripted target.
+
+Runs TestExecutor.execute_test_suite with the HTTP layer replaced by a
+local script (no network), and feeds the limiter directly:
+
+  - fast errors: connect errors, requests never answered and cassette
+    replays mixed into a steady 50 ms target leave the baseline and the
+    limit alone
+  - windowed baseline: one very fast sample stops counting once it leaves
+    the latency window, so later healthy samples grow the limit again
+
+Run from the backend directory; the exit code is 1 when a scenario fails:
+
+    python benchmarks/adaptive_concurrency.py
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.concurrency_limiter import AdaptiveConcurrencyLimiter, AdaptiveLimiterRegistry
+from app.services.retry_policy import RetryPolicy
+from app.services.test_executor import TestExecutor
+
+BASE_URL = "http://scripted-target:8000"
+TARGET_LATENCY = 0.05
+
+async def scripted_request(test_case, base_url, service_configs=None, cassette=None):
+    """Healthy cases answer 200 after TARGET_LATENCY; the others fail or replay at once"""
+    kind = test_case['path'].rsplit('/', 1)[-1]
+    if kind == 'connect':
+        return {'status_code': None, 'body': None, 'error': 'Connection failed', 'service_calls': [], 'error_type': 'connect'}
+    if kind == 'replayed':
+        return {'status_code': 200, 'body': '{}', 'headers': {}, 'service_calls': [], 'replayed': True}
+    await asyncio.sleep(TARGET_LATENCY)
+    return {'status_code': 200, 'body': '{}', 'headers': {}, 'service_calls': []}
+
+def case(index: int, kind: str):
+    return {'id': index, 'method': 'GET', 'path': f"/items/{kind}", 'input_data': {}, 'expected_status_code': 200}
+
+def fast_errors():
+    kinds = ['healthy', 'connect', 'healthy', 'replayed']
+    test_cases = [case(index, kinds[index % len(kinds)]) for index in range(400)]
+    limiters = AdaptiveLimiterRegistry()
+    original = TestExecutor._execute_http_request
+    TestExecutor._execute_http_request = staticmethod(scripted_request)
+    try:
+        results = asyncio.run(TestExecutor.execute_test_suite(
+            test_cases, BASE_URL, limiters=limiters, retry_policy=RetryPolicy(max_attempts=1)
+        ))
+    finally:
+        TestExecutor._execute_http_request = original
+    limiter = limiters.for_url(BASE_URL)
+    reasons = {point['reason'] for point in limiter.trajectory}
+    return [
+        ("every case ran", len(results) == len(test_cases)),
+        (f"baseline is the target's latency ({limiter.min_latency} ms)", limiter.min_latency is not None and limiter.min_latency >= TARGET_LATENCY * 1000 * 0.8),
+        (f"no latency cuts ({sorted(reasons)})", 'latency' not in reasons),
+        (f"limit did not shrink ({limiter.limit:.2f})", limiter.limit >= settings.MAX_CONCURRENT_TESTS),
+    ]
+
+def windowed_baseline():
+    limiter = AdaptiveConcurrencyLimiter('scripted-target:8000', initial_limit=10, max_limit=100)
+    window = settings.ADAPTIVE_CONCURRENCY_LATENCY_WINDOW
+    limiter._on_sample(1.0, 200, False, int(limiter.limit))
+    for _ in range(window * 3):
+        limiter._on_sample(50.0, 200, False, int(limiter.limit))
+    last_cut = max(index for index, point in enumerate(limiter.trajectory) if point['reason'] == 'latency')
+    grown_after = [point for point in limiter.trajectory[last_cut + 1:] if point['reason'] == 'increase']
+    return [
+        (f"baseline back at 50 ms after {window} samples ({limiter.min_latency} ms)", limiter.min_latency == 50.0),
+        ("limit grows again once the fast sample is out of the window", len(grown_after) > 0),
+    ]
+
+SCENARIOS = {
+    'fast errors': fast_errors,
+    'windowed baseline': windowed_baseline,
+}
+
+def main():
+    failed = 0
+    for name, scenario in SCENARIOS.items():
+        print(name)
+        for description, passed in scenario():
+            print(f"  {'ok  ' if passed else 'FAIL'} {description}")
+            failed += not passed
+    print(f"{failed} checks failed" if failed else "all checks passed")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Import-time budget check for the API process.
+
+Imports the application in a fresh interpreter with ``-X importtime``,
+prints the slowest modules and fails (exit code 1) when the total exceeds
+the budget or when a module that should load lazily is imported at
+startup (AI provider SDKs and settings, the OpenTelemetry SDK, pyinstrument,
+the generation job runner and what it pulls in). Run from the backend
+directory:
+
+    python benchmarks/import_time.py [--budget-ms 1500] [--runs 3] [--top 15]
+
+The best of several runs is compared, so one slow filesystem read does not
+fail the check.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Only imported when the feature is used; pulling one in at startup is a regression
+LAZY_MODULES = (
+    'openai',
+    'google.generativeai',
+    'opentelemetry.sdk',
+    'pyinstrument',
+    'app.services.rag_test_generator',
+    'app.services.deepseek_rag_generator',
+    'app.services.aimlapi_rag_generator',
+    'app.services.gemini_rag_generator',
+    'app.services.llm_hedging',
+    'app.core.ai_config',
+    'app.services.generation_jobs',
+    'app.services.test_case_validation',
+    'app.services.test_case_dedup',
+    'app.services.spec_index',
+    'app.services.llm_streaming',
+    'app.services.llm_accounting',
+)
+
+def measure_imports(module: str) -> list:
+    """(module, self_us, cumulative_us) for every import in a fresh interpreter"""
+    env = dict(os.environ)
+    # Importing the app creates the engine, so give it a database URL that needs no server
+    env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.gettempdir(), 'import_time.db')}")
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the API import time against a budget")
+    parser.add_argument('--module', default='app.main', help="module to import (default app.main)")
+    parser.add_argument('--budget-ms', type=float, default=1500, help="maximum import time in milliseconds (default 1500)")
+    parser.add_argument('--runs', type=int, default=3, help="fresh interpreters to try; the fastest counts (default 3)")
+    parser.add_argument('--top', type=int, default=15, help="slowest top-level packages to list")
+    args = parser.parse_args()
+
+    # The first run also warms the bytecode cache
+    runs = [measure_imports(args.module) for _ in range(max(1, args.runs))]
+    imports = min(runs, key=lambda run: sum(self_us for _, self_us, _ in run))
+    total_ms = sum(self_us for _, self_us, _ in imports) / 1000
+
+    packages = {}
+    for name, self_us, _ in imports:
+        package = name.split('.')[0] if not name.startswith('app.') else '.'.join(name.split('.')[:3])
+        packages[package] = packages.get(package, 0) + self_us
+
+    print(f"Import of {args.module}: {total_ms:.0f} ms (best of {len(runs)}, budget {args.budget_ms:.0f} ms)")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+    imported = {name for name, _, _ in imports}
+    eager = [module for module in LAZY_MODULES if module in imported]
+    failed = False
+    if eager:
+        print(f"Imported at startup but should load lazily: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"Import time {total_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
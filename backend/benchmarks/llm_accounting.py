@@ -0,0 +1,96 @@
+"""
+LLM usage summary checked against a scratch SQLite database.
+
+Records calls avoided by the rule engine the way the generators do, then
+persists them the way the request and job paths do:
+
+  - request path: /generate and friends persist outside any job, and the
+    spec's usage summary (and the overall one) still counts the avoided calls
+  - job path: a job's avoided calls show in its own summary and its spec's,
+    without the request path's leaking into the job's
+
+Run from the backend directory; the exit code is 1 when a scenario fails:
+
+    python benchmarks/llm_accounting.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'llm_accounting.db')}"
+
+from app.core.database import SessionLocal, create_tables
+from app.core.llm_usage import LLMUsageLedger, use_ledger
+from app.core.metrics import record_llm_calls_avoided
+from app.models.api_spec import APISpec as APISpecModel
+from app.models.generation_job import GenerationJob as GenerationJobModel
+from app.services.llm_accounting import LLMAccounting
+
+def avoid(ledger: LLMUsageLedger, categories):
+    with use_ledger(ledger):
+        record_llm_calls_avoided('openai', categories)
+
+def request_path(db):
+    spec = APISpecModel(name="request path")
+    other = APISpecModel(name="other")
+    db.add_all([spec, other])
+    db.commit()
+    for categories in (['boundary', 'negative'], ['negative']):
+        ledger = LLMAccounting.request_ledger()
+        avoid(ledger, categories)
+        LLMAccounting.persist_request(db, spec.id, ledger)
+        db.commit()
+    spec_usage = LLMAccounting.summary(db, api_spec_id=spec.id)
+    other_usage = LLMAccounting.summary(db, api_spec_id=other.id)
+    overall = LLMAccounting.summary(db)
+    return [
+        (f"spec summary counts the requests' avoided calls ({spec_usage['llm_calls_avoided']})", spec_usage['llm_calls_avoided'] == 3),
+        (f"other specs are unaffected ({other_usage['llm_calls_avoided']})", other_usage['llm_calls_avoided'] == 0),
+        (f"overall summary counts them ({overall['llm_calls_avoided']})", overall['llm_calls_avoided'] >= 3),
+    ]
+
+def job_path(db):
+    spec = APISpecModel(name="job path")
+    db.add(spec)
+    db.commit()
+    job = GenerationJobModel(api_spec_id=spec.id, status='running', endpoint_ids=[])
+    db.add(job)
+    db.commit()
+    ledger = LLMAccounting.ledger_for(job)
+    avoid(ledger, ['boundary', 'negative'])
+    LLMAccounting.persist(db, job, ledger)
+    ledger = LLMAccounting.request_ledger()
+    avoid(ledger, ['boundary'])
+    LLMAccounting.persist_request(db, spec.id, ledger)
+    db.commit()
+    job_usage = LLMAccounting.summary(db, job_id=job.id)
+    spec_usage = LLMAccounting.summary(db, api_spec_id=spec.id)
+    return [
+        (f"job summary counts only the job's ({job_usage['llm_calls_avoided']})", job_usage['llm_calls_avoided'] == 2),
+        (f"spec summary counts the job's and the request's ({spec_usage['llm_calls_avoided']})", spec_usage['llm_calls_avoided'] == 3),
+    ]
+
+SCENARIOS = {
+    'request path': request_path,
+    'job path': job_path,
+}
+
+def main():
+    create_tables()
+    failed = 0
+    for name, scenario in SCENARIOS.items():
+        print(name)
+        db = SessionLocal()
+        try:
+            checks = scenario(db)
+        finally:
+            db.close()
+        for description, passed in checks:
+            print(f"  {'ok  ' if passed else 'FAIL'} {description}")
+            failed += not passed
+    print(f"{failed} checks failed" if failed else "all checks passed")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
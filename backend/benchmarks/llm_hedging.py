@@ -0,0 +1,136 @@
+"""
+Hedged generation checked against two local fake providers.
+
+Runs HedgedRAGGenerator over in-process providers with scripted latency
+and failures, no network or API keys involved:
+
+  - slow primary: the hedge fires after the delay and the fast provider wins
+  - failing primary: the next provider is tried at once, without waiting
+  - all fail: retried with backoff, then the rule-based fallback is returned
+  - re-ranking: a provider that keeps losing drops behind the other by p95
+
+Run from the backend directory; the exit code is 1 when a scenario fails:
+
+    python benchmarks/llm_hedging.py
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.test_case import TestCaseType
+from app.services.llm_hedging import HedgedRAGGenerator, ProviderLatencyTracker
+from app.services.llm_streaming import emit_test_case
+
+ENDPOINT = {'method': 'GET', 'path': '/users/{user_id}'}
+HEDGE_DELAY = 0.2
+
+class FakeProvider:
+    """Answers after ``delay`` seconds with two AI test cases, or fails, or only has its rule-based fallback"""
+
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False, fallback_only: bool = False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.fallback_only = fallback_only
+        self.is_available = True
+        self.calls = 0
+        self.cancelled = 0
+        self.lock = threading.Lock()
+
+    def generate_rag_test_cases(self, endpoint, api_spec, base_url="", on_test_case=None):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        test_type = TestCaseType.AUTOMATED if self.fallback_only else TestCaseType.AI_GENERATED
+        test_cases = []
+        try:
+            for index in range(2):
+                test_case = {'name': f"{self.name} case {index + 1}", 'test_type': test_type, 'provider': self.name}
+                test_cases.append(emit_test_case(on_test_case, endpoint, test_case))
+                time.sleep(0.01)
+        except Exception:
+            with self.lock:
+                self.cancelled += 1
+            raise
+        return test_cases
+
+def hedged(providers, tracker=None, max_retries=0):
+    return HedgedRAGGenerator(
+        {provider.name: provider for provider in providers}, hedge_delay=HEDGE_DELAY, max_retries=max_retries,
+        retry_base_delay=0.05, retry_max_delay=0.1, tracker=tracker or ProviderLatencyTracker(window=20)
+    )
+
+def generate(generator):
+    delivered = []
+    start_time = time.perf_counter()
+    test_cases = generator.generate_rag_test_cases(ENDPOINT, {}, "", on_test_case=lambda key, test_case: delivered.append(test_case))
+    return test_cases, delivered, time.perf_counter() - start_time
+
+def slow_primary():
+    slow, fast = FakeProvider('slow', delay=1.0), FakeProvider('fast', delay=0.02)
+    test_cases, delivered, elapsed = generate(hedged([slow, fast]))
+    time.sleep(1.1)  # let the losing call reach its next test case
+    return [
+        ("fast provider's cases returned", {case['provider'] for case in test_cases} == {'fast'}),
+        ("only the winner's cases delivered", [case['name'] for case in delivered] == [case['name'] for case in test_cases]),
+        (f"answered after the hedge delay ({elapsed:.2f}s)", HEDGE_DELAY <= elapsed < 0.6),
+        ("slow provider cancelled at its first test case", slow.cancelled == 1),
+    ]
+
+def failing_primary():
+    failing, healthy = FakeProvider('failing', fail=True), FakeProvider('healthy', delay=0.02)
+    test_cases, _, elapsed = generate(hedged([failing, healthy]))
+    return [
+        ("healthy provider's cases returned", {case['provider'] for case in test_cases} == {'healthy'}),
+        (f"handed over without waiting for the hedge delay ({elapsed:.2f}s)", elapsed < HEDGE_DELAY),
+    ]
+
+def all_fail():
+    failing, fallback = FakeProvider('failing', fail=True), FakeProvider('fallback', fallback_only=True)
+    test_cases, delivered, _ = generate(hedged([failing, fallback], max_retries=2))
+    return [
+        ("every provider tried in every round", (failing.calls, fallback.calls) == (3, 3)),
+        ("rule-based fallback returned", len(test_cases) == 2 and all(case['test_type'] == TestCaseType.AUTOMATED for case in test_cases)),
+        ("fallback delivered once", len(delivered) == 2),
+    ]
+
+def re_ranking():
+    tracker = ProviderLatencyTracker(window=20)
+    # 'lagging' is listed first, so it starts as the primary
+    lagging, quick = FakeProvider('lagging', delay=0.5), FakeProvider('quick', delay=0.02)
+    generator = hedged([lagging, quick], tracker)
+    for _ in range(3):
+        generate(generator)
+    ranking = tracker.rank(['lagging', 'quick'])
+    lagging_calls = lagging.calls
+    _, _, elapsed = generate(generator)
+    time.sleep(0.6)
+    return [
+        (f"quick ranked first by p95 {tracker.summary()}", ranking == ['quick', 'lagging']),
+        (f"quick answers as the primary, no hedge ({elapsed:.2f}s)", elapsed < HEDGE_DELAY and lagging.calls == lagging_calls),
+    ]
+
+SCENARIOS = {
+    'slow primary': slow_primary,
+    'failing primary': failing_primary,
+    'all fail': all_fail,
+    're-ranking': re_ranking,
+}
+
+def main():
+    failed = 0
+    for name, scenario in SCENARIOS.items():
+        print(name)
+        for description, passed in scenario():
+            print(f"  {'ok  ' if passed else 'FAIL'} {description}")
+            failed += not passed
+    print(f"{failed} checks failed" if failed else "all checks passed")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
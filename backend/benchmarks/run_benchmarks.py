@@ -0,0 +1,441 @@
+"""
+Reproducible benchmark suite for the backend hot paths.
+
+Covers APIParser on synthetic specs, TestGenerator throughput,
+TestExecutor.execute_test_suite against an in-process ASGI stand-in and
+against test-apis/user-api on SQLite, ReportGenerator on large result sets
+and TestResult writes. Results are saved as JSON (one file per run, tagged
+with the git commit) and can be checked against a baseline:
+
+    python benchmarks/run_benchmarks.py                       # full run
+    python benchmarks/run_benchmarks.py --quick               # smaller sizes
+    python benchmarks/run_benchmarks.py --only parser executor_asgi
+    python benchmarks/run_benchmarks.py --baseline benchmarks/results/<file>.json --threshold 0.2
+
+With --baseline the exit code is 1 when any benchmark's best time grew by
+more than the threshold (a fraction, default 0.2).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+RESULTS_DIR = os.path.join(BACKEND_DIR, 'benchmarks', 'results')
+USER_API_DIR = os.path.join(REPO_DIR, 'test-apis', 'user-api')
+
+# The app creates its engine at import time, so point it at a scratch SQLite file first
+WORK_DIR = tempfile.mkdtemp(prefix='apitestgen-bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORK_DIR, 'bench.db')}"
+sys.path.insert(0, BACKEND_DIR)
+
+import yaml
+from app.services.api_parser import APIParser
+from app.services.test_generator import TestGenerator
+from app.services.test_executor import TestExecutor
+from app.services.report_generator import ReportGenerator
+from app.services.mock_server import SpecMockServer, MockServerRegistry
+from app.core.database import engine, SessionLocal
+from app.models.base import Base
+from app.models.api_spec import APISpec as APISpecModel, Endpoint as EndpointModel
+from app.models.test_case import TestCase as TestCaseModel, TestResult as TestResultModel, TestCaseType
+
+SEED = 1234
+
+def synthetic_spec(operations: int) -> dict:
+    """OpenAPI document with the given number of operations over CRUD-style resources"""
+    spec = {
+        'openapi': '3.0.3',
+        'info': {'title': f'Synthetic API ({operations} operations)', 'version': '1.0.0'},
+        'servers': [{'url': 'http://localhost:9000/api/v1'}],
+        'paths': {},
+        'components': {'schemas': {}}
+    }
+    resource = 0
+    count = 0
+    while count < operations:
+        name = f"Resource{resource}"
+        spec['components']['schemas'][name] = {
+            'type': 'object',
+            'required': ['name'],
+            'properties': {
+                'id': {'type': 'integer'},
+                'name': {'type': 'string', 'minLength': 1, 'maxLength': 64},
+                'price': {'type': 'number', 'minimum': 0},
+                'active': {'type': 'boolean'},
+                'tags': {'type': 'array', 'items': {'type': 'string'}}
+            }
+        }
+        ref = {'$ref': f'#/components/schemas/{name}'}
+        item_param = [{'name': 'id', 'in': 'path', 'required': True, 'schema': {'type': 'integer'}}]
+        operations_for_resource = [
+            (f"/resources{resource}", 'get', {
+                'parameters': [{'name': 'limit', 'in': 'query', 'schema': {'type': 'integer'}}],
+                'responses': {'200': {'description': 'OK', 'content': {'application/json': {'schema': {'type': 'array', 'items': ref}}}}}
+            }),
+            (f"/resources{resource}", 'post', {
+                'requestBody': {'content': {'application/json': {'schema': ref}}},
+                'responses': {'201': {'description': 'Created', 'content': {'application/json': {'schema': ref}}}}
+            }),
+            (f"/resources{resource}/{{id}}", 'get', {
+                'parameters': item_param,
+                'responses': {'200': {'description': 'OK', 'content': {'application/json': {'schema': ref}}}}
+            }),
+            (f"/resources{resource}/{{id}}", 'put', {
+                'parameters': item_param,
+                'requestBody': {'content': {'application/json': {'schema': ref}}},
+                'responses': {'200': {'description': 'OK', 'content': {'application/json': {'schema': ref}}}}
+            }),
+            (f"/resources{resource}/{{id}}", 'delete', {
+                'parameters': item_param,
+                'responses': {'204': {'description': 'Deleted'}}
+            }),
+        ]
+        for path, method, operation in operations_for_resource:
+            if count >= operations:
+                break
+            operation['summary'] = f"{method.upper()} {path}"
+            spec['paths'].setdefault(path, {})[method] = operation
+            count += 1
+        resource += 1
+    return spec
+
+def measure(func, repeats: int) -> dict:
+    """Median and min wall time of ``func`` over ``repeats`` runs"""
+    timings = []
+    for _ in range(repeats):
+        random.seed(SEED)
+        start_time = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start_time)
+    return {'seconds': statistics.median(timings), 'min_seconds': min(timings), 'repeats': repeats}
+
+def with_throughput(result: dict, items: int) -> dict:
+    result['items'] = items
+    result['items_per_second'] = round(items / result['seconds'], 1) if result['seconds'] > 0 else None
+    return result
+
+def bench_parser(quick: bool) -> dict:
+    """APIParser load + endpoint extraction on synthetic specs"""
+    results = {}
+    sizes = [10, 100, 1000] if quick else [10, 100, 1000, 10000]
+    for size in sizes:
+        spec = synthetic_spec(size)
+        formats = ['json', 'yaml'] if size <= 1000 else ['json']
+        for file_format in formats:
+            file_path = os.path.join(WORK_DIR, f"spec_{size}.{file_format}")
+            with open(file_path, 'w', encoding='utf-8') as f:
+                if file_format == 'json':
+                    json.dump(spec, f)
+                else:
+                    yaml.safe_dump(spec, f, sort_keys=False)
+
+            def parse():
+                content = APIParser.validate_spec_file(file_path)['content']
+                APIParser.extract_endpoints_from_openapi(content)
+
+            repeats = 1 if size >= 10000 or (file_format == 'yaml' and size >= 1000) else 5
+            results[f"parser_{file_format}_{size}"] = with_throughput(measure(parse, repeats), size)
+    return results
+
+def bench_generator(quick: bool) -> dict:
+    """Rule-based TestGenerator.generate_test_cases throughput"""
+    size = 200 if quick else 1000
+    endpoints = APIParser.extract_endpoints_from_openapi(synthetic_spec(size))
+
+    def generate():
+        for endpoint in endpoints:
+            TestGenerator.generate_test_cases(endpoint, "http://localhost:9000")
+
+    return {f"generator_{size}_endpoints": with_throughput(measure(generate, 3), size)}
+
+def executor_cases(endpoints: list, count: int) -> list:
+    cases = []
+    for i in range(count):
+        endpoint = endpoints[i % len(endpoints)]
+        cases.append({
+            'id': i,
+            'name': f"bench {i}",
+            'method': endpoint['method'],
+            'path': endpoint['path'].replace('{id}', str(i % 50 + 1)),
+            'priority': 'medium',
+            'input_data': {'body': {'name': 'bench'}} if endpoint['method'] in ('POST', 'PUT') else {},
+            'expected_status_code': 200
+        })
+    return cases
+
+def bench_executor_asgi(quick: bool) -> dict:
+    """execute_test_suite against the in-process spec mock (no sockets)"""
+    spec = synthetic_spec(100)
+    endpoints = APIParser.extract_endpoints_from_openapi(spec)
+    server = MockServerRegistry.register(SpecMockServer(999999, endpoints, spec))
+    count = 1000 if quick else 5000
+    cases = executor_cases(endpoints, count)
+
+    def run():
+        asyncio.run(TestExecutor.execute_test_suite(cases, server.base_url))
+
+    try:
+        return {f"executor_asgi_{count}_cases": with_throughput(measure(run, 3), count)}
+    finally:
+        MockServerRegistry.remove(server.api_spec_id)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def bench_executor_user_api(quick: bool) -> dict:
+    """execute_test_suite over HTTP against test-apis/user-api backed by SQLite"""
+    import httpx
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {**os.environ, 'DATABASE_URL': f"sqlite:///{os.path.join(WORK_DIR, 'user_api.db')}"}
+    log_path = os.path.join(WORK_DIR, 'user_api.log')
+
+    # user-api's startup hook creates tables from database.Base, but its models use
+    # their own declarative Base, so create the users table from the models directly
+    prepare = subprocess.run(
+        [sys.executable, '-c', "from models import Base; from database import engine; Base.metadata.create_all(bind=engine)"],
+        cwd=USER_API_DIR, env=env, capture_output=True
+    )
+    if prepare.returncode != 0:
+        error = prepare.stderr.decode(errors='replace').strip().splitlines()
+        return {'executor_user_api': {'skipped': f"user-api could not be imported: {error[-1] if error else prepare.returncode}"}}
+
+    with open(log_path, 'wb') as log_file:
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+            cwd=USER_API_DIR, env=env, stdout=log_file, stderr=subprocess.STDOUT
+        )
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            if process.poll() is not None:
+                with open(log_path, encoding='utf-8', errors='replace') as f:
+                    error = f.read().strip().splitlines()
+                return {'executor_user_api': {'skipped': f"user-api failed to start: {error[-1] if error else process.returncode}"}}
+            try:
+                if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                return {'executor_user_api': {'skipped': "user-api did not become healthy within 20s"}}
+            time.sleep(0.2)
+
+        for i in range(50):
+            httpx.post(f"{base_url}/auth/register", json={
+                'username': f"bench{i}", 'email': f"bench{i}@example.com",
+                'full_name': f"Bench User {i}", 'password': 'bench-password'
+            }, timeout=10)
+
+        endpoints = [
+            {'method': 'GET', 'path': '/users'},
+            {'method': 'GET', 'path': '/users/{id}'},
+            {'method': 'GET', 'path': '/health'},
+        ]
+        count = 300 if quick else 2000
+        cases = executor_cases(endpoints, count)
+
+        def run():
+            asyncio.run(TestExecutor.execute_test_suite(cases, base_url))
+
+        return {f"executor_user_api_{count}_cases": with_throughput(measure(run, 3), count)}
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+def synthetic_results(count: int) -> list:
+    statuses = ['passed'] * 7 + ['failed', 'error', 'skipped']
+    results = []
+    for i in range(count):
+        status = statuses[i % len(statuses)]
+        results.append({
+            'test_case': {
+                'id': i, 'name': f"Test case {i}", 'method': 'GET', 'path': f"/resources{i % 100}/{{id}}",
+                'priority': 'medium', 'expected_status_code': 200
+            },
+            'status': status,
+            'response_status_code': 200 if status == 'passed' else (500 if status == 'failed' else None),
+            'response_body': json.dumps({'id': i, 'name': 'x' * 64}),
+            'response_time': random.randint(5, 500),
+            'error_message': None if status == 'passed' else f"{status} for case {i}",
+            'execution_log': f"Request: GET /resources/{i}\nResponse: 200",
+            'service_calls': [],
+            'attempt_count': 1,
+            'flaky': False
+        })
+    return results
+
+def bench_reporter(quick: bool) -> dict:
+    """ReportGenerator markdown generation on a large result set"""
+    count = 2000 if quick else 10000
+    random.seed(SEED)
+    results = synthetic_results(count)
+    summary = {
+        'total_tests': count,
+        'passed': sum(1 for r in results if r['status'] == 'passed'),
+        'failed': sum(1 for r in results if r['status'] == 'failed'),
+        'errors': sum(1 for r in results if r['status'] == 'error'),
+        'skipped': sum(1 for r in results if r['status'] == 'skipped'),
+        'success_rate': 70.0,
+        'average_response_time': 250
+    }
+    previous_dir = os.getcwd()
+    os.chdir(WORK_DIR)
+    try:
+        return {f"reporter_{count}_results": with_throughput(
+            measure(lambda: ReportGenerator.generate_test_report('bench', results, summary), 3), count
+        )}
+    finally:
+        os.chdir(previous_dir)
+
+def bench_db_writes(quick: bool) -> dict:
+    """TestResult inserts in the same add-per-row + single commit pattern as the endpoints"""
+    import app.models  # noqa: F401 - registers all models
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        api_spec = APISpecModel(name='bench', file_type='openapi')
+        db.add(api_spec)
+        db.flush()
+        endpoint = EndpointModel(api_spec_id=api_spec.id, path='/bench', method='GET')
+        db.add(endpoint)
+        db.flush()
+        test_case = TestCaseModel(api_spec_id=api_spec.id, endpoint_id=endpoint.id, name='bench', test_type=TestCaseType.AUTOMATED)
+        db.add(test_case)
+        db.commit()
+        test_case_id = test_case.id
+    finally:
+        db.close()
+
+    count = 1000 if quick else 5000
+    random.seed(SEED)
+    results = synthetic_results(count)
+
+    def write():
+        session = SessionLocal()
+        try:
+            for result in results:
+                session.add(TestResultModel(
+                    test_case_id=test_case_id,
+                    status=result['status'],
+                    response_status_code=result['response_status_code'],
+                    response_body=result['response_body'],
+                    response_time=result['response_time'],
+                    error_message=result['error_message'],
+                    execution_log=result['execution_log'],
+                    attempt_count=1,
+                    is_flaky=False
+                ))
+            session.commit()
+        finally:
+            session.close()
+
+    return {f"db_writes_{count}_results": with_throughput(measure(write, 3), count)}
+
+BENCHMARKS = {
+    'parser': bench_parser,
+    'generator': bench_generator,
+    'executor_asgi': bench_executor_asgi,
+    'executor_user_api': bench_executor_user_api,
+    'reporter': bench_reporter,
+    'db_writes': bench_db_writes,
+}
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def compare(results: dict, baseline: dict, threshold: float, min_seconds: float) -> list:
+    """Benchmarks whose best time grew by more than ``threshold`` over the baseline.
+
+    Best-of times are compared because they are far less sensitive to
+    scheduler noise than medians; sub-``min_seconds`` benchmarks are ignored.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or 'min_seconds' not in previous or 'min_seconds' not in result:
+            continue
+        if previous['min_seconds'] < min_seconds:
+            continue
+        change = (result['min_seconds'] - previous['min_seconds']) / previous['min_seconds']
+        if change > threshold:
+            regressions.append({
+                'benchmark': name,
+                'baseline_seconds': previous['min_seconds'],
+                'seconds': result['min_seconds'],
+                'change': round(change, 3)
+            })
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="APITestGen backend benchmarks")
+    parser.add_argument('--quick', action='store_true', help="smaller sizes for a fast local check")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument('--output', help="result file (default: benchmarks/results/<timestamp>_<commit>.json)")
+    parser.add_argument('--baseline', help="result file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed slowdown as a fraction (default 0.2)")
+    parser.add_argument('--min-seconds', type=float, default=0.001, help="skip regression checks for faster benchmarks (default 0.001)")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        print(f"Running {name}...", flush=True)
+        results.update(BENCHMARKS[name](args.quick))
+
+    commit = git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(),
+            'quick': args.quick,
+            'seed': SEED,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'results': results
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{commit}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'benchmark':40} {'median s':>10} {'items/s':>12}")
+    for name, result in results.items():
+        if 'skipped' in result:
+            print(f"{name:40} skipped: {result['skipped']}")
+        else:
+            print(f"{name:40} {result['seconds']:10.4f} {result.get('items_per_second') or 0:12.1f}")
+    print(f"\nSaved {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        if regressions:
+            print(f"\nRegressions over {args.threshold:.0%} against {baseline['meta'].get('commit')}:")
+            for regression in regressions:
+                print(f"  {regression['benchmark']}: {regression['baseline_seconds']:.4f}s -> {regression['seconds']:.4f}s ({regression['change']:+.0%})")
+            sys.exit(1)
+        print(f"\nNo regressions over {args.threshold:.0%} against {baseline['meta'].get('commit')}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+Migration script to add the fixture_sets table for bulk seed data
+"""
+from app.core.database import engine
+from app.models.fixture_set import FixtureSet
+import app.models  # registers the api_specs table the foreign key points to
+
+def upgrade():
+    """Create fixture_sets"""
+    FixtureSet.__table__.create(bind=engine, checkfirst=True)
+
+def downgrade():
+    """Drop fixture_sets"""
+    FixtureSet.__table__.drop(bind=engine, checkfirst=True)
+
+if __name__ == "__main__":
+    print("Creating fixture_sets table...")
+    upgrade()
+    print("Migration completed successfully!")
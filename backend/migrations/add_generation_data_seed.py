@@ -0,0 +1,28 @@
+"""
+Migration script to add the synthetic test data seed to generation_jobs table
+"""
+from sqlalchemy import text
+from app.core.database import engine
+
+def upgrade():
+    """Add data_seed to generation_jobs"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE generation_jobs
+            ADD COLUMN data_seed INTEGER
+        """))
+        conn.commit()
+
+def downgrade():
+    """Remove data_seed from generation_jobs"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE generation_jobs
+            DROP COLUMN data_seed
+        """))
+        conn.commit()
+
+if __name__ == "__main__":
+    print("Adding data_seed column to generation_jobs table...")
+    upgrade()
+    print("Migration completed successfully!")
@@ -0,0 +1,19 @@
+"""
+Migration script to add the generation_jobs table for background generation
+"""
+from app.core.database import engine
+from app.models.generation_job import GenerationJob
+import app.models  # registers the api_specs table the foreign key points to
+
+def upgrade():
+    """Create generation_jobs"""
+    GenerationJob.__table__.create(bind=engine, checkfirst=True)
+
+def downgrade():
+    """Drop generation_jobs"""
+    GenerationJob.__table__.drop(bind=engine, checkfirst=True)
+
+if __name__ == "__main__":
+    print("Creating generation_jobs table...")
+    upgrade()
+    print("Migration completed successfully!")
@@ -0,0 +1,45 @@
+"""
+Migration script to add background generation status columns to api_specs table
+"""
+from sqlalchemy import text
+from app.core.database import engine
+
+def upgrade():
+    """Add generation_status, generation_job_id and generation_error to api_specs"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE api_specs
+            ADD COLUMN generation_status VARCHAR(50)
+        """))
+        conn.execute(text("""
+            ALTER TABLE api_specs
+            ADD COLUMN generation_job_id INTEGER
+        """))
+        conn.execute(text("""
+            ALTER TABLE api_specs
+            ADD COLUMN generation_error TEXT
+        """))
+
+        # Specs imported before this migration generated their test cases during import
+        conn.execute(text("""
+            UPDATE api_specs
+            SET generation_status = 'completed'
+            WHERE status = 'success'
+        """))
+
+        conn.commit()
+
+def downgrade():
+    """Remove the generation status columns from api_specs"""
+    with engine.connect() as conn:
+        for column in ('generation_error', 'generation_job_id', 'generation_status'):
+            conn.execute(text(f"""
+                ALTER TABLE api_specs
+                DROP COLUMN {column}
+            """))
+        conn.commit()
+
+if __name__ == "__main__":
+    print("Adding generation status columns to api_specs table...")
+    upgrade()
+    print("Migration completed successfully!")
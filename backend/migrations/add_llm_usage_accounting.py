@@ -0,0 +1,43 @@
+"""
+Migration script to add per-call LLM usage accounting and budgets to generation jobs
+"""
+from sqlalchemy import text
+from app.core.database import engine
+from app.models.llm_call import LLMCall
+import app.models  # registers the generation_jobs table the foreign key points to
+
+GENERATION_JOB_COLUMNS = (
+    ("prompt_tokens", "INTEGER DEFAULT 0"),
+    ("completion_tokens", "INTEGER DEFAULT 0"),
+    ("cost", "FLOAT DEFAULT 0"),
+    ("llm_call_count", "INTEGER DEFAULT 0"),
+    ("max_tokens", "INTEGER"),
+    ("max_cost", "FLOAT"),
+)
+
+def upgrade():
+    """Create llm_calls and add usage totals and budget columns to generation_jobs"""
+    LLMCall.__table__.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        for column, definition in GENERATION_JOB_COLUMNS:
+            conn.execute(text(f"""
+                ALTER TABLE generation_jobs
+                ADD COLUMN {column} {definition}
+            """))
+        conn.commit()
+
+def downgrade():
+    """Drop llm_calls and the generation_jobs usage columns"""
+    LLMCall.__table__.drop(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        for column, _ in reversed(GENERATION_JOB_COLUMNS):
+            conn.execute(text(f"""
+                ALTER TABLE generation_jobs
+                DROP COLUMN {column}
+            """))
+        conn.commit()
+
+if __name__ == "__main__":
+    print("Adding LLM usage accounting tables and columns...")
+    upgrade()
+    print("Migration completed successfully!")
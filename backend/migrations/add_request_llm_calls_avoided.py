@@ -0,0 +1,28 @@
+"""
+Migration script to add the avoided LLM call count of generation requests to api_specs table
+"""
+from sqlalchemy import text
+from app.core.database import engine
+
+def upgrade():
+    """Add llm_calls_avoided to api_specs"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE api_specs
+            ADD COLUMN llm_calls_avoided INTEGER DEFAULT 0
+        """))
+        conn.commit()
+
+def downgrade():
+    """Remove llm_calls_avoided from api_specs"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE api_specs
+            DROP COLUMN llm_calls_avoided
+        """))
+        conn.commit()
+
+if __name__ == "__main__":
+    print("Adding llm_calls_avoided column to api_specs table...")
+    upgrade()
+    print("Migration completed successfully!")
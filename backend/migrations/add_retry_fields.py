@@ -0,0 +1,47 @@
+"""
+Migration script to add retry policy and retry outcome columns
+"""
+from sqlalchemy import text
+from app.core.database import engine
+
+def upgrade():
+    """Add retry_policy to test_cases and attempt_count/is_flaky to test_results"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE test_cases 
+            ADD COLUMN retry_policy JSON
+        """))
+        
+        conn.execute(text("""
+            ALTER TABLE test_results 
+            ADD COLUMN attempt_count INTEGER DEFAULT 1
+        """))
+        
+        conn.execute(text("""
+            ALTER TABLE test_results 
+            ADD COLUMN is_flaky BOOLEAN DEFAULT FALSE
+        """))
+        
+        conn.commit()
+
+def downgrade():
+    """Remove retry columns"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE test_cases 
+            DROP COLUMN retry_policy
+        """))
+        conn.execute(text("""
+            ALTER TABLE test_results 
+            DROP COLUMN attempt_count
+        """))
+        conn.execute(text("""
+            ALTER TABLE test_results 
+            DROP COLUMN is_flaky
+        """))
+        conn.commit()
+
+if __name__ == "__main__":
+    print("Adding retry columns to test_cases and test_results tables...")
+    upgrade()
+    print("Migration completed successfully!")
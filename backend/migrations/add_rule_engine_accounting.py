@@ -0,0 +1,28 @@
+"""
+Migration script to add the rule engine's avoided LLM call count to generation_jobs table
+"""
+from sqlalchemy import text
+from app.core.database import engine
+
+def upgrade():
+    """Add llm_calls_avoided to generation_jobs"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE generation_jobs
+            ADD COLUMN llm_calls_avoided INTEGER DEFAULT 0
+        """))
+        conn.commit()
+
+def downgrade():
+    """Remove llm_calls_avoided from generation_jobs"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE generation_jobs
+            DROP COLUMN llm_calls_avoided
+        """))
+        conn.commit()
+
+if __name__ == "__main__":
+    print("Adding llm_calls_avoided column to generation_jobs table...")
+    upgrade()
+    print("Migration completed successfully!")
@@ -0,0 +1,44 @@
+"""
+Migration script to add the test case fingerprint column and its dedup index
+"""
+from sqlalchemy import text
+from app.core.database import engine, SessionLocal
+from app.services.test_case_dedup import TestCaseDeduplicator
+
+def upgrade():
+    """Add fingerprint to test_cases, index it per API spec and fingerprint existing rows"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE test_cases 
+            ADD COLUMN fingerprint VARCHAR(64)
+        """))
+        
+        conn.execute(text("""
+            CREATE INDEX ix_test_cases_api_spec_fingerprint 
+            ON test_cases (api_spec_id, fingerprint)
+        """))
+        
+        conn.commit()
+    
+    db = SessionLocal()
+    try:
+        print(f"Fingerprinted {TestCaseDeduplicator.backfill(db)} existing test cases")
+    finally:
+        db.close()
+
+def downgrade():
+    """Remove the fingerprint column and index"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            DROP INDEX ix_test_cases_api_spec_fingerprint
+        """))
+        conn.execute(text("""
+            ALTER TABLE test_cases 
+            DROP COLUMN fingerprint
+        """))
+        conn.commit()
+
+if __name__ == "__main__":
+    print("Adding fingerprint column to test_cases table...")
+    upgrade()
+    print("Migration completed successfully!")
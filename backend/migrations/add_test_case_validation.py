@@ -0,0 +1,33 @@
+"""
+Migration script to add pre-execution validation columns to test_cases table
+"""
+from sqlalchemy import text
+from app.core.database import engine
+
+def upgrade():
+    """Add validation_status and validation_errors to test_cases"""
+    with engine.connect() as conn:
+        conn.execute(text("""
+            ALTER TABLE test_cases 
+            ADD COLUMN validation_status VARCHAR(20)
+        """))
+        conn.execute(text("""
+            ALTER TABLE test_cases 
+            ADD COLUMN validation_errors JSON
+        """))
+        conn.commit()
+
+def downgrade():
+    """Remove the validation columns from test_cases"""
+    with engine.connect() as conn:
+        for column in ('validation_errors', 'validation_status'):
+            conn.execute(text(f"""
+                ALTER TABLE test_cases 
+                DROP COLUMN {column}
+            """))
+        conn.commit()
+
+if __name__ == "__main__":
+    print("Adding validation columns to test_cases table...")
+    upgrade()
+    print("Migration completed successfully!")
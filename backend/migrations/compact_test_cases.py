@@ -0,0 +1,34 @@
+"""
+One-off job collapsing stored test cases that share a fingerprint.
+
+Run after add_test_case_fingerprints from the backend directory:
+
+    python -m migrations.compact_test_cases [--api-spec-id N] [--dry-run]
+
+Prints a JSON report of the duplicates removed and the requests saved.
+"""
+import argparse
+import json
+from app.core.database import SessionLocal
+from app.services.test_case_dedup import TestCaseDeduplicator
+
+def main():
+    parser = argparse.ArgumentParser(description="Collapse duplicate test cases")
+    parser.add_argument('--api-spec-id', type=int, help="only compact this API specification")
+    parser.add_argument('--dry-run', action='store_true', help="report without changing anything")
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        report = TestCaseDeduplicator.compact(db, api_spec_id=args.api_spec_id, dry_run=args.dry_run)
+    finally:
+        db.close()
+    
+    print(json.dumps(report, indent=2))
+    print(f"{'Would remove' if args.dry_run else 'Removed'} {report['duplicates_removed']} duplicate test cases: "
+          f"{report['requests_saved_per_run']} fewer requests per run, "
+          f"{report['duplicate_executions']} duplicate executions already recorded "
+          f"({report['runs_worth_saved']} runs' worth)")
+
+if __name__ == "__main__":
+    main()
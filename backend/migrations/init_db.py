@@ -0,0 +1,30 @@
+"""
+Create the database schema before the API starts serving.
+
+Meant to run as a deploy step (e.g. a Kubernetes init container) so the
+server itself does not wait on the database:
+
+    python -m migrations.init_db
+
+Set DB_INIT_ON_STARTUP=0 on the server when this step is used.
+"""
+import time
+from app.core.config import settings
+from app.core.database import create_tables
+
+def upgrade():
+    """Create all tables, retrying while the database comes up"""
+    for attempt in range(settings.DB_INIT_MAX_RETRIES):
+        try:
+            create_tables()
+            return
+        except Exception as e:
+            if attempt == settings.DB_INIT_MAX_RETRIES - 1:
+                raise
+            print(f"Database not ready (attempt {attempt + 1}/{settings.DB_INIT_MAX_RETRIES}): {e}")
+            time.sleep(settings.DB_INIT_RETRY_DELAY)
+
+if __name__ == "__main__":
+    print("Creating database tables...")
+    upgrade()
+    print("Database tables created successfully!")